@@ -19,6 +19,7 @@ minimal_requires = [
     "anthropic",
     "dashscope",
     "docstring_parser",
+    "httpx",
     "json5",
     "json_repair",
     "mcp",
@@ -9,13 +9,15 @@ import os
 import tempfile
 import types
 import typing
+from copy import deepcopy
 from datetime import datetime
+from urllib.parse import urlparse
 from typing import Union, Any, Callable, Type, Dict
 
-import requests
 from json_repair import repair_json
 from pydantic import BaseModel
 
+from ._media_cache import _media_cache
 from .._logging import logger
 
 if typing.TYPE_CHECKING:
@@ -103,11 +105,22 @@ async def _execute_async_or_sync_func(
     return func(*args, **kwargs)
 
 
+def _decode_web_bytes(content: bytes) -> str:
+    """Decode the downloaded content as UTF-8 text, or encode it into base64
+    if it's binary."""
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return base64.b64encode(content).decode("ascii")
+
+
 def _get_bytes_from_web_url(
     url: str,
     max_retries: int = 3,
 ) -> str:
-    """Get the bytes from a given URL.
+    """Get the bytes from a given URL. The downloaded content is cached in
+    the shared media cache. Use `_aget_bytes_from_web_url` in the async
+    code instead.
 
     Args:
         url (`str`):
@@ -117,12 +130,36 @@ def _get_bytes_from_web_url(
     """
     for _ in range(max_retries):
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.content.decode("utf-8")
+            return _media_cache.get_url(url, _decode_web_bytes)
+
+        except Exception as e:
+            logger.info(
+                "Failed to fetch bytes from URL %s. Error %s. Retrying...",
+                url,
+                str(e),
+            )
+
+    raise RuntimeError(
+        f"Failed to fetch bytes from URL `{url}` after {max_retries} retries.",
+    )
+
 
-        except UnicodeDecodeError:
-            return base64.b64encode(response.content).decode("ascii")
+async def _aget_bytes_from_web_url(
+    url: str,
+    max_retries: int = 3,
+) -> str:
+    """Get the bytes from a given URL without blocking the event loop. The
+    downloaded content is cached in the shared media cache.
+
+    Args:
+        url (`str`):
+            The URL to fetch the bytes from.
+        max_retries (`int`, defaults to `3`):
+            The maximum number of retries.
+    """
+    for _ in range(max_retries):
+        try:
+            return await _media_cache.aget_url(url, _decode_web_bytes)
 
         except Exception as e:
             logger.info(
@@ -136,6 +173,13 @@ def _get_bytes_from_web_url(
     )
 
 
+def _is_web_url(url: str) -> bool:
+    """Check if the URL is a web URL rather than a local file."""
+    return urlparse(url).scheme in ["http", "https"] and not os.path.exists(
+        url,
+    )
+
+
 def _save_base64_data(
     media_type: str,
     base64_data: str,
@@ -162,7 +206,8 @@ def _save_base64_data(
 
 
 def _extract_json_schema_from_mcp_tool(tool: Tool) -> dict[str, Any]:
-    """Extract JSON schema from MCP tool."""
+    """Extract JSON schema from MCP tool. The schema is copied, since the
+    tool may be shared by the clients through the tool cache."""
 
     return {
         "type": "function",
@@ -171,13 +216,17 @@ def _extract_json_schema_from_mcp_tool(tool: Tool) -> dict[str, Any]:
             "description": tool.description,
             "parameters": {
                 "type": "object",
-                "properties": tool.inputSchema.get(
-                    "properties",
-                    {},
+                "properties": deepcopy(
+                    tool.inputSchema.get(
+                        "properties",
+                        {},
+                    ),
                 ),
-                "required": tool.inputSchema.get(
-                    "required",
-                    [],
+                "required": list(
+                    tool.inputSchema.get(
+                        "required",
+                        [],
+                    ),
                 ),
             },
         },
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Parse the dimensions of the images from their header bytes, so that the
+size of an image is known without downloading or decoding all of it."""
+import struct
+
+# The JPEG start-of-frame markers, which carry the image dimensions
+_JPEG_SOF_MARKERS = {
+    0xC0,
+    0xC1,
+    0xC2,
+    0xC3,
+    0xC5,
+    0xC6,
+    0xC7,
+    0xC9,
+    0xCA,
+    0xCB,
+    0xCD,
+    0xCE,
+    0xCF,
+}
+
+
+def _get_jpeg_size(data: bytes) -> tuple[int, int] | None:
+    """Walk through the JPEG segments until the start-of-frame one."""
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Standalone markers without length
+            i += 2
+            continue
+
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[i + 5 : i + 9])
+            return width, height
+
+        (length,) = struct.unpack(">H", data[i + 2 : i + 4])
+        i += 2 + length
+    return None
+
+
+def _get_webp_size(data: bytes) -> tuple[int, int] | None:
+    """Read the dimensions from the first chunk of the WebP image."""
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and data[20] == 0x2F:
+        (bits,) = struct.unpack("<I", data[21:25])
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def _get_image_size_from_header(  # pylint: disable=too-many-return-statements
+    data: bytes,
+) -> tuple[int, int] | None:
+    """Get the width and height of a PNG, JPEG, GIF or WebP image from its
+    leading bytes.
+
+    Args:
+        data (`bytes`):
+            The leading bytes of the image.
+
+    Returns:
+        `tuple[int, int] | None`:
+            The width and height of the image, or `None` if the format is
+            not supported or the dimensions are not within the given bytes.
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(data) < 24 or data[12:16] != b"IHDR":
+            return None
+        width, height = struct.unpack(">II", data[16:24])
+        return width, height
+
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        if len(data) < 10:
+            return None
+        width, height = struct.unpack("<HH", data[6:10])
+        return width, height
+
+    if data.startswith(b"\xff\xd8"):
+        return _get_jpeg_size(data)
+
+    if data.startswith(b"RIFF") and data[8:12] == b"WEBP":
+        return _get_webp_size(data)
+
+    return None
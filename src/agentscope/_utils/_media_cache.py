@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""The content-addressed cache of the encoded media (e.g. the base64 data of
+the local images and the downloaded audios), shared by the formatters."""
+import asyncio
+import base64
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import requests
+
+from ._media_fetcher import _media_fetcher
+from .._logging import logger
+
+
+def _encode_base64(content: bytes) -> str:
+    """Encode the bytes into the base64 string."""
+    return base64.b64encode(content).decode("ascii")
+
+
+@dataclass
+class _MediaCacheEntry:
+    """A cached encoded media."""
+
+    payload: str
+    """The encoded payload."""
+
+    etag: str | None = None
+    """The ETag of the web URL, used to revalidate the entry."""
+
+    last_modified: str | None = None
+    """The Last-Modified header of the web URL, used to revalidate the
+    entry if there's no ETag."""
+
+    validated_at: float = 0.0
+    """The timestamp when the web URL was last downloaded or
+    revalidated."""
+
+
+class _MediaCache:
+    """The byte-bounded LRU cache of the encoded media, so that the local
+    files and web URLs in the memory are not read, downloaded and encoded
+    again each time the messages are formatted.
+
+    The local files are keyed by their real path, modification time and
+    size, so a modified file is encoded again. The web URLs are reused
+    within `revalidate_after` seconds since downloaded, e.g. across the
+    formatting and truncation of the same messages. After that, they're
+    revalidated by a conditional request with their `ETag` or
+    `Last-Modified` headers, which only downloads the content again if
+    it's changed, or downloaded again if there's no such validator.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        revalidate_after: float = 60.0,
+    ) -> None:
+        """Initialize the media cache.
+
+        Args:
+            max_bytes (`int`, defaults to `256 * 1024 * 1024`):
+                The maximum total size of the cached payloads, the least
+                recently used ones are evicted when exceeded.
+            revalidate_after (`float`, defaults to `60.0`):
+                The seconds within which a downloaded web URL is reused
+                without revalidation.
+        """
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[tuple, _MediaCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_file(
+        self,
+        path: str,
+        encode: Callable[[bytes], str] = _encode_base64,
+    ) -> str:
+        """Get the encoded content of the local file.
+
+        Args:
+            path (`str`):
+                The path of the local file.
+            encode (`Callable[[bytes], str]`, defaults to base64 encoding):
+                The function encoding the file content.
+
+        Returns:
+            `str`:
+                The encoded file content.
+        """
+        real_path = os.path.realpath(path)
+        stat = os.stat(real_path)
+        key = (
+            "file",
+            real_path,
+            stat.st_mtime_ns,
+            stat.st_size,
+            encode.__qualname__,
+        )
+
+        entry = self._get(key)
+        if entry is not None:
+            return entry.payload
+
+        with open(real_path, "rb") as f:
+            payload = encode(f.read())
+        self._put(key, _MediaCacheEntry(payload))
+        return payload
+
+    def get_url(
+        self,
+        url: str,
+        encode: Callable[[bytes], str] = _encode_base64,
+        timeout: float | None = 60,
+    ) -> str:
+        """Get the encoded content of the web URL in the blocking way, for
+        the synchronous callers. Use `aget_url` in the async code.
+
+        Args:
+            url (`str`):
+                The web URL.
+            encode (`Callable[[bytes], str]`, defaults to base64 encoding):
+                The function encoding the downloaded content.
+            timeout (`float | None`, defaults to `60`):
+                The timeout of the request in seconds.
+
+        Returns:
+            `str`:
+                The encoded content.
+        """
+        key, entry, headers = self._prepare_url(url, encode)
+        if entry is not None and not headers:
+            return entry.payload
+
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if entry is not None and response.status_code == 304:
+            return self._revalidated(entry)
+
+        response.raise_for_status()
+        return self._downloaded(
+            key,
+            encode(response.content),
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+
+    async def aget_url(
+        self,
+        url: str,
+        encode: Callable[[bytes], str] = _encode_base64,
+    ) -> str:
+        """Get the encoded content of the web URL, which is downloaded by
+        the shared async media fetcher.
+
+        Args:
+            url (`str`):
+                The web URL.
+            encode (`Callable[[bytes], str]`, defaults to base64 encoding):
+                The function encoding the downloaded content.
+
+        Returns:
+            `str`:
+                The encoded content.
+        """
+        key, entry, headers = self._prepare_url(url, encode)
+        if entry is not None and not headers:
+            return entry.payload
+
+        media = await _media_fetcher.fetch(url, headers=headers)
+        try:
+            if entry is not None and media.status_code == 304:
+                return self._revalidated(entry)
+            payload = encode(media.read())
+        finally:
+            media.close()
+
+        return self._downloaded(
+            key,
+            payload,
+            media.headers.get("etag"),
+            media.headers.get("last-modified"),
+        )
+
+    async def aprefetch(
+        self,
+        urls: Iterable[str],
+        encode: Callable[[bytes], str] = _encode_base64,
+    ) -> None:
+        """Download the web URLs concurrently ahead of their use. The
+        failures are only logged here, and raised again when the URL is
+        used.
+
+        Args:
+            urls (`Iterable[str]`):
+                The web URLs.
+            encode (`Callable[[bytes], str]`, defaults to base64 encoding):
+                The function encoding the downloaded content.
+        """
+        urls = list(dict.fromkeys(urls))
+        results = await asyncio.gather(
+            *[self.aget_url(_, encode) for _ in urls],
+            return_exceptions=True,
+        )
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to prefetch %s: %s", url, result)
+
+    def _prepare_url(
+        self,
+        url: str,
+        encode: Callable[[bytes], str],
+    ) -> tuple[tuple, _MediaCacheEntry | None, dict[str, str]]:
+        """Get the key and cached entry of the web URL, and the conditional
+        headers to revalidate it. The headers are empty if the entry is
+        fresh."""
+        key = ("url", url, encode.__qualname__)
+        entry = self._get(key, count=False)
+
+        headers: dict[str, str] = {}
+        if entry is None:
+            return key, None, headers
+
+        if time.time() - entry.validated_at < self.revalidate_after:
+            self.hits += 1
+            return key, entry, headers
+
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        if not headers:
+            # Not able to revalidate, download it again
+            return key, None, headers
+        return key, entry, headers
+
+    def _revalidated(self, entry: _MediaCacheEntry) -> str:
+        """Mark the entry as revalidated and return its payload."""
+        self.hits += 1
+        entry.validated_at = time.time()
+        return entry.payload
+
+    def _downloaded(
+        self,
+        key: tuple,
+        payload: str,
+        etag: str | None,
+        last_modified: str | None,
+    ) -> str:
+        """Cache the downloaded payload and return it."""
+        self.misses += 1
+        self._put(
+            key,
+            _MediaCacheEntry(payload, etag, last_modified, time.time()),
+        )
+        return payload
+
+    def get(self, key: tuple) -> str | None:
+        """Get the cached payload of a derived media, e.g. a downscaled
+        image keyed by the hash of its original content.
+
+        Args:
+            key (`tuple`):
+                The key of the derived media.
+
+        Returns:
+            `str | None`:
+                The cached payload, or `None` if not cached.
+        """
+        entry = self._get(("derived", *key))
+        return entry.payload if entry is not None else None
+
+    def put(self, key: tuple, payload: str) -> None:
+        """Cache the payload of a derived media.
+
+        Args:
+            key (`tuple`):
+                The key of the derived media.
+            payload (`str`):
+                The encoded payload.
+        """
+        self._put(("derived", *key), _MediaCacheEntry(payload))
+
+    def clear(self) -> None:
+        """Remove all the cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _get(self, key: tuple, count: bool = True) -> _MediaCacheEntry | None:
+        """Get the entry and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            if count:
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            return entry
+
+    def _put(self, key: tuple, entry: _MediaCacheEntry) -> None:
+        """Put the entry, and evict the least recently used ones if the
+        cache is full. The payload larger than the cache is not cached."""
+        size = len(entry.payload)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.payload)
+
+            self._entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.payload)
+
+
+_media_cache = _MediaCache()
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""The async fetcher of the remote media, built on a pooled HTTP client
+shared within the event loop."""
+import asyncio
+import tempfile
+import weakref
+from dataclasses import dataclass, field
+from typing import IO
+
+import httpx
+
+
+@dataclass
+class _FetchedMedia:
+    """A fetched remote media."""
+
+    status_code: int
+    """The status code of the response."""
+
+    headers: dict[str, str] = field(default_factory=dict)
+    """The response headers, with lower-cased names."""
+
+    file: IO[bytes] | None = None
+    """The downloaded content, which is kept in memory and rolled over to a
+    temporary file on disk once it's large. `None` if not modified."""
+
+    def read(self) -> bytes:
+        """Read the downloaded content."""
+        if self.file is None:
+            return b""
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self) -> None:
+        """Release the downloaded content."""
+        if self.file is not None:
+            self.file.close()
+
+
+class _MediaFetcher:
+    """Fetch the remote media without blocking the event loop. The
+    requests within an event loop share one pooled HTTP client, and the
+    concurrent downloads are bounded by a semaphore. The downloads are
+    streamed, so the ones exceeding the size limit are aborted early, and
+    the large ones are spooled to disk instead of memory."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_size: int = 100 * 1024 * 1024,
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        spool_size: int = 8 * 1024 * 1024,
+    ) -> None:
+        """Initialize the media fetcher.
+
+        Args:
+            max_concurrency (`int`, defaults to `8`):
+                The maximum number of the concurrent downloads in an event
+                loop.
+            max_size (`int`, defaults to `100 * 1024 * 1024`):
+                The maximum size of a download in bytes.
+            timeout (`float`, defaults to `60.0`):
+                The timeout in seconds of reading, writing and waiting for a
+                pooled connection.
+            connect_timeout (`float`, defaults to `10.0`):
+                The timeout in seconds of connecting to the server.
+            spool_size (`int`, defaults to `8 * 1024 * 1024`):
+                The size in bytes above which a download is spooled to disk.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_size = max_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.spool_size = spool_size
+
+        # The HTTP client and semaphore are bound to the event loop
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop,
+            tuple[httpx.AsyncClient, asyncio.Semaphore],
+        ] = weakref.WeakKeyDictionary()
+
+    def _get_client(self) -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        """Get the HTTP client and semaphore of the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in self._clients:
+            client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=httpx.Timeout(
+                    self.timeout,
+                    connect=self.connect_timeout,
+                ),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._clients[loop] = (
+                client,
+                asyncio.Semaphore(self.max_concurrency),
+            )
+        return self._clients[loop]
+
+    async def fetch(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+    ) -> _FetchedMedia:
+        """Download the media from the web URL. The caller should close the
+        returned media.
+
+        Args:
+            url (`str`):
+                The web URL of the media.
+            headers (`dict[str, str] | None`, optional):
+                The extra request headers, e.g. the conditional headers.
+
+        Returns:
+            `_FetchedMedia`:
+                The fetched media, whose `file` is `None` if the server
+                responds 304 (not modified).
+        """
+        client, semaphore = self._get_client()
+        async with semaphore:
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304:
+                    return _FetchedMedia(304, dict(response.headers))
+                response.raise_for_status()
+
+                content_length = response.headers.get("Content-Length")
+                if content_length and int(content_length) > self.max_size:
+                    raise ValueError(
+                        f"The media at {url} has {content_length} bytes, "
+                        f"exceeding the limit of {self.max_size} bytes.",
+                    )
+
+                # pylint: disable=consider-using-with
+                file = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+                try:
+                    size = 0
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > self.max_size:
+                            raise ValueError(
+                                f"The media at {url} exceeds the limit of "
+                                f"{self.max_size} bytes.",
+                            )
+                        file.write(chunk)
+                except BaseException:
+                    file.close()
+                    raise
+
+                return _FetchedMedia(
+                    response.status_code,
+                    dict(response.headers),
+                    file,
+                )
+
+    async def fetch_bytes(self, url: str) -> bytes:
+        """Download the content of the web URL.
+
+        Args:
+            url (`str`):
+                The web URL of the media.
+
+        Returns:
+            `bytes`:
+                The downloaded content.
+        """
+        media = await self.fetch(url)
+        try:
+            return media.read()
+        finally:
+            media.close()
+
+    async def fetch_head(self, url: str, size: int) -> bytes:
+        """Download the leading bytes of the web URL by a range request,
+        e.g. to read the header of an image. The download stops after
+        `size` bytes even if the server ignores the range.
+
+        Args:
+            url (`str`):
+                The web URL of the media.
+            size (`int`):
+                The number of the leading bytes to download.
+
+        Returns:
+            `bytes`:
+                The leading bytes, which are fewer than `size` if the media
+                is smaller.
+        """
+        client, semaphore = self._get_client()
+        async with semaphore:
+            async with client.stream(
+                "GET",
+                url,
+                headers={"Range": f"bytes=0-{size - 1}"},
+            ) as response:
+                response.raise_for_status()
+                buffer = bytearray()
+                async for chunk in response.aiter_bytes():
+                    buffer += chunk
+                    if len(buffer) >= size:
+                        break
+                return bytes(buffer[:size])
+
+    async def aclose(self) -> None:
+        """Close the HTTP client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop in self._clients:
+            client, _ = self._clients.pop(loop)
+            await client.aclose()
+
+
+_media_fetcher = _MediaFetcher()
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""The single-flight utilities that deduplicate identical in-flight
+requests."""
+import asyncio
+import hashlib
+import json
+import weakref
+from typing import Any, AsyncGenerator, Awaitable, Callable
+
+
+def _hash_request(*args: Any, **kwargs: Any) -> str:
+    """Hash the request arguments into a key. The unserializable objects
+    (e.g. pydantic model classes) are hashed by their string
+    representations."""
+    json_str = json.dumps(
+        {"args": args, "kwargs": kwargs},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(json_str.encode("utf-8")).hexdigest()
+
+
+class _StreamBroadcaster:
+    """Consume an async generator once and replay its chunks to every
+    subscriber, so that each caller gets its own tee of the stream."""
+
+    def __init__(self, source: AsyncGenerator[Any, None]) -> None:
+        self._chunks: list = []
+        self._done = False
+        self._error: BaseException | None = None
+        self._event = asyncio.Event()
+        self._subscribers = 0
+        self.task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source: AsyncGenerator[Any, None]) -> None:
+        """Pull the chunks from the source and wake up the subscribers."""
+        try:
+            async for chunk in source:
+                self._chunks.append(chunk)
+                self._notify()
+        except asyncio.CancelledError:
+            # Only cancelled when no one is listening, never re-raise the
+            # cancellation into the callers
+            self._error = RuntimeError("The shared stream was cancelled.")
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._notify()
+            await source.aclose()
+
+    def _notify(self) -> None:
+        """Wake up all the waiting subscribers."""
+        self._event.set()
+        self._event = asyncio.Event()
+
+    def subscribe(self) -> AsyncGenerator[Any, None]:
+        """Get a new tee of the stream, starting from the first chunk. The
+        subscriber is counted from now on, until it's closed, exhausted or
+        garbage collected, even if it hasn't started iterating."""
+        self._subscribers += 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            # Stop the source once no one is listening
+            self._subscribers -= 1
+            if self._subscribers == 0 and not self.task.done():
+                self.task.cancel()
+
+        stream = self._iterate(release)
+        weakref.finalize(stream, release)
+        return stream
+
+    async def _iterate(
+        self,
+        release: Callable[[], None],
+    ) -> AsyncGenerator[Any, None]:
+        """Replay the chunks to a subscriber."""
+        index = 0
+        try:
+            while True:
+                if index < len(self._chunks):
+                    index += 1
+                    yield self._chunks[index - 1]
+                    continue
+
+                if self._done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+
+                await self._event.wait()
+
+        finally:
+            release()
+
+
+class _Flight:
+    """An in-flight request and the number of its waiters."""
+
+    def __init__(self, task: asyncio.Future) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class _SingleFlightGroup:
+    """Deduplicate the concurrent calls with the same key, so that only the
+    first caller issues the request and the others await the same result.
+
+    The request runs in its own task and each waiter awaits it through
+    `asyncio.shield`, so cancelling a waiter won't affect the others. The
+    request is cancelled only when all its waiters are cancelled. If the
+    request returns an async generator, each waiter gets its own tee of the
+    stream.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight] = {}
+        self.num_calls = 0
+        self.num_deduplicated = 0
+
+    @property
+    def num_in_flight(self) -> int:
+        """The number of distinct requests in flight."""
+        return len(self._flights)
+
+    async def call(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Call the function, or join the in-flight call with the same key.
+
+        Args:
+            key (`str`):
+                The request key, e.g. the hash of the request arguments.
+            func (`Callable[[], Awaitable[Any]]`):
+                The function that issues the request.
+        """
+        self.num_calls += 1
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(self._run(func)))
+            self._flights[key] = flight
+            flight.task.add_done_callback(
+                lambda _: self._on_request_done(key, flight),
+            )
+        else:
+            self.num_deduplicated += 1
+
+        flight.waiters += 1
+        try:
+            res = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.task.cancelled():
+                raise
+            # The waiter itself is cancelled
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                flight.task.cancel()
+            raise
+
+        flight.waiters -= 1
+        if isinstance(res, _StreamBroadcaster):
+            return res.subscribe()
+        return res
+
+    @staticmethod
+    async def _run(func: Callable[[], Awaitable[Any]]) -> Any:
+        """Issue the request, and broadcast it if it's a stream."""
+        res = await func()
+        if isinstance(res, AsyncGenerator):
+            return _StreamBroadcaster(res)
+        return res
+
+    def _on_request_done(self, key: str, flight: _Flight) -> None:
+        """Unregister the flight once the request (or the stream) is
+        finished, so that the later calls issue new requests."""
+        if (
+            not flight.task.cancelled()
+            and flight.task.exception() is None
+            and isinstance(flight.task.result(), _StreamBroadcaster)
+        ):
+            flight.task.result().task.add_done_callback(
+                lambda _: self._remove(key, flight),
+            )
+        else:
+            self._remove(key, flight)
+
+    def _remove(self, key: str, flight: _Flight) -> None:
+        """Remove the flight if it's still registered under the key."""
+        if self._flights.get(key) is flight:
+            self._flights.pop(key)
+
+
+_SHARED_GROUPS: dict[str, _SingleFlightGroup] = {}
+
+
+def _get_single_flight_group(scope: str | None) -> _SingleFlightGroup:
+    """Get the single-flight group shared by the given scope, or a new
+    private group if the scope is `None`."""
+    if scope is None:
+        return _SingleFlightGroup()
+    return _SHARED_GROUPS.setdefault(scope, _SingleFlightGroup())
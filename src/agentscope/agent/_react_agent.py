@@ -245,20 +245,27 @@ class ReActAgent(ReActAgentBase):
         for _ in range(self.max_iters):
             msg_reasoning = await self._reasoning()
 
-            futures = [
-                self._acting(tool_call)
-                for tool_call in msg_reasoning.get_content_blocks(
-                    "tool_use",
-                )
-            ]
+            tool_calls = msg_reasoning.get_content_blocks("tool_use")
+            # Execute the calls to the same batchable tool function together
+            self.toolkit.batch_tool_calls(tool_calls)
 
-            # Parallel tool calls or not
-            if self.parallel_tool_calls:
-                acting_responses = await asyncio.gather(*futures)
+            try:
+                # Parallel tool calls or not
+                if self.parallel_tool_calls:
+                    acting_responses = await asyncio.gather(
+                        *[self._acting(_) for _ in tool_calls],
+                    )
 
-            else:
-                # Sequential tool calls
-                acting_responses = [await _ for _ in futures]
+                else:
+                    # Sequential tool calls, where the calls after an
+                    # interruption are not created
+                    acting_responses = [
+                        await self._acting(_) for _ in tool_calls
+                    ]
+
+            finally:
+                # Discard the collected calls that are not called
+                self.toolkit.clear_tool_batches(tool_calls)
 
             # Find the first non-None replying message from the acting
             for acting_msg in acting_responses:
@@ -295,10 +302,16 @@ class ReActAgent(ReActAgentBase):
             ],
         )
 
-        res = await self.model(
-            prompt,
-            tools=self.toolkit.get_json_schemas(),
-        )
+        if self.toolkit.tool_retriever is None:
+            tools = self.toolkit.get_json_schemas()
+        else:
+            # Only send the tool functions relevant to the recent messages
+            tools = await self.toolkit.get_relevant_json_schemas(
+                await self._get_tool_retrieval_query(),
+                pinned_tools=[self.finish_function_name],
+            )
+
+        res = await self.model(prompt, tools=tools)
 
         # handle output from the model
         interrupted_by_user = False
@@ -392,6 +405,18 @@ class ReActAgent(ReActAgentBase):
             response_msg = None
             # Async generator handling
             async for chunk in tool_res:
+                if chunk.is_delta:
+                    # Accumulate the delta chunks to print the output so far,
+                    # which is replaced by the accumulated last chunk
+                    tool_res_msg.content[0][  # type: ignore[index]
+                        "output"
+                    ] = self._add_delta_output(
+                        tool_res_msg.content[0]["output"],  # type: ignore
+                        chunk,
+                    )
+                    await self.print(tool_res_msg, False)
+                    continue
+
                 # Turn into a tool result block
                 tool_res_msg.content[0][  # type: ignore[index]
                     "output"
@@ -420,6 +445,36 @@ class ReActAgent(ReActAgentBase):
             # Record the tool result message in the memory
             await self.memory.add(tool_res_msg)
 
+    @staticmethod
+    def _add_delta_output(
+        output: list,
+        chunk: ToolResponse,
+    ) -> list:
+        """Append the content of the delta chunk to the output, joining the
+        consecutive texts."""
+        output = list(output)
+        for block in chunk.content:
+            if (
+                block["type"] == "text"
+                and output
+                and output[-1]["type"] == "text"
+            ):
+                output[-1] = TextBlock(
+                    type="text",
+                    text=output[-1]["text"] + block["text"],
+                )
+            else:
+                output.append(block)
+        return output
+
+    async def _get_tool_retrieval_query(self) -> str:
+        """Get the query to retrieve the relevant tool functions, i.e. the
+        text of the recent messages in the memory."""
+        texts = [
+            _.get_text_content() for _ in (await self.memory.get_memory())[-3:]
+        ]
+        return "\n".join(_ for _ in texts if _)
+
     async def observe(self, msg: Msg | list[Msg] | None) -> None:
         """Receive observing message(s) without generating a reply.
 
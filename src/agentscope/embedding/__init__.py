@@ -10,6 +10,7 @@ from ._gemini_embedding import GeminiTextEmbedding
 from ._ollama_embedding import OllamaTextEmbedding
 from ._cache_base import EmbeddingCacheBase
 from ._file_cache import FileEmbeddingCache
+from ._single_flight_embedding import SingleFlightEmbeddingModel
 
 
 __all__ = [
@@ -22,4 +23,5 @@ __all__ = [
     "OllamaTextEmbedding",
     "EmbeddingCacheBase",
     "FileEmbeddingCache",
+    "SingleFlightEmbeddingModel",
 ]
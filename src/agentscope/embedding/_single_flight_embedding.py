@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""The single-flight embedding model wrapper."""
+from typing import Any, List
+
+from ._embedding_base import EmbeddingModelBase
+from ._embedding_response import EmbeddingResponse
+from .._utils._single_flight import _get_single_flight_group, _hash_request
+
+
+class SingleFlightEmbeddingModel(EmbeddingModelBase):
+    """An embedding model wrapper that deduplicates identical in-flight
+    requests, so that the concurrent callers embedding the same texts
+    await the same `EmbeddingResponse`."""
+
+    def __init__(
+        self,
+        model: EmbeddingModelBase,
+        scope: str | None = None,
+    ) -> None:
+        """Initialize the single-flight embedding model.
+
+        Args:
+            model (`EmbeddingModelBase`):
+                The wrapped embedding model.
+            scope (`str | None`, optional):
+                The wrappers with the same scope share their in-flight
+                requests, so it should only be shared by identically
+                configured models. If `None`, only the calls through this
+                wrapper are deduplicated.
+        """
+        super().__init__(model.model_name)
+        self.model = model
+        self.single_flight = _get_single_flight_group(scope)
+
+    async def __call__(
+        self,
+        text: List[str],
+        **kwargs: Any,
+    ) -> EmbeddingResponse:
+        """Call the wrapped model, or join the identical in-flight call."""
+        key = _hash_request(
+            self.model.__class__.__name__,
+            self.model_name,
+            text,
+            **kwargs,
+        )
+        return await self.single_flight.call(
+            key,
+            lambda: self.model(text, **kwargs),
+        )
@@ -3,6 +3,13 @@
 
 from ._formatter_base import FormatterBase
 from ._truncated_formatter_base import TruncatedFormatterBase
+from ._image_processor import ImageProcessor
+from ._file_uploader import (
+    UploadedFile,
+    FileUploaderBase,
+    GeminiFileUploader,
+    DashScopeFileUploader,
+)
 from ._dashscope_formatter import (
     DashScopeChatFormatter,
     DashScopeMultiAgentFormatter,
@@ -31,6 +38,11 @@ from ._deepseek_formatter import (
 __all__ = [
     "FormatterBase",
     "TruncatedFormatterBase",
+    "ImageProcessor",
+    "UploadedFile",
+    "FileUploaderBase",
+    "GeminiFileUploader",
+    "DashScopeFileUploader",
     "DashScopeChatFormatter",
     "DashScopeMultiAgentFormatter",
     "OpenAIChatFormatter",
@@ -4,6 +4,7 @@
 
 from typing import Any
 
+from ._image_processor import ImageProcessor
 from ._truncated_formatter_base import TruncatedFormatterBase
 from .._logging import logger
 from ..message import Msg, TextBlock, ImageBlock, ToolUseBlock, ToolResultBlock
@@ -60,9 +61,14 @@ class AnthropicChatFormatter(TruncatedFormatterBase):
 
             for block in msg.get_content_blocks():
                 typ = block.get("type")
-                if typ in ["thinking", "text", "image"]:
+                if typ in ["thinking", "text"]:
                     content_blocks.append({**block})
 
+                elif typ == "image":
+                    content_blocks.append(
+                        await self._format_image_block(block),
+                    )
+
                 elif typ == "tool_use":
                     content_blocks.append(
                         {
@@ -151,14 +157,21 @@ class AnthropicMultiAgentFormatter(TruncatedFormatterBase):
         ),
         token_counter: TokenCounterBase | None = None,
         max_tokens: int | None = None,
+        image_processor: ImageProcessor | None = None,
     ) -> None:
         """Initialize the DashScope multi-agent formatter.
 
         Args:
             conversation_history_prompt (`str`):
                 The prompt to use for the conversation history section.
+            image_processor (`ImageProcessor | None`, optional):
+                The processor downscaling and re-encoding the images.
         """
-        super().__init__(token_counter=token_counter, max_tokens=max_tokens)
+        super().__init__(
+            token_counter=token_counter,
+            max_tokens=max_tokens,
+            image_processor=image_processor,
+        )
         self.conversation_history_prompt = conversation_history_prompt
 
     async def _format_tool_sequence(
@@ -167,7 +180,9 @@ class AnthropicMultiAgentFormatter(TruncatedFormatterBase):
     ) -> list[dict[str, Any]]:
         """Given a sequence of tool call/result messages, format them into
         the required format for the Anthropic API."""
-        return await AnthropicChatFormatter().format(msgs)
+        return await AnthropicChatFormatter(
+            image_processor=self.image_processor,
+        ).format(msgs)
 
     async def _format_agent_message(
         self,
@@ -204,7 +219,9 @@ class AnthropicMultiAgentFormatter(TruncatedFormatterBase):
                         )
                         accumulated_text.clear()
 
-                    conversation_blocks.append({**block})
+                    conversation_blocks.append(
+                        await self._format_image_block(block),
+                    )
 
         if accumulated_text:
             conversation_blocks.append(
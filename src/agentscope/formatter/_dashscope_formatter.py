@@ -3,12 +3,16 @@
 """The dashscope formatter module."""
 
 import json
+import mimetypes
 import os.path
 from typing import Any
 
+from ._file_uploader import FileUploaderBase
+from ._image_processor import ImageProcessor
 from ._truncated_formatter_base import TruncatedFormatterBase
 from .._logging import logger
 from .._utils._common import _is_accessible_local_file
+from .._utils._media_cache import _media_cache
 from ..message import (
     Msg,
     TextBlock,
@@ -100,6 +104,50 @@ def _reformat_messages(
     return messages
 
 
+async def _to_dashscope_media_url(
+    block: ImageBlock | AudioBlock,
+    image_processor: ImageProcessor | None,
+    file_uploader: FileUploaderBase | None,
+) -> str | None:
+    """Convert the multimodal block into the URL in DashScope API, which
+    refers to the uploaded file if the file uploader is given. Return `None`
+    if the source type is not supported."""
+    source = block["source"]
+    if source["type"] == "url":
+        url = source["url"]
+        if not _is_accessible_local_file(url):
+            # treat as web url
+            return url
+        if file_uploader is None:
+            return "file://" + os.path.abspath(url)
+
+        # Upload the local file once, rather than every call by the SDK
+        media_type = (
+            mimetypes.guess_type(url)[0] or f"{block['type']}/octet-stream"
+        )
+        base64_data = _media_cache.get_file(url)
+
+    elif source["type"] == "base64":
+        media_type = source["media_type"]
+        base64_data = source["data"]
+
+    else:
+        return None
+
+    if block["type"] == "image" and image_processor is not None:
+        base64_data, media_type = await image_processor.process(
+            base64_data,
+            media_type,
+        )
+
+    if file_uploader is not None:
+        file = await file_uploader.get_file(base64_data, media_type)
+        if file is not None:
+            return file.uri
+
+    return f"data:{media_type};base64,{base64_data}"
+
+
 class DashScopeChatFormatter(TruncatedFormatterBase):
     """Formatter for DashScope messages."""
 
@@ -120,6 +168,36 @@ class DashScopeChatFormatter(TruncatedFormatterBase):
         ToolResultBlock,
     ]
 
+    def __init__(
+        self,
+        token_counter: TokenCounterBase | None = None,
+        max_tokens: int | None = None,
+        image_processor: ImageProcessor | None = None,
+        file_uploader: FileUploaderBase | None = None,
+    ) -> None:
+        """Initialize the DashScope chat formatter.
+
+        Args:
+            token_counter (`TokenCounterBase | None`, optional):
+                The token counter used for truncation.
+            max_tokens (`int | None`, optional):
+                The maximum number of tokens allowed in the formatted
+                messages. If `None`, no truncation will be applied.
+            image_processor (`ImageProcessor | None`, optional):
+                The processor downscaling and re-encoding the images.
+            file_uploader (`FileUploaderBase | None`, optional):
+                The uploader that uploads the base64 data and local files
+                to DashScope once, so that they're referenced by the
+                `oss://` URLs instead of being inlined or uploaded in every
+                request.
+        """
+        super().__init__(
+            token_counter=token_counter,
+            max_tokens=max_tokens,
+            image_processor=image_processor,
+        )
+        self.file_uploader = file_uploader
+
     async def _format(
         self,
         msgs: list[Msg],
@@ -151,29 +229,18 @@ class DashScopeChatFormatter(TruncatedFormatterBase):
                     )
 
                 elif typ in ["image", "audio"]:
-                    source = block["source"]
-                    if source["type"] == "url":
-                        url = source["url"]
-                        if _is_accessible_local_file(url):
-                            content_blocks.append(
-                                {typ: "file://" + os.path.abspath(url)},
-                            )
-                        else:
-                            # treat as web url
-                            content_blocks.append({typ: url})
-
-                    elif source["type"] == "base64":
-                        media_type = source["media_type"]
-                        base64_data = source["data"]
-                        content_blocks.append(
-                            {typ: f"data:{media_type};base64,{base64_data}"},
-                        )
-
-                    else:
+                    url = await _to_dashscope_media_url(
+                        block,  # type: ignore[arg-type]
+                        self.image_processor,
+                        self.file_uploader,
+                    )
+                    if url is None:
                         raise NotImplementedError(
-                            f"Unsupported source type '{source.get('type')}' "
-                            f"for {typ} block.",
+                            "Unsupported source type "
+                            f"'{block['source'].get('type')}' for {typ} "
+                            "block.",
                         )
+                    content_blocks.append({typ: url})
 
                 elif typ == "tool_use":
                     tool_calls.append(
@@ -274,6 +341,8 @@ class DashScopeMultiAgentFormatter(TruncatedFormatterBase):
         ),
         token_counter: TokenCounterBase | None = None,
         max_tokens: int | None = None,
+        image_processor: ImageProcessor | None = None,
+        file_uploader: FileUploaderBase | None = None,
     ) -> None:
         """Initialize the DashScope multi-agent formatter.
 
@@ -285,8 +354,19 @@ class DashScopeMultiAgentFormatter(TruncatedFormatterBase):
             max_tokens (`int | None`, optional):
                 The maximum number of tokens allowed in the formatted
                 messages. If `None`, no truncation will be applied.
+            image_processor (`ImageProcessor | None`, optional):
+                The processor downscaling and re-encoding the images.
+            file_uploader (`FileUploaderBase | None`, optional):
+                The uploader that uploads the base64 data and local files
+                to DashScope once, so that they're referenced by the
+                `oss://` URLs.
         """
-        super().__init__(token_counter=token_counter, max_tokens=max_tokens)
+        super().__init__(
+            token_counter=token_counter,
+            max_tokens=max_tokens,
+            image_processor=image_processor,
+        )
+        self.file_uploader = file_uploader
         self.conversation_history_prompt = conversation_history_prompt
 
     async def _format_tool_sequence(
@@ -304,7 +384,10 @@ class DashScopeMultiAgentFormatter(TruncatedFormatterBase):
             `list[dict[str, Any]]`:
                 A list of dictionaries formatted for the DashScope API.
         """
-        return await DashScopeChatFormatter().format(msgs)
+        return await DashScopeChatFormatter(
+            image_processor=self.image_processor,
+            file_uploader=self.file_uploader,
+        ).format(msgs)
 
     async def _format_agent_message(
         self,
@@ -351,35 +434,19 @@ class DashScopeMultiAgentFormatter(TruncatedFormatterBase):
                         )
                         accumulated_text.clear()
 
-                    if block["source"]["type"] == "url":
-                        url = block["source"]["url"]
-                        if _is_accessible_local_file(url):
-                            conversation_blocks.append(
-                                {
-                                    block["type"]: "file://"
-                                    + os.path.abspath(url),
-                                },
-                            )
-                        else:
-                            conversation_blocks.append({block["type"]: url})
-
-                    elif block["source"]["type"] == "base64":
-                        media_type = block["source"]["media_type"]
-                        base64_data = block["source"]["data"]
-                        conversation_blocks.append(
-                            {
-                                block[
-                                    "type"
-                                ]: f"data:{media_type};base64,{base64_data}",
-                            },
-                        )
-
-                    else:
+                    url = await _to_dashscope_media_url(
+                        block,  # type: ignore[arg-type]
+                        self.image_processor,
+                        self.file_uploader,
+                    )
+                    if url is None:
                         logger.warning(
                             "Unsupported block type %s in the message, "
                             "skipped.",
                             block["type"],
                         )
+                    else:
+                        conversation_blocks.append({block["type"]: url})
 
         if accumulated_text:
             conversation_blocks.append({"text": "\n".join(accumulated_text)})
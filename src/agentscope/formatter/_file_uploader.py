@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""The file uploaders that upload the multimodal data through the files
+APIs of the providers once, so that the formatters reference the uploaded
+files instead of inlining the same base64 data in every request."""
+import asyncio
+import base64
+import hashlib
+import io
+import mimetypes
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from .._logging import logger
+
+
+@dataclass
+class UploadedFile:
+    """A file uploaded through the files API of the provider."""
+
+    uri: str
+    """The URI or ID referencing the uploaded file."""
+
+    mime_type: str
+    """The MIME type of the file."""
+
+    expire_at: float | None = None
+    """The timestamp when the file expires, `None` means never."""
+
+
+class FileUploaderBase(ABC):
+    """The base class of the file uploaders, which uploads each media once
+    and caches the uploaded file by the hash of its content. The file is
+    uploaded again once it's about to expire, or after being invalidated,
+    e.g. when the API reports it's not found. The base64 data of the
+    recently uploaded media is kept within `max_source_size`, so that it can
+    be uploaded again at once. Otherwise, the file is invalidated and
+    uploaded again from the data of the formatter in the next formatting.
+    """
+
+    def __init__(
+        self,
+        min_size: int = 0,
+        expiry_margin: float = 600.0,
+        max_source_size: int = 64 * 1024 * 1024,
+    ) -> None:
+        """Initialize the file uploader.
+
+        Args:
+            min_size (`int`, defaults to `0`):
+                The minimum size in bytes of the media to upload, the
+                smaller ones are inlined as they are.
+            expiry_margin (`float`, defaults to `600.0`):
+                The seconds before the expiration, from which the file is
+                uploaded again instead of being referenced.
+            max_source_size (`int`, defaults to `64 * 1024 * 1024`):
+                The maximum total size in bytes of the base64 data kept to
+                upload the files again, the least recently used ones are
+                dropped beyond it.
+        """
+        self.min_size = min_size
+        self.expiry_margin = expiry_margin
+        self.max_source_size = max_source_size
+        self.num_uploads = 0
+
+        self._files: dict[str, UploadedFile] = {}
+        self._uploading: dict[str, asyncio.Future] = {}
+        # The URI -> the base64 data, MIME type and expiration of the
+        # uploaded file in the LRU order, to upload them again
+        self._sources: OrderedDict[
+            str,
+            tuple[str, str, float | None],
+        ] = OrderedDict()
+        self._source_size = 0
+
+    async def get_file(
+        self,
+        data: str,
+        mime_type: str,
+    ) -> UploadedFile | None:
+        """Get the uploaded file of the base64 encoded media, uploading it
+        if it's not uploaded or about to expire. The concurrent uploads of
+        the same media are coalesced into one.
+
+        Args:
+            data (`str`):
+                The base64 encoded media.
+            mime_type (`str`):
+                The MIME type of the media.
+
+        Returns:
+            `UploadedFile | None`:
+                The uploaded file, or `None` if the media is smaller than
+                `min_size` or failed to upload, so it should be inlined.
+        """
+        if len(data) * 3 // 4 < self.min_size:
+            return None
+
+        key = hashlib.sha256(f"{mime_type},{data}".encode()).hexdigest()
+        file = self._files.get(key)
+        if file is not None and (
+            file.expire_at is None
+            or file.expire_at - self.expiry_margin > time.time()
+        ):
+            if file.uri in self._sources:
+                self._sources.move_to_end(file.uri)
+            return file
+
+        future = self._uploading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(
+                self._upload_and_cache(key, data, mime_type),
+            )
+            self._uploading[key] = future
+
+        # Cancelling one caller doesn't cancel the upload shared by others
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if future.cancelled():
+                return None
+            raise
+        except Exception:
+            return None
+
+    async def reupload(self, uri: str) -> UploadedFile | None:
+        """Upload the media of the uploaded file again, e.g. when the API
+        reports the file is not found.
+
+        Args:
+            uri (`str`):
+                The URI or ID of the uploaded file.
+
+        Returns:
+            `UploadedFile | None`:
+                The newly uploaded file, or `None` if the file isn't uploaded
+                by this uploader, its data isn't kept anymore, or it failed
+                to upload again. The file is invalidated anyway, so that
+                it's uploaded again in the next formatting.
+        """
+        source = self._sources.get(uri)
+        self.invalidate(uri)
+        if source is None:
+            return None
+
+        data, mime_type, _ = source
+        return await self.get_file(data, mime_type)
+
+    def invalidate(self, uri: str | None = None) -> None:
+        """Drop the uploaded file so that it's uploaded again next time, or
+        all the files if `uri` is `None`.
+
+        Args:
+            uri (`str | None`, optional):
+                The URI or ID of the uploaded file.
+        """
+        if uri is None:
+            self._files.clear()
+            self._sources.clear()
+            self._source_size = 0
+            return
+
+        for key, file in list(self._files.items()):
+            if file.uri == uri:
+                self._files.pop(key)
+        self._drop_source(uri)
+
+    async def _upload_and_cache(
+        self,
+        key: str,
+        data: str,
+        mime_type: str,
+    ) -> UploadedFile:
+        """Upload the media and cache the uploaded file by the key."""
+        try:
+            file = await self._upload(base64.b64decode(data), mime_type)
+        except Exception as e:
+            logger.warning(
+                "Failed to upload the %s media, inlined instead: %s",
+                mime_type,
+                e,
+            )
+            raise
+        finally:
+            self._uploading.pop(key, None)
+
+        self.num_uploads += 1
+        old_file = self._files.get(key)
+        if old_file is not None:
+            self._drop_source(old_file.uri)
+        self._files[key] = file
+        self._keep_source(file, data, mime_type)
+        return file
+
+    def _keep_source(
+        self,
+        file: UploadedFile,
+        data: str,
+        mime_type: str,
+    ) -> None:
+        """Keep the data of the uploaded file, dropping the expired and the
+        least recently used ones beyond the size limit."""
+        now = time.time()
+        for uri, (_, _, expire_at) in list(self._sources.items()):
+            if expire_at is not None and expire_at <= now:
+                self._drop_source(uri)
+
+        if len(data) > self.max_source_size:
+            return
+
+        self._sources[file.uri] = (data, mime_type, file.expire_at)
+        self._source_size += len(data)
+        while self._source_size > self.max_source_size:
+            self._drop_source(next(iter(self._sources)))
+
+    def _drop_source(self, uri: str) -> None:
+        """Drop the kept data of the uploaded file, if any."""
+        source = self._sources.pop(uri, None)
+        if source is not None:
+            self._source_size -= len(source[0])
+
+    @abstractmethod
+    async def _upload(self, data: bytes, mime_type: str) -> UploadedFile:
+        """Upload the media through the files API.
+
+        Args:
+            data (`bytes`):
+                The content of the media.
+            mime_type (`str`):
+                The MIME type of the media.
+
+        Returns:
+            `UploadedFile`:
+                The uploaded file.
+        """
+
+
+class GeminiFileUploader(FileUploaderBase):
+    """Upload the media through the Gemini Files API, which keeps the files
+    for 48 hours. The uploaded files are referenced by `file_data` parts
+    in the formatted messages."""
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        client_args: dict | None = None,
+        min_size: int = 0,
+        expiry_margin: float = 600.0,
+        max_source_size: int = 64 * 1024 * 1024,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """Initialize the Gemini file uploader.
+
+        Args:
+            api_key (`str | None`, optional):
+                The API key for Google Gemini.
+            client_args (`dict | None`, optional):
+                The extra keyword arguments to initialize the Gemini client.
+            min_size (`int`, defaults to `0`):
+                The minimum size in bytes of the media to upload.
+            expiry_margin (`float`, defaults to `600.0`):
+                The seconds before the expiration, from which the file is
+                uploaded again.
+            max_source_size (`int`, defaults to `64 * 1024 * 1024`):
+                The maximum total size in bytes of the base64 data kept to
+                upload the files again.
+            poll_interval (`float`, defaults to `1.0`):
+                The seconds between the checks of the files being processed
+                (e.g. the videos).
+        """
+        try:
+            from google import genai
+        except ImportError as e:
+            raise ImportError(
+                "Please install gemini Python sdk with "
+                "`pip install -q -U google-genai`",
+            ) from e
+
+        super().__init__(
+            min_size=min_size,
+            expiry_margin=expiry_margin,
+            max_source_size=max_source_size,
+        )
+        self.client = genai.Client(api_key=api_key, **(client_args or {}))
+        self.poll_interval = poll_interval
+
+    async def _upload(self, data: bytes, mime_type: str) -> UploadedFile:
+        """Upload the media and wait until it's processed."""
+        file: Any = await self.client.aio.files.upload(
+            file=io.BytesIO(data),
+            config={"mime_type": mime_type},
+        )
+        while file.state is not None and file.state.name == "PROCESSING":
+            await asyncio.sleep(self.poll_interval)
+            file = await self.client.aio.files.get(name=file.name)
+
+        if file.state is not None and file.state.name == "FAILED":
+            raise RuntimeError(f"Failed to process the file {file.name}.")
+
+        return UploadedFile(
+            uri=file.uri,
+            mime_type=file.mime_type or mime_type,
+            expire_at=(
+                file.expiration_time.timestamp()
+                if file.expiration_time
+                else None
+            ),
+        )
+
+
+class DashScopeFileUploader(FileUploaderBase):
+    """Upload the media to the temporary storage of DashScope, which keeps
+    the files for 48 hours. The uploaded files are referenced by their
+    `oss://` URLs in the formatted messages."""
+
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        min_size: int = 0,
+        expiry_margin: float = 600.0,
+        max_source_size: int = 64 * 1024 * 1024,
+    ) -> None:
+        """Initialize the DashScope file uploader.
+
+        Args:
+            api_key (`str`):
+                The API key for DashScope.
+            model_name (`str`):
+                The name of the model that the files are uploaded for.
+            min_size (`int`, defaults to `0`):
+                The minimum size in bytes of the media to upload.
+            expiry_margin (`float`, defaults to `600.0`):
+                The seconds before the expiration, from which the file is
+                uploaded again.
+            max_source_size (`int`, defaults to `64 * 1024 * 1024`):
+                The maximum total size in bytes of the base64 data kept to
+                upload the files again.
+        """
+        super().__init__(
+            min_size=min_size,
+            expiry_margin=expiry_margin,
+            max_source_size=max_source_size,
+        )
+        self.api_key = api_key
+        self.model_name = model_name
+
+    async def _upload(self, data: bytes, mime_type: str) -> UploadedFile:
+        """Upload the media from a temporary file."""
+        from dashscope.utils.oss_utils import OssUtils
+
+        extension = mimetypes.guess_extension(mime_type) or ""
+        fd, path = tempfile.mkstemp(suffix=extension)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            url = await asyncio.to_thread(
+                OssUtils.upload,
+                model=self.model_name,
+                file_path=path,
+                api_key=self.api_key,
+            )
+        finally:
+            os.remove(path)
+
+        return UploadedFile(
+            uri=url,
+            mime_type=mime_type,
+            expire_at=time.time() + 48 * 3600,
+        )
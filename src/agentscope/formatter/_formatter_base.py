@@ -2,9 +2,10 @@
 """The formatter module."""
 
 from abc import abstractmethod
-from typing import Any, List
+from typing import Any, Callable, List
 
-from .._utils._common import _save_base64_data
+from .._utils._common import _is_web_url, _save_base64_data
+from .._utils._media_cache import _media_cache
 from ..message import Msg, AudioBlock, ImageBlock, TextBlock
 
 
@@ -33,6 +34,37 @@ class FormatterBase:
                     f"Expected Msg object, got {type(msg)} instead.",
                 )
 
+    @staticmethod
+    async def _prefetch_web_media(
+        msgs: list[Msg],
+        block_types: list[str],
+        encode: Callable[[bytes], str],
+    ) -> None:
+        """Download the web media of the given block types in the messages
+        concurrently, so that they're taken from the media cache when the
+        blocks are formatted one by one.
+
+        Args:
+            msgs (`list[Msg]`):
+                The messages to be formatted.
+            block_types (`list[str]`):
+                The types of the blocks whose web URLs are downloaded, e.g.
+                `["image", "audio"]`.
+            encode (`Callable[[bytes], str]`):
+                The function encoding the downloaded content, which should
+                be the same as the one used in formatting.
+        """
+        urls = [
+            block["source"]["url"]
+            for msg in msgs
+            for block in msg.get_content_blocks()
+            if block["type"] in block_types
+            and block["source"]["type"] == "url"
+            and _is_web_url(block["source"]["url"])
+        ]
+        if urls:
+            await _media_cache.aprefetch(urls, encode)
+
     @staticmethod
     def convert_tool_result_to_string(
         output: str | List[TextBlock | ImageBlock | AudioBlock],
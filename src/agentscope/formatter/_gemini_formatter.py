@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=too-many-branches
 """Google gemini API formatter in agentscope."""
-import base64
 import os
 from typing import Any
 from urllib.parse import urlparse
 
+from ._file_uploader import FileUploaderBase
+from ._image_processor import ImageProcessor
 from ._truncated_formatter_base import TruncatedFormatterBase
-from .._utils._common import _get_bytes_from_web_url
+from .._utils._common import _aget_bytes_from_web_url, _decode_web_bytes
+from .._utils._media_cache import _media_cache
 from ..message import (
     Msg,
     TextBlock,
@@ -21,7 +23,7 @@ from .._logging import logger
 from ..token import TokenCounterBase
 
 
-def _to_gemini_inline_data(url: str) -> dict:
+async def _to_gemini_inline_data(url: str) -> dict:
     """Convert url into the Gemini API required format."""
     parsed_url = urlparse(url)
     extension = url.split(".")[-1].lower()
@@ -39,7 +41,7 @@ def _to_gemini_inline_data(url: str) -> dict:
                 f"{GeminiChatFormatter.supported_extensions}",
             )
 
-        data = _get_bytes_from_web_url(url)
+        data = await _aget_bytes_from_web_url(url)
         return {
             "data": data,
             "mime_type": f"{typ}/{extension}",
@@ -47,8 +49,7 @@ def _to_gemini_inline_data(url: str) -> dict:
 
     elif os.path.exists(url):
         # Local file
-        with open(url, "rb") as f:
-            data = base64.b64encode(f.read()).decode("utf-8")
+        data = _media_cache.get_file(url)
 
         return {
             "data": data,
@@ -60,6 +61,50 @@ def _to_gemini_inline_data(url: str) -> dict:
     )
 
 
+async def _to_gemini_media_part(
+    block: ImageBlock | AudioBlock | VideoBlock,
+    image_processor: ImageProcessor | None,
+    file_uploader: FileUploaderBase | None,
+) -> dict | None:
+    """Convert the multimodal block into a Gemini part, which references the
+    uploaded file if the file uploader is given, otherwise inlines the
+    data."""
+    source = block["source"]
+    if source["type"] == "base64":
+        inline_data = {
+            "data": source["data"],
+            "mime_type": source["media_type"],
+        }
+    elif source["type"] == "url":
+        inline_data = await _to_gemini_inline_data(source["url"])
+    else:
+        return None
+
+    if block["type"] == "image" and image_processor is not None:
+        (
+            inline_data["data"],
+            inline_data["mime_type"],
+        ) = await image_processor.process(
+            inline_data["data"],
+            inline_data["mime_type"],
+        )
+
+    if file_uploader is not None:
+        file = await file_uploader.get_file(
+            inline_data["data"],
+            inline_data["mime_type"],
+        )
+        if file is not None:
+            return {
+                "file_data": {
+                    "file_uri": file.uri,
+                    "mime_type": file.mime_type,
+                },
+            }
+
+    return {"inline_data": inline_data}
+
+
 class GeminiChatFormatter(TruncatedFormatterBase):
     """The formatter for Google Gemini API."""
 
@@ -100,12 +145,47 @@ class GeminiChatFormatter(TruncatedFormatterBase):
         "audio": ["mp3", "wav", "aiff", "aac", "ogg", "flac"],
     }
 
+    def __init__(
+        self,
+        token_counter: TokenCounterBase | None = None,
+        max_tokens: int | None = None,
+        image_processor: ImageProcessor | None = None,
+        file_uploader: FileUploaderBase | None = None,
+    ) -> None:
+        """Initialize the Gemini chat formatter.
+
+        Args:
+            token_counter (`TokenCounterBase | None`, optional):
+                The token counter used for truncation.
+            max_tokens (`int | None`, optional):
+                The maximum number of tokens allowed in the formatted
+                messages. If `None`, no truncation will be applied.
+            image_processor (`ImageProcessor | None`, optional):
+                The processor downscaling and re-encoding the images.
+            file_uploader (`FileUploaderBase | None`, optional):
+                The uploader that uploads the images, audios and videos
+                through the Gemini Files API once, so that they're
+                referenced by `file_data` instead of being inlined in every
+                request.
+        """
+        super().__init__(
+            token_counter=token_counter,
+            max_tokens=max_tokens,
+            image_processor=image_processor,
+        )
+        self.file_uploader = file_uploader
+
     async def _format(
         self,
         msgs: list[Msg],
     ) -> list[dict]:
         """Format message objects into Gemini API required format."""
         self.assert_list_of_msgs(msgs)
+        await self._prefetch_web_media(
+            msgs,
+            ["image", "audio", "video"],
+            _decode_web_bytes,
+        )
 
         messages: list = []
         for msg in msgs:
@@ -153,27 +233,13 @@ class GeminiChatFormatter(TruncatedFormatterBase):
                     )
 
                 elif typ in ["image", "audio", "video"]:
-                    if block["source"]["type"] == "base64":
-                        media_type = block["source"]["media_type"]
-                        base64_data = block["source"]["data"]
-
-                        parts.append(
-                            {
-                                "inline_data": {
-                                    "data": base64_data,
-                                    "mime_type": media_type,
-                                },
-                            },
-                        )
-
-                    elif block["source"]["type"] == "url":
-                        parts.append(
-                            {
-                                "inline_data": _to_gemini_inline_data(
-                                    block["source"]["url"],
-                                ),
-                            },
-                        )
+                    part = await _to_gemini_media_part(
+                        block,  # type: ignore[arg-type]
+                        self.image_processor,
+                        self.file_uploader,
+                    )
+                    if part is not None:
+                        parts.append(part)
 
                 else:
                     logger.warning(
@@ -243,6 +309,8 @@ class GeminiMultiAgentFormatter(TruncatedFormatterBase):
         ),
         token_counter: TokenCounterBase | None = None,
         max_tokens: int | None = None,
+        image_processor: ImageProcessor | None = None,
+        file_uploader: FileUploaderBase | None = None,
     ) -> None:
         """Initialize the Gemini multi-agent formatter.
 
@@ -254,8 +322,19 @@ class GeminiMultiAgentFormatter(TruncatedFormatterBase):
             max_tokens (`int | None`, optional):
                 The maximum number of tokens allowed in the formatted
                 messages. If `None`, no truncation will be applied.
+            image_processor (`ImageProcessor | None`, optional):
+                The processor downscaling and re-encoding the images.
+            file_uploader (`FileUploaderBase | None`, optional):
+                The uploader that uploads the images, audios and videos
+                through the Gemini Files API once, so that they're
+                referenced by `file_data` instead of being inlined.
         """
-        super().__init__(token_counter=token_counter, max_tokens=max_tokens)
+        super().__init__(
+            token_counter=token_counter,
+            max_tokens=max_tokens,
+            image_processor=image_processor,
+        )
+        self.file_uploader = file_uploader
         self.conversation_history_prompt = conversation_history_prompt
 
     async def _format_system_message(
@@ -272,6 +351,16 @@ class GeminiMultiAgentFormatter(TruncatedFormatterBase):
             ],
         }
 
+    async def _format(self, msgs: list[Msg]) -> list[dict[str, Any]]:
+        """Download the web media in the messages concurrently, and format
+        the messages."""
+        await self._prefetch_web_media(
+            msgs,
+            ["image", "audio", "video"],
+            _decode_web_bytes,
+        )
+        return await super()._format(msgs)
+
     async def _format_tool_sequence(
         self,
         msgs: list[Msg],
@@ -287,7 +376,10 @@ class GeminiMultiAgentFormatter(TruncatedFormatterBase):
             `list[dict[str, Any]]`:
                 A list of dictionaries formatted for the Gemini API.
         """
-        return await GeminiChatFormatter().format(msgs)
+        return await GeminiChatFormatter(
+            image_processor=self.image_processor,
+            file_uploader=self.file_uploader,
+        ).format(msgs)
 
     async def _format_agent_message(
         self,
@@ -336,26 +428,13 @@ class GeminiMultiAgentFormatter(TruncatedFormatterBase):
                         accumulated_text.clear()
 
                     # handle the multimodal data
-                    if block["source"]["type"] == "url":
-                        conversation_parts.append(
-                            {
-                                "inline_data": _to_gemini_inline_data(
-                                    block["source"]["url"],
-                                ),
-                            },
-                        )
-
-                    elif block["source"]["type"] == "base64":
-                        media_type = block["source"]["media_type"]
-                        base64_data = block["source"]["data"]
-                        conversation_parts.append(
-                            {
-                                "inline_data": {
-                                    "data": base64_data,
-                                    "mime_type": media_type,
-                                },
-                            },
-                        )
+                    part = await _to_gemini_media_part(
+                        block,  # type: ignore[arg-type]
+                        self.image_processor,
+                        self.file_uploader,
+                    )
+                    if part is not None:
+                        conversation_parts.append(part)
 
         if accumulated_text:
             conversation_parts.append(
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""The image processor that downscales and re-encodes the images before
+they're sent to the LLM APIs."""
+import asyncio
+import base64
+import hashlib
+import io
+import math
+from typing import Any, Literal
+
+from .._logging import logger
+from .._utils._media_cache import _media_cache
+
+# The effective resolution of the vision models, i.e. the images larger than
+# this are resized by the API before being billed and seen by the model.
+_MODEL_IMAGE_LIMITS: list[tuple[tuple[str, ...], dict[str, int]]] = [
+    # Patch-based OpenAI models: 32px patches, at most 1536 patches
+    (
+        ("gpt-4.1-mini", "gpt-4.1-nano", "o4-mini"),
+        {"max_pixels": 1536 * 32 * 32},
+    ),
+    # Tile-based OpenAI models: fit in 2048x2048, then the short side 768
+    (
+        ("gpt-", "o1", "o3", "chatgpt-"),
+        {"max_long_side": 2048, "max_short_side": 768},
+    ),
+    # Anthropic: the long edge within 1568px and about 1.15 megapixels
+    (("claude",), {"max_long_side": 1568, "max_pixels": 1_150_000}),
+    # Gemini: tiled by 768x768, scaled down to fit in 3072x3072
+    (("gemini",), {"max_long_side": 3072}),
+    # Qwen-VL: at most 1280 tokens of 28x28 pixels by default
+    (("qwen",), {"max_pixels": 1280 * 28 * 28}),
+]
+
+
+class ImageProcessor:
+    """Downscale the images to the effective resolution of the model, and
+    re-encode them as WebP or JPEG, so that the formatters send smaller
+    payloads without changing what the model sees or the tokens billed.
+    The results are cached by the hash of the original image, so the
+    images kept in the memory (e.g. the screenshots of a browser agent)
+    are only processed once.
+
+    The animated images and the ones that don't get smaller are sent as
+    they are. Only the images inlined by the formatter (the base64 data
+    and local files) are processed, the web URLs are fetched by the APIs.
+
+    Example:
+        .. code-block:: python
+
+            formatter = OpenAIChatFormatter(
+                image_processor=ImageProcessor.from_model("gpt-4o"),
+            )
+    """
+
+    def __init__(
+        self,
+        max_long_side: int | None = None,
+        max_short_side: int | None = None,
+        max_pixels: int | None = None,
+        image_format: Literal["webp", "jpeg"] | None = "webp",
+        quality: int = 85,
+    ) -> None:
+        """Initialize the image processor.
+
+        Args:
+            max_long_side (`int | None`, optional):
+                The maximum length in pixels of the long side.
+            max_short_side (`int | None`, optional):
+                The maximum length in pixels of the short side.
+            max_pixels (`int | None`, optional):
+                The maximum number of pixels.
+            image_format (`Literal["webp", "jpeg"] | None`, defaults to \
+            `"webp"`):
+                The format to re-encode the images, or `None` to keep their
+                original formats. Note some local models (e.g. those served
+                by Ollama) don't support WebP.
+            quality (`int`, defaults to `85`):
+                The quality of the re-encoded images, from 1 to 100.
+        """
+        self.max_long_side = max_long_side
+        self.max_short_side = max_short_side
+        self.max_pixels = max_pixels
+        self.image_format = image_format
+        self.quality = quality
+
+    @classmethod
+    def from_model(cls, model_name: str, **kwargs: Any) -> "ImageProcessor":
+        """Create the image processor with the effective resolution of the
+        given model. The unknown models are not resized, but re-encoded.
+
+        Args:
+            model_name (`str`):
+                The name of the model, e.g. `"gpt-4o"`, `"claude-sonnet-4"`,
+                `"gemini-2.5-flash"` or `"qwen-vl-max"`.
+            **kwargs (`Any`):
+                The other arguments of the image processor, which override
+                the limits of the model.
+
+        Returns:
+            `ImageProcessor`:
+                The image processor for the model.
+        """
+        name = model_name.lower().rsplit("/", 1)[-1]
+        for prefixes, limits in _MODEL_IMAGE_LIMITS:
+            if name.startswith(prefixes):
+                return cls(**{**limits, **kwargs})
+        return cls(**kwargs)
+
+    async def process(self, data: str, media_type: str) -> tuple[str, str]:
+        """Process the base64 encoded image.
+
+        Args:
+            data (`str`):
+                The base64 encoded image.
+            media_type (`str`):
+                The media type of the image, e.g. `"image/png"`.
+
+        Returns:
+            `tuple[str, str]`:
+                The base64 encoded processed image and its media type.
+        """
+        key = (
+            "image",
+            hashlib.sha256(data.encode("ascii")).hexdigest(),
+            self.max_long_side,
+            self.max_short_side,
+            self.max_pixels,
+            self.image_format,
+            self.quality,
+        )
+        cached = _media_cache.get(key)
+        if cached is None:
+            try:
+                cached = await asyncio.to_thread(
+                    self._process,
+                    data,
+                    media_type,
+                )
+            except Exception as e:
+                logger.warning(
+                    "Failed to process the image, sent as it is: %s",
+                    e,
+                )
+                return data, media_type
+            _media_cache.put(key, cached)
+
+        processed_media_type, processed_data = cached.split(",", 1)
+        return processed_data, processed_media_type
+
+    async def process_url(self, url: str) -> str:
+        """Process the image if it's a base64 data URL, otherwise return the
+        URL as it is.
+
+        Args:
+            url (`str`):
+                The URL of the image.
+
+        Returns:
+            `str`:
+                The processed data URL, or the original URL.
+        """
+        if not url.startswith("data:image/") or ";base64," not in url:
+            return url
+        header, data = url.split(";base64,", 1)
+        data, media_type = await self.process(data, header[len("data:") :])
+        return f"data:{media_type};base64,{data}"
+
+    def _get_scale(self, width: int, height: int) -> float:
+        """Get the scale to fit the image into the limits."""
+        scale = 1.0
+        if self.max_long_side:
+            scale = min(scale, self.max_long_side / max(width, height))
+        if self.max_short_side:
+            scale = min(scale, self.max_short_side / min(width, height))
+        if self.max_pixels:
+            scale = min(scale, math.sqrt(self.max_pixels / (width * height)))
+        return scale
+
+    @staticmethod
+    def _to_rgb(image: Any) -> Any:
+        """Convert the image to RGB for JPEG, where the transparent pixels
+        are pasted onto a white background instead of turning black."""
+        from PIL import Image
+
+        if image.mode not in ("RGBA", "LA", "PA") and (
+            "transparency" not in image.info
+        ):
+            return image.convert("RGB")
+
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+
+    def _process(self, data: str, media_type: str) -> str:
+        """Process the image, and return the media type and base64 data
+        joined by a comma."""
+        from PIL import Image
+
+        raw = base64.b64decode(data)
+        image = Image.open(io.BytesIO(raw))
+        if getattr(image, "is_animated", False):
+            return f"{media_type},{data}"
+
+        original_format = image.format
+        width, height = image.size
+        scale = self._get_scale(width, height)
+        if scale < 1:
+            image = image.resize(
+                (max(1, int(width * scale)), max(1, int(height * scale))),
+                Image.Resampling.LANCZOS,
+            )
+
+        image_format = self.image_format or original_format or "png"
+        if image_format.lower() == "jpeg" and image.mode != "RGB":
+            image = self._to_rgb(image)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, quality=self.quality)
+        if scale >= 1 and buffer.tell() >= len(raw):
+            # Re-encoding doesn't make it smaller
+            return f"{media_type},{data}"
+
+        encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+        return f"image/{image_format.lower()},{encoded}"
@@ -1,30 +1,30 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=too-many-branches
 """The Ollama formatter module."""
-import base64
 import os
 from typing import Any
 from urllib.parse import urlparse
 
+from ._image_processor import ImageProcessor
 from ._truncated_formatter_base import TruncatedFormatterBase
 from .._logging import logger
-from .._utils._common import _get_bytes_from_web_url
+from .._utils._common import _aget_bytes_from_web_url, _decode_web_bytes
+from .._utils._media_cache import _media_cache
 from ..message import Msg, TextBlock, ImageBlock, ToolUseBlock, ToolResultBlock
 from ..token import TokenCounterBase
 
 
-def _convert_ollama_image_url_to_base64_data(url: str) -> str:
+async def _convert_ollama_image_url_to_base64_data(url: str) -> str:
     """Convert image url to base64."""
     parsed_url = urlparse(url)
 
     if not os.path.exists(url) and parsed_url.scheme != "":
         # Web url
-        data = _get_bytes_from_web_url(url)
+        data = await _aget_bytes_from_web_url(url)
         return data
     if os.path.exists(url):
         # Local file
-        with open(url, "rb") as f:
-            data = base64.b64encode(f.read()).decode("utf-8")
+        data = _media_cache.get_file(url)
 
         return data
 
@@ -70,6 +70,11 @@ class OllamaChatFormatter(TruncatedFormatterBase):
                 The formatted messages as a list of dictionaries.
         """
         self.assert_list_of_msgs(msgs)
+        await self._prefetch_web_media(
+            msgs,
+            ["image"],
+            _decode_web_bytes,
+        )
 
         messages: list[dict] = []
         for msg in msgs:
@@ -109,13 +114,18 @@ class OllamaChatFormatter(TruncatedFormatterBase):
                 elif typ == "image":
                     source_type = block["source"]["type"]
                     if source_type == "url":
+                        data = await _convert_ollama_image_url_to_base64_data(
+                            block["source"]["url"],
+                        )
                         images.append(
-                            _convert_ollama_image_url_to_base64_data(
-                                block["source"]["url"],
-                            ),
+                            (await self._process_image(data, "image"))[0],
                         )
                     elif source_type == "base64":
-                        images.append(block["source"]["data"])
+                        data, _ = await self._process_image(
+                            block["source"]["data"],
+                            block["source"]["media_type"],
+                        )
+                        images.append(data)
 
                 else:
                     logger.warning(
@@ -176,6 +186,7 @@ class OllamaMultiAgentFormatter(TruncatedFormatterBase):
         ),
         token_counter: TokenCounterBase | None = None,
         max_tokens: int | None = None,
+        image_processor: ImageProcessor | None = None,
     ) -> None:
         """Initialize the Ollama multi-agent formatter.
 
@@ -187,8 +198,14 @@ class OllamaMultiAgentFormatter(TruncatedFormatterBase):
             max_tokens (`int | None`, optional):
                 The maximum number of tokens allowed in the formatted
                 messages. If `None`, no truncation will be applied.
+            image_processor (`ImageProcessor | None`, optional):
+                The processor downscaling and re-encoding the images.
         """
-        super().__init__(token_counter=token_counter, max_tokens=max_tokens)
+        super().__init__(
+            token_counter=token_counter,
+            max_tokens=max_tokens,
+            image_processor=image_processor,
+        )
         self.conversation_history_prompt = conversation_history_prompt
 
     async def _format_system_message(
@@ -201,6 +218,16 @@ class OllamaMultiAgentFormatter(TruncatedFormatterBase):
             "content": msg.get_text_content(),
         }
 
+    async def _format(self, msgs: list[Msg]) -> list[dict[str, Any]]:
+        """Download the web media in the messages concurrently, and format
+        the messages."""
+        await self._prefetch_web_media(
+            msgs,
+            ["image"],
+            _decode_web_bytes,
+        )
+        return await super()._format(msgs)
+
     async def _format_tool_sequence(
         self,
         msgs: list[Msg],
@@ -216,7 +243,9 @@ class OllamaMultiAgentFormatter(TruncatedFormatterBase):
             `list[dict[str, Any]]`:
                 A list of dictionaries formatted for the Ollama API.
         """
-        return await OllamaChatFormatter().format(msgs)
+        return await OllamaChatFormatter(
+            image_processor=self.image_processor,
+        ).format(msgs)
 
     async def _format_agent_message(
         self,
@@ -265,14 +294,19 @@ class OllamaMultiAgentFormatter(TruncatedFormatterBase):
                         accumulated_text.clear()
 
                     if source["type"] == "url":
+                        data = await _convert_ollama_image_url_to_base64_data(
+                            source["url"],
+                        )
                         images.append(
-                            _convert_ollama_image_url_to_base64_data(
-                                source["url"],
-                            ),
+                            (await self._process_image(data, "image"))[0],
                         )
 
                     elif source["type"] == "base64":
-                        images.append(source["data"])
+                        data, _ = await self._process_image(
+                            source["data"],
+                            source["media_type"],
+                        )
+                        images.append(data)
 
                     conversation_blocks.append({**block})
 
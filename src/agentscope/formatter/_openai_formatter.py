@@ -1,16 +1,15 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=too-many-branches
 """The OpenAI formatter for agentscope."""
-import base64
 import json
 import os
 from typing import Any
 from urllib.parse import urlparse
 
-import requests
-
+from ._image_processor import ImageProcessor
 from ._truncated_formatter_base import TruncatedFormatterBase
 from .._logging import logger
+from .._utils._media_cache import _encode_base64, _media_cache
 from ..message import (
     Msg,
     URLSource,
@@ -55,10 +54,7 @@ def _to_openai_image_url(url: str) -> str:
     # Check if it is a local file
     elif os.path.exists(url) and os.path.isfile(url):
         if any(lower_url.endswith(_) for _ in support_image_extensions):
-            with open(url, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode(
-                    "utf-8",
-                )
+            base64_image = _media_cache.get_file(url)
             extension = parsed_url.path.lower().split(".")[-1]
             mime_type = f"image/{extension}"
             return f"data:{mime_type};base64,{base64_image}"
@@ -66,7 +62,9 @@ def _to_openai_image_url(url: str) -> str:
     raise TypeError(f'"{url}" should end with {support_image_extensions}.')
 
 
-def _to_openai_audio_data(source: URLSource | Base64Source) -> dict:
+async def _to_openai_audio_data(
+    source: URLSource | Base64Source,
+) -> dict:
     """Covert an audio source to OpenAI format."""
     if source["type"] == "url":
         extension = source["url"].split(".")[-1].lower()
@@ -79,14 +77,11 @@ def _to_openai_audio_data(source: URLSource | Base64Source) -> dict:
         parsed_url = urlparse(source["url"])
 
         if os.path.exists(source["url"]):
-            with open(source["url"], "rb") as audio_file:
-                data = base64.b64encode(audio_file.read()).decode("utf-8")
+            data = _media_cache.get_file(source["url"])
 
         # web url
         elif parsed_url.scheme != "":
-            response = requests.get(source["url"])
-            response.raise_for_status()
-            data = base64.b64encode(response.content).decode("utf-8")
+            data = await _media_cache.aget_url(source["url"])
 
         else:
             raise ValueError(
@@ -155,6 +150,7 @@ class OpenAIChatFormatter(TruncatedFormatterBase):
                 "role", and "content" keys.
         """
         self.assert_list_of_msgs(msgs)
+        await self._prefetch_web_media(msgs, ["audio"], _encode_base64)
 
         messages: list[dict] = []
         for msg in msgs:
@@ -212,13 +208,13 @@ class OpenAIChatFormatter(TruncatedFormatterBase):
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": url,
+                                "url": await self._process_image_url(url),
                             },
                         },
                     )
 
                 elif typ == "audio":
-                    input_audio = _to_openai_audio_data(block["source"])
+                    input_audio = await _to_openai_audio_data(block["source"])
                     content_blocks.append(
                         {
                             "type": "input_audio",
@@ -283,23 +279,38 @@ class OpenAIMultiAgentFormatter(TruncatedFormatterBase):
         ),
         token_counter: TokenCounterBase | None = None,
         max_tokens: int | None = None,
+        image_processor: ImageProcessor | None = None,
     ) -> None:
         """Initialize the OpenAI multi-agent formatter.
 
         Args:
             conversation_history_prompt (`str`):
                 The prompt to use for the conversation history section.
+            image_processor (`ImageProcessor | None`, optional):
+                The processor downscaling and re-encoding the images.
         """
-        super().__init__(token_counter=token_counter, max_tokens=max_tokens)
+        super().__init__(
+            token_counter=token_counter,
+            max_tokens=max_tokens,
+            image_processor=image_processor,
+        )
         self.conversation_history_prompt = conversation_history_prompt
 
+    async def _format(self, msgs: list[Msg]) -> list[dict[str, Any]]:
+        """Download the web media in the messages concurrently, and format
+        the messages."""
+        await self._prefetch_web_media(msgs, ["audio"], _encode_base64)
+        return await super()._format(msgs)
+
     async def _format_tool_sequence(
         self,
         msgs: list[Msg],
     ) -> list[dict[str, Any]]:
         """Given a sequence of tool call/result messages, format them into
         the required format for the OpenAI API."""
-        return await OpenAIChatFormatter().format(msgs)
+        return await OpenAIChatFormatter(
+            image_processor=self.image_processor,
+        ).format(msgs)
 
     async def _format_agent_message(
         self,
@@ -345,12 +356,12 @@ class OpenAIMultiAgentFormatter(TruncatedFormatterBase):
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": url,
+                                "url": await self._process_image_url(url),
                             },
                         },
                     )
                 elif block["type"] == "audio":
-                    input_audio = _to_openai_audio_data(block["source"])
+                    input_audio = await _to_openai_audio_data(block["source"])
                     audios.append(
                         {
                             "type": "input_audio",
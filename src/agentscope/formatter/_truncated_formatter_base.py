@@ -11,7 +11,8 @@ from typing import (
 )
 
 from ._formatter_base import FormatterBase
-from ..message import Msg
+from ._image_processor import ImageProcessor
+from ..message import ImageBlock, Msg
 from ..token import TokenCounterBase
 from ..tracing import trace_format
 
@@ -24,6 +25,7 @@ class TruncatedFormatterBase(FormatterBase, ABC):
         self,
         token_counter: TokenCounterBase | None = None,
         max_tokens: int | None = None,
+        image_processor: ImageProcessor | None = None,
     ) -> None:
         """Initialize the TruncatedFormatterBase.
 
@@ -36,8 +38,14 @@ class TruncatedFormatterBase(FormatterBase, ABC):
                 The maximum number of tokens allowed in the formatted
                 messages. If not provided, the formatter will not truncate
                 the messages.
+            image_processor (`ImageProcessor | None`, optional):
+                The processor downscaling and re-encoding the images inlined
+                in the formatted messages, e.g.
+                `ImageProcessor.from_model("gpt-4o")`. If not provided, the
+                images are sent as they are.
         """
         self.token_counter = token_counter
+        self.image_processor = image_processor
 
         assert (
             max_tokens is None or 0 < max_tokens
@@ -112,6 +120,35 @@ class TruncatedFormatterBase(FormatterBase, ABC):
 
         return formatted_msgs
 
+    async def _process_image(
+        self,
+        data: str,
+        media_type: str,
+    ) -> tuple[str, str]:
+        """Process the base64 encoded image by the image processor if
+        given."""
+        if self.image_processor is None:
+            return data, media_type
+        return await self.image_processor.process(data, media_type)
+
+    async def _format_image_block(self, block: ImageBlock) -> dict:
+        """Copy the image block, with its base64 data processed by the
+        image processor if given."""
+        source = block["source"]
+        if source["type"] == "base64":
+            data, media_type = await self._process_image(
+                source["data"],
+                source["media_type"],
+            )
+            source = {**source, "data": data, "media_type": media_type}
+        return {**block, "source": source}
+
+    async def _process_image_url(self, url: str) -> str:
+        """Process the image data URL by the image processor if given."""
+        if self.image_processor is None:
+            return url
+        return await self.image_processor.process_url(url)
+
     async def _format_system_message(
         self,
         msg: Msg,
@@ -4,17 +4,23 @@ the MCP servers."""
 
 from ._client_base import MCPClientBase
 from ._mcp_function import MCPToolFunction
+from ._session_pool import MCPSessionPool
+from ._tool_cache import MCPToolListCache
 from ._stateful_client_base import StatefulClientBase
 from ._stdio_stateful_client import StdIOStatefulClient
 from ._http_stateless_client import HttpStatelessClient
 from ._http_stateful_client import HttpStatefulClient
+from ._toolkit_server import ToolkitMCPServer
 
 
 __all__ = [
     "MCPToolFunction",
     "MCPClientBase",
+    "MCPSessionPool",
+    "MCPToolListCache",
     "StatefulClientBase",
     "StdIOStatefulClient",
     "HttpStatelessClient",
     "HttpStatefulClient",
+    "ToolkitMCPServer",
 ]
@@ -5,6 +5,7 @@ from typing import Callable, List
 
 import mcp.types
 
+from ._tool_cache import MCPToolListCache, _shared_tool_cache
 from .._logging import logger
 from ..message import ImageBlock, Base64Source, AudioBlock, TextBlock
 
@@ -12,6 +13,11 @@ from ..message import ImageBlock, Base64Source, AudioBlock, TextBlock
 class MCPClientBase:
     """Base class for MCP clients."""
 
+    tool_cache: MCPToolListCache
+    """The cache of the tool listings, which is shared by all the clients by
+    default, and only coalesces the concurrent listings. Set a cache with a
+    TTL to reuse the listings."""
+
     def __init__(self, name: str) -> None:
         """Initialize the MCP client with a name.
 
@@ -21,6 +27,12 @@ class MCPClientBase:
                 across the MCP servers.
         """
         self.name = name
+        self.tool_cache = _shared_tool_cache
+
+    def _get_tool_cache_key(self) -> str:
+        """Get the key identifying the MCP server in the tool cache, which
+        should change with the server configuration."""
+        return f"{self.__class__.__name__}:{self.name}"
 
     @abstractmethod
     async def get_callable_function(
@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 """The MCP stateful HTTP client module in AgentScope."""
+from contextlib import _AsyncGeneratorContextManager
 from typing import Any, Literal
 
 from mcp.client.sse import sse_client
 from mcp.client.streamable_http import streamablehttp_client
 
 from ._stateful_client_base import StatefulClientBase
+from ._tool_cache import _hash_config
 
 
 class HttpStatefulClient(StatefulClientBase):
@@ -29,6 +31,8 @@ class HttpStatefulClient(StatefulClientBase):
         headers: dict[str, str] | None = None,
         timeout: float = 30,
         sse_read_timeout: float = 60 * 5,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 0.5,
         **client_kwargs: Any,
     ) -> None:
         """Initialize the streamable HTTP MCP client.
@@ -50,28 +54,42 @@ class HttpStatefulClient(StatefulClientBase):
             sse_read_timeout (`float`, optional):
                 The timeout for reading Server-Sent Events (SSE) in seconds.
                 Defaults to 300 (5 minutes).
+            max_reconnect_attempts (`int`, defaults to `5`):
+                The maximum number of the attempts to reconnect the lost
+                session. If `0`, the lost session is not reconnected.
+            reconnect_backoff (`float`, defaults to `0.5`):
+                The seconds to wait before the second reconnection attempt,
+                which is doubled for each following attempt.
             **client_kwargs (`Any`):
                 The additional keyword arguments to pass to the streamable
                 HTTP client.
         """
-        super().__init__(name=name)
+        super().__init__(
+            name=name,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+        )
 
         assert transport in ["streamable_http", "sse"]
         self.transport = transport
 
+        self.client_config = {
+            "url": url,
+            "headers": headers,
+            "timeout": timeout,
+            "sse_read_timeout": sse_read_timeout,
+            **client_kwargs,
+        }
+
+    def _get_tool_cache_key(self) -> str:
+        """Identify the MCP server by its URL and headers."""
+        return (
+            f"{self.transport}:{self.client_config['url']}:"
+            f"{_hash_config(self.client_config['headers'])}"
+        )
+
+    def get_client(self) -> _AsyncGeneratorContextManager[Any]:
+        """Create a new transport context to the MCP server."""
         if self.transport == "streamable_http":
-            self.client = streamablehttp_client(
-                url=url,
-                headers=headers,
-                timeout=timeout,
-                sse_read_timeout=sse_read_timeout,
-                **client_kwargs,
-            )
-        else:
-            self.client = sse_client(
-                url=url,
-                headers=headers,
-                timeout=timeout,
-                sse_read_timeout=sse_read_timeout,
-                **client_kwargs,
-            )
+            return streamablehttp_client(**self.client_config)
+        return sse_client(**self.client_config)
@@ -10,6 +10,8 @@ from mcp.client.streamable_http import streamablehttp_client
 
 from . import MCPToolFunction
 from ._client_base import MCPClientBase
+from ._session_pool import MCPSessionPool
+from ._tool_cache import _hash_config
 from ..tool import ToolResponse
 
 
@@ -20,6 +22,11 @@ class HttpStatelessClient(MCPClientBase):
      session state across multiple tool calls. Each tool call will start a
      new session and close it after the call is done.
 
+    To save the connection and handshake round trips of each call, set
+    `pool_size` or `max_concurrency` to take the sessions from a
+    :class:`MCPSessionPool`, and call `close()` when the client is no longer
+    used.
+
     """
 
     stateful: bool = False
@@ -35,6 +42,10 @@ class HttpStatelessClient(MCPClientBase):
         headers: dict[str, str] | None = None,
         timeout: float = 30,
         sse_read_timeout: float = 60 * 5,
+        pool_size: int = 0,
+        max_concurrency: int | None = None,
+        max_idle_time: float = 60.0,
+        max_session_uses: int = 1,
         **client_kwargs: Any,
     ) -> None:
         """Initialize the streamable HTTP MCP server.
@@ -56,6 +67,19 @@ class HttpStatelessClient(MCPClientBase):
             sse_read_timeout (`float`, optional):
                 The timeout for reading Server-Sent Events (SSE) in seconds.
                 Defaults to 300 (5 minutes).
+            pool_size (`int`, defaults to `0`):
+                The number of the pre-initialized sessions kept for the
+                upcoming calls. If `0` and `max_concurrency` is `None`,
+                each call connects to the server by itself.
+            max_concurrency (`int | None`, defaults to `None`):
+                The maximum number of the concurrent calls to the server.
+            max_idle_time (`float`, defaults to `60.0`):
+                The seconds after which an idle pooled session is closed.
+            max_session_uses (`int`, defaults to `1`):
+                The number of the calls served by a pooled session. The
+                default `1` keeps no state across the calls, and a larger
+                value reuses the sessions for the servers without any
+                session state.
             **client_kwargs (`Any`):
                 The additional keyword arguments to pass to the streamable
                 HTTP client.
@@ -76,6 +100,16 @@ class HttpStatelessClient(MCPClientBase):
 
         self._tools = None
 
+        self.session_pool = None
+        if pool_size > 0 or max_concurrency is not None:
+            self.session_pool = MCPSessionPool(
+                client_gen=self.get_client,
+                pool_size=pool_size,
+                max_concurrency=max_concurrency,
+                max_idle_time=max_idle_time,
+                max_session_uses=max_session_uses,
+            )
+
     def get_client(self) -> _AsyncGeneratorContextManager[Any]:
         """The disposable MCP client object, which is a context manager."""
         if self.transport == "sse":
@@ -125,6 +159,14 @@ class HttpStatelessClient(MCPClientBase):
                 f"Tool '{func_name}' not found in the MCP server ",
             )
 
+        if self.session_pool is not None:
+            return MCPToolFunction(
+                mcp_name=self.name,
+                tool=target_tool,
+                wrap_tool_result=wrap_tool_result,
+                session_pool=self.session_pool,
+            )
+
         return MCPToolFunction(
             mcp_name=self.name,
             tool=target_tool,
@@ -132,17 +174,51 @@ class HttpStatelessClient(MCPClientBase):
             client_gen=self.get_client,
         )
 
-    async def list_tools(self) -> List[mcp.types.Tool]:
-        """List all tools available on the MCP server.
+    async def list_tools(
+        self,
+        refresh: bool = False,
+    ) -> List[mcp.types.Tool]:
+        """List all tools available on the MCP server, which are taken from
+        the tool cache until the listing expires.
+
+        Args:
+            refresh (`bool`, defaults to `False`):
+                Whether to list the tools from the server even if cached.
 
         Returns:
             `mcp.types.ListToolsResult`:
                 The result containing the list of tools.
         """
+        tools = await self.tool_cache.get_or_list(
+            self._get_tool_cache_key(),
+            self._list_tools,
+            refresh=refresh,
+        )
+        self._tools = tools
+        return tools
+
+    async def _list_tools(self) -> List[mcp.types.Tool]:
+        """List the tools from the MCP server."""
+        if self.session_pool is not None:
+            async with self.session_pool.acquire() as session:
+                res = await session.list_tools()
+                return res.tools
+
         async with self.get_client() as cli:
             read_stream, write_stream = cli[0], cli[1]
             async with ClientSession(read_stream, write_stream) as session:
                 await session.initialize()
                 res = await session.list_tools()
-                self._tools = res.tools
                 return res.tools
+
+    def _get_tool_cache_key(self) -> str:
+        """Identify the MCP server by its URL and headers."""
+        return (
+            f"{self.transport}:{self.client_config['url']}:"
+            f"{_hash_config(self.client_config['headers'])}"
+        )
+
+    async def close(self) -> None:
+        """Close the pooled sessions, if any."""
+        if self.session_pool is not None:
+            await self.session_pool.close()
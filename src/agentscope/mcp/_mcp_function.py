@@ -7,6 +7,7 @@ import mcp
 from mcp import ClientSession
 
 from ._client_base import MCPClientBase
+from ._session_pool import _SessionProvider
 from .._utils._common import _extract_json_schema_from_mcp_tool
 from ..tool import ToolResponse
 
@@ -31,26 +32,27 @@ class MCPToolFunction:
         client_gen: Callable[..., _AsyncGeneratorContextManager[Any]]
         | None = None,
         session: ClientSession | None = None,
+        session_pool: _SessionProvider | None = None,
     ) -> None:
-        """Initialize the MCP function."""
+        """Initialize the MCP function, which calls the tool through
+        exactly one of a new session from `client_gen`, the given `session`
+        or a session acquired from the `session_pool` (e.g. the
+        `MCPSessionPool` or a stateful client) for each call."""
         self.mcp_name = mcp_name
         self.name = tool.name
         self.description = tool.description
         self.json_schema = _extract_json_schema_from_mcp_tool(tool)
         self.wrap_tool_result = wrap_tool_result
 
-        # Cannot be None at the same time
-        if (
-            client_gen is None
-            and session is None
-            or (client_gen is not None and session is not None)
-        ):
+        if [client_gen, session, session_pool].count(None) != 2:
             raise ValueError(
-                "Either client or session must be provided, but not both.",
+                "Exactly one of client_gen, session and session_pool must be "
+                "provided.",
             )
 
         self.client_gen = client_gen
         self.session = session
+        self.session_pool = session_pool
 
     async def __call__(
         self,
@@ -68,6 +70,13 @@ class MCPToolFunction:
                         arguments=kwargs,
                     )
 
+        elif self.session_pool:
+            async with self.session_pool.acquire() as session:
+                res = await session.call_tool(
+                    self.name,
+                    arguments=kwargs,
+                )
+
         else:
             res = await self.session.call_tool(
                 self.name,
@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+"""The pool of pre-initialized MCP sessions for the stateless clients, and
+the session management shared with the stateful clients."""
+import asyncio
+from collections import deque
+from contextlib import (
+    AbstractAsyncContextManager,
+    _AsyncGeneratorContextManager,
+    asynccontextmanager,
+    nullcontext,
+)
+from types import TracebackType
+from typing import Any, AsyncGenerator, Callable, Protocol
+
+import anyio
+import mcp.types
+from mcp import ClientSession, McpError
+from mcp.types import CONNECTION_CLOSED
+
+from .._logging import logger
+
+
+class _SessionProvider(Protocol):
+    """The provider of the MCP sessions used by the tool functions, e.g. the
+    session pool and the stateful clients."""
+
+    def acquire(self) -> AbstractAsyncContextManager[ClientSession]:
+        """Acquire an initialized session for a call."""
+
+
+def _is_connection_error(error: BaseException) -> bool:
+    """Whether the error is caused by the lost connection to the server."""
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(
+        error,
+        (anyio.ClosedResourceError, anyio.BrokenResourceError, EOFError),
+    )
+
+
+class _WatchedReadStream:
+    """Proxy the read stream of the transport, to notice the lost
+    connection as soon as the stream ends."""
+
+    def __init__(self, stream: Any, on_end: Callable[[], None]) -> None:
+        """Wrap the read stream."""
+        self._stream = stream
+        self._on_end = on_end
+
+    async def receive(self) -> Any:
+        """Receive the next message from the server."""
+        try:
+            return await self._stream.receive()
+        except (anyio.EndOfStream, anyio.ClosedResourceError):
+            self._on_end()
+            raise
+
+    def __aiter__(self) -> "_WatchedReadStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self.receive()
+        except anyio.EndOfStream:
+            raise StopAsyncIteration from None
+
+    async def aclose(self) -> None:
+        """Close the read stream."""
+        await self._stream.aclose()
+
+    async def __aenter__(self) -> "_WatchedReadStream":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+
+class _PooledSession:
+    """An MCP session owned by a dedicated task, since the transport
+    contexts must be entered and exited in the same task. Once the
+    transport ends, the session is no longer `alive`, and should be closed
+    by its user."""
+
+    def __init__(
+        self,
+        client_gen: Callable[..., _AsyncGeneratorContextManager[Any]],
+        max_idle_time: float | None = None,
+        on_tools_changed: Callable[[], None] | None = None,
+    ) -> None:
+        """Start connecting to the MCP server."""
+        self.session: ClientSession | None = None
+        self.ended = False
+        self.num_uses = 0
+        self.idle_since: float | None = None
+
+        self._client_gen = client_gen
+        self._max_idle_time = max_idle_time
+        self._on_tools_changed = on_tools_changed
+        self._ready = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def alive(self) -> bool:
+        """Whether the session is connected and not closing."""
+        return (
+            self._ready.done()
+            and not self._ready.cancelled()
+            and self._ready.exception() is None
+            and not self._task.done()
+            and not self._closing.is_set()
+            and not self.ended
+        )
+
+    async def _run(self) -> None:
+        """Connect to the server, initialize the session, and keep it until
+        it's closed, the transport ends, or it expires while idle."""
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._client_gen() as cli:
+                # Not to close the session right away, so that the pending
+                # requests are failed by the session before it's closed
+                read_stream = _WatchedReadStream(cli[0], self._on_end)
+                write_stream = cli[1]
+                async with ClientSession(
+                    read_stream,  # type: ignore[arg-type]
+                    write_stream,
+                    message_handler=self._handle_message,
+                ) as session:
+                    await session.initialize()
+                    # Cache the output schemas, which `call_tool` otherwise
+                    # lists the tools for to validate the result
+                    await session.list_tools()
+                    self.session = session
+                    self.idle_since = loop.time()
+                    self._ready.set_result(None)
+
+                    while not self._closing.is_set():
+                        try:
+                            await asyncio.wait_for(
+                                self._closing.wait(),
+                                timeout=self._max_idle_time,
+                            )
+                        except asyncio.TimeoutError:
+                            if (
+                                self.idle_since is not None
+                                and self._max_idle_time is not None
+                                and loop.time() - self.idle_since
+                                >= self._max_idle_time
+                            ):
+                                break
+
+        except Exception as e:  # pylint: disable=broad-except
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            else:
+                logger.warning("The pooled MCP session is broken: %s", e)
+
+        finally:
+            if not self._ready.done():
+                self._ready.cancel()
+            self._closing.set()
+
+    async def _handle_message(self, message: Any) -> None:
+        """Handle the notifications from the server."""
+        if isinstance(message, mcp.types.ServerNotification) and isinstance(
+            message.root,
+            mcp.types.ToolListChangedNotification,
+        ):
+            if self._on_tools_changed is not None:
+                self._on_tools_changed()
+
+    def _on_end(self) -> None:
+        """Mark the session as ended when the transport ends."""
+        self.ended = True
+
+    async def wait_ready(self) -> ClientSession:
+        """Wait until the session is initialized."""
+        await asyncio.shield(self._ready)
+        assert self.session is not None
+        return self.session
+
+    async def close(self) -> None:
+        """Close the session and wait for its transport to be closed."""
+        self._closing.set()
+        if not self._ready.done():
+            # Still connecting
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+class MCPSessionPool:
+    """A bounded pool of pre-initialized sessions to a stateless MCP server,
+    which moves the connection and `initialize` handshake off the critical
+    path of the tool calls.
+
+    By default, each session serves only one tool call and is closed
+    afterward, while the spare sessions are initialized in the background,
+    so that no state is carried across the calls. In this way, the
+    handshakes still happen once per call, and only the latency is saved
+    when the spare sessions get ready between the calls. For the servers
+    that keep no session state at all, set `max_session_uses` greater than
+    1 to reuse the sessions and save the handshakes as well.
+    """
+
+    def __init__(
+        self,
+        client_gen: Callable[..., _AsyncGeneratorContextManager[Any]],
+        pool_size: int = 2,
+        max_concurrency: int | None = None,
+        max_idle_time: float = 60.0,
+        max_session_uses: int = 1,
+        health_check_interval: float = 10.0,
+        health_check_timeout: float = 5.0,
+    ) -> None:
+        """Initialize the session pool. The sessions are created lazily
+        within the running event loop.
+
+        Args:
+            client_gen (`Callable[..., _AsyncGeneratorContextManager[Any]]`):
+                The function returning a new MCP transport context, e.g.
+                `HttpStatelessClient.get_client`.
+            pool_size (`int`, defaults to `2`):
+                The maximum number of the idle sessions kept in the pool,
+                including the spare ones being initialized.
+            max_concurrency (`int | None`, defaults to `None`):
+                The maximum number of the concurrent calls to the server,
+                the other calls wait for a free slot. If `None`, no limit
+                is applied.
+            max_idle_time (`float`, defaults to `60.0`):
+                The seconds after which an idle session is closed.
+            max_session_uses (`int`, defaults to `1`):
+                The number of the calls served by a session before it's
+                recycled.
+            health_check_interval (`float`, defaults to `10.0`):
+                The idle seconds after which a session is pinged before
+                being used.
+            health_check_timeout (`float`, defaults to `5.0`):
+                The timeout of the ping in seconds.
+        """
+        if pool_size < 0:
+            raise ValueError(
+                f"The pool size must be non-negative, got {pool_size}.",
+            )
+        if max_session_uses < 1:
+            raise ValueError(
+                "The max_session_uses must be positive, got "
+                f"{max_session_uses}.",
+            )
+
+        self.client_gen = client_gen
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.max_idle_time = max_idle_time
+        self.max_session_uses = max_session_uses
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._idle: deque[_PooledSession] = deque()
+        self._warming: deque[_PooledSession] = deque()
+        self._background_tasks: set[asyncio.Task] = set()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncGenerator[ClientSession, None]:
+        """Acquire an initialized session for a tool call, which is
+        recycled after the call, or discarded if the call fails.
+
+        Yields:
+            `ClientSession`:
+                The initialized MCP client session.
+        """
+        self._bind_loop()
+
+        async with self._semaphore or nullcontext():
+            pooled = await self._take()
+            try:
+                if pooled.num_uses + 1 >= self.max_session_uses:
+                    # Replace the session used up by this call in advance
+                    self._refill()
+                session = await pooled.wait_ready()
+                # Not to be expired while in use
+                pooled.idle_since = None
+                yield session
+
+            except BaseException:
+                self._spawn(pooled.close())
+                raise
+
+            self._release(pooled)
+
+    async def warm_up(self) -> None:
+        """Initialize the spare sessions in advance, e.g. when the agent
+        starts, and wait until they're ready."""
+        self._bind_loop()
+        self._refill()
+        await asyncio.gather(
+            *[_.wait_ready() for _ in self._warming],
+            return_exceptions=True,
+        )
+
+    async def close(self) -> None:
+        """Close all the sessions in the pool."""
+        sessions = [*self._idle, *self._warming]
+        self._idle.clear()
+        self._warming.clear()
+        await asyncio.gather(
+            *[_.close() for _ in sessions],
+            *self._background_tasks,
+            return_exceptions=True,
+        )
+
+    def _bind_loop(self) -> None:
+        """Bind the pool to the running event loop, dropping the sessions
+        created in another one."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        self._loop = loop
+        self._semaphore = (
+            asyncio.Semaphore(self.max_concurrency)
+            if self.max_concurrency
+            else None
+        )
+        self._idle.clear()
+        self._warming.clear()
+        self._background_tasks.clear()
+
+    async def _take(self) -> _PooledSession:
+        """Take a healthy idle session, a spare one being initialized, or
+        a new one from the pool."""
+        while self._idle:
+            # The most recently used one is the most likely to be healthy
+            pooled = self._idle.pop()
+            if await self._check_health(pooled):
+                return pooled
+            self._spawn(pooled.close())
+
+        if self._warming:
+            return self._warming.popleft()
+
+        return _PooledSession(self.client_gen, self.max_idle_time)
+
+    async def _check_health(self, pooled: _PooledSession) -> bool:
+        """Check if the idle session is still usable, pinging the server if
+        it has been idle for a while."""
+        if not pooled.alive:
+            return False
+
+        assert self._loop is not None and pooled.idle_since is not None
+        if self._loop.time() - pooled.idle_since < self.health_check_interval:
+            return True
+
+        try:
+            assert pooled.session is not None
+            await asyncio.wait_for(
+                pooled.session.send_ping(),
+                timeout=self.health_check_timeout,
+            )
+            return True
+        except Exception as e:  # pylint: disable=broad-except
+            logger.info("The pooled MCP session failed the ping: %s", e)
+            return False
+
+    def _refill(self) -> None:
+        """Initialize the spare sessions in the background."""
+        while len(self._idle) + len(self._warming) < self.pool_size:
+            pooled = _PooledSession(self.client_gen, self.max_idle_time)
+            self._warming.append(pooled)
+            self._spawn(self._warm_up(pooled))
+
+    async def _warm_up(self, pooled: _PooledSession) -> None:
+        """Move the spare session to the idle ones once initialized."""
+        try:
+            await pooled.wait_ready()
+        except BaseException as e:  # pylint: disable=broad-except
+            if pooled in self._warming:
+                self._warming.remove(pooled)
+            logger.warning("Failed to initialize the MCP session: %s", e)
+            return
+
+        if pooled in self._warming:
+            self._warming.remove(pooled)
+            self._idle.append(pooled)
+
+    def _release(self, pooled: _PooledSession) -> None:
+        """Put the used session back to the pool, or close it if it's used
+        up or the pool is full."""
+        pooled.num_uses += 1
+        if (
+            pooled.num_uses >= self.max_session_uses
+            or not pooled.alive
+            or len(self._idle) + len(self._warming) >= self.pool_size
+        ):
+            self._spawn(pooled.close())
+            self._refill()
+            return
+
+        assert self._loop is not None
+        pooled.idle_since = self._loop.time()
+        self._idle.append(pooled)
+
+    def _spawn(self, coro: Any) -> None:
+        """Run the coroutine in the background, keeping a reference to it
+        until it's done."""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
@@ -1,15 +1,17 @@
 # -*- coding: utf-8 -*-
 """The base MCP stateful client class in AgentScope, that provides basic
  functionality for stateful MCP clients."""
+import asyncio
 from abc import ABC
-from contextlib import AsyncExitStack
-from typing import List
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from typing import Any, AsyncGenerator, List
 
 import mcp
 from mcp import ClientSession
 
 from ._client_base import MCPClientBase
 from ._mcp_function import MCPToolFunction
+from ._session_pool import _PooledSession, _is_connection_error
 from .._logging import logger
 
 
@@ -19,30 +21,80 @@ class StatefulClientBase(MCPClientBase, ABC):
 
     The developers should use `connect()` and `close()` methods to manage
     the client lifecycle.
+
+    The concurrent tool calls are pipelined over the session(s), and each
+    call is dispatched to the session with the fewest in-flight requests.
+    Once the connection is lost, the in-flight calls fail, and the session
+    is reconnected with exponential backoff on the next call. Note the
+    server-side state is lost after reconnecting.
     """
 
     is_connected: bool
     """If connected to the MCP server"""
 
-    def __init__(self, name: str) -> None:
+    def __init__(
+        self,
+        name: str,
+        num_sessions: int = 1,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 0.5,
+        max_reconnect_backoff: float = 30.0,
+    ) -> None:
         """Initialize the stateful MCP client.
 
         Args:
             name (`str`):
                 The name to identify the MCP server, which should be unique
                 across the MCP servers.
+            num_sessions (`int`, defaults to `1`):
+                The number of the sessions (e.g. the server processes of the
+                StdIO client) that the calls are distributed across. Note
+                the sessions don't share their server-side state.
+            max_reconnect_attempts (`int`, defaults to `5`):
+                The maximum number of the attempts to reconnect a lost
+                session. If `0`, the lost session is not reconnected.
+            reconnect_backoff (`float`, defaults to `0.5`):
+                The seconds to wait before the second attempt, which is
+                doubled for each following attempt.
+            max_reconnect_backoff (`float`, defaults to `30.0`):
+                The maximum seconds to wait between the attempts.
         """
 
         super().__init__(name=name)
 
+        if num_sessions < 1:
+            raise ValueError(
+                f"The num_sessions must be positive, got {num_sessions}.",
+            )
+
+        self.num_sessions = num_sessions
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.reconnect_backoff = reconnect_backoff
+        self.max_reconnect_backoff = max_reconnect_backoff
+
         self.client = None
-        self.stack = None
-        self.session = None
+        self.session: ClientSession | None = None
         self.is_connected = False
 
+        self._sessions: list[_PooledSession | None] = []
+        self._in_flight: list[int] = []
+        self._reconnecting: dict[int, asyncio.Task] = {}
+        self._closing_tasks: set[asyncio.Task] = set()
+
         # Cache the tools to avoid fetching them multiple times
         self._cached_tools = None
 
+    def get_client(self) -> _AsyncGeneratorContextManager[Any]:
+        """Create a new transport context to the MCP server, which is
+        entered each time a session connects. The subclasses that set
+        `self.client` instead can only connect once."""
+        if self.client is None:
+            raise NotImplementedError(
+                f"{self.__class__.__name__} doesn't implement get_client().",
+            )
+        client, self.client = self.client, None
+        return client
+
     async def connect(self) -> None:
         """Connect to MCP server."""
         if self.is_connected:
@@ -51,24 +103,28 @@ class StatefulClientBase(MCPClientBase, ABC):
                 "before connecting again.",
             )
 
-        self.stack = AsyncExitStack()
-
+        sessions = [
+            _PooledSession(
+                self.get_client,
+                on_tools_changed=self._on_tools_changed,
+            )
+            for _ in range(self.num_sessions)
+        ]
         try:
-            context = await self.stack.enter_async_context(
-                self.client,
+            await asyncio.gather(*[_.wait_ready() for _ in sessions])
+        except BaseException:
+            await asyncio.gather(
+                *[_.close() for _ in sessions],
+                return_exceptions=True,
             )
-            read_stream, write_stream = context[0], context[1]
-            self.session = ClientSession(read_stream, write_stream)
-            await self.stack.enter_async_context(self.session)
-            await self.session.initialize()
-
-            self.is_connected = True
-            logger.info("MCP client connected.")
-        except Exception:
-            await self.stack.aclose()
-            self.stack = None
             raise
 
+        self._sessions = list(sessions)
+        self._in_flight = [0] * self.num_sessions
+        self.session = sessions[0].session
+        self.is_connected = True
+        logger.info("MCP client connected.")
+
     async def close(self) -> None:
         """Clean up the MCP client resources. You must call this method when
         your application is done."""
@@ -79,17 +135,138 @@ class StatefulClientBase(MCPClientBase, ABC):
             )
 
         try:
-            if self.stack:
-                await self.stack.aclose()
+            for task in self._reconnecting.values():
+                task.cancel()
+            await asyncio.gather(
+                *self._reconnecting.values(),
+                *self._closing_tasks,
+                *[_.close() for _ in self._sessions if _ is not None],
+                return_exceptions=True,
+            )
 
             logger.info("MCP client closed.")
         finally:
-            self.stack = None
+            self._sessions = []
+            self._in_flight = []
+            self._reconnecting = {}
             self.session = None
             self.is_connected = False
 
-    async def list_tools(self) -> List[mcp.types.Tool]:
-        """Get all available tools from the server.
+    @asynccontextmanager
+    async def acquire(self) -> AsyncGenerator[ClientSession, None]:
+        """Acquire the session with the fewest in-flight requests for a
+        call, reconnecting it if the connection is lost.
+
+        Yields:
+            `ClientSession`:
+                The connected MCP client session.
+        """
+        self._validate_connection()
+
+        i = min(range(self.num_sessions), key=lambda _: self._in_flight[_])
+        self._in_flight[i] += 1
+        try:
+            pooled = await self._get_live_session(i)
+            try:
+                assert pooled.session is not None
+                yield pooled.session
+
+            except BaseException as e:
+                if (
+                    _is_connection_error(e)
+                    and i < len(self._sessions)
+                    and self._sessions[i] is pooled
+                ):
+                    logger.warning(
+                        "Lost the connection to the MCP server %s, with %d "
+                        "in-flight request(s).",
+                        self.name,
+                        self._in_flight[i],
+                    )
+                    self._sessions[i] = None
+                    task = asyncio.ensure_future(pooled.close())
+                    self._closing_tasks.add(task)
+                    task.add_done_callback(self._closing_tasks.discard)
+                raise
+
+        finally:
+            if i < len(self._in_flight):
+                self._in_flight[i] -= 1
+
+    async def _get_live_session(self, i: int) -> _PooledSession:
+        """Get the i-th session, reconnecting it if it's lost. The
+        concurrent callers share the same reconnection."""
+        pooled = self._sessions[i]
+        if pooled is not None and pooled.alive:
+            return pooled
+
+        task = self._reconnecting.get(i)
+        if task is None:
+            task = asyncio.ensure_future(self._reconnect(i))
+            self._reconnecting[i] = task
+            task.add_done_callback(lambda _: self._reconnecting.pop(i, None))
+
+        return await asyncio.shield(task)
+
+    async def _reconnect(self, i: int) -> _PooledSession:
+        """Reconnect the i-th session with exponential backoff."""
+        old = self._sessions[i]
+        self._sessions[i] = None
+        if old is not None:
+            await old.close()
+
+        error = None
+        for attempt in range(self.max_reconnect_attempts):
+            if attempt > 0:
+                await asyncio.sleep(
+                    min(
+                        self.reconnect_backoff * 2 ** (attempt - 1),
+                        self.max_reconnect_backoff,
+                    ),
+                )
+
+            pooled = _PooledSession(
+                self.get_client,
+                on_tools_changed=self._on_tools_changed,
+            )
+            try:
+                await pooled.wait_ready()
+            except Exception as e:
+                await pooled.close()
+                logger.warning(
+                    "Failed to reconnect to the MCP server %s (attempt "
+                    "%d/%d): %s",
+                    self.name,
+                    attempt + 1,
+                    self.max_reconnect_attempts,
+                    e,
+                )
+                error = e
+                continue
+
+            self._sessions[i] = pooled
+            if i == 0:
+                self.session = pooled.session
+            logger.info("MCP client %s reconnected.", self.name)
+            return pooled
+
+        raise RuntimeError(
+            f"The connection to the MCP server {self.name} is lost, and "
+            f"failed to reconnect after {self.max_reconnect_attempts} "
+            "attempt(s).",
+        ) from error
+
+    async def list_tools(
+        self,
+        refresh: bool = False,
+    ) -> List[mcp.types.Tool]:
+        """Get all available tools from the server, which are taken from the
+        tool cache until the listing expires or the server notifies the
+        change of its tools.
+
+        Args:
+            refresh (`bool`, defaults to `False`):
+                Whether to list the tools from the server even if cached.
 
         Returns:
             `mcp.types.ListToolsResult`:
@@ -97,12 +274,27 @@ class StatefulClientBase(MCPClientBase, ABC):
         """
         self._validate_connection()
 
-        res = await self.session.list_tools()
-
         # Cache the tools for later use
-        self._cached_tools = res.tools
+        tools = await self.tool_cache.get_or_list(
+            self._get_tool_cache_key(),
+            self._list_tools,
+            refresh=refresh,
+        )
+        self._cached_tools = tools
+        return tools
+
+    async def _list_tools(self) -> List[mcp.types.Tool]:
+        """List the tools from the MCP server."""
+        async with self.acquire() as session:
+            res = await session.list_tools()
         return res.tools
 
+    def _on_tools_changed(self) -> None:
+        """Drop the cached tools once the server notifies the change."""
+        logger.info("The tools of the MCP server %s changed.", self.name)
+        self._cached_tools = None
+        self.tool_cache.invalidate(self._get_tool_cache_key())
+
     async def get_callable_function(
         self,
         func_name: str,
@@ -110,7 +302,8 @@ class StatefulClientBase(MCPClientBase, ABC):
     ) -> MCPToolFunction:
         """Get an async tool function from the MCP server by its name, so
         that you can call it directly, wrap it into your own function, or
-        anyway you like.
+        anyway you like. The function acquires the session from this client
+        for each call, so it keeps working after reconnecting.
 
         .. note:: Currently, only the text, image, and audio results are
          supported in this function.
@@ -148,7 +341,7 @@ class StatefulClientBase(MCPClientBase, ABC):
             mcp_name=self.name,
             tool=target_tool,
             wrap_tool_result=wrap_tool_result,
-            session=self.session,
+            session_pool=self,
         )
 
     def _validate_connection(self) -> None:
@@ -159,7 +352,7 @@ class StatefulClientBase(MCPClientBase, ABC):
                 "before using the client.",
             )
 
-        if not self.session:
+        if not self._sessions:
             raise RuntimeError(
                 "The session is not initialized. Call connect() "
                 "before using the client.",
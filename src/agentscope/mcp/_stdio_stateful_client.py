@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 """The StdIO MCP server implementation in AgentScope, which provides
 function-level fine-grained control over the MCP servers using standard IO."""
-from typing import Literal
+import json
+from contextlib import _AsyncGeneratorContextManager
+from typing import Any, Literal
 
 from mcp import stdio_client, StdioServerParameters
 
 from ._stateful_client_base import StatefulClientBase
+from ._tool_cache import _hash_config
 
 
 class StdIOStatefulClient(StatefulClientBase):
@@ -19,6 +22,10 @@ class StdIOStatefulClient(StatefulClientBase):
     .. note:: The stateful client will maintain one session across multiple
      tool calls, until the client is closed by explicitly calling the
      `close()` method.
+
+    .. tip:: For the CPU-bound servers without session states, set
+     `num_processes` to distribute the calls across multiple server
+     processes.
     """
 
     def __init__(
@@ -34,6 +41,9 @@ class StdIOStatefulClient(StatefulClientBase):
             "ignore",
             "replace",
         ] = "strict",
+        num_processes: int = 1,
+        max_reconnect_attempts: int = 5,
+        reconnect_backoff: float = 0.5,
     ) -> None:
         """Initialize the MCP server with std IO.
 
@@ -55,16 +65,43 @@ class StdIOStatefulClient(StatefulClientBase):
             encoding_error_handler (`Literal["strict", "ignore", "replace"]`,
              defaults to "strict"):
                 The text encoding error handler.
+            num_processes (`int`, defaults to `1`):
+                The number of the server processes, and each call is sent to
+                the one with the fewest in-flight requests. Note the
+                processes don't share their states.
+            max_reconnect_attempts (`int`, defaults to `5`):
+                The maximum number of the attempts to restart an exited
+                server process. If `0`, the process is not restarted.
+            reconnect_backoff (`float`, defaults to `0.5`):
+                The seconds to wait before the second restart attempt, which
+                is doubled for each following attempt.
         """
-        super().__init__(name=name)
+        super().__init__(
+            name=name,
+            num_sessions=num_processes,
+            max_reconnect_attempts=max_reconnect_attempts,
+            reconnect_backoff=reconnect_backoff,
+        )
 
-        self.client = stdio_client(
-            StdioServerParameters(
-                command=command,
-                args=args or [],
-                env=env,
-                cwd=cwd,
-                encoding=encoding,
-                encoding_error_handler=encoding_error_handler,
-            ),
+        self.server_params = StdioServerParameters(
+            command=command,
+            args=args or [],
+            env=env,
+            cwd=cwd,
+            encoding=encoding,
+            encoding_error_handler=encoding_error_handler,
         )
+
+    def _get_tool_cache_key(self) -> str:
+        """Identify the MCP server by its command and environment
+        variables."""
+        params = self.server_params
+        command = json.dumps(
+            [params.command, *params.args, str(params.cwd or "")],
+        )
+        return f"stdio:{command}:{_hash_config(params.env)}"
+
+    def get_client(self) -> _AsyncGeneratorContextManager[Any]:
+        """Create a new transport context, which starts a new server
+        process."""
+        return stdio_client(self.server_params)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""The shared cache of the MCP tool listings."""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Awaitable, Callable
+
+import mcp.types
+
+from .._logging import logger
+
+
+class MCPToolListCache:
+    """The cache of the tool listings of the MCP servers, so that the tools
+    of a server are listed once and reused by the clients and toolkits
+    connected to it. By default, the MCP clients share a cache with zero
+    TTL, which only coalesces the concurrent listings of the same server,
+    and the listings are reused once a cache with a TTL is set.
+
+    A listing is refreshed after the TTL expires, or once the server sends
+    the `notifications/tools/list_changed` notification to a stateful
+    client. With a snapshot path, the listings are persisted and loaded
+    on the next start, so that the servers aren't listed again within the
+    TTL.
+
+    Example:
+        .. code-block:: python
+
+            client = StdIOStatefulClient(name="fs", command="npx", ...)
+            client.tool_cache = MCPToolListCache(
+                ttl=3600,
+                snapshot_path="./mcp_tools.json",
+            )
+    """
+
+    def __init__(
+        self,
+        ttl: float | None = 300.0,
+        snapshot_path: str | None = None,
+    ) -> None:
+        """Initialize the tool listing cache.
+
+        Args:
+            ttl (`float | None`, defaults to `300.0`):
+                The seconds after which a listing is refreshed. If `None`,
+                the listings are only refreshed on the notifications.
+            snapshot_path (`str | None`, optional):
+                The JSON file where the listings are persisted. If the file
+                exists, the listings are loaded from it.
+        """
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+
+        # The key -> (the wall-clock time of the listing, the tools)
+        self._entries: dict[str, tuple[float, list[mcp.types.Tool]]] = {}
+        self._listing: dict[str, asyncio.Future] = {}
+
+        if snapshot_path and os.path.exists(snapshot_path):
+            self._load()
+
+    async def get_or_list(
+        self,
+        key: str,
+        list_func: Callable[[], Awaitable[list[mcp.types.Tool]]],
+        refresh: bool = False,
+    ) -> list[mcp.types.Tool]:
+        """Get the cached tools of the server, or list them by the given
+        function if not cached or expired. The concurrent listings of the
+        same server are coalesced into one.
+
+        Args:
+            key (`str`):
+                The key identifying the MCP server.
+            list_func (`Callable[[], Awaitable[list[mcp.types.Tool]]]`):
+                The function listing the tools from the server.
+            refresh (`bool`, defaults to `False`):
+                Whether to list the tools even if they're cached.
+
+        Returns:
+            `list[mcp.types.Tool]`:
+                The tools of the MCP server.
+        """
+        entry = self._entries.get(key)
+        if (
+            not refresh
+            and entry is not None
+            and (self.ttl is None or time.time() - entry[0] < self.ttl)
+        ):
+            return entry[1]
+
+        future = self._listing.get(key)
+        if future is None:
+            future = asyncio.ensure_future(
+                self._list_and_cache(key, list_func),
+            )
+            self._listing[key] = future
+
+        # Cancelling a caller doesn't cancel the listing shared with others
+        return await asyncio.shield(future)
+
+    async def _list_and_cache(
+        self,
+        key: str,
+        list_func: Callable[[], Awaitable[list[mcp.types.Tool]]],
+    ) -> list[mcp.types.Tool]:
+        """List the tools and cache them, unless the listing is invalidated
+        in the meantime."""
+        task = asyncio.current_task()
+        try:
+            tools = await list_func()
+        finally:
+            valid = self._listing.get(key) is task
+            if valid:
+                self._listing.pop(key)
+
+        if valid:
+            self._entries[key] = (time.time(), tools)
+            self._save()
+        return tools
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Drop the cached tools of the server, or all servers if `key` is
+        `None`.
+
+        Args:
+            key (`str | None`, optional):
+                The key identifying the MCP server.
+        """
+        if key is None:
+            self._entries.clear()
+            self._listing.clear()
+        else:
+            self._entries.pop(key, None)
+            self._listing.pop(key, None)
+        self._save()
+
+    def _load(self) -> None:
+        """Load the listings from the snapshot file."""
+        assert self.snapshot_path is not None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            for key, entry in snapshot.items():
+                self._entries[key] = (
+                    entry["listed_at"],
+                    [mcp.types.Tool.model_validate(_) for _ in entry["tools"]],
+                )
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(
+                "Failed to load the MCP tool snapshot from %s: %s",
+                self.snapshot_path,
+                e,
+            )
+            self._entries.clear()
+
+    def _save(self) -> None:
+        """Persist the listings to the snapshot file atomically."""
+        if not self.snapshot_path:
+            return
+
+        snapshot = {
+            key: {
+                "listed_at": listed_at,
+                "tools": [
+                    _.model_dump(mode="json", by_alias=True, exclude_none=True)
+                    for _ in tools
+                ],
+            }
+            for key, (listed_at, tools) in self._entries.items()
+        }
+        dir_name = os.path.dirname(os.path.abspath(self.snapshot_path))
+        os.makedirs(dir_name, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(temp_path, self.snapshot_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+# Only coalesce the concurrent listings by default
+_shared_tool_cache = MCPToolListCache(ttl=0)
+
+
+def _hash_config(config: object) -> str:
+    """Hash the server configuration in the cache key, e.g. the headers or
+    the environment variables, without exposing the secrets in it."""
+    return hashlib.sha256(
+        json.dumps(config, sort_keys=True, default=str).encode("utf-8"),
+    ).hexdigest()[:16]
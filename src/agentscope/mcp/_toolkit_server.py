@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""The MCP server serving the tool functions of a toolkit, so that the
+agents in different processes can share one tool runtime."""
+import asyncio
+from typing import TYPE_CHECKING, Any, Literal
+
+import mcp.types
+import shortuuid
+from mcp.server.lowlevel import NotificationOptions, Server
+
+from .._logging import logger
+from ..message import ToolUseBlock
+
+if TYPE_CHECKING:
+    from ..tool import Toolkit, ToolResponse
+else:
+    Toolkit = "agentscope.tool.Toolkit"
+    ToolResponse = "agentscope.tool.ToolResponse"
+
+
+class ToolkitMCPServer:
+    """Serve the tool functions of a toolkit over MCP with the stdio or
+    streamable HTTP transport, so that the heavy tool states (e.g. browser
+    sessions, database pools and loaded models) are kept in one process
+    and shared by the agents connecting to it, e.g. by
+    `HttpStatefulClient`.
+
+    The requests are handled concurrently. The intermediate chunks of the
+    streaming tool functions are sent as the progress notifications of
+    the call, and the final response is returned as the call result. The
+    failed, timed out and interrupted calls, and the calls to the tool
+    functions not activated, are returned as the error results.
+
+    Example:
+        .. code-block:: python
+
+            toolkit = Toolkit()
+            toolkit.register_tool_function(execute_python_code)
+
+            server = ToolkitMCPServer(toolkit, name="shared-tools")
+            await server.run("streamable_http", port=8000)
+    """
+
+    def __init__(
+        self,
+        toolkit: Toolkit,
+        name: str = "agentscope-toolkit",
+        instructions: str | None = None,
+    ) -> None:
+        """Initialize the toolkit MCP server.
+
+        Args:
+            toolkit (`Toolkit`):
+                The toolkit whose activated tool functions are served.
+            name (`str`, defaults to `"agentscope-toolkit"`):
+                The name of the MCP server.
+            instructions (`str | None`, optional):
+                The instructions of the server for the clients. If `None`,
+                the notes of the activated tool groups are used.
+        """
+        self.toolkit = toolkit
+        self.server: Server = Server(
+            name,
+            instructions=instructions or toolkit.get_activated_notes() or None,
+        )
+        self.server.list_tools()(self._list_tools)
+        self.server.call_tool()(self._call_tool)
+
+    async def run(
+        self,
+        transport: Literal["stdio", "streamable_http"] = "stdio",
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        path: str = "/mcp",
+    ) -> None:
+        """Run the MCP server until it's cancelled or shut down.
+
+        Args:
+            transport (`Literal["stdio", "streamable_http"]`, defaults to \
+            `"stdio"`):
+                The transport of the MCP server.
+            host (`str`, defaults to `"127.0.0.1"`):
+                The host of the streamable HTTP server.
+            port (`int`, defaults to `8000`):
+                The port of the streamable HTTP server.
+            path (`str`, defaults to `"/mcp"`):
+                The URL path of the streamable HTTP endpoint.
+        """
+        if transport == "stdio":
+            await self._run_stdio()
+        elif transport == "streamable_http":
+            await self._run_streamable_http(host, port, path)
+        else:
+            raise ValueError(
+                f"Unsupported transport type: {transport}. Supported types "
+                "are 'stdio' and 'streamable_http'.",
+            )
+
+    async def _run_stdio(self) -> None:
+        """Serve over the standard IO."""
+        from mcp.server.stdio import stdio_server
+
+        async with stdio_server() as (read_stream, write_stream):
+            await self.server.run(
+                read_stream,
+                write_stream,
+                self._get_initialization_options(),
+            )
+
+    async def _run_streamable_http(
+        self,
+        host: str,
+        port: int,
+        path: str,
+    ) -> None:
+        """Serve over the streamable HTTP."""
+        import uvicorn
+        from mcp.server.streamable_http_manager import (
+            StreamableHTTPSessionManager,
+        )
+        from starlette.applications import Starlette
+        from starlette.routing import Route
+
+        session_manager = StreamableHTTPSessionManager(app=self.server)
+
+        class _Endpoint:
+            """The ASGI endpoint handing the requests to the manager."""
+
+            async def __call__(
+                self,
+                scope: Any,
+                receive: Any,
+                send: Any,
+            ) -> None:
+                await session_manager.handle_request(scope, receive, send)
+
+        app = Starlette(
+            routes=[Route(path, endpoint=_Endpoint())],
+            lifespan=lambda _: session_manager.run(),
+        )
+        server = uvicorn.Server(
+            uvicorn.Config(app, host=host, port=port, log_level="warning"),
+        )
+        logger.info(
+            "Serving the toolkit over MCP at http://%s:%d%s",
+            host,
+            port,
+            path,
+        )
+
+        # Shut down gracefully on cancellation to release the port
+        serve_task = asyncio.ensure_future(server.serve())
+        try:
+            await asyncio.shield(serve_task)
+        except asyncio.CancelledError:
+            server.should_exit = True
+            await serve_task
+            raise
+
+    def _get_initialization_options(self) -> Any:
+        """Get the initialization options of the server."""
+        return self.server.create_initialization_options(
+            notification_options=NotificationOptions(),
+        )
+
+    async def _list_tools(self) -> list[mcp.types.Tool]:
+        """List the activated tool functions of the toolkit."""
+        return [
+            mcp.types.Tool(
+                name=schema["function"]["name"],
+                description=schema["function"].get("description"),
+                inputSchema=schema["function"].get(
+                    "parameters",
+                    {"type": "object", "properties": {}},
+                ),
+            )
+            for schema in self.toolkit.get_json_schemas()
+        ]
+
+    async def _call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any],
+    ) -> list[mcp.types.ContentBlock]:
+        """Call the tool function, and send its intermediate chunks as the
+        progress notifications. The errors are raised, so that they're
+        returned as the error results."""
+        tool_func = self.toolkit.tools.get(name)
+        if tool_func is None or (
+            tool_func.group != "basic"
+            and not self.toolkit.groups[tool_func.group].active
+        ):
+            raise ValueError(f"Tool '{name}' not found or not activated.")
+
+        ctx = self.server.request_context
+        progress_token = ctx.meta.progressToken if ctx.meta else None
+
+        tool_res = await self.toolkit.call_tool_function(
+            ToolUseBlock(
+                type="tool_use",
+                id=shortuuid.uuid(),
+                name=name,
+                input=arguments,
+            ),
+        )
+
+        # The last chunk is the result, and the ones before are the progress
+        last_chunk = None
+        progress = 0
+        async for chunk in tool_res:
+            if last_chunk is not None and progress_token is not None:
+                progress += 1
+                await ctx.session.send_progress_notification(
+                    progress_token,
+                    progress=progress,
+                    message=_get_text(last_chunk),
+                    related_request_id=str(ctx.request_id),
+                )
+            last_chunk = chunk
+
+        if last_chunk is None:
+            return []
+
+        if (
+            last_chunk.is_interrupted
+            or (last_chunk.metadata or {}).get(
+                "success",
+            )
+            is False
+        ):
+            raise RuntimeError(_get_text(last_chunk))
+        return _convert_as_blocks_to_mcp_content(last_chunk.content)
+
+
+def _get_text(response: ToolResponse) -> str:
+    """Join the text blocks of the tool response."""
+    return "".join(
+        _["text"] for _ in response.content if _.get("type") == "text"
+    )
+
+
+def _convert_as_blocks_to_mcp_content(
+    blocks: list,
+) -> list[mcp.types.ContentBlock]:
+    """Convert the AgentScope blocks of the tool response into the MCP
+    content."""
+    content: list[mcp.types.ContentBlock] = []
+    for block in blocks:
+        typ = block.get("type")
+        if typ == "text":
+            content.append(
+                mcp.types.TextContent(type="text", text=block["text"]),
+            )
+            continue
+
+        source = block.get("source", {})
+        if typ in ["image", "audio"] and source.get("type") == "base64":
+            cls = (
+                mcp.types.ImageContent
+                if typ == "image"
+                else mcp.types.AudioContent
+            )
+            content.append(
+                cls(
+                    type=typ,
+                    data=source["data"],
+                    mimeType=source["media_type"],
+                ),
+            )
+        elif source.get("type") == "url":
+            content.append(
+                mcp.types.TextContent(
+                    type="text",
+                    text=f"<{typ}>{source['url']}</{typ}>",
+                ),
+            )
+        else:
+            logger.warning(
+                "Unsupported block type: %s. Skipping this block.",
+                typ,
+            )
+    return content
@@ -8,6 +8,13 @@ from ._openai_model import OpenAIChatModel
 from ._anthropic_model import AnthropicChatModel
 from ._ollama_model import OllamaChatModel
 from ._gemini_model import GeminiChatModel
+from ._semantic_cache import (
+    SemanticCache,
+    SemanticCacheChatModel,
+    SemanticCacheHit,
+)
+from ._single_flight_model import SingleFlightChatModel
+from ._router_model import RouterChatModel, RouterBackend, BackendStats
 
 __all__ = [
     "ChatModelBase",
@@ -17,4 +24,11 @@ __all__ = [
     "AnthropicChatModel",
     "OllamaChatModel",
     "GeminiChatModel",
+    "SemanticCache",
+    "SemanticCacheChatModel",
+    "SemanticCacheHit",
+    "SingleFlightChatModel",
+    "RouterChatModel",
+    "RouterBackend",
+    "BackendStats",
 ]
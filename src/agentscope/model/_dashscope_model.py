@@ -25,6 +25,7 @@ from .._utils._common import (
 )
 from ..message import TextBlock, ToolUseBlock, ThinkingBlock
 from ..tracing import trace_llm
+from ..formatter._file_uploader import FileUploaderBase
 from ..types import JSONSerializableObject
 from .._logging import logger
 
@@ -55,6 +56,7 @@ class DashScopeChatModel(ChatModelBase):
         enable_thinking: bool | None = None,
         generate_kwargs: dict[str, JSONSerializableObject] | None = None,
         base_http_api_url: str | None = None,
+        file_uploader: FileUploaderBase | None = None,
     ) -> None:
         """Initialize the DashScope chat model.
 
@@ -77,6 +79,10 @@ class DashScopeChatModel(ChatModelBase):
             base_http_api_url (`str | None`, optional):
                 The base URL for DashScope API requests. If not provided,
                 the default base URL from the DashScope SDK will be used.
+            file_uploader (`FileUploaderBase | None`, optional):
+                The file uploader used by the formatter. If given, the
+                referenced files are uploaded again and the request is
+                retried once, when the API fails to access the files.
         """
         if enable_thinking and not stream:
             logger.info(
@@ -90,6 +96,7 @@ class DashScopeChatModel(ChatModelBase):
         self.api_key = api_key
         self.enable_thinking = enable_thinking
         self.generate_kwargs = generate_kwargs or {}
+        self.file_uploader = file_uploader
 
         if base_http_api_url is not None:
             import dashscope
@@ -146,8 +153,6 @@ class DashScopeChatModel(ChatModelBase):
                 <https://help.aliyun.com/zh/dashscope/developer-reference/api-details>`_
                 for more detailed arguments.
         """
-        import dashscope
-
         # For qvq and qwen-vl models, the content field cannot be `None` or
         # `[{"text": None}]`, so we need to convert it to an empty list.
         if self.model_name.startswith("qvq") or "-vl" in self.model_name:
@@ -196,17 +201,18 @@ class DashScopeChatModel(ChatModelBase):
             )
 
         start_datetime = datetime.now()
-        if self.model_name.startswith("qvq") or "-vl" in self.model_name:
-            response = dashscope.MultiModalConversation.call(
-                api_key=self.api_key,
-                **kwargs,
-            )
-
-        else:
-            response = await dashscope.aigc.generation.AioGeneration.call(
-                api_key=self.api_key,
-                **kwargs,
+        response, first = await self._call_api(kwargs)
+        if (
+            first is not None
+            and first.status_code in (400, 403, 404)
+            and any(
+                _ in str(first.message).lower()
+                for _ in ["url", "download", "file"]
             )
+            and await self._reupload_files(messages)
+        ):
+            # The uploaded files may be deleted or expired
+            response, first = await self._call_api(kwargs)
 
         if self.stream:
             return self._parse_dashscope_stream_response(
@@ -223,6 +229,60 @@ class DashScopeChatModel(ChatModelBase):
 
         return parsed_response
 
+    async def _call_api(self, kwargs: dict) -> tuple[Any, Any]:
+        """Call the Generation or MultiModalConversation API, and return the
+        response together with its first chunk (or itself if not
+        streaming), whose status can be checked before parsing."""
+        import dashscope
+
+        if self.model_name.startswith("qvq") or "-vl" in self.model_name:
+            response = dashscope.MultiModalConversation.call(
+                api_key=self.api_key,
+                **kwargs,
+            )
+
+        else:
+            response = await dashscope.aigc.generation.AioGeneration.call(
+                api_key=self.api_key,
+                **kwargs,
+            )
+
+        if not self.stream:
+            return response, response
+
+        chunks = giter(response)
+        first = await anext(chunks, None)
+
+        async def _chain() -> AsyncGenerator:
+            """Yield the peeked first chunk and the rest."""
+            if first is not None:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+
+        return _chain(), first
+
+    async def _reupload_files(self, messages: list[dict]) -> bool:
+        """Upload the files referenced in the messages again by the file
+        uploader, and replace the URLs in place. Return whether any file is
+        uploaded again."""
+        if self.file_uploader is None:
+            return False
+
+        reuploaded = False
+        for message in messages:
+            if not isinstance(message.get("content"), list):
+                continue
+            for item in message["content"]:
+                for key in ["image", "audio", "video"]:
+                    if not isinstance(item.get(key), str):
+                        continue
+                    file = await self.file_uploader.reupload(item[key])
+                    if file is not None:
+                        item[key] = file.uri
+                        reuploaded = True
+        return reuploaded
+
     # pylint: disable=too-many-branches
     async def _parse_dashscope_stream_response(
         self,
@@ -21,6 +21,7 @@ from ._model_usage import ChatUsage
 from ._model_base import ChatModelBase
 from ._model_response import ChatResponse
 from ..tracing import trace_llm
+from ..formatter._file_uploader import FileUploaderBase
 from ..types import JSONSerializableObject
 
 if TYPE_CHECKING:
@@ -40,6 +41,7 @@ class GeminiChatModel(ChatModelBase):
         thinking_config: dict | None = None,
         client_args: dict = None,
         generate_kwargs: dict[str, JSONSerializableObject] | None = None,
+        file_uploader: FileUploaderBase | None = None,
     ) -> None:
         """Initialize the Gemini chat model.
 
@@ -69,6 +71,10 @@ class GeminiChatModel(ChatModelBase):
              optional):
                The extra keyword arguments used in Gemini API generation,
                e.g. `temperature`, `seed`.
+            file_uploader (`FileUploaderBase | None`, optional):
+                The file uploader used by the formatter. If given, the
+                referenced files are uploaded again and the request is
+                retried once, when the API reports the files are not found.
         """
         try:
             from google import genai
@@ -86,6 +92,7 @@ class GeminiChatModel(ChatModelBase):
         )
         self.thinking_config = thinking_config
         self.generate_kwargs = generate_kwargs or {}
+        self.file_uploader = file_uploader
 
     @trace_llm
     async def __call__(
@@ -128,6 +135,8 @@ class GeminiChatModel(ChatModelBase):
                 The keyword arguments for Gemini chat completions API.
         """
 
+        from google.genai import errors
+
         config: dict = {
             "thinking_config": self.thinking_config,
             **self.generate_kwargs,
@@ -162,22 +171,25 @@ class GeminiChatModel(ChatModelBase):
         }
 
         start_datetime = datetime.now()
-        if self.stream:
-            response = await self.client.aio.models.generate_content_stream(
-                **kwargs,
-            )
+        try:
+            response = await self._generate_content(kwargs)
+        except errors.APIError as e:
+            # The uploaded files may be deleted or expired
+            if (
+                e.code not in (403, 404)
+                or "file" not in str(e.message).lower()
+                or not await self._reupload_files(messages)
+            ):
+                raise
+            response = await self._generate_content(kwargs)
 
+        if self.stream:
             return self._parse_gemini_stream_generation_response(
                 start_datetime,
                 response,
                 structured_model,
             )
 
-        # non-streaming
-        response = await self.client.aio.models.generate_content(
-            **kwargs,
-        )
-
         parsed_response = self._parse_gemini_generation_response(
             start_datetime,
             response,
@@ -186,6 +198,36 @@ class GeminiChatModel(ChatModelBase):
 
         return parsed_response
 
+    async def _generate_content(self, kwargs: dict) -> Any:
+        """Call the Gemini API in the streaming mode or not."""
+        if self.stream:
+            return await self.client.aio.models.generate_content_stream(
+                **kwargs,
+            )
+        return await self.client.aio.models.generate_content(**kwargs)
+
+    async def _reupload_files(self, messages: list[dict]) -> bool:
+        """Upload the files referenced in the messages again by the file
+        uploader, and replace the references in place. Return whether any
+        file is uploaded again."""
+        if self.file_uploader is None:
+            return False
+
+        reuploaded = False
+        for message in messages:
+            for part in message.get("parts", []):
+                file_data = part.get("file_data")
+                if not isinstance(file_data, dict):
+                    continue
+                file = await self.file_uploader.reupload(
+                    file_data.get("file_uri", ""),
+                )
+                if file is not None:
+                    file_data["file_uri"] = file.uri
+                    file_data["mime_type"] = file.mime_type
+                    reuploaded = True
+        return reuploaded
+
     async def _parse_gemini_stream_generation_response(
         self,
         start_datetime: datetime,
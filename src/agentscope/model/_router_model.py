@@ -0,0 +1,419 @@
+# -*- coding: utf-8 -*-
+"""The latency-aware router chat model, which routes the requests across a
+pool of chat model backends with fallback."""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Literal
+
+from ._model_base import ChatModelBase
+from ._model_response import ChatResponse
+from .._logging import logger
+from ..formatter._formatter_base import FormatterBase
+from ..message import Msg
+
+
+@dataclass
+class RouterBackend:
+    """A backend of the router, i.e. a chat model paired with the formatter
+    that formats the messages for it."""
+
+    model: ChatModelBase
+    """The chat model."""
+
+    formatter: FormatterBase
+    """The formatter paired with the chat model."""
+
+    name: str = ""
+    """The name of the backend, defaults to the model name."""
+
+    cost: float = 0.0
+    """The relative cost of one request, used by the routing policy."""
+
+    def __post_init__(self) -> None:
+        if not self.name:
+            self.name = self.model.model_name
+
+
+@dataclass
+class BackendStats:
+    """The rolling statistics of a router backend."""
+
+    window: int = 20
+    """The number of recent requests in the rolling window."""
+
+    latencies: deque = field(default_factory=deque)
+    """The recent latencies of the successful requests in seconds."""
+
+    ttfts: deque = field(default_factory=deque)
+    """The recent time-to-first-token of the successful streaming requests
+    in seconds."""
+
+    errors: deque = field(default_factory=deque)
+    """The recent request outcomes, `True` for errors."""
+
+    consecutive_errors: int = 0
+    """The number of consecutive errors."""
+
+    cooldown_until: float = 0.0
+    """The timestamp until which the backend is skipped."""
+
+    def record(
+        self,
+        error: bool,
+        latency: float | None = None,
+        ttft: float | None = None,
+    ) -> None:
+        """Record the outcome of a request."""
+        self.errors.append(error)
+        if latency is not None:
+            self.latencies.append(latency)
+        if ttft is not None:
+            self.ttfts.append(ttft)
+        for queue in [self.errors, self.latencies, self.ttfts]:
+            while len(queue) > self.window:
+                queue.popleft()
+        self.consecutive_errors = self.consecutive_errors + 1 if error else 0
+
+    @property
+    def latency(self) -> float | None:
+        """The mean latency within the window."""
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+    @property
+    def ttft(self) -> float | None:
+        """The mean time-to-first-token within the window."""
+        if not self.ttfts:
+            return None
+        return sum(self.ttfts) / len(self.ttfts)
+
+    @property
+    def error_rate(self) -> float:
+        """The error rate within the window."""
+        if not self.errors:
+            return 0.0
+        return sum(self.errors) / len(self.errors)
+
+
+class _RoutedPrompt(list):
+    """The messages returned by the router formatter, which are formatted
+    by the formatter of the chosen backend once it's known."""
+
+    def __init__(self, msgs: list[Msg], kwargs: dict[str, Any]) -> None:
+        super().__init__(msgs)
+        self.kwargs = kwargs
+
+
+class _RouterFormatter(FormatterBase):
+    """The formatter paired with the router, which delegates the formatting
+    to the formatter of the chosen backend, so that its own truncation and
+    token limit are applied."""
+
+    async def format(self, msgs: list[Msg], **kwargs: Any) -> _RoutedPrompt:
+        """Validate the messages and defer the formatting to the formatter
+        of the chosen backend, together with the keyword arguments."""
+        self.assert_list_of_msgs(msgs)
+        return _RoutedPrompt(msgs, kwargs)
+
+    @staticmethod
+    async def format_for(
+        backend: "RouterBackend",
+        messages: list[Msg] | list[dict],
+    ) -> list[dict]:
+        """Format the messages with the formatter of the backend. The
+        already formatted messages are returned as they are."""
+        if isinstance(messages, _RoutedPrompt):
+            return await backend.formatter.format(
+                list(messages),
+                **messages.kwargs,
+            )
+        if messages and all(isinstance(_, Msg) for _ in messages):
+            return await backend.formatter.format(messages)
+        return messages
+
+
+class _StreamStalledError(Exception):
+    """Raised when a backend stream doesn't produce a chunk in time."""
+
+
+class RouterChatModel(ChatModelBase):
+    """A chat model that routes each request to the best backend within a
+    pool according to their rolling latency, time-to-first-token, error
+    rate and cost, and fails over to the next backend when the request
+    fails or the stream stalls.
+
+    Since different backends require differently formatted messages, the
+    router should be used together with its `formatter`, which delegates
+    the formatting to the formatter paired with the chosen backend, e.g.
+    applying the truncation by its `max_tokens`.
+
+    Example:
+        .. code-block:: python
+
+            router = RouterChatModel(
+                backends=[
+                    RouterBackend(
+                        OpenAIChatModel("gpt-4o"),
+                        OpenAIChatFormatter(),
+                        cost=1.0,
+                    ),
+                    RouterBackend(
+                        DashScopeChatModel("qwen-max", api_key="xxx"),
+                        DashScopeChatFormatter(),
+                        cost=0.5,
+                    ),
+                    RouterBackend(
+                        OllamaChatModel("qwen3"),
+                        OllamaChatFormatter(),
+                    ),
+                ],
+            )
+            agent = ReActAgent(
+                name="Friday",
+                sys_prompt="You're a helpful assistant.",
+                model=router,
+                formatter=router.formatter,
+            )
+
+    .. note:: The chunks of the streaming responses are accumulated, so
+     when the stream fails over to another backend, the new stream starts
+     from the beginning and its chunks replace the previous ones.
+    """
+
+    def __init__(
+        self,
+        backends: list[RouterBackend],
+        latency_weight: float = 1.0,
+        cost_weight: float = 0.0,
+        error_weight: float = 10.0,
+        window: int = 20,
+        timeout: float | None = None,
+        first_token_timeout: float | None = 30.0,
+        stall_timeout: float | None = 30.0,
+        max_consecutive_errors: int = 3,
+        cooldown: float = 60.0,
+    ) -> None:
+        """Initialize the router chat model.
+
+        Args:
+            backends (`list[RouterBackend]`):
+                The backends to route the requests to. All the chat models
+                must have the same streaming mode.
+            latency_weight (`float`, defaults to `1.0`):
+                The weight of the latency (or the time-to-first-token for
+                streaming models) in seconds in the routing score.
+            cost_weight (`float`, defaults to `0.0`):
+                The weight of the backend cost in the routing score.
+            error_weight (`float`, defaults to `10.0`):
+                The weight of the error rate in the routing score.
+            window (`int`, defaults to `20`):
+                The number of recent requests used to compute the rolling
+                statistics of each backend.
+            timeout (`float | None`, optional):
+                The maximum seconds to wait for the response of a
+                non-streaming request before failing over. If `None`, wait
+                forever.
+            first_token_timeout (`float | None`, defaults to `30.0`):
+                The maximum seconds to wait for the first chunk of a stream
+                before failing over. If `None`, wait forever.
+            stall_timeout (`float | None`, defaults to `30.0`):
+                The maximum seconds to wait between two chunks of a stream
+                before failing over. If `None`, wait forever.
+            max_consecutive_errors (`int`, defaults to `3`):
+                The number of consecutive errors after which the backend
+                is skipped for `cooldown` seconds.
+            cooldown (`float`, defaults to `60.0`):
+                The cooldown seconds of a failing backend.
+        """
+        if not backends:
+            raise ValueError("At least one backend is required.")
+
+        if len({_.model.stream for _ in backends}) != 1:
+            raise ValueError(
+                "All the backends of the router must have the same "
+                "streaming mode.",
+            )
+
+        names = [_.name for _ in backends]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate backend names: {names}.")
+
+        super().__init__(
+            model_name="router:" + ",".join(names),
+            stream=backends[0].model.stream,
+        )
+
+        self.backends = backends
+        self.latency_weight = latency_weight
+        self.cost_weight = cost_weight
+        self.error_weight = error_weight
+        self.timeout = timeout
+        self.first_token_timeout = first_token_timeout
+        self.stall_timeout = stall_timeout
+        self.max_consecutive_errors = max_consecutive_errors
+        self.cooldown = cooldown
+
+        self.stats: dict[str, BackendStats] = {
+            _.name: BackendStats(window=window) for _ in backends
+        }
+        self.formatter = _RouterFormatter()
+
+    def score(self, backend: RouterBackend) -> float:
+        """The routing score of the backend, the lower the better. The
+        backends without latency records score zero latency, so that they
+        are explored first."""
+        stats = self.stats[backend.name]
+        latency = stats.ttft if self.stream else stats.latency
+        return (
+            self.latency_weight * (latency or 0.0)
+            + self.cost_weight * backend.cost
+            + self.error_weight * stats.error_rate
+        )
+
+    def rank_backends(self) -> list[RouterBackend]:
+        """Rank the backends by their scores, with the cooling down
+        backends placed at the end."""
+        now = time.time()
+        return sorted(
+            self.backends,
+            key=lambda _: (
+                self.stats[_.name].cooldown_until > now,
+                self.score(_),
+            ),
+        )
+
+    async def __call__(
+        self,
+        messages: list[Msg] | list[dict],
+        tools: list[dict] | None = None,
+        tool_choice: Literal["auto", "none", "any", "required"]
+        | str
+        | None = None,
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        """Route the request to the best backend, and fail over to the
+        others if it fails.
+
+        Args:
+            messages (`list[Msg] | list[dict]`):
+                The `Msg` objects returned by the router's `formatter`,
+                which will be formatted by the formatter of the chosen
+                backend. The already formatted messages are passed to the
+                backends as they are.
+            tools (`list[dict] | None`, optional):
+                The tools JSON schemas.
+            tool_choice (`Literal["auto", "none", "any", "required"] | str \
+            | None`, optional):
+                The tool choice mode or the function name.
+            **kwargs (`Any`):
+                The other keyword arguments passed to the backend model.
+        """
+        kwargs = {"tools": tools, "tool_choice": tool_choice, **kwargs}
+
+        if self.stream:
+            return self._stream_with_failover(messages, kwargs)
+
+        errors = []
+        for backend in self.rank_backends():
+            start = time.perf_counter()
+            try:
+                res = await asyncio.wait_for(
+                    backend.model(
+                        await self.formatter.format_for(backend, messages),
+                        **kwargs,
+                    ),
+                    self.timeout,
+                )
+            except Exception as e:
+                self._record_error(backend, e)
+                errors.append(e)
+                continue
+
+            self.stats[backend.name].record(
+                error=False,
+                latency=time.perf_counter() - start,
+            )
+            return res
+
+        raise RuntimeError(
+            f"All the backends of the router failed: {errors}",
+        )
+
+    async def _stream_with_failover(
+        self,
+        messages: list[Msg] | list[dict],
+        kwargs: dict,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        """Yield the chunks from the best backend, and restart on the next
+        backend if the stream fails or stalls."""
+        errors = []
+        for backend in self.rank_backends():
+            start = time.perf_counter()
+            ttft = None
+            stream = None
+            try:
+                stream = await asyncio.wait_for(
+                    backend.model(
+                        await self.formatter.format_for(backend, messages),
+                        **kwargs,
+                    ),
+                    self.first_token_timeout,
+                )
+                while True:
+                    timeout = (
+                        self.first_token_timeout
+                        if ttft is None
+                        else self.stall_timeout
+                    )
+                    try:
+                        chunk = await asyncio.wait_for(
+                            anext(stream),
+                            timeout,
+                        )
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError as e:
+                        raise _StreamStalledError(
+                            f"No chunk received in {timeout} seconds.",
+                        ) from e
+
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    yield chunk
+
+            except Exception as e:
+                self._record_error(backend, e)
+                errors.append(e)
+                continue
+
+            finally:
+                if stream is not None:
+                    await stream.aclose()
+
+            self.stats[backend.name].record(
+                error=False,
+                latency=time.perf_counter() - start,
+                ttft=ttft,
+            )
+            return
+
+        raise RuntimeError(
+            f"All the backends of the router failed: {errors}",
+        )
+
+    def _record_error(self, backend: RouterBackend, error: Exception) -> None:
+        """Record the error and put the backend into cooldown if it keeps
+        failing."""
+        stats = self.stats[backend.name]
+        stats.record(error=True)
+        if stats.consecutive_errors >= self.max_consecutive_errors:
+            stats.cooldown_until = time.time() + self.cooldown
+
+        logger.warning(
+            "Router backend '%s' failed, failing over to the next one: %s",
+            backend.name,
+            repr(error),
+        )
@@ -0,0 +1,603 @@
+# -*- coding: utf-8 -*-
+"""The semantic (embedding-similarity) response cache for chat models."""
+import hashlib
+import json
+import time
+from collections import OrderedDict, deque
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Literal, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+from ._model_base import ChatModelBase
+from ._model_response import ChatResponse
+from ._model_usage import ChatUsage
+from .._logging import logger
+from .._utils._common import _get_timestamp
+from ..embedding import EmbeddingModelBase
+
+
+@dataclass
+class SemanticCacheHit:
+    """The audit record of a semantic cache hit."""
+
+    id: str
+    """The identity of the hit, which is also the id of the returned
+    `ChatResponse` object."""
+
+    entry_id: str
+    """The identity of the matched cache entry."""
+
+    namespace: str
+    """The namespace where the hit happened."""
+
+    query: str
+    """The query text that triggered the hit."""
+
+    cached_query: str
+    """The query text of the matched cache entry."""
+
+    similarity: float
+    """The cosine similarity between the two queries."""
+
+    created_at: str = field(default_factory=_get_timestamp)
+    """When the hit happened."""
+
+    false_hit: bool = False
+    """Whether the hit has been reported as a false hit."""
+
+
+@dataclass
+class _SemanticCacheEntry:
+    """A cached chat response together with its query."""
+
+    id: str
+    context_key: str
+    query: str
+    response: ChatResponse
+    created_at: float
+    last_access: float
+    hits: int = 0
+
+
+class _SemanticIndex:
+    """The vectorized index of one namespace, where the normalized query
+    embeddings are stored as rows of a pre-allocated matrix."""
+
+    def __init__(self) -> None:
+        self.embeddings = np.zeros((0, 0), dtype=np.float32)
+        self.entries: list[_SemanticCacheEntry] = []
+        self.context_ids = np.zeros(0, dtype=np.int64)
+        self.context_mapping: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, embedding: np.ndarray, entry: _SemanticCacheEntry) -> None:
+        """Append an entry, growing the matrix by doubling if needed."""
+        n = len(self.entries)
+        if self.embeddings.size == 0:
+            self.embeddings = np.zeros((16, embedding.shape[0]), np.float32)
+            self.context_ids = np.zeros(16, dtype=np.int64)
+
+        elif embedding.shape[0] != self.embeddings.shape[1]:
+            raise ValueError(
+                f"Embedding dimension mismatch: expected "
+                f"{self.embeddings.shape[1]}, got {embedding.shape[0]}.",
+            )
+
+        if n == self.embeddings.shape[0]:
+            self.embeddings = np.concatenate(
+                [self.embeddings, np.zeros_like(self.embeddings)],
+            )
+            self.context_ids = np.concatenate(
+                [self.context_ids, np.zeros_like(self.context_ids)],
+            )
+
+        context_id = self.context_mapping.setdefault(
+            entry.context_key,
+            len(self.context_mapping),
+        )
+        self.embeddings[n] = embedding
+        self.context_ids[n] = context_id
+        self.entries.append(entry)
+
+    def remove(self, index: int) -> _SemanticCacheEntry:
+        """Remove the entry at the given row by swapping it with the last
+        row, so that the removal is O(dim)."""
+        last = len(self.entries) - 1
+        entry = self.entries[index]
+        if index != last:
+            self.embeddings[index] = self.embeddings[last]
+            self.context_ids[index] = self.context_ids[last]
+            self.entries[index] = self.entries[last]
+        self.entries.pop()
+        return entry
+
+    def search(
+        self,
+        embedding: np.ndarray,
+        context_key: str,
+    ) -> tuple[int, float] | None:
+        """Find the most similar entry under the same context key."""
+        n = len(self.entries)
+        context_id = self.context_mapping.get(context_key)
+        if n == 0 or context_id is None:
+            return None
+
+        similarities = self.embeddings[:n] @ embedding
+        similarities[self.context_ids[:n] != context_id] = -np.inf
+        index = int(np.argmax(similarities))
+        if similarities[index] == -np.inf:
+            return None
+        return index, float(similarities[index])
+
+
+class SemanticCache:
+    """The semantic response cache, which embeds the query text with an
+    embedding model and returns the cached `ChatResponse` of the most
+    similar previous query when their cosine similarity is above the
+    threshold.
+
+    Entries are organized by namespaces (e.g. one per agent), and only the
+    entries with the same context key (e.g. the same system prompt and
+    tools) are compared. The hits are recorded in an audit log, so that
+    false hits can be reported and removed from the cache.
+    """
+
+    def __init__(
+        self,
+        embedding_model: EmbeddingModelBase,
+        similarity_threshold: float = 0.95,
+        max_entries: int | None = 1000,
+        ttl: float | None = None,
+        max_audit_records: int = 1000,
+        embedding_memo_size: int = 128,
+    ) -> None:
+        """Initialize the semantic cache.
+
+        Args:
+            embedding_model (`EmbeddingModelBase`):
+                The embedding model used to embed the query texts.
+            similarity_threshold (`float`, defaults to `0.95`):
+                The minimum cosine similarity for a cached response to be
+                returned.
+            max_entries (`int | None`, defaults to `1000`):
+                The maximum number of entries in each namespace. When
+                exceeded, the least recently used entry will be evicted.
+            ttl (`float | None`, defaults to `None`):
+                The time-to-live of the entries in seconds. If `None`, the
+                entries never expire.
+            max_audit_records (`int`, defaults to `1000`):
+                The maximum number of hit records kept in the audit log.
+            embedding_memo_size (`int`, defaults to `128`):
+                The number of recent query embeddings kept in memory, so
+                that storing a response after a missed lookup doesn't embed
+                the same query again.
+        """
+        self.embedding_model = embedding_model
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedding_memo_size = embedding_memo_size
+
+        self._indexes: dict[str, _SemanticIndex] = {}
+        self._embedding_memo: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._audit_log: deque[SemanticCacheHit] = deque(
+            maxlen=max_audit_records,
+        )
+
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "false_hits": 0,
+            "evictions": 0,
+        }
+
+    async def lookup(
+        self,
+        query: str,
+        context_key: str = "",
+        namespace: str = "default",
+    ) -> ChatResponse | None:
+        """Look up the cached response for the given query text.
+
+        Args:
+            query (`str`):
+                The query text, e.g. the last user turn.
+            context_key (`str`, defaults to `""`):
+                The key of the query context. Only the entries with the same
+                context key will be compared.
+            namespace (`str`, defaults to `"default"`):
+                The namespace to look up.
+
+        Returns:
+            `ChatResponse | None`:
+                A copy of the cached response whose id is the id of the hit
+                record, or `None` if no similar query is found.
+        """
+        self.stats["lookups"] += 1
+
+        index = self._indexes.get(namespace)
+        if index is None or len(index) == 0:
+            return None
+
+        self._remove_expired(index)
+
+        embedding = await self._embed(query)
+        res = index.search(embedding, context_key)
+        if res is None or res[1] < self.similarity_threshold:
+            return None
+
+        row, similarity = res
+        entry = index.entries[row]
+        entry.hits += 1
+        entry.last_access = time.time()
+
+        response = ChatResponse(
+            content=deepcopy(list(entry.response.content)),
+            usage=ChatUsage(input_tokens=0, output_tokens=0, time=0),
+            metadata=deepcopy(entry.response.metadata),
+        )
+
+        self.stats["hits"] += 1
+        self._audit_log.append(
+            SemanticCacheHit(
+                id=response.id,
+                entry_id=entry.id,
+                namespace=namespace,
+                query=query,
+                cached_query=entry.query,
+                similarity=similarity,
+            ),
+        )
+        return response
+
+    async def store(
+        self,
+        query: str,
+        response: ChatResponse,
+        context_key: str = "",
+        namespace: str = "default",
+    ) -> str:
+        """Store a chat response for the given query text.
+
+        Args:
+            query (`str`):
+                The query text, e.g. the last user turn.
+            response (`ChatResponse`):
+                The chat response to be cached.
+            context_key (`str`, defaults to `""`):
+                The key of the query context.
+            namespace (`str`, defaults to `"default"`):
+                The namespace to store the response.
+
+        Returns:
+            `str`:
+                The identity of the new cache entry.
+        """
+        embedding = await self._embed(query)
+        index = self._indexes.setdefault(namespace, _SemanticIndex())
+
+        now = time.time()
+        entry = _SemanticCacheEntry(
+            id=_get_timestamp(True),
+            context_key=context_key,
+            query=query,
+            response=ChatResponse(
+                content=deepcopy(list(response.content)),
+                usage=response.usage,
+                metadata=deepcopy(response.metadata),
+            ),
+            created_at=now,
+            last_access=now,
+        )
+        index.add(embedding, entry)
+
+        if self.max_entries is not None and len(index) > self.max_entries:
+            lru_row = min(
+                range(len(index)),
+                key=lambda i: index.entries[i].last_access,
+            )
+            index.remove(lru_row)
+            self.stats["evictions"] += 1
+
+        return entry.id
+
+    def report_false_hit(self, hit_id: str) -> None:
+        """Report a hit as a false hit, i.e. the cached response doesn't
+        answer the query. The matched entry will be removed from the cache.
+
+        Args:
+            hit_id (`str`):
+                The id of the hit record, which is also the id of the
+                `ChatResponse` returned by `lookup`.
+        """
+        for record in self._audit_log:
+            if record.id == hit_id:
+                break
+        else:
+            raise ValueError(f"Hit record '{hit_id}' not found.")
+
+        if record.false_hit:
+            return
+
+        record.false_hit = True
+        self.stats["false_hits"] += 1
+
+        index = self._indexes.get(record.namespace)
+        if index is not None:
+            for row, entry in enumerate(index.entries):
+                if entry.id == record.entry_id:
+                    index.remove(row)
+                    break
+
+        logger.info(
+            "Removed the semantic cache entry %s for a false hit "
+            "(similarity %.4f): %s -> %s",
+            record.entry_id,
+            record.similarity,
+            record.query,
+            record.cached_query,
+        )
+
+    def get_audit_log(
+        self,
+        namespace: str | None = None,
+    ) -> list[SemanticCacheHit]:
+        """Get the recorded hits for auditing.
+
+        Args:
+            namespace (`str | None`, optional):
+                Only return the hits within the given namespace. If `None`,
+                all hits will be returned.
+        """
+        return [
+            _
+            for _ in self._audit_log
+            if namespace is None or _.namespace == namespace
+        ]
+
+    def size(self, namespace: str | None = None) -> int:
+        """Get the number of cached entries.
+
+        Args:
+            namespace (`str | None`, optional):
+                The namespace to count. If `None`, all namespaces are counted.
+        """
+        if namespace is not None:
+            return len(self._indexes.get(namespace, []))
+        return sum(len(_) for _ in self._indexes.values())
+
+    def clear(self, namespace: str | None = None) -> None:
+        """Clear the cached entries.
+
+        Args:
+            namespace (`str | None`, optional):
+                The namespace to clear. If `None`, all namespaces will be
+                cleared.
+        """
+        if namespace is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(namespace, None)
+
+    def _remove_expired(self, index: _SemanticIndex) -> None:
+        """Remove the expired entries within the given index."""
+        if self.ttl is None:
+            return
+
+        deadline = time.time() - self.ttl
+        for row in range(len(index) - 1, -1, -1):
+            if index.entries[row].created_at < deadline:
+                index.remove(row)
+                self.stats["evictions"] += 1
+
+    async def _embed(self, text: str) -> np.ndarray:
+        """Embed and normalize the given text, reusing the recent
+        embeddings."""
+        if text in self._embedding_memo:
+            self._embedding_memo.move_to_end(text)
+            return self._embedding_memo[text]
+
+        res = await self.embedding_model([text])
+        embedding = np.asarray(res.embeddings[0], dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+
+        self._embedding_memo[text] = embedding
+        if len(self._embedding_memo) > self.embedding_memo_size:
+            self._embedding_memo.popitem(last=False)
+        return embedding
+
+
+def _get_text_content(msg: dict) -> str | None:
+    """Extract the plain text of a formatted message. Return `None` if the
+    message contains any non-text content, e.g. tool results or images."""
+    content = msg.get("content", msg.get("parts"))
+    if isinstance(content, str):
+        return content
+
+    if not isinstance(content, list):
+        return None
+
+    texts = []
+    for item in content:
+        if isinstance(item, str):
+            texts.append(item)
+        elif (
+            isinstance(item, dict)
+            and isinstance(item.get("text"), str)
+            and item.get("type", "text") == "text"
+        ):
+            texts.append(item["text"])
+        else:
+            return None
+    return "\n".join(texts)
+
+
+class SemanticCacheChatModel(ChatModelBase):
+    """A chat model wrapper that answers near-duplicate requests from a
+    `SemanticCache`.
+
+    The last user turn is embedded as the query, while the system prompt,
+    the tools, the remaining arguments and (optionally) the history form
+    the context key, so that a cached response is only reused under the
+    same context. Requests whose last message is not a plain text user
+    turn (e.g. tool results in a ReAct loop) bypass the cache.
+
+    Example:
+        .. code-block:: python
+
+            cache = SemanticCache(embedding_model, similarity_threshold=0.93)
+            agent = ReActAgent(
+                name="Friday",
+                model=SemanticCacheChatModel(model, cache, namespace="Friday"),
+                ...
+            )
+    """
+
+    def __init__(
+        self,
+        model: ChatModelBase,
+        cache: SemanticCache,
+        namespace: str = "default",
+        include_history: bool = True,
+    ) -> None:
+        """Initialize the semantic cache chat model.
+
+        Args:
+            model (`ChatModelBase`):
+                The wrapped chat model.
+            cache (`SemanticCache`):
+                The semantic cache, which can be shared by multiple wrappers.
+            namespace (`str`, defaults to `"default"`):
+                The namespace in the cache, e.g. the agent name.
+            include_history (`bool`, defaults to `True`):
+                If the messages before the last user turn are included in
+                the context key. If `False`, only the system messages are
+                included, so that the same question is answered from the
+                cache regardless of the previous conversation.
+        """
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.cache = cache
+        self.namespace = namespace
+        self.include_history = include_history
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        tool_choice: Literal["auto", "none", "any", "required"]
+        | str
+        | None = None,
+        structured_model: Type[BaseModel] | None = None,
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        """Get the response from the cache if a similar request is found,
+        otherwise from the wrapped model."""
+        call_kwargs = {**kwargs}
+        if tools is not None:
+            call_kwargs["tools"] = tools
+        if tool_choice is not None:
+            call_kwargs["tool_choice"] = tool_choice
+
+        query = None
+        if structured_model is None:
+            query = self._get_query(messages)
+
+        if query is None:
+            return await self.model(
+                messages,
+                structured_model=structured_model,
+                **call_kwargs,
+            )
+
+        context_key = self._get_context_key(messages, call_kwargs)
+
+        cached_response = await self.cache.lookup(
+            query,
+            context_key,
+            self.namespace,
+        )
+        if cached_response is not None:
+            if self.model.stream:
+                return self._yield_cached_response(cached_response)
+            return cached_response
+
+        res = await self.model(messages, **call_kwargs)
+
+        if isinstance(res, ChatResponse):
+            await self.cache.store(query, res, context_key, self.namespace)
+            return res
+
+        return self._store_stream_response(res, query, context_key)
+
+    async def _store_stream_response(
+        self,
+        res: AsyncGenerator[ChatResponse, None],
+        query: str,
+        context_key: str,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        """Forward the streaming chunks and store the last (accumulated)
+        chunk once the stream finishes."""
+        last_chunk = None
+        async for chunk in res:
+            last_chunk = chunk
+            yield chunk
+
+        if last_chunk is not None:
+            await self.cache.store(
+                query,
+                last_chunk,
+                context_key,
+                self.namespace,
+            )
+
+    @staticmethod
+    async def _yield_cached_response(
+        response: ChatResponse,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        """Yield the cached response as a single-chunk stream."""
+        yield response
+
+    @staticmethod
+    def _get_query(messages: list[dict]) -> str | None:
+        """Get the text of the last user turn, or `None` if the request is
+        not cacheable."""
+        if not messages or messages[-1].get("role") != "user":
+            return None
+
+        text = _get_text_content(messages[-1])
+        if not text:
+            return None
+        return text
+
+    def _get_context_key(
+        self,
+        messages: list[dict],
+        call_kwargs: dict,
+    ) -> str:
+        """Hash everything except the last user turn into the context key."""
+        if self.include_history:
+            context_messages = messages[:-1]
+        else:
+            context_messages = [
+                _ for _ in messages[:-1] if _.get("role") == "system"
+            ]
+
+        json_str = json.dumps(
+            {
+                "model_name": self.model_name,
+                "messages": context_messages,
+                "kwargs": call_kwargs,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(json_str.encode("utf-8")).hexdigest()
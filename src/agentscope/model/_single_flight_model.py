@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""The single-flight chat model wrapper."""
+from typing import Any, AsyncGenerator
+
+from ._model_base import ChatModelBase
+from ._model_response import ChatResponse
+from .._utils._single_flight import _get_single_flight_group, _hash_request
+
+
+class SingleFlightChatModel(ChatModelBase):
+    """A chat model wrapper that deduplicates identical in-flight requests.
+
+    When the same request is sent concurrently (e.g. the same message is
+    broadcast to several identically configured agents by
+    `fanout_pipeline`), only one request is issued to the wrapped model and
+    all the callers await the same response. For streaming models, each
+    caller gets its own tee of the chunk stream.
+
+    .. note:: The duplicate callers share the same `ChatResponse` objects,
+     so they shouldn't be modified in place.
+
+    Example:
+        .. code-block:: python
+
+            agents = [
+                ReActAgent(
+                    name=f"agent_{i}",
+                    model=SingleFlightChatModel(
+                        OpenAIChatModel("gpt-4o"),
+                        scope="gpt-4o",
+                    ),
+                    ...
+                )
+                for i in range(3)
+            ]
+            await fanout_pipeline(agents, msg)
+    """
+
+    def __init__(
+        self,
+        model: ChatModelBase,
+        scope: str | None = None,
+    ) -> None:
+        """Initialize the single-flight chat model.
+
+        Args:
+            model (`ChatModelBase`):
+                The wrapped chat model.
+            scope (`str | None`, optional):
+                The wrappers with the same scope share their in-flight
+                requests, so it should only be shared by identically
+                configured models. If `None`, only the calls through this
+                wrapper are deduplicated.
+        """
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.single_flight = _get_single_flight_group(scope)
+
+    async def __call__(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        """Call the wrapped model, or join the identical in-flight call."""
+        key = _hash_request(
+            self.model.__class__.__name__,
+            self.model_name,
+            self.stream,
+            *args,
+            **kwargs,
+        )
+        return await self.single_flight.call(
+            key,
+            lambda: self.model(*args, **kwargs),
+        )
@@ -6,6 +6,7 @@ from ._gemini_token_counter import GeminiTokenCounter
 from ._openai_token_counter import OpenAITokenCounter
 from ._anthropic_token_counter import AnthropicTokenCounter
 from ._huggingface_token_counter import HuggingFaceTokenCounter
+from ._estimated_token_counter import EstimatedTokenCounter
 
 __all__ = [
     "TokenCounterBase",
@@ -13,4 +14,5 @@ __all__ = [
     "OpenAITokenCounter",
     "AnthropicTokenCounter",
     "HuggingFaceTokenCounter",
+    "EstimatedTokenCounter",
 ]
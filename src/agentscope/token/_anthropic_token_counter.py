@@ -2,8 +2,10 @@
 """The Anthropic token counter class."""
 from typing import Any
 
+from ._token_base import TokenCounterBase
 
-class AnthropicTokenCounter:
+
+class AnthropicTokenCounter(TokenCounterBase):
     """The Anthropic token counter class."""
 
     def __init__(self, model_name: str, api_key: str, **kwargs: Any) -> None:
@@ -41,8 +43,9 @@ class AnthropicTokenCounter:
                 Additional keyword arguments for the token counting API.
         """
         system_message = None
-        if messages[0].get("role") == "system":
-            system_message = messages.pop(0)
+        if messages and messages[0].get("role") == "system":
+            # Don't modify the input messages
+            system_message, messages = messages[0], messages[1:]
 
         extra_kwargs: dict = {
             "model": self.model_name,
@@ -54,7 +57,7 @@ class AnthropicTokenCounter:
             extra_kwargs["tools"] = tools
 
         if system_message:
-            extra_kwargs["system"] = system_message
+            extra_kwargs["system"] = system_message["content"]
 
         res = await self.client.messages.count_tokens(**extra_kwargs)
 
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""The local token estimator, which calibrates itself against a remote
+token counter occasionally."""
+import asyncio
+import json
+import math
+import re
+from collections import deque
+from typing import Any, Callable
+
+from ._token_base import TokenCounterBase
+from .._logging import logger
+
+# The CJK characters, each of which is about a token
+_CJK_CHARS = (
+    r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+)
+
+# The pieces split similar to the pre-tokenization of the BPE tokenizers
+_PIECE_PATTERN = re.compile(
+    rf"(?P<cjk>[{_CJK_CHARS}])"
+    rf"|(?P<word>[^\W\d_{_CJK_CHARS}]+)"
+    r"|(?P<digits>\d+)"
+    r"|(?P<newlines>\n+)"
+    r"|(?P<punct>[^\w\s]+)",
+)
+
+# The keys holding the multimodal data in the formatted messages of the
+# supported APIs, which are counted as media instead of text
+_MEDIA_KEYS = {
+    "image_url",
+    "input_audio",
+    "source",
+    "inline_data",
+    "file_data",
+    "image",
+    "audio",
+    "video",
+}
+
+
+def _approximate_tokens(text: str) -> int:
+    """Approximate the number of tokens in the text by the byte-pair
+    encoding rules of thumb, i.e. a token per short word, three digits or a
+    CJK character. The spaces are merged into the following words."""
+    num_tokens = 0
+    for match in _PIECE_PATTERN.finditer(text):
+        piece = match.group()
+        match match.lastgroup:
+            case "cjk" | "newlines":
+                num_tokens += 1
+            case "word":
+                num_tokens += 1 + (len(piece) - 1) // 6
+            case "digits":
+                num_tokens += math.ceil(len(piece) / 3)
+            case _:
+                num_tokens += math.ceil(len(piece) / 2)
+    return num_tokens
+
+
+class EstimatedTokenCounter(TokenCounterBase):
+    """Estimate the number of tokens locally, without network calls on the
+    critical path of formatting the prompts.
+
+    The text is counted by the given tokenizer, or approximated by the
+    byte-pair encoding rules of thumb, and the multimodal data is counted
+    as `media_tokens` each. If a remote counter is given, every
+    `calibration_interval`-th count is also sent to it in the background,
+    and the estimates are scaled by a correction factor learned from the
+    remote counts. The relative errors of the recent estimates bound the
+    estimates, and in the strict mode, the count within the error bound of
+    `max_tokens` awaits the remote counter for the exact number.
+
+    Example:
+        .. code-block:: python
+
+            counter = EstimatedTokenCounter(
+                remote_counter=AnthropicTokenCounter(
+                    model_name="claude-sonnet-4-20250514",
+                    api_key=api_key,
+                ),
+                max_tokens=100000,
+                strict=True,
+            )
+            formatter = AnthropicChatFormatter(
+                token_counter=counter,
+                max_tokens=100000,
+            )
+    """
+
+    def __init__(
+        self,
+        remote_counter: TokenCounterBase | None = None,
+        tokenizer: Callable[[str], int] | None = None,
+        calibration_interval: int = 10,
+        max_tokens: int | None = None,
+        strict: bool = False,
+        media_tokens: int = 1000,
+        tokens_per_message: int = 3,
+        initial_error: float = 0.2,
+        error_window: int = 20,
+        smoothing: float = 0.3,
+    ) -> None:
+        """Initialize the estimated token counter.
+
+        Args:
+            remote_counter (`TokenCounterBase | None`, optional):
+                The remote token counter to calibrate against, e.g.
+                `AnthropicTokenCounter` or `GeminiTokenCounter`.
+            tokenizer (`Callable[[str], int] | None`, optional):
+                The function counting the tokens of a text, e.g.
+                `lambda text: len(encoding.encode(text))` with a loaded
+                tiktoken encoding. If not given, the tokens are approximated.
+            calibration_interval (`int`, defaults to `10`):
+                Send one in every `calibration_interval` counts to the
+                remote counter for calibration.
+            max_tokens (`int | None`, optional):
+                The token budget, near which the strict mode counts with the
+                remote counter.
+            strict (`bool`, defaults to `False`):
+                Whether to count with the remote counter when `max_tokens`
+                is within the error bound of the estimate.
+            media_tokens (`int`, defaults to `1000`):
+                The estimated number of tokens of an image, audio or video.
+            tokens_per_message (`int`, defaults to `3`):
+                The number of the tokens wrapping each message.
+            initial_error (`float`, defaults to `0.2`):
+                The relative error bound before enough calibrations.
+            error_window (`int`, defaults to `20`):
+                The number of the recent calibrations, whose largest relative
+                error is the error bound.
+            smoothing (`float`, defaults to `0.3`):
+                The weight of a new calibration in the correction factor.
+        """
+        assert calibration_interval > 0, "calibration_interval must be > 0"
+        assert 0 < smoothing <= 1, "smoothing must be in (0, 1]"
+
+        self.remote_counter = remote_counter
+        self.tokenizer = tokenizer or _approximate_tokens
+        self.calibration_interval = calibration_interval
+        self.max_tokens = max_tokens
+        self.strict = strict
+        self.media_tokens = media_tokens
+        self.tokens_per_message = tokens_per_message
+        self.initial_error = initial_error
+        self.smoothing = smoothing
+
+        self.correction_factor = 1.0
+        self.num_calibrations = 0
+        self.num_remote_counts = 0
+
+        self._num_counts = 0
+        self._errors: deque[float] = deque(maxlen=error_window)
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def error_bound(self) -> float:
+        """The relative error bound of the estimates, i.e. the largest
+        relative error of the recent calibrations, and not less than
+        `initial_error` before three calibrations."""
+        if len(self._errors) < 3:
+            return max([self.initial_error, *self._errors])
+        return max(self._errors)
+
+    async def count(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        **kwargs: Any,
+    ) -> int:
+        """Estimate the number of tokens of the messages, or count them with
+        the remote counter in the strict mode near the token budget.
+
+        Args:
+            messages (`list[dict]`):
+                The formatted messages.
+            tools (`list[dict] | None`, defaults to `None`):
+                The tools JSON schemas that the model can use.
+            **kwargs (`Any`):
+                The additional keyword arguments for the remote counter.
+
+        Returns:
+            `int`:
+                The number of tokens.
+        """
+        raw = self._count_raw(messages, tools)
+        num_tokens = round(raw * self.correction_factor)
+
+        if self.remote_counter is None:
+            return num_tokens
+
+        if (
+            self.strict
+            and self.max_tokens is not None
+            and abs(num_tokens - self.max_tokens)
+            <= math.ceil(num_tokens * self.error_bound)
+        ):
+            remote_tokens = await self._count_remotely(
+                messages,
+                tools,
+                raw,
+                **kwargs,
+            )
+            if remote_tokens is not None:
+                return remote_tokens
+            return num_tokens
+
+        if self._num_counts % self.calibration_interval == 0:
+            task = asyncio.create_task(
+                self._count_remotely(list(messages), tools, raw, **kwargs),
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        self._num_counts += 1
+
+        return num_tokens
+
+    async def estimate(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+    ) -> tuple[int, int]:
+        """Estimate the number of tokens of the messages locally, together
+        with its error bound.
+
+        Args:
+            messages (`list[dict]`):
+                The formatted messages.
+            tools (`list[dict] | None`, defaults to `None`):
+                The tools JSON schemas that the model can use.
+
+        Returns:
+            `tuple[int, int]`:
+                The estimated number of tokens, and the number of tokens it
+                may be off by.
+        """
+        num_tokens = round(
+            self._count_raw(messages, tools) * self.correction_factor,
+        )
+        return num_tokens, math.ceil(num_tokens * self.error_bound)
+
+    async def calibrate(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        **kwargs: Any,
+    ) -> int:
+        """Count the tokens with the remote counter and calibrate the
+        estimates, e.g. to warm up with the system prompt.
+
+        Args:
+            messages (`list[dict]`):
+                The formatted messages.
+            tools (`list[dict] | None`, defaults to `None`):
+                The tools JSON schemas that the model can use.
+            **kwargs (`Any`):
+                The additional keyword arguments for the remote counter.
+
+        Returns:
+            `int`:
+                The number of tokens counted by the remote counter.
+        """
+        if self.remote_counter is None:
+            raise ValueError("The remote counter is required to calibrate.")
+
+        remote_tokens = await self.remote_counter.count(
+            messages,
+            tools=tools,
+            **kwargs,
+        )
+        self.num_remote_counts += 1
+        self._calibrate(self._count_raw(messages, tools), remote_tokens)
+        return remote_tokens
+
+    async def _count_remotely(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None,
+        raw: int,
+        **kwargs: Any,
+    ) -> int | None:
+        """Count the tokens with the remote counter and calibrate, returning
+        `None` on failure."""
+        assert self.remote_counter is not None
+        try:
+            remote_tokens = await self.remote_counter.count(
+                messages,
+                tools=tools,
+                **kwargs,
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to count the tokens with the remote counter: %s",
+                e,
+            )
+            return None
+
+        self.num_remote_counts += 1
+        self._calibrate(raw, remote_tokens)
+        return remote_tokens
+
+    def _calibrate(self, raw: int, remote_tokens: int) -> None:
+        """Update the correction factor and the error bound with a remote
+        count."""
+        if raw <= 0 or remote_tokens <= 0:
+            return
+
+        if self.num_calibrations > 0:
+            self._errors.append(
+                abs(raw * self.correction_factor - remote_tokens)
+                / remote_tokens,
+            )
+            self.correction_factor += self.smoothing * (
+                remote_tokens / raw - self.correction_factor
+            )
+        else:
+            self.correction_factor = remote_tokens / raw
+        self.num_calibrations += 1
+
+    def _count_raw(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None,
+    ) -> int:
+        """Count the tokens of the messages before correction."""
+        num_tokens = 0
+        for message in messages:
+            num_tokens += self.tokens_per_message + self._count_value(message)
+        if tools:
+            num_tokens += self.tokenizer(
+                json.dumps(tools, ensure_ascii=False),
+            )
+        return num_tokens
+
+    def _count_value(self, value: Any, key: str | None = None) -> int:
+        """Count the tokens of a value in the formatted messages
+        recursively."""
+        num_tokens = 0
+        if key in _MEDIA_KEYS:
+            num_tokens = self.media_tokens
+        elif key == "images" and isinstance(value, list):
+            num_tokens = self.media_tokens * len(value)
+        elif isinstance(value, dict):
+            num_tokens = sum(self._count_value(v, k) for k, v in value.items())
+        elif isinstance(value, list):
+            num_tokens = sum(self._count_value(_) for _ in value)
+        elif isinstance(value, str):
+            if key not in ("role", "type", "id") and not value.startswith(
+                "data:",
+            ):
+                num_tokens = self.tokenizer(value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            num_tokens = self.tokenizer(str(value))
+        return num_tokens
@@ -45,6 +45,6 @@ class GeminiTokenCounter(TokenCounterBase):
             },
         }
 
-        res = self.client.models.count_tokens(**kwargs)
+        res = await self.client.aio.models.count_tokens(**kwargs)
 
         return res.total_tokens
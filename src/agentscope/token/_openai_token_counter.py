@@ -3,16 +3,18 @@
 follows
 https://platform.openai.com/docs/guides/images-vision?api-mode=chat#calculating-costs
 """
+import asyncio
 import base64
+import binascii
 import io
 import json
 import math
-from http import HTTPStatus
 from typing import Any
 
-import requests
-
 from ._token_base import TokenCounterBase
+from .._utils._image_header import _get_image_size_from_header
+from .._utils._media_cache import _media_cache
+from .._utils._media_fetcher import _media_fetcher
 
 
 def _calculate_tokens_for_high_quality_image(
@@ -48,8 +50,28 @@ def _calculate_tokens_for_high_quality_image(
     return total_tokens
 
 
-def _get_size_of_image_url(url: str) -> tuple[int, int]:
-    """Get the size of an image from the given URL.
+# The numbers of the leading bytes to probe for the image dimensions, which
+# cover the headers of most images, and the JPEGs with large metadata
+_PROBE_SIZES = (1024, 64 * 1024)
+
+
+def _decode_data_url(url: str, size: int | None) -> bytes:
+    """Decode the leading `size` bytes of the base64 data URL, or all of it
+    if `size` is `None`."""
+    base64_data = url.split("base64,", 1)[1]
+    if size is not None:
+        try:
+            return base64.b64decode(base64_data[: (size + 2) // 3 * 4])
+        except binascii.Error:
+            pass
+    return base64.b64decode(base64_data)
+
+
+async def _get_size_of_image_url(url: str) -> tuple[int, int]:
+    """Get the size of an image from the given URL. Only the header of the
+    PNG, JPEG, GIF and WebP images is read, i.e. a range request for the web
+    URL and a partial decode for the base64 data. The sizes of the web
+    images are cached by their URLs.
 
     Args:
         url (`str`):
@@ -59,26 +81,75 @@ def _get_size_of_image_url(url: str) -> tuple[int, int]:
         `tuple[int, int]`:
             A tuple containing the width and height of the image.
     """
-    if url.startswith("data:image/"):
-        base64_data = url.split("base64,")[1]
-        image_data = base64.b64decode(base64_data)
+    is_data_url = url.startswith("data:image/")
+    if not is_data_url:
+        cached = _media_cache.get(("image_size", url))
+        if cached is not None:
+            cached_width, cached_height = cached.split(",")
+            return int(cached_width), int(cached_height)
+
+    async def _read(size: int | None) -> bytes:
+        if is_data_url:
+            return _decode_data_url(url, size)
+        if size is None:
+            return await _media_fetcher.fetch_bytes(url)
+        return await _media_fetcher.fetch_head(url, size)
+
+    image_size = None
+    for probe_size in _PROBE_SIZES:
+        image_data = await _read(probe_size)
+        image_size = _get_image_size_from_header(image_data)
+        # Only the JPEG segments before the dimensions can be large
+        if (
+            image_size is not None
+            or len(image_data) < probe_size
+            or not image_data.startswith(b"\xff\xd8")
+        ):
+            break
+
+    if image_size is None:
+        # Other formats, whose header is parsed lazily by PIL
+        from PIL import Image
 
+        try:
+            width, height = Image.open(io.BytesIO(image_data)).size
+        except Exception:
+            image_data = await _read(None)
+            width, height = Image.open(io.BytesIO(image_data)).size
     else:
-        response = None
-        for _ in range(3):
-            response = requests.get(url)
-            if response.status_code == HTTPStatus.OK:
-                break
-        response.raise_for_status()
-        image_data = response.content
-
-    from PIL import Image
-
-    image = Image.open(io.BytesIO(image_data))
-    width, height = image.size
+        width, height = image_size
+
+    if not is_data_url:
+        _media_cache.put(("image_size", url), f"{width},{height}")
     return width, height
 
 
+async def _get_sizes_of_image_urls(
+    messages: list[dict[str, Any]],
+) -> dict[str, tuple[int, int]]:
+    """Get the sizes of the images in the messages concurrently.
+
+    Args:
+        messages (`list[dict[str, Any]]`):
+            The messages in OpenAI format.
+
+    Returns:
+        `dict[str, tuple[int, int]]`:
+            The image URLs mapped to their widths and heights.
+    """
+    urls = list(
+        dict.fromkeys(
+            item["image_url"]["url"]
+            for message in messages
+            if isinstance(message.get("content"), list)
+            for item in message["content"]
+            if isinstance(item, dict) and item.get("type") == "image_url"
+        ),
+    )
+    sizes = await asyncio.gather(*[_get_size_of_image_url(_) for _ in urls])
+    return dict(zip(urls, sizes))
+
+
 def _get_base_and_tile_tokens(model_name: str) -> tuple[int, int]:
     """Get the base and tile tokens for the given OpenAI model.
 
@@ -178,6 +249,7 @@ def _count_content_tokens_for_openai_vision_model(
     model_name: str,
     content: list[dict],
     encoding: Any,
+    image_sizes: dict[str, tuple[int, int]],
 ) -> int:
     """Yield the number of tokens for the content of an OpenAI vision model.
     Implemented according to https://platform.openai.com/docs/guides/vision.
@@ -189,6 +261,8 @@ def _count_content_tokens_for_openai_vision_model(
             A list of dictionaries.
         encoding (`Any`):
             The encoding object.
+        image_sizes (`dict[str, tuple[int, int]]`):
+            The image URLs mapped to their widths and heights.
 
     Example:
         .. code-block:: python
@@ -229,7 +303,7 @@ def _count_content_tokens_for_openai_vision_model(
             )
 
         elif typ == "image_url":
-            width, height = _get_size_of_image_url(item["image_url"]["url"])
+            width, height = image_sizes[item["image_url"]["url"]]
 
             # Different counting logic for different models
             if any(
@@ -334,6 +408,9 @@ class OpenAITokenCounter(TokenCounterBase):
         tokens_per_message = 3
         tokens_per_name = 1
 
+        # Fetch the sizes of the web images concurrently
+        image_sizes = await _get_sizes_of_image_urls(messages)
+
         # every reply is primed with <|start|>assistant<|message|>
         num_tokens = 3
         for message in messages:
@@ -346,6 +423,7 @@ class OpenAITokenCounter(TokenCounterBase):
                             self.model_name,
                             value,
                             encoding,
+                            image_sizes,
                         )
                     )
 
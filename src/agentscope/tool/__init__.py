@@ -3,6 +3,7 @@
 
 from ._response import ToolResponse
 from ._coding import (
+    InterpreterPool,
     execute_python_code,
     execute_shell_command,
 )
@@ -22,11 +23,18 @@ from ._multi_modality import (
     openai_image_to_text,
     openai_audio_to_text,
 )
+from ._schema_compactor import SchemaCompactor
+from ._tool_cache import ToolResultCache
+from ._tool_retriever import ToolRetriever
 from ._toolkit import Toolkit
 
 __all__ = [
     "Toolkit",
     "ToolResponse",
+    "SchemaCompactor",
+    "ToolResultCache",
+    "ToolRetriever",
+    "InterpreterPool",
     "execute_python_code",
     "execute_shell_command",
     "view_text_file",
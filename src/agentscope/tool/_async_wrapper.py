@@ -6,10 +6,10 @@ TODO: handle the exception raised when yielding from async generator
  into a normal ToolResponse instance.
 """
 import asyncio
-from typing import AsyncGenerator, Generator, Callable
+from typing import Any, AsyncGenerator, Awaitable, Generator, Callable
 
 from ._response import ToolResponse
-from ..message import TextBlock
+from ..message import AudioBlock, ImageBlock, TextBlock
 
 
 async def _postprocess_tool_response(
@@ -35,10 +35,33 @@ async def _object_wrapper(
 async def _sync_generator_wrapper(
     sync_generator: Generator[ToolResponse, None, None],
     postprocess_func: Callable[[ToolResponse], ToolResponse | None] | None,
+    run_in_executor: Callable[..., Awaitable[Any]] | None = None,
 ) -> AsyncGenerator[ToolResponse, None]:
-    """Wrap a sync generator to an async generator."""
-    for chunk in sync_generator:
-        yield await _postprocess_tool_response(chunk, postprocess_func)
+    """Wrap a sync generator to an async generator. If `run_in_executor` is
+    given, each chunk is pulled from the generator within the executor, so
+    that the event loop won't be blocked between the chunks."""
+    accumulator = _DeltaAccumulator(postprocess_func)
+    if run_in_executor is None:
+        for chunk in sync_generator:
+            yield await accumulator.process(chunk)
+        final_response = await accumulator.finish()
+        if final_response:
+            yield final_response
+        return
+
+    try:
+        while True:
+            chunk = await run_in_executor(next, sync_generator, None)
+            if chunk is None:
+                break
+            yield await accumulator.process(chunk)
+
+        final_response = await accumulator.finish()
+        if final_response:
+            yield final_response
+
+    except asyncio.CancelledError as e:
+        yield await accumulator.interrupt(_get_cancel_message(e))
 
 
 async def _async_generator_wrapper(
@@ -49,38 +72,154 @@ async def _async_generator_wrapper(
     response, add an interrupted message to the response, and postpone
     the CancelledError to the caller."""
 
-    last_chunk = None
+    accumulator = _DeltaAccumulator(postprocess_func)
     try:
         async for chunk in async_func:
-            processed_chunk = await _postprocess_tool_response(
-                chunk,
-                postprocess_func,
-            )
-            yield processed_chunk
-            last_chunk = processed_chunk
-
-    except asyncio.CancelledError:
-        interrupted_info = TextBlock(
-            type="text",
-            text="<system-info>"
-            "The tool call has been interrupted by the user."
-            "</system-info>",
+            yield await accumulator.process(chunk)
+
+        final_response = await accumulator.finish()
+        if final_response:
+            yield final_response
+
+    except asyncio.CancelledError as e:
+        yield await accumulator.interrupt(_get_cancel_message(e))
+
+
+class _DeltaAccumulator:
+    """Accumulate the chunks of a streaming tool function, where the delta
+    chunks (with `is_delta=True`) only contain the output generated since
+    the previous chunk.
+
+    The delta chunks are forwarded as they are, and the accumulated
+    response is built and post-processed only once after the stream ends.
+    The texts are collected in lists and joined when building the response,
+    so that the accumulation is linear in the output size. The accumulated
+    chunks are post-processed one by one as before.
+    """
+
+    def __init__(
+        self,
+        postprocess_func: Callable[[ToolResponse], ToolResponse | None] | None,
+    ) -> None:
+        """Initialize the accumulator."""
+        self.postprocess_func = postprocess_func
+        # The accumulated content, where the consecutive texts are kept as
+        # a list of strings
+        self.blocks: list[list[str] | ImageBlock | AudioBlock] = []
+        self.metadata: dict | None = None
+        self.last_chunk: ToolResponse | None = None
+        # Whether there are delta chunks after the last accumulated chunk
+        self.pending = False
+
+    async def process(self, chunk: ToolResponse) -> ToolResponse:
+        """Record the chunk, and return the chunk to be yielded."""
+        if chunk.is_delta:
+            self._add(chunk)
+            self.pending = True
+            # The accumulated response will be the last one
+            chunk.is_last = False
+            return chunk
+
+        # An accumulated chunk replaces the previous output
+        self.blocks, self.metadata, self.pending = [], None, False
+        self._add(chunk)
+        self.last_chunk = await _postprocess_tool_response(
+            chunk,
+            self.postprocess_func,
+        )
+        return self.last_chunk
+
+    async def finish(self) -> ToolResponse | None:
+        """Build the final accumulated response if the stream ends with delta
+        chunks."""
+        if not self.pending:
+            return None
+        self.pending = False
+        self.last_chunk = await _postprocess_tool_response(
+            self._build(),
+            self.postprocess_func,
+        )
+        return self.last_chunk
+
+    async def interrupt(self, message: str | None) -> ToolResponse:
+        """Build the interrupted response from the output so far."""
+        last_chunk = self._build() if self.pending else self.last_chunk
+        return await _postprocess_tool_response(
+            _get_interrupted_response(last_chunk, message),
+            self.postprocess_func,
+        )
+
+    def _add(self, chunk: ToolResponse) -> None:
+        """Append the content and metadata of the chunk."""
+        for block in chunk.content:
+            if block.get("type") != "text":
+                self.blocks.append(block)
+            elif self.blocks and isinstance(self.blocks[-1], list):
+                self.blocks[-1].append(block.get("text", ""))
+            else:
+                self.blocks.append([block.get("text", "")])
+
+        if chunk.metadata:
+            self.metadata = {**(self.metadata or {}), **chunk.metadata}
+
+    def _build(self) -> ToolResponse:
+        """Build the accumulated response."""
+        return ToolResponse(
+            content=[
+                TextBlock(type="text", text="".join(block))
+                if isinstance(block, list)
+                else block
+                for block in self.blocks
+            ],
+            metadata=self.metadata,
+            stream=True,
+            is_last=True,
         )
-        if last_chunk:
-            last_chunk.content.append(interrupted_info)
-            last_chunk.is_interrupted = True
-            last_chunk.is_last = True
-            yield await _postprocess_tool_response(
-                last_chunk,
-                postprocess_func,
-            )
-
-        else:
-            yield await _postprocess_tool_response(
-                ToolResponse(
-                    content=[interrupted_info],
-                    is_interrupted=True,
-                    is_last=True,
-                ),
-                postprocess_func,
-            )
+
+
+def _get_interrupted_response(
+    last_chunk: ToolResponse | None,
+    message: str | None = None,
+) -> ToolResponse:
+    """Mark the last chunk (or a new response if no chunk is generated) as
+    interrupted, with an interrupted message appended."""
+    interrupted_info = TextBlock(
+        type="text",
+        text="<system-info>"
+        f"{message or 'The tool call has been interrupted by the user.'}"
+        "</system-info>",
+    )
+    if last_chunk:
+        last_chunk.content.append(interrupted_info)
+        last_chunk.is_interrupted = True
+        last_chunk.is_last = True
+        return last_chunk
+
+    return ToolResponse(
+        content=[interrupted_info],
+        is_interrupted=True,
+        is_last=True,
+    )
+
+
+class _CancelMessage(str):
+    """The message passed to `Task.cancel` by the toolkit, e.g. when the
+    tool call times out, which is distinguished from the messages of the
+    cancellations raised by the tool functions themselves."""
+
+
+def _get_cancel_message(error: asyncio.CancelledError) -> str | None:
+    """Get the message of the cancellation issued by the toolkit."""
+    if error.args and isinstance(error.args[0], _CancelMessage):
+        return error.args[0]
+    return None
+
+
+def _call_and_drain(func: Callable, kwargs: dict) -> Any:
+    """Call the function and drain the returned generator (if any) into a
+    list, which is used to run tool functions in the process pool, where
+    the generators cannot be sent back across processes."""
+    res = func(**kwargs)
+    if isinstance(res, Generator):
+        return list(res)
+    return res
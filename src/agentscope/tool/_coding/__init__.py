@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 """The coding-related tools module in agentscope."""
 
+from ._interpreter_pool import InterpreterPool
 from ._python import execute_python_code
 from ._shell import execute_shell_command
 
 __all__ = [
+    "InterpreterPool",
     "execute_python_code",
     "execute_shell_command",
 ]
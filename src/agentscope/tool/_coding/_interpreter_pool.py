@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+"""The pool of warm interpreter processes for the code execution tools."""
+import asyncio
+import json
+import os
+import shlex
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from typing import Literal
+
+import shortuuid
+
+from ._output import _READ_SIZE, _OutputCapture, _terminate_process
+from ..._logging import logger
+
+_WORKER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "_interpreter_worker.py",
+)
+
+
+@dataclass
+class _ExecutionResult:
+    """The result of a code execution in the pool."""
+
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+
+
+@dataclass
+class _Worker:
+    """A warm Python or shell process."""
+
+    kind: Literal["python", "shell"]
+    proc: asyncio.subprocess.Process
+    sentinel: str = ""
+    num_runs: int = 0
+    max_rss_kb: int | None = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class InterpreterPool:
+    """The pool of warm Python interpreters and shells, which saves the
+    startup time of the interpreter and the imports for each call of
+    `execute_python_code` and `execute_shell_command`.
+
+    - Each call is executed in an idle worker, in an isolated namespace
+      (Python) or subshell (shell), with the output captured at the file
+      descriptor level.
+    - The timed-out calls kill the worker (and its subprocesses), and the
+      workers are recycled after a number of runs or when their memory
+      grows beyond the limit.
+    - The calls with the same session ID are executed in a dedicated
+      worker, so that the variables (Python) or the working directory and
+      environment variables (shell) carry over between calls.
+
+    The pool is passed to the tool functions as a preset keyword argument,
+    together with an optional session ID, e.g.
+
+    .. code-block:: python
+
+        pool = InterpreterPool(preload_modules=["numpy", "pandas"])
+        toolkit.register_tool_function(
+            execute_python_code,
+            preset_kwargs={
+                "interpreter_pool": pool,
+                "session_id": agent.id,
+            },
+        )
+        ...
+        await pool.close()
+
+    .. note:: The shell workers require a POSIX shell.
+    """
+
+    def __init__(
+        self,
+        num_python_workers: int = 2,
+        num_shell_workers: int = 1,
+        preload_modules: list[str] | None = None,
+        max_runs_per_worker: int | None = 100,
+        max_memory_mb: float | None = None,
+        python_executable: str | None = None,
+        shell_executable: str | None = None,
+        kill_grace_period: float = 1.0,
+    ) -> None:
+        """Initialize the interpreter pool. The workers are started on the
+        first call of each kind.
+
+        Args:
+            num_python_workers (`int`, defaults to `2`):
+                The number of warm Python workers.
+            num_shell_workers (`int`, defaults to `1`):
+                The number of warm shell workers.
+            preload_modules (`list[str] | None`, optional):
+                The modules imported by the Python workers when they start,
+                e.g. `["numpy", "pandas"]`.
+            max_runs_per_worker (`int | None`, defaults to `100`):
+                The number of runs after which a worker is replaced by a
+                new one. If `None`, the workers are not recycled by the
+                number of runs. The session workers are never recycled.
+            max_memory_mb (`float | None`, optional):
+                The peak memory (resident set size) in MB beyond which a
+                Python worker is replaced by a new one.
+            python_executable (`str | None`, optional):
+                The Python executable of the workers, defaults to the
+                current one.
+            shell_executable (`str | None`, optional):
+                The shell executable of the workers, defaults to `bash` if
+                available, otherwise `sh`.
+            kill_grace_period (`float`, defaults to `1.0`):
+                The seconds to wait after terminating a worker before it's
+                killed.
+        """
+        self.num_workers = {
+            "python": num_python_workers,
+            "shell": num_shell_workers,
+        }
+        self.preload_modules = preload_modules or []
+        self.max_runs_per_worker = max_runs_per_worker
+        self.max_memory_mb = max_memory_mb
+        self.python_executable = python_executable or sys.executable
+        self.shell_executable = (
+            shell_executable or shutil.which("bash") or "/bin/sh"
+        )
+        self.kill_grace_period = kill_grace_period
+
+        self._idle: dict[str, asyncio.Queue] = {}
+        self._sessions: dict[tuple[str, str], _Worker] = {}
+        self._background_tasks: set[asyncio.Task] = set()
+        self._temp_dir: str | None = None
+        self._closed = False
+
+    async def run_python(
+        self,
+        code: str,
+        timeout: float | None = None,
+        session_id: str | None = None,
+        output_captures: tuple[_OutputCapture, _OutputCapture] | None = None,
+    ) -> _ExecutionResult:
+        """Execute the Python code in a warm worker.
+
+        Args:
+            code (`str`):
+                The Python code.
+            timeout (`float | None`, optional):
+                The maximum seconds of the execution.
+            session_id (`str | None`, optional):
+                The session ID, the code of the same session is executed in
+                the same namespace.
+            output_captures (`tuple[_OutputCapture, _OutputCapture] | \
+            None`, optional):
+                The captures of the stdout and stderr, which cap the output
+                kept in memory. If `None`, the output is not capped.
+
+        Returns:
+            `_ExecutionResult`:
+                The return code, standard output and error.
+        """
+        return await self._run(
+            "python",
+            code,
+            timeout,
+            session_id,
+            output_captures,
+        )
+
+    async def run_shell(
+        self,
+        command: str,
+        timeout: float | None = None,
+        session_id: str | None = None,
+        output_captures: tuple[_OutputCapture, _OutputCapture] | None = None,
+    ) -> _ExecutionResult:
+        """Execute the shell command in a warm shell.
+
+        Args:
+            command (`str`):
+                The shell command.
+            timeout (`float | None`, optional):
+                The maximum seconds of the execution.
+            session_id (`str | None`, optional):
+                The session ID, the commands of the same session are
+                executed in the same shell.
+            output_captures (`tuple[_OutputCapture, _OutputCapture] | \
+            None`, optional):
+                The captures of the stdout and stderr, which cap the output
+                kept in memory. If `None`, the output is not capped.
+
+        Returns:
+            `_ExecutionResult`:
+                The return code, standard output and error.
+        """
+        return await self._run(
+            "shell",
+            command,
+            timeout,
+            session_id,
+            output_captures,
+        )
+
+    async def close_session(self, session_id: str) -> None:
+        """Close the Python and shell workers of the session.
+
+        Args:
+            session_id (`str`):
+                The session ID.
+        """
+        for kind in ["python", "shell"]:
+            worker = self._sessions.pop((kind, session_id), None)
+            if worker is not None:
+                await self._kill(worker)
+
+    async def close(self) -> None:
+        """Kill all the workers and remove the temporary files."""
+        self._closed = True
+        # The workers started in background are killed when they're ready
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
+        workers = list(self._sessions.values())
+        self._sessions.clear()
+        for queue in self._idle.values():
+            while not queue.empty():
+                item = queue.get_nowait()
+                if isinstance(item, _Worker):
+                    workers.append(item)
+        self._idle.clear()
+        await asyncio.gather(*[self._kill(_) for _ in workers])
+
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+    async def _run(
+        self,
+        kind: Literal["python", "shell"],
+        code: str,
+        timeout: float | None,
+        session_id: str | None,
+        output_captures: tuple[_OutputCapture, _OutputCapture] | None,
+    ) -> _ExecutionResult:
+        """Execute the code or command in a pooled or session worker."""
+        if self._closed:
+            raise RuntimeError("The interpreter pool has been closed.")
+
+        if session_id is None:
+            worker = await self._acquire(kind)
+        else:
+            worker = self._sessions.get((kind, session_id))
+            if worker is None or worker.proc.returncode is not None:
+                worker = await self._acquire(kind)
+                self._sessions[(kind, session_id)] = worker
+                # Keep the number of the pooled workers
+                self._run_in_background(self._spawn_into_queue(kind))
+
+        async with worker.lock:
+            healthy = False
+            try:
+                result = await self._execute(
+                    worker,
+                    code,
+                    timeout,
+                    persistent=session_id is not None,
+                    output_captures=output_captures,
+                )
+                healthy = not result.timed_out
+            finally:
+                if session_id is not None:
+                    if not healthy:
+                        self._sessions.pop((kind, session_id), None)
+                        self._run_in_background(self._kill(worker))
+                else:
+                    self._release(worker, healthy)
+
+        return result
+
+    async def _execute(
+        self,
+        worker: _Worker,
+        code: str,
+        timeout: float | None,
+        persistent: bool,
+        output_captures: tuple[_OutputCapture, _OutputCapture] | None,
+    ) -> _ExecutionResult:
+        """Send the code to the worker and wait for the result."""
+        stdout_path = self._create_output_file()
+        stderr_path = self._create_output_file()
+        try:
+            if worker.kind == "python":
+                request = json.dumps(
+                    {
+                        "code": code,
+                        "persistent": persistent,
+                        "stdout": stdout_path,
+                        "stderr": stderr_path,
+                    },
+                )
+            else:
+                # Evaluate the command, so that its syntax errors don't
+                # terminate the shell
+                command = f"eval {shlex.quote(code)}"
+                command = (
+                    f"{{ {command}; }}" if persistent else f"( {command} )"
+                )
+                request = (
+                    f"{command} >{shlex.quote(stdout_path)} "
+                    f"2>{shlex.quote(stderr_path)} </dev/null; "
+                    f'echo "{worker.sentinel} $?"'
+                )
+
+            worker.proc.stdin.write(request.encode("utf-8") + b"\n")
+            await worker.proc.stdin.drain()
+            worker.num_runs += 1
+
+            timed_out = False
+            try:
+                returncode = await asyncio.wait_for(
+                    self._read_returncode(worker),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                timed_out = True
+                returncode = -1
+                await self._kill(worker)
+
+            if returncode is None:
+                # The worker exits, e.g. by `os._exit` or `exit` in the
+                # session shell
+                returncode = await worker.proc.wait()
+
+            return _ExecutionResult(
+                returncode=returncode,
+                stdout=self._read_output_file(
+                    stdout_path,
+                    output_captures[0] if output_captures else None,
+                ),
+                stderr=self._read_output_file(
+                    stderr_path,
+                    output_captures[1] if output_captures else None,
+                ),
+                timed_out=timed_out,
+            )
+
+        finally:
+            for path in [stdout_path, stderr_path]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @staticmethod
+    async def _read_returncode(worker: _Worker) -> int | None:
+        """Read the return code from the worker, `None` if it exits."""
+        while True:
+            line = await worker.proc.stdout.readline()
+            if not line:
+                return None
+
+            line = line.decode("utf-8").strip()
+            if worker.kind == "python":
+                response = json.loads(line)
+                worker.max_rss_kb = response["max_rss_kb"]
+                return response["returncode"]
+
+            if line.startswith(worker.sentinel):
+                return int(line[len(worker.sentinel) :])
+
+    async def _acquire(self, kind: Literal["python", "shell"]) -> _Worker:
+        """Get an idle worker, starting the workers on the first call."""
+        if kind not in self._idle:
+            self._idle[kind] = asyncio.Queue()
+            for _ in range(max(self.num_workers[kind], 1)):
+                self._run_in_background(self._spawn_into_queue(kind))
+
+        item = await self._idle[kind].get()
+        if isinstance(item, BaseException):
+            # Try again for the next call
+            self._run_in_background(self._spawn_into_queue(kind))
+            raise item
+        return item
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        """Return the worker to the pool, or replace it with a new one."""
+        if self._closed or worker.kind not in self._idle:
+            self._run_in_background(self._kill(worker))
+            return
+
+        recycle = (
+            self.max_runs_per_worker is not None
+            and worker.num_runs >= self.max_runs_per_worker
+        ) or (
+            self.max_memory_mb is not None
+            and worker.max_rss_kb is not None
+            and worker.max_rss_kb > self.max_memory_mb * 1024
+        )
+        if healthy and not recycle and worker.proc.returncode is None:
+            self._idle[worker.kind].put_nowait(worker)
+            return
+
+        self._run_in_background(self._kill(worker))
+        self._run_in_background(self._spawn_into_queue(worker.kind))
+
+    async def _spawn_into_queue(
+        self,
+        kind: Literal["python", "shell"],
+    ) -> None:
+        """Start a worker and put it (or the error) into the idle queue."""
+        try:
+            item: _Worker | BaseException = await self._spawn(kind)
+        except Exception as e:
+            logger.error("Failed to start the %s worker: %s", kind, e)
+            item = e
+
+        if kind in self._idle and not self._closed:
+            self._idle[kind].put_nowait(item)
+        elif isinstance(item, _Worker):
+            await self._kill(item)
+
+    async def _spawn(self, kind: Literal["python", "shell"]) -> _Worker:
+        """Start a worker and wait until it's ready."""
+        if kind == "python":
+            args = [
+                self.python_executable,
+                "-u",
+                _WORKER_SCRIPT,
+                *self.preload_modules,
+            ]
+        else:
+            args = [self.shell_executable]
+
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            # Kill the subprocesses of the worker together
+            start_new_session=os.name == "posix",
+        )
+        worker = _Worker(kind=kind, proc=proc)
+
+        if kind == "python":
+            ready = await proc.stdout.readline()
+            if not ready:
+                raise RuntimeError(
+                    "The Python worker exits with code "
+                    f"{await proc.wait()} when starting.",
+                )
+        else:
+            worker.sentinel = f"__agentscope_{shortuuid.uuid()}__"
+
+        return worker
+
+    async def _kill(self, worker: _Worker) -> None:
+        """Terminate the worker and its subprocesses, and kill them if they
+        don't exit within the grace period."""
+        await _terminate_process(worker.proc, self.kill_grace_period)
+
+    def _run_in_background(self, coro: object) -> None:
+        """Run the coroutine in background, keeping a reference to it."""
+        task = asyncio.ensure_future(coro)  # type: ignore[call-overload]
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _create_output_file(self) -> str:
+        """Create an empty file to capture the output."""
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix="agentscope_pool_")
+        fd, path = tempfile.mkstemp(dir=self._temp_dir)
+        os.close(fd)
+        return path
+
+    @staticmethod
+    def _read_output_file(path: str, capture: _OutputCapture | None) -> str:
+        """Read the captured output, within the caps of the capture if
+        given."""
+        with open(path, "rb") as f:
+            if capture is None:
+                return f.read().decode("utf-8", errors="replace")
+
+            try:
+                while data := f.read(_READ_SIZE):
+                    capture.write(data)
+            finally:
+                capture.close()
+            return capture.get_text()
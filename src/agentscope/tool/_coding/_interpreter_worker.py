@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""The worker process of the interpreter pool, which is executed as a
+standalone script (without importing agentscope) and runs the submitted
+Python code one by one.
+
+The requests and responses are exchanged as JSON lines through the
+duplicated stdin and stdout, while the file descriptors 1 and 2 are
+redirected to the output files given by each request, so that the output
+of the subprocesses and C extensions is captured as well.
+"""
+import builtins
+import importlib
+import json
+import linecache
+import os
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+_FILENAME = "<code>"
+
+
+def _new_namespace() -> dict:
+    """Create an isolated namespace to execute the code."""
+    return {"__name__": "__main__", "__builtins__": builtins}
+
+
+def _get_max_rss_kb() -> int | None:
+    """Get the peak resident set size of the worker in KB."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # The unit is bytes on macOS and KB on Linux
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def _run(code: str, namespace: dict) -> int:
+    """Execute the code in the namespace and return the return code."""
+    linecache.cache[_FILENAME] = (
+        len(code),
+        None,
+        code.splitlines(True),
+        _FILENAME,
+    )
+    try:
+        exec(compile(code, _FILENAME, "exec"), namespace)
+        return 0
+
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+
+    except BaseException as e:  # pylint: disable=broad-except
+        # Skip the frame of this function
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return 1
+
+
+def main() -> None:
+    """Preload the modules and serve the requests until stdin is closed."""
+    for module_name in sys.argv[1:]:
+        try:
+            importlib.import_module(module_name)
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+
+    with os.fdopen(os.dup(0), "r", encoding="utf-8") as requests, os.fdopen(
+        os.dup(1),
+        "w",
+        encoding="utf-8",
+    ) as responses:
+        # The code shouldn't read the requests from stdin
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+
+        cwd = os.getcwd()
+        session_namespace = None
+
+        responses.write(json.dumps({"ready": True}) + "\n")
+        responses.flush()
+
+        for line in requests:
+            request = json.loads(line)
+            if request.get("persistent"):
+                if session_namespace is None:
+                    session_namespace = _new_namespace()
+                namespace = session_namespace
+            else:
+                namespace = _new_namespace()
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+            saved_fds = os.dup(1), os.dup(2)
+            for fd, path in [(1, request["stdout"]), (2, request["stderr"])]:
+                output_fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+                os.dup2(output_fd, fd)
+                os.close(output_fd)
+
+            try:
+                returncode = _run(request["code"], namespace)
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                for fd, saved_fd in zip([1, 2], saved_fds):
+                    os.dup2(saved_fd, fd)
+                    os.close(saved_fd)
+                if not request.get("persistent"):
+                    os.chdir(cwd)
+
+            responses.write(
+                json.dumps(
+                    {
+                        "returncode": returncode,
+                        "max_rss_kb": _get_max_rss_kb(),
+                    },
+                )
+                + "\n",
+            )
+            responses.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""The size-capped output capture and streaming of the code execution
+tools, which are configured by the preset keyword arguments of
+`execute_python_code` and `execute_shell_command`:
+
+- `stream` (`bool`, defaults to `False`): return an async generator
+  yielding the output captured so far whenever new output arrives.
+- `max_head_bytes` / `max_tail_bytes` (`int`, defaults to `32768`): the
+  leading / trailing bytes of each output stream kept in the response.
+- `spill_dir` (`str | None`, defaults to `None`): the directory where
+  the full output is saved once it exceeds the caps. If `None`, the
+  truncated part is dropped. The spill files are not removed by the tools.
+- `kill_grace_period` (`float`, defaults to `1.0`): the seconds between
+  terminating and killing the timed-out process.
+"""
+import asyncio
+import os
+import signal
+from typing import AsyncGenerator
+
+import shortuuid
+
+from .._response import ToolResponse
+from ...message import TextBlock
+
+_READ_SIZE = 65536
+
+DEFAULT_MAX_HEAD_BYTES = 32768
+DEFAULT_MAX_TAIL_BYTES = 32768
+
+
+class _OutputCapture:
+    """Capture an output stream, keeping its head and tail in memory. Once
+    the output exceeds the caps, the middle part is dropped from memory,
+    and the full output is spilled to a file if the spill directory is
+    given."""
+
+    def __init__(
+        self,
+        name: str,
+        max_head_bytes: int = DEFAULT_MAX_HEAD_BYTES,
+        max_tail_bytes: int = DEFAULT_MAX_TAIL_BYTES,
+        spill_dir: str | None = None,
+    ) -> None:
+        """Initialize the output capture.
+
+        Args:
+            name (`str`):
+                The name of the stream, e.g. `"stdout"`, used in the name
+                of the spill file.
+            max_head_bytes (`int`, defaults to `32768`):
+                The number of the leading bytes kept in memory.
+            max_tail_bytes (`int`, defaults to `32768`):
+                The number of the trailing bytes kept in memory.
+            spill_dir (`str | None`, optional):
+                The directory of the spill files. If `None`, the middle part
+                of the output is dropped without spilling.
+        """
+        self.name = name
+        self.max_head_bytes = max_head_bytes
+        self.max_tail_bytes = max_tail_bytes
+        self.spill_dir = spill_dir
+
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.num_bytes = 0
+        self.spill_path: str | None = None
+        self._spill_file = None
+
+    def write(self, data: bytes) -> None:
+        """Append the data to the captured output."""
+        self.num_bytes += len(data)
+
+        num_head_bytes = min(self.max_head_bytes - len(self.head), len(data))
+        if num_head_bytes > 0:
+            self.head += data[:num_head_bytes]
+        self.tail += data[max(num_head_bytes, 0) :]
+
+        if self._spill_file is not None:
+            self._spill_file.write(data)
+        elif (
+            self.spill_dir is not None
+            and self.num_bytes > self.max_head_bytes + self.max_tail_bytes
+        ):
+            # The full output is still in memory at this point
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self.spill_path = os.path.join(
+                self.spill_dir,
+                f"{self.name}_{shortuuid.uuid()}.log",
+            )
+            self._spill_file = open(  # pylint: disable=consider-using-with
+                self.spill_path,
+                "wb",
+            )
+            self._spill_file.write(self.head)
+            self._spill_file.write(self.tail)
+
+        if len(self.tail) > self.max_tail_bytes:
+            del self.tail[: len(self.tail) - self.max_tail_bytes]
+
+    def close(self) -> None:
+        """Close the spill file."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the middle part of the output is dropped."""
+        return self.num_bytes > len(self.head) + len(self.tail)
+
+    def get_text(self) -> str:
+        """Get the captured output, with a note on the truncated part."""
+        text = self.head.decode("utf-8", errors="replace")
+        if self.truncated:
+            num_truncated = self.num_bytes - len(self.head) - len(self.tail)
+            text += f"\n... [{num_truncated} bytes truncated"
+            if self.spill_path:
+                text += f", the full output is saved in {self.spill_path}"
+            text += "] ...\n"
+        return text + self.tail.decode("utf-8", errors="replace")
+
+
+def _get_output_captures(
+    kwargs: dict,
+) -> tuple[_OutputCapture, _OutputCapture]:
+    """Create the captures of stdout and stderr by the preset keyword
+    arguments of the tool function."""
+    max_head_bytes = kwargs.get("max_head_bytes", DEFAULT_MAX_HEAD_BYTES)
+    max_tail_bytes = kwargs.get("max_tail_bytes", DEFAULT_MAX_TAIL_BYTES)
+    spill_dir = kwargs.get("spill_dir")
+    return (
+        _OutputCapture("stdout", max_head_bytes, max_tail_bytes, spill_dir),
+        _OutputCapture("stderr", max_head_bytes, max_tail_bytes, spill_dir),
+    )
+
+
+async def _stream_process(
+    proc: asyncio.subprocess.Process,
+    timeout: float | None,
+    timeout_message: str,
+    stdout: _OutputCapture,
+    stderr: _OutputCapture,
+    stream: bool = False,
+    kill_grace_period: float = 1.0,
+) -> AsyncGenerator[ToolResponse, None]:
+    """Capture the output of the process until it exits.
+
+    Args:
+        proc (`asyncio.subprocess.Process`):
+            The process with the stdout and stderr piped.
+        timeout (`float | None`):
+            The maximum seconds the process is allowed to run, after which
+            it's terminated, and killed if it doesn't exit within the grace
+            period.
+        timeout_message (`str`):
+            The message appended to stderr when the process times out.
+        stdout (`_OutputCapture`):
+            The capture of the stdout.
+        stderr (`_OutputCapture`):
+            The capture of the stderr.
+        stream (`bool`, defaults to `False`):
+            Whether to yield the captured output whenever new output
+            arrives. Otherwise, only the final response is yielded.
+        kill_grace_period (`float`, defaults to `1.0`):
+            The seconds to wait after terminating the process before it's
+            killed.
+
+    Yields:
+        `ToolResponse`:
+            The accumulated output so far, and the last one containing the
+            return code.
+    """
+    loop = asyncio.get_running_loop()
+    updated = asyncio.Event()
+
+    async def pump(
+        reader: asyncio.StreamReader | None,
+        capture: _OutputCapture,
+    ) -> None:
+        """Read the output stream into the capture."""
+        assert reader is not None
+        while True:
+            data = await reader.read(_READ_SIZE)
+            if not data:
+                break
+            capture.write(data)
+            updated.set()
+
+    finished = asyncio.gather(
+        proc.wait(),
+        pump(proc.stdout, stdout),
+        pump(proc.stderr, stderr),
+    )
+    deadline = None if timeout is None else loop.time() + timeout
+    timed_out = False
+    kill_task = None
+
+    try:
+        while not finished.done():
+            remaining = None
+            if deadline is not None and not timed_out:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    timed_out = True
+                    remaining = None
+                    kill_task = asyncio.ensure_future(
+                        _terminate_process(proc, kill_grace_period),
+                    )
+
+            waiter = asyncio.ensure_future(updated.wait())
+            awaitables: set[asyncio.Future] = {waiter, finished}
+            await asyncio.wait(
+                awaitables,
+                timeout=remaining,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            waiter.cancel()
+
+            if not updated.is_set():
+                continue
+            updated.clear()
+
+            if stream and not finished.done():
+                yield ToolResponse(
+                    content=[
+                        TextBlock(
+                            type="text",
+                            text=f"<stdout>{stdout.get_text()}</stdout>"
+                            f"<stderr>{stderr.get_text()}</stderr>",
+                        ),
+                    ],
+                    stream=True,
+                    is_last=False,
+                )
+
+        finished.result()
+        if kill_task is not None:
+            await kill_task
+
+    finally:
+        if not finished.done():
+            # Interrupted, e.g. by the user
+            await _terminate_process(proc, kill_grace_period)
+            finished.cancel()
+            await asyncio.gather(finished, return_exceptions=True)
+        stdout.close()
+        stderr.close()
+
+    stderr_str = stderr.get_text()
+    if timed_out:
+        stderr_str = (
+            f"{stderr_str}\n{timeout_message}"
+            if stderr_str
+            else timeout_message
+        )
+
+    yield ToolResponse(
+        content=[
+            TextBlock(
+                type="text",
+                text=f"<returncode>{-1 if timed_out else proc.returncode}"
+                "</returncode>"
+                f"<stdout>{stdout.get_text()}</stdout>"
+                f"<stderr>{stderr_str}</stderr>",
+            ),
+        ],
+        stream=stream,
+        is_last=True,
+    )
+
+
+async def _terminate_process(
+    proc: asyncio.subprocess.Process,
+    kill_grace_period: float,
+) -> None:
+    """Terminate the process (and its process group on POSIX), and kill it
+    if it doesn't exit within the grace period."""
+    for sig in [signal.SIGTERM, getattr(signal, "SIGKILL", None)]:
+        if proc.returncode is not None or sig is None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, sig)
+            elif sig == signal.SIGTERM:
+                proc.terminate()
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            return
+
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=kill_grace_period)
+        except asyncio.TimeoutError:
+            continue
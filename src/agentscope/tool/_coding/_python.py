@@ -6,10 +6,11 @@ import asyncio
 import os
 import sys
 import tempfile
-from typing import Any
+from typing import Any, AsyncGenerator
 
 import shortuuid
 
+from ._output import _get_output_captures, _stream_process
 from ...message import TextBlock
 from .._response import ToolResponse
 
@@ -18,10 +19,12 @@ async def execute_python_code(
     code: str,
     timeout: float = 300,
     **kwargs: Any,
-) -> ToolResponse:
+) -> ToolResponse | AsyncGenerator[ToolResponse, None]:
     """Execute the given python code in a temp file and capture the return
     code, standard output and error. Note you must `print` the output to get
     the result, and the tmp file will be removed right after the execution.
+    The standard output and error longer than 64 KiB are truncated in the
+    middle.
 
     Args:
         code (`str`):
@@ -30,49 +33,31 @@ async def execute_python_code(
             The maximum time (in seconds) allowed for the code to run.
 
     Returns:
-        `ToolResponse`:
+        `ToolResponse | AsyncGenerator[ToolResponse, None]`:
             The response containing the return code, standard output, and
             standard error of the executed code.
     """
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_file = os.path.join(temp_dir, f"tmp_{shortuuid.uuid()}.py")
-        with open(temp_file, "w", encoding="utf-8") as f:
-            f.write(code)
+    timeout_message = (
+        f"TimeoutError: The code execution exceeded "
+        f"the timeout of {timeout} seconds."
+    )
 
-        proc = await asyncio.create_subprocess_exec(
-            sys.executable,
-            "-u",
-            temp_file,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+    interpreter_pool = kwargs.get("interpreter_pool")
+    if interpreter_pool is not None:
+        result = await interpreter_pool.run_python(
+            code,
+            timeout=timeout,
+            session_id=kwargs.get("session_id"),
+            output_captures=_get_output_captures(kwargs),
         )
-
-        try:
-            await asyncio.wait_for(proc.wait(), timeout=timeout)
-            stdout, stderr = await proc.communicate()
-            stdout_str = stdout.decode("utf-8")
-            stderr_str = stderr.decode("utf-8")
-            returncode = proc.returncode
-
-        except asyncio.TimeoutError:
-            stderr_suffix = (
-                f"TimeoutError: The code execution exceeded "
-                f"the timeout of {timeout} seconds."
-            )
-            returncode = -1
-            try:
-                proc.terminate()
-                stdout, stderr = await proc.communicate()
-                stdout_str = stdout.decode("utf-8")
-                stderr_str = stderr.decode("utf-8")
-                if stderr_str:
-                    stderr_str += f"\n{stderr_suffix}"
-                else:
-                    stderr_str = stderr_suffix
-            except ProcessLookupError:
-                stdout_str = ""
-                stderr_str = stderr_suffix
+        returncode = result.returncode
+        stdout_str, stderr_str = result.stdout, result.stderr
+        if result.timed_out:
+            if stderr_str:
+                stderr_str += f"\n{timeout_message}"
+            else:
+                stderr_str = timeout_message
 
         return ToolResponse(
             content=[
@@ -84,3 +69,43 @@ async def execute_python_code(
                 ),
             ],
         )
+
+    res = _execute_in_subprocess(code, timeout, timeout_message, kwargs)
+    if kwargs.get("stream"):
+        return res
+
+    return [_ async for _ in res][-1]
+
+
+async def _execute_in_subprocess(
+    code: str,
+    timeout: float,
+    timeout_message: str,
+    kwargs: dict,
+) -> AsyncGenerator[ToolResponse, None]:
+    """Execute the code in a new Python process, and yield the captured
+    output."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_file = os.path.join(temp_dir, f"tmp_{shortuuid.uuid()}.py")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write(code)
+
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-u",
+            temp_file,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            # Terminate the subprocesses of the code together
+            start_new_session=os.name == "posix",
+        )
+
+        async for chunk in _stream_process(
+            proc,
+            timeout,
+            timeout_message,
+            *_get_output_captures(kwargs),
+            stream=kwargs.get("stream", False),
+            kill_grace_period=kwargs.get("kill_grace_period", 1.0),
+        ):
+            yield chunk
@@ -3,8 +3,10 @@
 """The shell command tool in agentscope."""
 
 import asyncio
-from typing import Any
+import os
+from typing import Any, AsyncGenerator
 
+from ._output import _get_output_captures, _stream_process
 from .._response import ToolResponse
 from ...message import TextBlock
 
@@ -13,10 +15,11 @@ async def execute_shell_command(
     command: str,
     timeout: int = 300,
     **kwargs: Any,
-) -> ToolResponse:
+) -> ToolResponse | AsyncGenerator[ToolResponse, None]:
     """Execute given command and return the return code, standard output and
     error within <returncode></returncode>, <stdout></stdout> and
-    <stderr></stderr> tags.
+    <stderr></stderr> tags. The standard output and error longer than 64 KiB
+    are truncated in the middle.
 
     Args:
         command (`str`):
@@ -25,53 +28,74 @@ async def execute_shell_command(
             The maximum time (in seconds) allowed for the command to run.
 
     Returns:
-        `ToolResponse`:
+        `ToolResponse | AsyncGenerator[ToolResponse, None]`:
             The tool response containing the return code, standard output, and
             standard error of the executed command.
     """
 
-    proc = await asyncio.create_subprocess_shell(
-        command,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        bufsize=0,
+    timeout_message = (
+        f"TimeoutError: The command execution exceeded "
+        f"the timeout of {timeout} seconds."
     )
 
-    try:
-        await asyncio.wait_for(proc.wait(), timeout=timeout)
-        stdout, stderr = await proc.communicate()
-        stdout_str = stdout.decode("utf-8")
-        stderr_str = stderr.decode("utf-8")
-        returncode = proc.returncode
-
-    except asyncio.TimeoutError:
-        stderr_suffix = (
-            f"TimeoutError: The command execution exceeded "
-            f"the timeout of {timeout} seconds."
+    interpreter_pool = kwargs.get("interpreter_pool")
+    if interpreter_pool is not None:
+        result = await interpreter_pool.run_shell(
+            command,
+            timeout=timeout,
+            session_id=kwargs.get("session_id"),
+            output_captures=_get_output_captures(kwargs),
         )
-        returncode = -1
-        try:
-            proc.terminate()
-            stdout, stderr = await proc.communicate()
-            stdout_str = stdout.decode("utf-8")
-            stderr_str = stderr.decode("utf-8")
+        returncode = result.returncode
+        stdout_str, stderr_str = result.stdout, result.stderr
+        if result.timed_out:
             if stderr_str:
-                stderr_str += f"\n{stderr_suffix}"
+                stderr_str += f"\n{timeout_message}"
             else:
-                stderr_str = stderr_suffix
-        except ProcessLookupError:
-            stdout_str = ""
-            stderr_str = stderr_suffix
+                stderr_str = timeout_message
 
-    return ToolResponse(
-        content=[
-            TextBlock(
-                type="text",
-                text=(
-                    f"<returncode>{returncode}</returncode>"
-                    f"<stdout>{stdout_str}</stdout>"
-                    f"<stderr>{stderr_str}</stderr>"
+        return ToolResponse(
+            content=[
+                TextBlock(
+                    type="text",
+                    text=(
+                        f"<returncode>{returncode}</returncode>"
+                        f"<stdout>{stdout_str}</stdout>"
+                        f"<stderr>{stderr_str}</stderr>"
+                    ),
                 ),
-            ),
-        ],
+            ],
+        )
+
+    res = _execute_in_subprocess(command, timeout, timeout_message, kwargs)
+    if kwargs.get("stream"):
+        return res
+
+    return [_ async for _ in res][-1]
+
+
+async def _execute_in_subprocess(
+    command: str,
+    timeout: float,
+    timeout_message: str,
+    kwargs: dict,
+) -> AsyncGenerator[ToolResponse, None]:
+    """Execute the command in a new shell, and yield the captured output."""
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        bufsize=0,
+        # Terminate the subprocesses of the command together
+        start_new_session=os.name == "posix",
     )
+
+    async for chunk in _stream_process(
+        proc,
+        timeout,
+        timeout_message,
+        *_get_output_captures(kwargs),
+        stream=kwargs.get("stream", False),
+        kill_grace_period=kwargs.get("kill_grace_period", 1.0),
+    ):
+        yield chunk
@@ -27,7 +27,7 @@ def _parse_url(url: str) -> BytesIO | IO[bytes]:
     If url is a web URL, fetch the content and return as BytesIO.
     """
     if url.startswith(("http://", "https://")):
-        response = requests.get(url)
+        response = requests.get(url, timeout=60)
         response.raise_for_status()  # Raise an exception for HTTP errors
         return BytesIO(response.content)
     else:
@@ -236,7 +236,7 @@ def openai_edit_image(
             from PIL import Image
 
             if url_or_path.startswith(("http://", "https://")):
-                response = requests.get(url_or_path)
+                response = requests.get(url_or_path, timeout=60)
                 response.raise_for_status()
                 img = Image.open(BytesIO(response.content))
             else:
@@ -624,7 +624,7 @@ def openai_audio_to_text(
         )
 
         if audio_file_url.startswith(("http://", "https://")):
-            response = requests.get(audio_file_url)
+            response = requests.get(audio_file_url, timeout=60)
             response.raise_for_status()
             audio_buffer = BytesIO(response.content)
             import urllib.parse
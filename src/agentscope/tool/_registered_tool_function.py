@@ -2,7 +2,7 @@
 """The data model for registered tool functions in AgentScope."""
 from copy import deepcopy
 from dataclasses import field, dataclass
-from typing import Callable, Literal, Type
+from typing import Awaitable, Callable, Literal, Type
 
 from pydantic import BaseModel
 
@@ -24,8 +24,10 @@ class RegisteredToolFunction:
     """"The type of the tool function, can be `function` or `mcp_server`."""
     original_func: ToolFunction
     """The original function"""
-    json_schema: dict
-    """The JSON schema of the tool function, which is used to validate the """
+    json_schema_builder: Callable[[], dict]
+    """The function that builds the JSON schema of the tool function, which
+    is called lazily when the JSON schema is accessed for the first time, so
+    that parsing the docstrings is deferred until the schema is needed."""
     preset_kwargs: dict[str, JSONSerializableObject] = field(
         default_factory=dict,
     )
@@ -45,14 +47,75 @@ class RegisteredToolFunction:
     response as arguments. If it returns `None`, the tool result will be
     returned as is. If it returns a `ToolResponse`, the returned block
     will be used as the final tool response."""
+    execution_mode: Literal["inline", "thread", "process"] | None = None
+    """How the sync tool function (and sync generator) is executed. If
+    `None`, the default execution mode of the toolkit is used."""
+    timeout: float | None = None
+    """The maximum seconds of a call, after which the call is cancelled and
+    a response marked as interrupted is returned. If `None`, no timeout."""
+    max_concurrency: int | None = None
+    """The maximum number of concurrent calls of the tool function. If
+    `None`, no limit."""
+    max_queue_size: int | None = None
+    """The maximum number of calls waiting for a free concurrency slot, the
+    excess calls are rejected with an error response. If `None`, no limit.
+    Only takes effect when `max_concurrency` is set."""
+    cacheable: bool = False
+    """If the tool function is idempotent, so that its final responses can
+    be cached and reused for the same arguments."""
+    cache_ttl: float | None = None
+    """The time-to-live of the cached responses in seconds. If `None`, the
+    cached responses never expire."""
+    resource_args: list[str] = field(default_factory=list)
+    """The names of the arguments that identify the resources (e.g. file
+    paths) the tool function reads or writes, which are used to invalidate
+    the cached responses."""
+
+    batch_func: Callable[
+        [list[dict]],
+        list[ToolResponse] | Awaitable[list[ToolResponse]],
+    ] | None = None
+    """The function handling multiple calls in one invocation, which takes
+    the list of keyword arguments and returns the responses in the same
+    order."""
+    max_batch_size: int | None = None
+    """The maximum number of calls in one batch. If `None`, no limit."""
+
+    _json_schema: dict | None = field(default=None, init=False, repr=False)
+    _extended_json_schema_cache: tuple | None = field(
+        default=None,
+        init=False,
+        repr=False,
+    )
+
+    @property
+    def json_schema(self) -> dict:
+        """The JSON schema of the tool function, built on the first
+        access."""
+        if self._json_schema is None:
+            self._json_schema = self.json_schema_builder()
+        return self._json_schema
+
+    @json_schema.setter
+    def json_schema(self, json_schema: dict) -> None:
+        """Replace the JSON schema of the tool function."""
+        self._json_schema = json_schema
+        self._extended_json_schema_cache = None
 
     @property
     def extended_json_schema(self) -> dict:
         """Get the JSON schema of the tool function, if an extended model is
-        set, the merged JSON schema will be returned."""
+        set, the merged JSON schema will be returned. The merged JSON schema
+        is cached until the extended model changes."""
         if self.extended_model is None:
             return self.json_schema
 
+        if (
+            self._extended_json_schema_cache is not None
+            and self._extended_json_schema_cache[0] is self.extended_model
+        ):
+            return self._extended_json_schema_cache[1]
+
         # Merge the extended model with the original JSON schema
         extended_schema = self.extended_model.model_json_schema()
 
@@ -76,4 +139,6 @@ class RegisteredToolFunction:
                 if "required" not in merged_schema["function"]["parameters"]:
                     merged_schema["function"]["parameters"]["required"] = []
                 merged_schema["function"]["parameters"]["required"].append(key)
+
+        self._extended_json_schema_cache = (self.extended_model, merged_schema)
         return merged_schema
@@ -25,6 +25,12 @@ class ToolResponse:
     is_last: bool = True
     """Whether this is the last response in a stream tool execution."""
 
+    is_delta: bool = False
+    """Whether the content only contains the output generated since the
+    previous chunk in a stream tool execution. The delta chunks are
+    accumulated by the toolkit, which yields the accumulated response as the
+    last chunk."""
+
     is_interrupted: bool = False
     """Whether the tool execution is interrupted."""
 
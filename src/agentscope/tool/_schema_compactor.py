@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""The compactor that shrinks the tool JSON schemas to save prompt
+tokens."""
+import json
+import re
+from copy import deepcopy
+from typing import Any
+
+from ..token import TokenCounterBase
+
+_DEFS_PREFIX = "#/$defs/"
+
+
+class SchemaCompactor:
+    """The compactor that removes the redundant parts of the tool JSON
+    schemas generated from the docstrings and pydantic models, including
+
+    - the `null` branches of the optional arguments and `"default": null`,
+    - the trivial `anyOf` with a single branch,
+    - the long descriptions exceeding the token budget, and
+    - the unused, duplicated and single-use `$defs`.
+
+    Example:
+        .. code-block:: python
+
+            toolkit.set_schema_compactor(
+                ["basic", "browser"],
+                SchemaCompactor(max_description_tokens=64),
+            )
+            report = await toolkit.get_schema_compaction_report(
+                OpenAITokenCounter("gpt-4o"),
+            )
+    """
+
+    def __init__(
+        self,
+        strip_nulls: bool = True,
+        collapse_any_of: bool = True,
+        max_description_tokens: int | None = 128,
+        dedupe_defs: bool = True,
+        chars_per_token: float = 4.0,
+    ) -> None:
+        """Initialize the schema compactor.
+
+        Args:
+            strip_nulls (`bool`, defaults to `True`):
+                Whether to remove the `null` branches in `anyOf` and the
+                `"default": null` of the optional arguments.
+            collapse_any_of (`bool`, defaults to `True`):
+                Whether to replace the `anyOf` with a single branch by the
+                branch itself.
+            max_description_tokens (`int | None`, defaults to `128`):
+                The token budget of each description, the longer ones are
+                truncated at a word boundary. If `None`, the descriptions
+                are kept as they are.
+            dedupe_defs (`bool`, defaults to `True`):
+                Whether to remove the unused `$defs`, merge the identical
+                ones and inline the ones referenced only once.
+            chars_per_token (`float`, defaults to `4.0`):
+                The estimated number of characters per token, used to
+                truncate the descriptions without calling the tokenizer.
+        """
+        self.strip_nulls = strip_nulls
+        self.collapse_any_of = collapse_any_of
+        self.max_description_tokens = max_description_tokens
+        self.dedupe_defs = dedupe_defs
+        self.chars_per_token = chars_per_token
+
+    def compact(self, json_schema: dict) -> dict:
+        """Compact the tool JSON schema without modifying the input.
+
+        Args:
+            json_schema (`dict`):
+                The tool JSON schema, i.e. `{"type": "function", "function":
+                {...}}`.
+
+        Returns:
+            `dict`:
+                The compacted tool JSON schema.
+        """
+        json_schema = deepcopy(json_schema)
+        function = json_schema["function"]
+
+        if isinstance(function.get("description"), str):
+            function["description"] = self._truncate(function["description"])
+
+        parameters = function.get("parameters")
+        if isinstance(parameters, dict):
+            if self.dedupe_defs:
+                self._dedupe_defs(parameters)
+            function["parameters"] = self._compact_node(parameters)
+
+        return json_schema
+
+    async def report(
+        self,
+        json_schemas: list[dict],
+        token_counter: TokenCounterBase,
+    ) -> list[dict]:
+        """Measure the tokens saved by compacting each tool JSON schema,
+        where the tokens of a schema are counted by the token counter with
+        the serialized schema as the message content.
+
+        Args:
+            json_schemas (`list[dict]`):
+                The original tool JSON schemas.
+            token_counter (`TokenCounterBase`):
+                The token counter of the used model.
+
+        Returns:
+            `list[dict]`:
+                The report of each tool, containing the `name`,
+                `original_tokens`, `compacted_tokens` and `saved_tokens`.
+        """
+        overhead = await token_counter.count(
+            [{"role": "user", "content": ""}],
+        )
+
+        async def count(json_schema: dict) -> int:
+            content = json.dumps(json_schema, ensure_ascii=False)
+            tokens = await token_counter.count(
+                [{"role": "user", "content": content}],
+            )
+            return tokens - overhead
+
+        report = []
+        for json_schema in json_schemas:
+            original_tokens = await count(json_schema)
+            compacted_tokens = await count(self.compact(json_schema))
+            report.append(
+                {
+                    "name": json_schema["function"]["name"],
+                    "original_tokens": original_tokens,
+                    "compacted_tokens": compacted_tokens,
+                    "saved_tokens": original_tokens - compacted_tokens,
+                },
+            )
+        return report
+
+    def _compact_node(self, node: Any) -> Any:
+        """Compact the schema node recursively."""
+        if isinstance(node, list):
+            return [self._compact_node(_) for _ in node]
+
+        if not isinstance(node, dict):
+            return node
+
+        node = {key: self._compact_node(value) for key, value in node.items()}
+
+        if self.strip_nulls:
+            any_of = node.get("anyOf")
+            if isinstance(any_of, list) and len(any_of) > 1:
+                non_null = [_ for _ in any_of if _ != {"type": "null"}]
+                if non_null:
+                    node["anyOf"] = non_null
+
+            if isinstance(node.get("type"), list) and len(node["type"]) > 1:
+                types = [_ for _ in node["type"] if _ != "null"]
+                node["type"] = types[0] if len(types) == 1 else types
+
+            if "default" in node and node["default"] is None:
+                node.pop("default")
+
+        if self.collapse_any_of:
+            any_of = node.get("anyOf")
+            if (
+                isinstance(any_of, list)
+                and len(any_of) == 1
+                and isinstance(any_of[0], dict)
+            ):
+                node.pop("anyOf")
+                node = {**any_of[0], **node}
+
+        if isinstance(node.get("description"), str):
+            node["description"] = self._truncate(node["description"])
+
+        return node
+
+    def _truncate(self, description: str) -> str:
+        """Truncate the description to the token budget at a word
+        boundary."""
+        if self.max_description_tokens is None:
+            return description
+
+        max_chars = int(self.max_description_tokens * self.chars_per_token)
+        if len(description) <= max_chars:
+            return description
+
+        truncated = description[:max_chars]
+        if " " in truncated:
+            truncated = truncated.rsplit(" ", 1)[0]
+        return truncated.rstrip(" ,;:") + "..."
+
+    def _dedupe_defs(self, parameters: dict) -> None:
+        """Merge the identical `$defs`, inline the ones referenced only once
+        and remove the unused ones in place."""
+        defs = parameters.get("$defs")
+        if not isinstance(defs, dict):
+            return
+
+        # Merge the identical definitions
+        canonical: dict[str, str] = {}
+        renamed: dict[str, str] = {}
+        for name, definition in defs.items():
+            key = json.dumps(definition, sort_keys=True)
+            if key in canonical:
+                renamed[name] = canonical[key]
+            else:
+                canonical[key] = name
+
+        if renamed:
+            for name in renamed:
+                defs.pop(name)
+            _rewrite_refs(parameters, renamed)
+
+        # Inline the non-recursive definitions referenced only once, and
+        # remove the unused ones, until nothing changes
+        changed = True
+        while changed:
+            changed = False
+            counts = _count_refs(parameters)
+            for name in list(defs):
+                definition = defs[name]
+                if counts.get(name, 0) == 0:
+                    defs.pop(name)
+                    changed = True
+                elif counts[name] == 1 and name not in _count_refs(
+                    definition,
+                ):
+                    defs.pop(name)
+                    _inline_ref(parameters, name, definition)
+                    changed = True
+
+                if changed:
+                    break
+
+        if not defs:
+            parameters.pop("$defs")
+
+
+def _count_refs(node: Any) -> dict[str, int]:
+    """Count the references to each definition."""
+    text = json.dumps(node)
+    counts: dict[str, int] = {}
+    for name in re.findall(r'"\$ref": "#/\$defs/([^"]+)"', text):
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def _rewrite_refs(node: Any, renamed: dict[str, str]) -> None:
+    """Point the references to the renamed definitions in place."""
+    if isinstance(node, list):
+        for item in node:
+            _rewrite_refs(item, renamed)
+
+    elif isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith(_DEFS_PREFIX):
+            name = ref[len(_DEFS_PREFIX) :]
+            if name in renamed:
+                node["$ref"] = _DEFS_PREFIX + renamed[name]
+
+        for value in node.values():
+            _rewrite_refs(value, renamed)
+
+
+def _inline_ref(node: Any, name: str, definition: dict) -> None:
+    """Replace the reference to the definition by the definition itself
+    in place."""
+    if isinstance(node, list):
+        for item in node:
+            _inline_ref(item, name, definition)
+
+    elif isinstance(node, dict):
+        if node.get("$ref") == _DEFS_PREFIX + name:
+            node.pop("$ref")
+            # The sibling keywords (e.g. description) take precedence
+            for key, value in deepcopy(definition).items():
+                node.setdefault(key, value)
+
+        for value in node.values():
+            _inline_ref(value, name, definition)
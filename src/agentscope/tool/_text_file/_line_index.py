@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""The line-offset index of the text files, which allows reading a range of
+lines by seeking to its byte offsets instead of reading the whole file."""
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+# The number of bytes scanned at a time when building the index
+_SCAN_SIZE = 64 * 1024 * 1024
+
+# The maximum number of the cached indices
+_MAX_CACHED_INDICES = 32
+
+
+@dataclass
+class _LineIndex:
+    """The byte offsets of the line starts of a text file, which is valid
+    while the modification time and size of the file are unchanged."""
+
+    mtime_ns: int
+    """The modification time of the indexed file."""
+    size: int
+    """The size of the indexed file in bytes."""
+    starts: np.ndarray
+    """The byte offsets of the line starts, i.e. `0` and the offsets right
+    after each newline (including the one at the end of the file)."""
+
+    @property
+    def n_lines(self) -> int:
+        """The number of lines, counted in the same way as
+        `file.readlines()`."""
+        if self.starts[-1] == self.size:
+            return len(self.starts) - 1
+        return len(self.starts)
+
+    def get_byte_range(self, start: int, end: int) -> tuple[int, int]:
+        """Get the byte range of the lines from `start` to `end` (1-based,
+        inclusive), where `end` is clipped to the number of lines."""
+        end = min(end, self.n_lines)
+        if start > end:
+            return 0, 0
+        stop = int(self.starts[end]) if end < len(self.starts) else self.size
+        return int(self.starts[start - 1]), stop
+
+
+_cache: OrderedDict[str, _LineIndex] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_line_index(file_path: str) -> _LineIndex:
+    """Get the line-offset index of the file, which is rebuilt when the
+    modification time or size of the file changes."""
+    key = os.path.realpath(file_path)
+    stat = os.stat(key)
+
+    with _cache_lock:
+        index = _cache.get(key)
+        if (
+            index is not None
+            and index.mtime_ns == stat.st_mtime_ns
+            and index.size == stat.st_size
+        ):
+            _cache.move_to_end(key)
+            return index
+
+    index = _LineIndex(
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        starts=_scan_line_starts(key, stat.st_size),
+    )
+    _set_line_index(key, index)
+    return index
+
+
+def _set_line_index(file_path: str, index: _LineIndex) -> None:
+    """Cache the line-offset index of the file, e.g. the one updated by
+    the editing tools."""
+    key = os.path.realpath(file_path)
+    with _cache_lock:
+        _cache[key] = index
+        _cache.move_to_end(key)
+        while len(_cache) > _MAX_CACHED_INDICES:
+            _cache.popitem(last=False)
+
+
+def _scan_line_starts(file_path: str, size: int) -> np.ndarray:
+    """Scan the memory-mapped file for the line starts chunk by chunk."""
+    if size == 0:
+        return np.zeros(1, dtype=np.int64)
+
+    chunks = [np.zeros(1, dtype=np.int64)]
+    with open(file_path, "rb") as f, mmap.mmap(
+        f.fileno(),
+        0,
+        access=mmap.ACCESS_READ,
+    ) as mm:
+        for offset in range(0, size, _SCAN_SIZE):
+            data = np.frombuffer(
+                mm,
+                dtype=np.uint8,
+                count=min(_SCAN_SIZE, size - offset),
+                offset=offset,
+            )
+            chunks.append(np.flatnonzero(data == ord("\n")) + offset + 1)
+            # Release the buffer before the mmap is closed
+            del data
+
+    return np.concatenate(chunks)
+
+
+def _read_bytes(file_path: str, begin: int, stop: int) -> bytes:
+    """Read the byte range of the file by the memory map."""
+    if begin >= stop:
+        return b""
+    with open(file_path, "rb") as f, mmap.mmap(
+        f.fileno(),
+        0,
+        access=mmap.ACCESS_READ,
+    ) as mm:
+        return mm[begin:stop]
+
+
+def _decode_lines(data: bytes) -> list[str]:
+    """Decode the bytes into lines with the line endings kept, in the same
+    way as `file.readlines()` in text mode."""
+    text = data.decode("utf-8").replace("\r\n", "\n")
+    lines = [_ + "\n" for _ in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _read_lines(file_path: str, start: int, end: int) -> list[str]:
+    """Read the lines from `start` to `end` (1-based, inclusive) of the
+    file, where `end` is clipped to the number of lines."""
+    index = _get_line_index(file_path)
+    begin, stop = index.get_byte_range(start, end)
+    return _decode_lines(_read_bytes(file_path, begin, stop))
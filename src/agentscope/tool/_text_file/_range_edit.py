@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""The range-editing engine of the text file tools, which replaces a byte
+range of a file atomically by streaming the unchanged prefix and suffix
+into a temporary file, and updates the line-offset index from the edit
+instead of rescanning the file."""
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Callable
+
+import numpy as np
+
+from ._line_index import _LineIndex, _get_line_index, _set_line_index
+
+# The number of bytes copied at a time
+_COPY_SIZE = 1024 * 1024
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, begin: int, stop: int) -> None:
+    """Copy the byte range of the source file into the destination file
+    chunk by chunk."""
+    src.seek(begin)
+    remaining = stop - begin
+    while remaining > 0:
+        data = src.read(min(_COPY_SIZE, remaining))
+        if not data:
+            break
+        dst.write(data)
+        remaining -= len(data)
+
+
+def _replace_file(target: str, write: Callable[[BinaryIO], object]) -> None:
+    """Write the new content of the file into a temporary file next to it
+    by the given function, and move it over the file by `os.replace`, so
+    that the file is never left partially written."""
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(target),
+        prefix=f".{os.path.basename(target)}.",
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            write(dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copymode(target, temp_path)
+        os.replace(temp_path, target)
+
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _update_line_index(target: str, starts: np.ndarray) -> _LineIndex:
+    """Cache the line-offset index of the edited file."""
+    stat = os.stat(target)
+    index = _LineIndex(
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        starts=starts,
+    )
+    _set_line_index(target, index)
+    return index
+
+
+def _get_line_ends(data: bytes, offset: int = 0) -> np.ndarray:
+    """Get the offsets right after the newlines in the data."""
+    newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+    return newlines + offset + 1
+
+
+def _replace_byte_range(
+    file_path: str,
+    begin: int,
+    stop: int,
+    data: bytes,
+) -> _LineIndex:
+    """Replace the bytes from `begin` to `stop` (exclusive) of the file with
+    the given data atomically.
+
+    Args:
+        file_path (`str`):
+            The target file path.
+        begin (`int`):
+            The byte offset where the replaced range begins.
+        stop (`int`):
+            The byte offset where the replaced range stops.
+        data (`bytes`):
+            The new bytes of the range.
+
+    Returns:
+        `_LineIndex`:
+            The line-offset index of the edited file.
+    """
+    # Write through the symbolic links instead of replacing them
+    target = os.path.realpath(file_path)
+    index = _get_line_index(target)
+
+    def write(dst: BinaryIO) -> None:
+        with open(target, "rb") as src:
+            _copy_range(src, dst, 0, begin)
+            dst.write(data)
+            _copy_range(src, dst, stop, index.size)
+
+    _replace_file(target, write)
+
+    # The line starts up to the range and after it are unchanged except
+    # for the shift, and the ones in between come from the new data
+    delta = len(data) - (stop - begin)
+    return _update_line_index(
+        target,
+        np.concatenate(
+            [
+                index.starts[index.starts <= begin],
+                _get_line_ends(data, begin),
+                index.starts[index.starts > stop] + delta,
+            ],
+        ),
+    )
+
+
+def _overwrite_file(file_path: str, data: bytes) -> _LineIndex:
+    """Overwrite the file with the given data atomically, without scanning
+    the original file.
+
+    Args:
+        file_path (`str`):
+            The target file path.
+        data (`bytes`):
+            The new content of the file.
+
+    Returns:
+        `_LineIndex`:
+            The line-offset index of the overwritten file.
+    """
+    target = os.path.realpath(file_path)
+    _replace_file(target, lambda dst: dst.write(data))
+    return _update_line_index(
+        target,
+        np.concatenate([np.zeros(1, dtype=np.int64), _get_line_ends(data)]),
+    )
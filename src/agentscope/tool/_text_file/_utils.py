@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 """The utility functions for text file tools in agentscope."""
+from ._line_index import _decode_lines, _get_line_index, _read_lines
 from ...exception import ToolInvalidArgumentsError
 
 
@@ -47,7 +48,8 @@ def _assert_ranges(
         and all(isinstance(i, int) for i in ranges)
     ):
         start, end = ranges
-        if start > end:
+        # The negative line numbers count from the end of the file
+        if (start < 0) == (end < 0) and start > end:
             raise ToolInvalidArgumentsError(
                 f"InvalidArgumentError: The start line is greater than the "
                 f"end line in the given range {ranges}.",
@@ -63,26 +65,36 @@ def _view_text_file(
     file_path: str,
     ranges: list[int] | None = None,
 ) -> str:
-    """Return the file content in the specified range with line numbers."""
-    with open(file_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
-
-    if ranges:
-        _assert_ranges(ranges)
-        start, end = ranges
+    """Return the file content in the specified range with line numbers.
+    The range is read by seeking to its byte offsets in the line-offset
+    index of the file, and the negative line numbers count from the end."""
+    if not ranges:
+        with open(file_path, "rb") as file:
+            lines = _decode_lines(file.read())
+        return "".join(
+            f"{index + 1}: {line}" for index, line in enumerate(lines)
+        )
 
-        if start > len(lines):
-            raise ToolInvalidArgumentsError(
-                f"InvalidArgumentError: The range '{ranges}' is out of bounds "
-                f"for the file '{file_path}', which has only {len(lines)} "
-                f"lines.",
-            )
+    _assert_ranges(ranges)
+    n_lines = _get_line_index(file_path).n_lines
+    start, end = (n_lines + 1 + _ if _ < 0 else _ for _ in ranges)
+    start = max(start, 1)
 
-        view_content = [
-            f"{index + start}: {line}"
-            for index, line in enumerate(lines[start - 1 : end])
-        ]
+    if start > n_lines:
+        raise ToolInvalidArgumentsError(
+            f"InvalidArgumentError: The range '{ranges}' is out of bounds "
+            f"for the file '{file_path}', which has only {n_lines} "
+            f"lines.",
+        )
 
-        return "".join(view_content)
+    if start > end:
+        raise ToolInvalidArgumentsError(
+            f"InvalidArgumentError: The start line is greater than the "
+            f"end line in the given range {ranges}, i.e. [{start}, {end}] "
+            f"for the file '{file_path}' with {n_lines} lines.",
+        )
 
-    return "".join(f"{index + 1}: {line}" for index, line in enumerate(lines))
+    return "".join(
+        f"{index + start}: {line}"
+        for index, line in enumerate(_read_lines(file_path, start, end))
+    )
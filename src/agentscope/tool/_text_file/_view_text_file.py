@@ -2,6 +2,7 @@
 # flake8: noqa: E501
 # pylint: disable=line-too-long
 """The view text file tool in agentscope."""
+import asyncio
 import os
 
 from ._write_text_file import _view_text_file
@@ -46,7 +47,8 @@ async def view_text_file(
         )
 
     try:
-        content = _view_text_file(file_path, ranges)
+        # Keep the file I/O off the event loop
+        content = await asyncio.to_thread(_view_text_file, file_path, ranges)
     except ToolInvalidArgumentsError as e:
         return ToolResponse(
             content=[
@@ -2,8 +2,11 @@
 # flake8: noqa: E501
 # pylint: disable=line-too-long
 """The text file tools in agentscope."""
+import asyncio
 import os
 
+from ._line_index import _get_line_index, _read_lines
+from ._range_edit import _overwrite_file, _replace_byte_range
 from ._utils import _calculate_view_ranges, _view_text_file
 from .._response import ToolResponse
 from ...message import TextBlock
@@ -54,17 +57,13 @@ async def insert_text_file(
             ],
         )
 
-    with open(file_path, "r", encoding="utf-8") as file:
-        original_lines = file.readlines()
+    # Keep the file I/O off the event loop
+    index = await asyncio.to_thread(_get_line_index, file_path)
 
-    if line_number == len(original_lines) + 1:
-        new_lines = original_lines + ["\n" + content]
-    elif line_number < len(original_lines) + 1:
-        new_lines = (
-            original_lines[: line_number - 1]
-            + [content + "\n"]
-            + original_lines[line_number - 1 :]
-        )
+    if line_number == index.n_lines + 1:
+        offset, data = index.size, "\n" + content
+    elif line_number < index.n_lines + 1:
+        offset, data = int(index.starts[line_number - 1]), content + "\n"
     else:
         return ToolResponse(
             content=[
@@ -72,26 +71,32 @@ async def insert_text_file(
                     type="text",
                     text="InvalidArgumentsError: The given line_number "
                     f"({line_number}) is not in the valid range "
-                    f"[1, {len(original_lines) + 1}].",
+                    f"[1, {index.n_lines + 1}].",
                 ),
             ],
         )
 
-    with open(file_path, "w", encoding="utf-8") as file:
-        file.writelines(new_lines)
-
-    with open(file_path, "r", encoding="utf-8") as file:
-        new_lines = file.readlines()
+    new_index = await asyncio.to_thread(
+        _replace_byte_range,
+        file_path,
+        offset,
+        offset,
+        data.encode("utf-8"),
+    )
 
     start, end = _calculate_view_ranges(
-        len(original_lines),
-        len(new_lines),
+        index.n_lines,
+        new_index.n_lines,
         line_number,
         line_number,
         extra_view_n_lines=5,
     )
 
-    show_content = _view_text_file(file_path, [start, end])
+    show_content = await asyncio.to_thread(
+        _view_text_file,
+        file_path,
+        [start, end],
+    )
 
     return ToolResponse(
         content=[
@@ -152,9 +157,6 @@ async def write_text_file(
             ],
         )
 
-    with open(file_path, "r", encoding="utf-8") as file:
-        original_lines = file.readlines()
-
     if ranges is not None:
         if (
             isinstance(ranges, list)
@@ -163,47 +165,49 @@ async def write_text_file(
         ):
             # Replace content in the specified range
             start, end = ranges
-            if start > len(original_lines):
+            # Keep the file I/O off the event loop
+            index = await asyncio.to_thread(_get_line_index, file_path)
+            if start < 1 or start > index.n_lines:
                 return ToolResponse(
                     content=[
                         TextBlock(
                             type="text",
                             text=f"Error: The start line {start} is invalid. "
-                            f"The file only has {len(original_lines)} "
+                            f"The file only has {index.n_lines} "
                             f"lines.",
                         ),
                     ],
                 )
 
-            new_content = (
-                original_lines[: start - 1]
-                + [
-                    content,
-                ]
-                + original_lines[end:]
+            # Only the replaced lines are rewritten, and the unchanged
+            # bytes before and after them are copied as they are
+            begin = int(index.starts[start - 1])
+            stop = max(index.get_byte_range(start, end)[1], begin)
+            new_index = await asyncio.to_thread(
+                _replace_byte_range,
+                file_path,
+                begin,
+                stop,
+                content.encode("utf-8"),
             )
 
-            with open(file_path, "w", encoding="utf-8") as file:
-                file.write("".join(new_content))
-
-            # The written content may contain multiple "\n", to avoid mis
-            # counting the lines, we read the file again to get the new content
-            with open(file_path, "r", encoding="utf-8") as file:
-                new_lines = file.readlines()
-
             view_start, view_end = _calculate_view_ranges(
-                len(original_lines),
-                len(new_lines),
+                index.n_lines,
+                new_index.n_lines,
                 start,
                 end,
             )
+            new_lines = await asyncio.to_thread(
+                _read_lines,
+                file_path,
+                view_start,
+                view_end,
+            )
 
             content = "".join(
                 [
                     f"{index + view_start}: {line}"
-                    for index, line in enumerate(
-                        new_lines[view_start - 1 : view_end],
-                    )
+                    for index, line in enumerate(new_lines)
                 ],
             )
 
@@ -229,8 +233,11 @@ async def write_text_file(
                 ],
             )
 
-    with open(file_path, "w", encoding="utf-8") as file:
-        file.write(content)
+    await asyncio.to_thread(
+        _overwrite_file,
+        file_path,
+        content.encode("utf-8"),
+    )
 
     return ToolResponse(
         content=[
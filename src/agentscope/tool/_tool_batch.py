@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""The batch of calls to a batchable tool function."""
+import asyncio
+from typing import Awaitable, Callable
+
+from ._response import ToolResponse
+from ..message import ToolUseBlock
+
+
+class _ToolBatch:
+    """The calls to a batchable tool function collected within one
+    reasoning step, which are executed by one invocation of the batch
+    function when the first of them is called, and fanned out to the
+    individual calls."""
+
+    def __init__(
+        self,
+        tool_calls: list[ToolUseBlock],
+        kwargs_list: list[dict],
+        execute: Callable[[list[dict]], Awaitable[list[ToolResponse]]],
+    ) -> None:
+        """Initialize the batch.
+
+        Args:
+            tool_calls (`list[ToolUseBlock]`):
+                The tool calls in the batch.
+            kwargs_list (`list[dict]`):
+                The keyword arguments of the tool calls, including the
+                preset ones.
+            execute (`Callable[[list[dict]], Awaitable[list[ToolResponse]]]`):
+                The function executing the batch function with the keyword
+                arguments, and returning the responses in the same order.
+        """
+        self.indices = {_["id"]: i for i, _ in enumerate(tool_calls)}
+        self.kwargs_list = kwargs_list
+        self._execute = execute
+        self._task: asyncio.Future | None = None
+
+    def contains(self, tool_call_id: str, kwargs: dict) -> bool:
+        """If the tool call is in the batch with the same arguments, which
+        may be modified (e.g. by the hooks) after it's collected."""
+        index = self.indices.get(tool_call_id)
+        return index is not None and self.kwargs_list[index] == kwargs
+
+    async def get_response(self, tool_call_id: str) -> ToolResponse:
+        """Get the response of the tool call, executing the whole batch if
+        it's not started yet."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(
+                self._execute(self.kwargs_list),
+            )
+        # Interrupting one call doesn't cancel the others in the batch
+        responses = await asyncio.shield(self._task)
+        return responses[self.indices[tool_call_id]]
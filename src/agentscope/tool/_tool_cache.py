@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""The result cache for the idempotent tool functions."""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from ._response import ToolResponse
+from .._logging import logger
+
+
+@dataclass
+class _ToolCacheEntry:
+    """A cached tool result."""
+
+    tool_name: str
+    """The name of the tool function."""
+
+    response: dict
+    """The final tool response without its id."""
+
+    expire_at: float | None = None
+    """The timestamp when the entry expires, `None` means never."""
+
+    resources: list[str] = field(default_factory=list)
+    """The resources read by the tool call, used for invalidation."""
+
+    @property
+    def expired(self) -> bool:
+        """If the entry is expired."""
+        return self.expire_at is not None and self.expire_at <= time.time()
+
+
+class ToolResultCache:
+    """The bounded LRU cache that stores the final `ToolResponse` of the
+    cacheable tool functions, keyed by the tool name and the canonicalized
+    arguments. If `cache_dir` is given, the entries are also persisted as
+    JSON files, so that they can be reused across sessions.
+
+    The cached entries are tagged with the resources (e.g. the file paths)
+    they read, and can be invalidated by tool name or resource, e.g. when
+    a write tool touches the same file.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        cache_dir: str | None = None,
+    ) -> None:
+        """Initialize the tool result cache.
+
+        Args:
+            max_size (`int`, defaults to `1024`):
+                The maximum number of cached entries, the least recently
+                used ones are evicted when exceeded.
+            cache_dir (`str | None`, optional):
+                The directory to persist the entries. If `None`, the
+                entries are only kept in memory.
+        """
+        self.max_size = max_size
+        self.cache_dir = os.path.abspath(cache_dir) if cache_dir else None
+
+        self.version = 0
+        """The version increased by each invalidation, used to avoid caching
+        the results computed before the invalidation."""
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[str, _ToolCacheEntry] = OrderedDict()
+        self._load_cache_dir()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def get_key(tool_name: str, kwargs: dict[str, Any]) -> str | None:
+        """Get the cache key of a tool call from the tool name and the
+        keyword arguments (including the preset ones).
+
+        Args:
+            tool_name (`str`):
+                The name of the tool function.
+            kwargs (`dict[str, Any]`):
+                The canonicalized keyword arguments of the tool call.
+
+        Returns:
+            `str | None`:
+                The cache key, or `None` if the arguments are not JSON
+                serializable, so that the call is not cacheable.
+        """
+        try:
+            json_str = json.dumps(
+                {"name": tool_name, "kwargs": kwargs},
+                sort_keys=True,
+                ensure_ascii=False,
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(json_str.encode("utf-8")).hexdigest()
+
+    async def retrieve(self, key: str) -> ToolResponse | None:
+        """Retrieve the cached tool response by the key, return `None` if
+        not found or expired.
+
+        Args:
+            key (`str`):
+                The cache key obtained by `get_key`.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.expired:
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        # Keep the recency order of the persisted entries
+        if self.cache_dir:
+            path_file = os.path.join(self.cache_dir, f"{key}.json")
+            if os.path.exists(path_file):
+                os.utime(path_file)
+
+        return ToolResponse(**json.loads(json.dumps(entry.response)))
+
+    async def store(
+        self,
+        key: str,
+        tool_name: str,
+        response: ToolResponse,
+        ttl: float | None = None,
+        resources: list[str] | None = None,
+    ) -> None:
+        """Store the final tool response.
+
+        Args:
+            key (`str`):
+                The cache key obtained by `get_key`.
+            tool_name (`str`):
+                The name of the tool function.
+            response (`ToolResponse`):
+                The final tool response.
+            ttl (`float | None`, optional):
+                The time-to-live in seconds. If `None`, the entry never
+                expires.
+            resources (`list[str] | None`, optional):
+                The resources read by the tool call, which are normalized
+                as the file paths, e.g. `./a.txt` and `a.txt` are the same.
+        """
+        data = asdict(response)
+        data.pop("id")
+        data["is_last"] = True
+
+        entry = _ToolCacheEntry(
+            tool_name=tool_name,
+            response=data,
+            expire_at=None if ttl is None else time.time() + ttl,
+            resources=_normalize_resources(resources),
+        )
+        try:
+            json_str = json.dumps(asdict(entry), ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(
+                "Skip caching the response of %s, which is not JSON "
+                "serializable: %s",
+                tool_name,
+                e,
+            )
+            return
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        if self.cache_dir:
+            path_file = os.path.join(self.cache_dir, f"{key}.json")
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(path_file, "w", encoding="utf-8") as f:
+                    f.write(json_str)
+            except OSError as e:
+                logger.warning(
+                    "Failed to persist the tool cache file %s: %s",
+                    path_file,
+                    e,
+                )
+                if os.path.exists(path_file):
+                    os.remove(path_file)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate(
+        self,
+        tool_name: str | None = None,
+        resources: list[str] | None = None,
+    ) -> int:
+        """Remove the entries of the given tool function, or the ones that
+        read any of the given resources.
+
+        Args:
+            tool_name (`str | None`, optional):
+                The name of the tool function.
+            resources (`list[str] | None`, optional):
+                The resources, e.g. the file paths modified by a write
+                tool, which are normalized in the same way as `store`.
+
+        Returns:
+            `int`:
+                The number of removed entries.
+        """
+        self.version += 1
+        resources = set(_normalize_resources(resources))
+        keys = [
+            key
+            for key, entry in self._entries.items()
+            if entry.tool_name == tool_name
+            or not resources.isdisjoint(entry.resources)
+        ]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    async def clear(self) -> None:
+        """Clear all the cached entries."""
+        self.version += 1
+        for key in list(self._entries):
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        """Remove the entry from the memory and the disk."""
+        self._entries.pop(key, None)
+        if self.cache_dir:
+            path_file = os.path.join(self.cache_dir, f"{key}.json")
+            if os.path.exists(path_file):
+                os.remove(path_file)
+
+    def _load_cache_dir(self) -> None:
+        """Load the persisted entries from the oldest to the newest."""
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+
+        files = sorted(
+            (
+                _
+                for _ in os.scandir(self.cache_dir)
+                if _.is_file() and _.name.endswith(".json")
+            ),
+            key=lambda _: _.stat().st_mtime,
+        )
+        for file in files:
+            key = file.name[: -len(".json")]
+            try:
+                with open(file.path, "r", encoding="utf-8") as f:
+                    self._entries[key] = _ToolCacheEntry(**json.load(f))
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(
+                    "Skip the invalid tool cache file %s: %s",
+                    file.path,
+                    e,
+                )
+                continue
+
+            if self._entries[key].expired:
+                self._remove(key)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+
+def _normalize_resources(resources: list[str] | None) -> list[str]:
+    """Normalize the resources as the file paths, so that the different
+    spellings of the same file match."""
+    return [os.path.realpath(_) for _ in resources or []]
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""The embedding-based tool retriever, which selects the relevant tool
+functions for the current context."""
+import numpy as np
+
+from ..embedding import EmbeddingModelBase
+
+
+class ToolRetriever:
+    """The tool retriever that embeds the name and description of each tool
+    function once, and selects the top-k relevant tool functions for the
+    given query by a vectorized cosine similarity search, so that only the
+    relevant JSON schemas are sent to the LLM.
+
+    Example:
+        .. code-block:: python
+
+            toolkit = Toolkit(
+                tool_retriever=ToolRetriever(
+                    embedding_model=OpenAITextEmbedding(
+                        api_key="xxx",
+                        model_name="text-embedding-3-small",
+                        embedding_cache=FileEmbeddingCache(),
+                    ),
+                    top_k=10,
+                ),
+            )
+            schemas = await toolkit.get_relevant_json_schemas(
+                "What's the weather in Hangzhou?",
+            )
+    """
+
+    def __init__(
+        self,
+        embedding_model: EmbeddingModelBase,
+        top_k: int = 10,
+        pinned_tools: list[str] | None = None,
+    ) -> None:
+        """Initialize the tool retriever.
+
+        Args:
+            embedding_model (`EmbeddingModelBase`):
+                The embedding model used to embed the tool descriptions and
+                the queries. Setting an embedding cache for it avoids
+                re-embedding the tools across sessions.
+            top_k (`int`, defaults to `10`):
+                The number of the retrieved tool functions, excluding the
+                pinned ones.
+            pinned_tools (`list[str] | None`, optional):
+                The names of the tool functions that are always included.
+        """
+        self.embedding_model = embedding_model
+        self.top_k = top_k
+        self.pinned_tools = pinned_tools or []
+
+        # The normalized embeddings of the tool functions, keyed by the
+        # tool name, together with the embedded text
+        self._tool_embeddings: dict[str, tuple[str, np.ndarray]] = {}
+        # The stacked embedding matrix of the last candidate tools
+        self._matrix: tuple[tuple[str, ...], np.ndarray] | None = None
+        self._last_query: tuple[str, np.ndarray] | None = None
+
+    async def retrieve(
+        self,
+        json_schemas: list[dict],
+        query: str,
+        pinned_tools: list[str] | None = None,
+    ) -> list[dict]:
+        """Select the relevant JSON schemas for the query, keeping their
+        original order.
+
+        Args:
+            json_schemas (`list[dict]`):
+                The JSON schemas of the candidate tool functions.
+            query (`str`):
+                The query, e.g. the text of the recent messages.
+            pinned_tools (`list[str] | None`, optional):
+                The names of the tool functions that are always included in
+                addition to the pinned tools of the retriever, e.g. the
+                finish function of the agent.
+
+        Returns:
+            `list[dict]`:
+                The JSON schemas of the pinned and the top-k relevant tool
+                functions.
+        """
+        pinned = set(self.pinned_tools + (pinned_tools or []))
+        candidates = [
+            _ for _ in json_schemas if _["function"]["name"] not in pinned
+        ]
+        if len(candidates) <= self.top_k or not query:
+            return json_schemas
+
+        matrix = await self._get_matrix(candidates)
+        similarities = matrix @ await self._embed_query(query)
+        selected = {
+            candidates[_]["function"]["name"]
+            for _ in np.argpartition(-similarities, self.top_k - 1)[
+                : self.top_k
+            ]
+        }
+
+        return [
+            _
+            for _ in json_schemas
+            if _["function"]["name"] in pinned
+            or _["function"]["name"] in selected
+        ]
+
+    async def _get_matrix(self, json_schemas: list[dict]) -> np.ndarray:
+        """Get the embedding matrix of the tool functions, only the new or
+        changed tool functions are embedded."""
+        texts = {
+            _["function"]["name"]: self._get_tool_text(_) for _ in json_schemas
+        }
+        names = tuple(texts)
+        if (
+            self._matrix is not None
+            and self._matrix[0] == names
+            and all(
+                self._tool_embeddings[name][0] == text
+                for name, text in texts.items()
+            )
+        ):
+            return self._matrix[1]
+
+        to_embed = [
+            name
+            for name, text in texts.items()
+            if name not in self._tool_embeddings
+            or self._tool_embeddings[name][0] != text
+        ]
+        if to_embed:
+            res = await self.embedding_model([texts[_] for _ in to_embed])
+            for name, embedding in zip(to_embed, res.embeddings):
+                self._tool_embeddings[name] = (
+                    texts[name],
+                    self._normalize(embedding),
+                )
+
+        matrix = np.stack([self._tool_embeddings[_][1] for _ in names])
+        self._matrix = (names, matrix)
+        return matrix
+
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """Embed the query, reusing the embedding of the last query."""
+        if self._last_query is None or self._last_query[0] != query:
+            res = await self.embedding_model([query])
+            self._last_query = (query, self._normalize(res.embeddings[0]))
+        return self._last_query[1]
+
+    @staticmethod
+    def _get_tool_text(json_schema: dict) -> str:
+        """The text to be embedded for a tool function."""
+        name = json_schema["function"]["name"]
+        description = json_schema["function"].get("description", "")
+        return f"{name}: {description}"
+
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        """Normalize the embedding for the cosine similarity."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
@@ -1,13 +1,21 @@
 # -*- coding: utf-8 -*-
+# pylint: disable=too-many-lines
 """The toolkit class for tool calls in agentscope."""
 
 import asyncio
+import contextvars
 import inspect
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from copy import deepcopy
 from dataclasses import dataclass
 from functools import partial
 from typing import (
     AsyncGenerator,
+    Awaitable,
     Literal,
     Dict,
     Any,
@@ -16,6 +24,7 @@ from typing import (
     Callable,
 )
 
+import mcp
 from pydantic import (
     BaseModel,
     Field,
@@ -26,11 +35,19 @@ from docstring_parser import parse
 
 from ._async_wrapper import (
     _async_generator_wrapper,
+    _CancelMessage,
+    _call_and_drain,
+    _get_cancel_message,
+    _get_interrupted_response,
     _object_wrapper,
     _sync_generator_wrapper,
 )
 from ._registered_tool_function import RegisteredToolFunction
 from ._response import ToolResponse
+from ._schema_compactor import SchemaCompactor
+from ._tool_batch import _ToolBatch
+from ._tool_cache import ToolResultCache
+from ._tool_retriever import ToolRetriever
 from .._utils._common import _remove_title_field
 from ..mcp import (
     MCPToolFunction,
@@ -42,6 +59,7 @@ from ..message import (
     TextBlock,
 )
 from ..module import StateModule
+from ..token import TokenCounterBase
 from ..types import (
     JSONSerializableObject,
     ToolFunction,
@@ -67,7 +85,7 @@ class ToolGroup:
     """The using notes of the tool group, to remind the agent how to use"""
 
 
-class Toolkit(StateModule):
+class Toolkit(StateModule):  # pylint: disable=too-many-public-methods
     """The class that supports both function- and group-level tool management.
 
     Use the following methods to manage the tool functions:
@@ -83,8 +101,9 @@ class Toolkit(StateModule):
 
     MCP related methods:
 
-    - `register_mcp_server`
-    - `remove_mcp_servers`
+    - `register_mcp_client`
+    - `register_mcp_clients`
+    - `remove_mcp_clients`
 
     To run the tool functions or get the data from the activated tools:
 
@@ -93,13 +112,93 @@ class Toolkit(StateModule):
     - `get_tool_group_notes`
     """
 
-    def __init__(self) -> None:
-        """Initialize the toolkit."""
+    def __init__(
+        self,
+        default_execution_mode: Literal[
+            "inline",
+            "thread",
+            "process",
+        ] = "inline",
+        max_thread_workers: int | None = None,
+        max_process_workers: int | None = None,
+        max_pending_calls: int | None = None,
+        max_concurrent_calls: int | None = None,
+        tool_cache: ToolResultCache | None = None,
+        tool_retriever: ToolRetriever | None = None,
+    ) -> None:
+        """Initialize the toolkit.
+
+        Args:
+            default_execution_mode (`Literal["inline", "thread", \
+            "process"]`, defaults to `"inline"`):
+                How the sync tool functions and sync generators are executed
+                by default. `"inline"` runs them directly on the event loop,
+                `"thread"` and `"process"` opt in to running them in a thread
+                pool or a process pool respectively, so that the blocking
+                tools won't freeze the other coroutines. Note the tool
+                functions run in the process pool must be picklable, and
+                their generators are drained in the worker process before
+                being returned.
+            max_thread_workers (`int | None`, optional):
+                The maximum number of workers in the thread pool.
+            max_process_workers (`int | None`, optional):
+                The maximum number of workers in the process pool.
+            max_pending_calls (`int | None`, optional):
+                The maximum number of calls submitted to each pool at the
+                same time, including the queued ones. The excess calls wait
+                on the event loop without blocking it. If `None`, no limit.
+            max_concurrent_calls (`int | None`, optional):
+                The maximum number of tool calls running at the same time
+                across all the tool functions in this toolkit, e.g. when
+                the agent calls multiple tools in parallel. The excess
+                calls wait until a running call finishes. If `None`, no
+                limit.
+            tool_cache (`ToolResultCache | None`, optional):
+                The cache for the responses of the cacheable tool
+                functions. If `None`, an in-memory cache is used.
+            tool_retriever (`ToolRetriever | None`, optional):
+                The retriever used by `get_relevant_json_schemas` to select
+                the tool functions relevant to the current context. If
+                `None`, all the active tool functions are used.
+        """
         super().__init__()
 
         self.tools: dict[str, RegisteredToolFunction] = {}
         self.groups: dict[str, ToolGroup] = {}
 
+        assert default_execution_mode in ["inline", "thread", "process"]
+        self.default_execution_mode = default_execution_mode
+        self.max_thread_workers = max_thread_workers
+        self.max_process_workers = max_process_workers
+        self.max_pending_calls = max_pending_calls
+
+        self._executors: dict[str, Executor] = {}
+        self._pending_semaphores: dict[str, asyncio.Semaphore] = {}
+
+        self.max_concurrent_calls = max_concurrent_calls
+        self._call_semaphore = (
+            None
+            if max_concurrent_calls is None
+            else asyncio.Semaphore(max_concurrent_calls)
+        )
+        self._tool_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._num_queued_calls: dict[str, int] = {}
+        # The batches of the collected tool calls, keyed by the tool call ID
+        self._tool_batches: dict[str, _ToolBatch] = {}
+
+        self.tool_cache = (
+            tool_cache if tool_cache is not None else ToolResultCache()
+        )
+
+        # The JSON schemas of the active tool functions are cached until the
+        # tools, the groups or the extended models change
+        self._schema_version = 0
+        self._active_json_schemas: tuple[int, list[dict]] | None = None
+        self._schema_compactors: dict[str, SchemaCompactor] = {}
+        self._compacted_json_schemas: dict[str, tuple] = {}
+
+        self.tool_retriever = tool_retriever
+
     def create_tool_group(
         self,
         group_name: str,
@@ -134,6 +233,7 @@ class Toolkit(StateModule):
             notes=notes,
             active=active,
         )
+        self._schema_version += 1
 
     def update_tool_groups(self, group_names: list[str], active: bool) -> None:
         """Update the activation status of the given tool groups.
@@ -154,6 +254,8 @@ class Toolkit(StateModule):
             if group_name in self.groups:
                 self.groups[group_name].active = active
 
+        self._schema_version += 1
+
     def remove_tool_groups(self, group_names: list[str]) -> None:
         """Remove tool functions from the toolkit by their group names.
 
@@ -179,6 +281,7 @@ class Toolkit(StateModule):
 
         for group_name in group_names:
             self.groups.pop(group_name, None)
+            self._schema_compactors.pop(group_name, None)
 
         # Remove the tool functions in the given groups
         tool_names = deepcopy(list(self.tools.keys()))
@@ -186,6 +289,8 @@ class Toolkit(StateModule):
             if self.tools[tool_name].group in group_names:
                 self.tools.pop(tool_name)
 
+        self._schema_version += 1
+
     def register_tool_function(  # pylint: disable=too-many-branches
         self,
         tool_func: ToolFunction,
@@ -204,6 +309,19 @@ class Toolkit(StateModule):
             ToolResponse | None,
         ]
         | None = None,
+        execution_mode: Literal["inline", "thread", "process"] | None = None,
+        timeout: float | None = None,
+        max_concurrency: int | None = None,
+        max_queue_size: int | None = None,
+        cacheable: bool = False,
+        cache_ttl: float | None = None,
+        resource_args: list[str] | None = None,
+        batch_func: Callable[
+            [list[dict]],
+            list[ToolResponse] | Awaitable[list[ToolResponse]],
+        ]
+        | None = None,
+        max_batch_size: int | None = None,
     ) -> None:
         """Register a tool function to the toolkit.
 
@@ -245,6 +363,55 @@ class Toolkit(StateModule):
                 result will be returned as is. If it returns a
                 `ToolResponse`, the returned block will be used as the
                 final tool result.
+            execution_mode (`Literal["inline", "thread", "process"] | \
+            None`, optional):
+                How the sync tool function is executed, i.e. on the event
+                loop, in the thread pool or in the process pool. If `None`,
+                the default execution mode of the toolkit is used. It has no
+                effect on the async tool functions.
+            timeout (`float | None`, optional):
+                The maximum seconds of a call, including streaming the
+                response. The timed-out call is cancelled and its response
+                is marked as interrupted. Note the sync tool functions
+                executed inline cannot be cancelled, and the ones in the
+                thread pool keep running in the background. If `None`, no
+                timeout.
+            max_concurrency (`int | None`, optional):
+                The maximum number of concurrent calls of this tool
+                function, the excess calls wait for a free slot. If `None`,
+                no limit.
+            max_queue_size (`int | None`, optional):
+                The maximum number of calls waiting for a free slot when
+                `max_concurrency` is reached, the excess calls are rejected
+                with an error response immediately. If `None`, no limit.
+            cacheable (`bool`, defaults to `False`):
+                If the tool function is idempotent (e.g. read-only), so that
+                its final response is cached in `tool_cache` by the
+                arguments (including the preset ones), and reused by the
+                following calls with the same arguments. The interrupted
+                and failed calls are not cached.
+            cache_ttl (`float | None`, optional):
+                The time-to-live of the cached responses in seconds. If
+                `None`, they never expire.
+            resource_args (`list[str] | None`, optional):
+                The names of the arguments that identify the resources the
+                tool function reads or writes, e.g. `["file_path"]`. The
+                cached responses of a cacheable tool function are tagged
+                with these resources, and calling a non-cacheable (write)
+                tool function invalidates the cached responses tagged with
+                the same resources.
+            batch_func (`Callable[[list[dict]], list[ToolResponse] | \
+            Awaitable[list[ToolResponse]]] | None`, optional):
+                The batch implementation of the tool function, e.g. backed
+                by a bulk API or database query, which takes the list of
+                keyword arguments (including the preset ones) and returns
+                the responses in the same order. The calls to the tool
+                function collected by `batch_tool_calls` are executed by one
+                invocation of it. The sync one is executed in the same way
+                as `execution_mode`.
+            max_batch_size (`int | None`, optional):
+                The maximum number of calls in one batch, the excess calls
+                are split into multiple batches. If `None`, no limit.
         """
         # Arguments checking
         if group_name not in self.groups and group_name != "basic":
@@ -291,63 +458,47 @@ class Toolkit(StateModule):
             func_name = tool_func.func.__name__
             original_func = tool_func.func
             self._validate_tool_function(func_name)
-            json_schema = json_schema or self._parse_tool_function(
-                tool_func.func,
-                include_long_description=include_long_description,
-                include_var_positional=include_var_positional,
-                include_var_keyword=include_var_keyword,
-            )
 
         else:
             # normal function
             func_name = tool_func.__name__
             original_func = tool_func
             self._validate_tool_function(func_name)
-            json_schema = json_schema or self._parse_tool_function(
-                tool_func,
-                include_long_description=include_long_description,
-                include_var_positional=include_var_positional,
-                include_var_keyword=include_var_keyword,
-            )
-
-        # Override the description if provided
-        if func_description:
-            json_schema["function"]["description"] = func_description
-
-        # Remove the preset kwargs from the JSON schema
-        for arg_name in preset_kwargs or {}:
-            if arg_name in json_schema["function"]["parameters"]["properties"]:
-                json_schema["function"]["parameters"]["properties"].pop(
-                    arg_name,
-                )
-
-        if "required" in json_schema["function"]["parameters"]:
-            for arg_name in preset_kwargs or {}:
-                if (
-                    arg_name
-                    in json_schema["function"]["parameters"]["required"]
-                ):
-                    json_schema["function"]["parameters"]["required"].remove(
-                        arg_name,
-                    )
-
-            # Remove the required field if it is empty
-            if len(json_schema["function"]["parameters"]["required"]) == 0:
-                json_schema["function"]["parameters"].pop("required", None)
 
         func_obj = RegisteredToolFunction(
             name=func_name,
             group=group_name,
             source="function",
             original_func=original_func,
-            json_schema=json_schema,
+            # Defer parsing the docstring until the JSON schema is needed
+            json_schema_builder=partial(
+                self._build_json_schema,
+                tool_func=original_func,
+                json_schema=json_schema,
+                func_description=func_description,
+                preset_kwargs=preset_kwargs,
+                include_long_description=include_long_description,
+                include_var_positional=include_var_positional,
+                include_var_keyword=include_var_keyword,
+            ),
             preset_kwargs=preset_kwargs or {},
             extended_model=None,
             mcp_name=mcp_name,
             postprocess_func=postprocess_func,
+            execution_mode=execution_mode,
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+            max_queue_size=max_queue_size,
+            cacheable=cacheable,
+            cache_ttl=cache_ttl,
+            resource_args=resource_args or [],
+            batch_func=batch_func,
+            max_batch_size=max_batch_size,
         )
 
         self.tools[func_name] = func_obj
+        self._tool_semaphores.pop(func_name, None)
+        self._schema_version += 1
 
     def remove_tool_function(self, tool_name: str) -> None:
         """Remove tool function from the toolkit by its name.
@@ -364,6 +515,7 @@ class Toolkit(StateModule):
             )
 
         self.tools.pop(tool_name, None)
+        self._schema_version += 1
 
     def get_json_schemas(
         self,
@@ -372,7 +524,12 @@ class Toolkit(StateModule):
         active groups.
 
         .. note:: The preset keyword arguments is removed from the JSON
-         schema, and the extended model is applied if it is set.
+         schema, and the extended model is applied if it is set. The JSON
+         schemas are cached until the tool functions, the tool groups,
+         the extended models or the schema compactors are changed through
+         the toolkit methods, e.g. `update_tool_groups` instead of setting
+         the `active` field of a group directly. The returned schema dicts
+         are shared with the cache and must be treated as read-only.
 
         Example:
             .. code-block:: JSON
@@ -403,6 +560,12 @@ class Toolkit(StateModule):
             `list[dict]`:
                 A list of function JSON schemas.
         """
+        if (
+            self._active_json_schemas is not None
+            and self._active_json_schemas[0] == self._schema_version
+        ):
+            return list(self._active_json_schemas[1])
+
         # If meta tool is set here, update its extended model here
         if "reset_equipped_tools" in self.tools:
             fields = {}
@@ -422,11 +585,126 @@ class Toolkit(StateModule):
                 extended_model,
             )
 
-        return [
-            tool.extended_json_schema
+        json_schemas = [
+            self._get_compacted_json_schema(tool)
             for tool in self.tools.values()
             if tool.group == "basic" or self.groups[tool.group].active
         ]
+        self._active_json_schemas = (self._schema_version, json_schemas)
+        return list(json_schemas)
+
+    def set_schema_compactor(
+        self,
+        group_names: list[str],
+        compactor: SchemaCompactor | None,
+    ) -> None:
+        """Compact the JSON schemas of the tool functions in the given groups
+        by the compactor, so that fewer prompt tokens are consumed.
+
+        Args:
+            group_names (`list[str]`):
+                The names of the tool groups, including `"basic"`.
+            compactor (`SchemaCompactor | None`):
+                The schema compactor. If `None`, the compaction of the
+                groups is disabled.
+        """
+        for group_name in group_names:
+            if group_name != "basic" and group_name not in self.groups:
+                raise ValueError(f"Tool group '{group_name}' not found.")
+
+            if compactor is None:
+                self._schema_compactors.pop(group_name, None)
+            else:
+                self._schema_compactors[group_name] = compactor
+
+        self._schema_version += 1
+
+    async def get_schema_compaction_report(
+        self,
+        token_counter: TokenCounterBase,
+    ) -> list[dict]:
+        """Report the tokens saved by the schema compaction for each tool
+        function whose group has a compactor.
+
+        Args:
+            token_counter (`TokenCounterBase`):
+                The token counter used to count the tokens of the original
+                and compacted JSON schemas.
+
+        Returns:
+            `list[dict]`:
+                The report of each tool function, containing the `name`,
+                `original_tokens`, `compacted_tokens` and `saved_tokens`.
+        """
+        report = []
+        for group_name, compactor in self._schema_compactors.items():
+            report.extend(
+                await compactor.report(
+                    [
+                        tool.extended_json_schema
+                        for tool in self.tools.values()
+                        if tool.group == group_name
+                    ],
+                    token_counter,
+                ),
+            )
+        return report
+
+    def _get_compacted_json_schema(self, tool: RegisteredToolFunction) -> dict:
+        """Get the JSON schema of the tool function compacted by the
+        compactor of its group, which is cached until the schema or the
+        compactor changes."""
+        json_schema = tool.extended_json_schema
+        compactor = self._schema_compactors.get(tool.group)
+        if compactor is None:
+            return json_schema
+
+        cached = self._compacted_json_schemas.get(tool.name)
+        if (
+            cached is not None
+            and cached[0] is json_schema
+            and cached[1] is compactor
+        ):
+            return cached[2]
+
+        compacted = compactor.compact(json_schema)
+        self._compacted_json_schemas[tool.name] = (
+            json_schema,
+            compactor,
+            compacted,
+        )
+        return compacted
+
+    async def get_relevant_json_schemas(
+        self,
+        query: str,
+        pinned_tools: list[str] | None = None,
+    ) -> list[dict]:
+        """Get the JSON schemas of the active tool functions relevant to the
+        query by the tool retriever. If no tool retriever is set, all the
+        active JSON schemas are returned.
+
+        Args:
+            query (`str`):
+                The query to retrieve the tool functions, e.g. the text of
+                the recent messages.
+            pinned_tools (`list[str] | None`, optional):
+                The names of the tool functions that are always included,
+                e.g. the finish function of the agent.
+
+        Returns:
+            `list[dict]`:
+                A list of function JSON schemas.
+        """
+        json_schemas = self.get_json_schemas()
+        if self.tool_retriever is None:
+            return json_schemas
+
+        return await self.tool_retriever.retrieve(
+            json_schemas,
+            query,
+            pinned_tools=pinned_tools,
+        )
 
     def set_extended_model(
         self,
@@ -450,6 +728,7 @@ class Toolkit(StateModule):
 
         if func_name in self.tools:
             self.tools[func_name].extended_model = model
+            self._schema_version += 1
 
         else:
             raise ValueError(
@@ -485,6 +764,8 @@ class Toolkit(StateModule):
                 self.tools.pop(func_name)
                 to_removed.append(func_name)
 
+        self._schema_version += 1
+
         logger.info(
             "Removed %d tool functions from %d MCP: %s",
             len(to_removed),
@@ -501,7 +782,14 @@ class Toolkit(StateModule):
         tool response chunk in unified streaming mode, i.e. an async
         generator of `ToolResponse` objects.
 
-        .. note:: The tool response chunk is **accumulated**.
+        .. note:: The tool response chunk is **accumulated**, except the
+         delta chunks (with `is_delta=True`) yielded by the tool functions
+         that opt in to the delta streaming. The delta chunks are forwarded
+         as they are, followed by the accumulated response as the last
+         chunk, and the postprocess function is only applied to the
+         accumulated response. The error responses, e.g. when the tool
+         function is not found or raises an exception, carry
+         `{"success": False}` in their metadata.
 
         Args:
             tool_call (`ToolUseBlock`):
@@ -523,16 +811,210 @@ class Toolkit(StateModule):
                             f"function named {tool_call['name']}",
                         ),
                     ],
+                    metadata={"success": False},
                 ),
                 None,
             )
 
-        # Prepare function and keyword arguments
         tool_func = self.tools[tool_call["name"]]
-        kwargs = {
-            **tool_func.preset_kwargs,
-            **(tool_call.get("input", {}) or {}),
-        }
+        kwargs = self._get_tool_kwargs(tool_func, tool_call)
+        batch = self._tool_batches.pop(tool_call["id"], None)
+        if tool_func.cacheable:
+            cache_key = self._get_cache_key(tool_func, kwargs)
+            cached_response = (
+                None
+                if cache_key is None
+                else await self.tool_cache.retrieve(cache_key)
+            )
+            if cached_response is not None:
+                return _object_wrapper(cached_response, None)
+
+        elif tool_func.resource_args:
+            await self.tool_cache.invalidate(
+                resources=self._get_resources(tool_func, kwargs),
+            )
+
+        if batch is not None and batch.contains(tool_call["id"], kwargs):
+            return self._call_in_batch(tool_func, tool_call, kwargs, batch)
+
+        if (
+            tool_func.timeout is None
+            and tool_func.max_concurrency is None
+            and self._call_semaphore is None
+        ):
+            return await self._execute_tool_function(tool_func, tool_call)
+
+        return self._call_with_limits(tool_func, tool_call)
+
+    def batch_tool_calls(self, tool_calls: list[ToolUseBlock]) -> None:
+        """Collect the calls to the same batchable tool function (registered
+        with `batch_func`), e.g. the tool calls generated in one reasoning
+        step, so that they're executed by one invocation of the batch
+        function when the first of them is called by `call_tool_function`.
+
+        .. note:: The timeout of the tool function applies to the whole
+         batch, while the concurrency limits don't. A collected call whose
+         arguments are changed before it's called is executed alone.
+
+        Args:
+            tool_calls (`list[ToolUseBlock]`):
+                The tool calls to be collected. The tool functions without
+                batch implementation, and the ones called only once, are
+                skipped.
+        """
+        grouped_calls: dict[str, list[ToolUseBlock]] = {}
+        for tool_call in tool_calls:
+            tool_func = self.tools.get(tool_call["name"])
+            if tool_func is not None and tool_func.batch_func is not None:
+                grouped_calls.setdefault(tool_call["name"], []).append(
+                    tool_call,
+                )
+
+        for name, calls in grouped_calls.items():
+            tool_func = self.tools[name]
+            batch_size = tool_func.max_batch_size or len(calls)
+            for start in range(0, len(calls), batch_size):
+                batch_calls = calls[start : start + batch_size]
+                if len(batch_calls) < 2:
+                    continue
+
+                batch = _ToolBatch(
+                    batch_calls,
+                    [self._get_tool_kwargs(tool_func, _) for _ in batch_calls],
+                    partial(self._execute_batch_function, tool_func),
+                )
+                for tool_call in batch_calls:
+                    self._tool_batches[tool_call["id"]] = batch
+
+    def clear_tool_batches(
+        self,
+        tool_calls: list[ToolUseBlock] | None = None,
+    ) -> None:
+        """Discard the collected calls that are not called, e.g. when the
+        acting is interrupted.
+
+        Args:
+            tool_calls (`list[ToolUseBlock] | None`, optional):
+                The tool calls to be discarded. If `None`, all the collected
+                calls are discarded.
+        """
+        if tool_calls is None:
+            self._tool_batches.clear()
+            return
+
+        for tool_call in tool_calls:
+            self._tool_batches.pop(tool_call["id"], None)
+
+    async def _execute_batch_function(
+        self,
+        tool_func: RegisteredToolFunction,
+        kwargs_list: list[dict],
+    ) -> list[ToolResponse]:
+        """Execute the batch function of the tool function within its
+        timeout."""
+        batch_func = tool_func.batch_func
+        assert batch_func is not None
+        execution_mode = (
+            tool_func.execution_mode or self.default_execution_mode
+        )
+        message = _CancelMessage(
+            f"The tool call has timed out after {tool_func.timeout} seconds.",
+        )
+
+        if (
+            not inspect.iscoroutinefunction(batch_func)
+            and execution_mode == "inline"
+        ):
+            # The sync function executed inline cannot be timed out
+            responses, timed_out = batch_func(kwargs_list), False
+
+        else:
+            if inspect.iscoroutinefunction(batch_func):
+                awaitable = batch_func(kwargs_list)
+            else:
+                awaitable = partial(self._run_in_executor, execution_mode)(
+                    batch_func,
+                    kwargs_list,
+                )
+
+            deadline = None
+            if tool_func.timeout is not None:
+                deadline = (
+                    asyncio.get_running_loop().time() + tool_func.timeout
+                )
+            responses, timed_out = await self._run_until(
+                awaitable,
+                deadline,
+                message,
+            )
+
+        if timed_out:
+            return [
+                self._get_interrupted_tool_response(message)
+                for _ in kwargs_list
+            ]
+
+        if not isinstance(responses, list) or len(responses) != len(
+            kwargs_list,
+        ):
+            raise ValueError(
+                f"The batch function of the tool function '{tool_func.name}'"
+                f" must return a list of {len(kwargs_list)} ToolResponse "
+                "objects.",
+            )
+        return responses
+
+    async def _call_in_batch(
+        self,
+        tool_func: RegisteredToolFunction,
+        tool_call: ToolUseBlock,
+        kwargs: dict[str, Any],
+        batch: _ToolBatch,
+    ) -> AsyncGenerator[ToolResponse, None]:
+        """Get the response of the tool call from its batch, and handle it
+        in the same way as the individual calls."""
+        cache_version = self.tool_cache.version
+        failed = False
+        try:
+            res = await batch.get_response(tool_call["id"])
+        except asyncio.CancelledError as e:
+            res = self._get_interrupted_tool_response(_get_cancel_message(e))
+        except Exception as e:
+            failed = True
+            res = ToolResponse(
+                content=[TextBlock(type="text", text=f"Error: {e}")],
+                metadata={"success": False},
+            )
+
+        postprocess_func = None
+        if tool_func.postprocess_func:
+            postprocess_func = partial(tool_func.postprocess_func, tool_call)
+
+        wrapped_res = _object_wrapper(res, postprocess_func)
+        if (tool_func.cacheable and not failed) or (
+            not tool_func.cacheable and tool_func.resource_args
+        ):
+            wrapped_res = self._cache_wrapper(
+                wrapped_res,
+                tool_func,
+                kwargs,
+                cache_version,
+            )
+
+        async for chunk in wrapped_res:
+            yield chunk
+
+    async def _execute_tool_function(  # pylint: disable=too-many-branches
+        self,
+        tool_func: RegisteredToolFunction,
+        tool_call: ToolUseBlock,
+    ) -> AsyncGenerator[ToolResponse, None]:
+        """Execute the tool function and wrap the result into an async
+        generator of `ToolResponse` objects."""
+        cache_version = self.tool_cache.version
+
+        # Prepare keyword arguments
+        kwargs = self._get_tool_kwargs(tool_func, tool_call)
 
         # Prepare postprocess function
         if tool_func.postprocess_func:
@@ -543,33 +1025,61 @@ class Toolkit(StateModule):
         else:
             partial_postprocess_func = None
 
+        execution_mode = (
+            tool_func.execution_mode or self.default_execution_mode
+        )
+        run_in_executor = None
+        if execution_mode != "inline":
+            run_in_executor = partial(self._run_in_executor, execution_mode)
+
         # Async function
+        failed = False
         try:
             if inspect.iscoroutinefunction(tool_func.original_func):
                 try:
                     res = await tool_func.original_func(**kwargs)
-                except asyncio.CancelledError:
-                    res = ToolResponse(
-                        content=[
-                            TextBlock(
-                                type="text",
-                                text="<system-info>"
-                                "The tool call has been interrupted "
-                                "by the user."
-                                "</system-info>",
-                            ),
-                        ],
-                        stream=True,
-                        is_last=True,
-                        is_interrupted=True,
+                except asyncio.CancelledError as e:
+                    res = self._get_interrupted_tool_response(
+                        _get_cancel_message(e),
                     )
 
-            else:
+            elif (
+                inspect.isasyncgenfunction(tool_func.original_func)
+                or run_in_executor is None
+            ):
                 # When `tool_func.original_func` is Async generator function or
-                # Sync function
+                # Sync function executed inline
                 res = tool_func.original_func(**kwargs)
 
+            elif execution_mode == "process":
+                try:
+                    res = await run_in_executor(
+                        _call_and_drain,
+                        tool_func.original_func,
+                        kwargs,
+                    )
+                except asyncio.CancelledError as e:
+                    res = self._get_interrupted_tool_response(
+                        _get_cancel_message(e),
+                    )
+
+                # The drained chunks of a sync generator
+                if isinstance(res, list):
+                    res = (_ for _ in res)
+                    run_in_executor = None
+
+            else:
+                try:
+                    res = await run_in_executor(
+                        partial(tool_func.original_func, **kwargs),
+                    )
+                except asyncio.CancelledError as e:
+                    res = self._get_interrupted_tool_response(
+                        _get_cancel_message(e),
+                    )
+
         except Exception as e:
+            failed = True
             res = ToolResponse(
                 content=[
                     TextBlock(
@@ -577,26 +1087,47 @@ class Toolkit(StateModule):
                         text=f"Error: {e}",
                     ),
                 ],
+                metadata={"success": False},
             )
 
         # Handle different return type
 
         # If return an async generator
         if isinstance(res, AsyncGenerator):
-            return _async_generator_wrapper(res, partial_postprocess_func)
+            wrapped_res = _async_generator_wrapper(
+                res,
+                partial_postprocess_func,
+            )
 
         # If return a sync generator
-        if isinstance(res, Generator):
-            return _sync_generator_wrapper(res, partial_postprocess_func)
+        elif isinstance(res, Generator):
+            wrapped_res = _sync_generator_wrapper(
+                res,
+                partial_postprocess_func,
+                run_in_executor,
+            )
 
-        if isinstance(res, ToolResponse):
-            return _object_wrapper(res, partial_postprocess_func)
+        elif isinstance(res, ToolResponse):
+            wrapped_res = _object_wrapper(res, partial_postprocess_func)
 
-        raise TypeError(
-            "The tool function must return a ToolResponse object, or an "
-            "AsyncGenerator/Generator of ToolResponse objects, "
-            f"but got {type(res)}.",
-        )
+        else:
+            raise TypeError(
+                "The tool function must return a ToolResponse object, or an "
+                "AsyncGenerator/Generator of ToolResponse objects, "
+                f"but got {type(res)}.",
+            )
+
+        if (tool_func.cacheable and not failed) or (
+            not tool_func.cacheable and tool_func.resource_args
+        ):
+            return self._cache_wrapper(
+                wrapped_res,
+                tool_func,
+                kwargs,
+                cache_version,
+            )
+
+        return wrapped_res
 
     async def register_mcp_client(
         self,
@@ -613,6 +1144,8 @@ class Toolkit(StateModule):
             ToolResponse | None,
         ]
         | None = None,
+        cacheable: bool = False,
+        cache_ttl: float | None = None,
     ) -> None:
         """Register tool functions from an MCP client.
 
@@ -639,6 +1172,13 @@ class Toolkit(StateModule):
                 result will be returned as is. If it returns a
                 `ToolResponse`, the returned block will be used as the
                 final tool result.
+            cacheable (`bool`, defaults to `False`):
+                If the MCP tool functions are idempotent, so that their
+                final responses are cached by the arguments. Refer to
+                `register_tool_function` for details.
+            cache_ttl (`float | None`, optional):
+                The time-to-live of the cached responses in seconds. If
+                `None`, they never expire.
         """
         if (
             isinstance(mcp_client, StatefulClientBase)
@@ -649,6 +1189,31 @@ class Toolkit(StateModule):
                 "`connect()` method first.",
             )
 
+        self._check_mcp_filters(
+            enable_funcs,
+            disable_funcs,
+            preset_kwargs_mapping,
+        )
+
+        await self._register_mcp_tools(
+            mcp_client,
+            await mcp_client.list_tools(),
+            group_name=group_name,
+            enable_funcs=enable_funcs,
+            disable_funcs=disable_funcs,
+            preset_kwargs_mapping=preset_kwargs_mapping,
+            postprocess_func=postprocess_func,
+            cacheable=cacheable,
+            cache_ttl=cache_ttl,
+        )
+
+    @staticmethod
+    def _check_mcp_filters(
+        enable_funcs: list[str] | None,
+        disable_funcs: list[str] | None,
+        preset_kwargs_mapping: dict[str, dict[str, Any]] | None,
+    ) -> None:
+        """Check the arguments used to filter and preset the MCP tools."""
         # Check arguments for enable_funcs and disabled_funcs
         if enable_funcs is not None and disable_funcs is not None:
             assert isinstance(enable_funcs, list) and all(
@@ -681,8 +1246,29 @@ class Toolkit(StateModule):
                 f"but got {type(preset_kwargs_mapping)}.",
             )
 
+    async def _register_mcp_tools(
+        self,
+        mcp_client: MCPClientBase,
+        mcp_tools: list[mcp.types.Tool],
+        group_name: str,
+        enable_funcs: list[str] | None,
+        disable_funcs: list[str] | None,
+        preset_kwargs_mapping: dict[str, dict[str, Any]] | None,
+        postprocess_func: Callable[
+            [
+                ToolUseBlock,
+                ToolResponse,
+            ],
+            ToolResponse | None,
+        ]
+        | None,
+        cacheable: bool,
+        cache_ttl: float | None,
+    ) -> None:
+        """Register the given tools listed from the MCP client, refer to
+        `register_mcp_client` for the arguments."""
         tool_names = []
-        for mcp_tool in await mcp_client.list_tools():
+        for mcp_tool in mcp_tools:
             # Skip the functions that are not in the enable_funcs if
             # enable_funcs is not None
             if enable_funcs is not None and mcp_tool.name not in enable_funcs:
@@ -711,6 +1297,8 @@ class Toolkit(StateModule):
                 group_name=group_name,
                 preset_kwargs=preset_kwargs,
                 postprocess_func=postprocess_func,
+                cacheable=cacheable,
+                cache_ttl=cache_ttl,
             )
 
         logger.info(
@@ -719,6 +1307,88 @@ class Toolkit(StateModule):
             ", ".join(tool_names),
         )
 
+    async def register_mcp_clients(
+        self,
+        mcp_clients: list[MCPClientBase],
+        group_name: str = "basic",
+        enable_funcs: list[str] | None = None,
+        disable_funcs: list[str] | None = None,
+        preset_kwargs_mapping: dict[str, dict[str, Any]] | None = None,
+        postprocess_func: Callable[
+            [
+                ToolUseBlock,
+                ToolResponse,
+            ],
+            ToolResponse | None,
+        ]
+        | None = None,
+        cacheable: bool = False,
+        cache_ttl: float | None = None,
+    ) -> None:
+        """Register tool functions from multiple MCP clients, whose tools are
+        listed concurrently (or taken from the tool cache of the clients)
+        and then registered in the given order.
+
+        Args:
+            mcp_clients (`list[MCPClientBase]`):
+                The MCP client instances to connect to the MCP servers.
+            group_name (`str`, defaults to `"basic"`):
+                The group name that the tool functions will be added to.
+            enable_funcs (`list[str] | None`, optional):
+                The functions to be added into the toolkit. If `None`, all
+                tool functions within the MCP servers will be added.
+            disable_funcs (`list[str] | None`, optional):
+                The functions that will be filtered out. If `None`, no
+                tool functions will be filtered out.
+            preset_kwargs_mapping: (`Optional[dict[str, dict[str, Any]]]`, \
+            defaults to `None`):
+                The preset keyword arguments mapping, whose keys are the tool
+                function names and values are the preset keyword arguments.
+            postprocess_func (`Callable[[ToolUseBlock, ToolResponse], \
+            ToolResponse | None] | None`, optional):
+                A post-processing function that will be called after the tool
+                function is executed. Refer to `register_mcp_client` for
+                details.
+            cacheable (`bool`, defaults to `False`):
+                If the MCP tool functions are idempotent, so that their
+                final responses are cached by the arguments.
+            cache_ttl (`float | None`, optional):
+                The time-to-live of the cached responses in seconds. If
+                `None`, they never expire.
+        """
+        for mcp_client in mcp_clients:
+            if (
+                isinstance(mcp_client, StatefulClientBase)
+                and not mcp_client.is_connected
+            ):
+                raise RuntimeError(
+                    f"The MCP client {mcp_client.name} is not connected to "
+                    "the server. Use the `connect()` method first.",
+                )
+
+        self._check_mcp_filters(
+            enable_funcs,
+            disable_funcs,
+            preset_kwargs_mapping,
+        )
+
+        # List the tools concurrently, and register them in the given order
+        tools_list = await asyncio.gather(
+            *[_.list_tools() for _ in mcp_clients],
+        )
+        for mcp_client, mcp_tools in zip(mcp_clients, tools_list):
+            await self._register_mcp_tools(
+                mcp_client,
+                mcp_tools,
+                group_name=group_name,
+                enable_funcs=enable_funcs,
+                disable_funcs=disable_funcs,
+                preset_kwargs_mapping=preset_kwargs_mapping,
+                postprocess_func=postprocess_func,
+                cacheable=cacheable,
+                cache_ttl=cache_ttl,
+            )
+
     def state_dict(self) -> dict[str, Any]:
         """Get the state dictionary of the toolkit.
 
@@ -771,6 +1441,8 @@ class Toolkit(StateModule):
             else:
                 group.active = False
 
+        self._schema_version += 1
+
     def get_activated_notes(self) -> str:
         """Get the notes from the active tool groups, which can be used to
         construct the system prompt for the agent.
@@ -837,6 +1509,275 @@ class Toolkit(StateModule):
         """Clear the toolkit, removing all tool functions and groups."""
         self.tools.clear()
         self.groups.clear()
+        self._schema_version += 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the thread and process pools used to execute the sync
+        tool functions. The pools will be re-created when needed.
+
+        Args:
+            wait (`bool`, defaults to `True`):
+                Whether to wait for the running calls to finish.
+        """
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+        self._executors.clear()
+
+    async def _run_in_executor(
+        self,
+        execution_mode: Literal["thread", "process"],
+        func: Callable,
+        *args: Any,
+    ) -> Any:
+        """Run the sync function in the thread or process pool without
+        blocking the event loop, waiting for a free slot if the pending
+        calls reach the limit."""
+        if execution_mode not in self._executors:
+            if execution_mode == "thread":
+                self._executors[execution_mode] = ThreadPoolExecutor(
+                    max_workers=self.max_thread_workers,
+                    thread_name_prefix="agentscope_tool",
+                )
+            else:
+                self._executors[execution_mode] = ProcessPoolExecutor(
+                    max_workers=self.max_process_workers,
+                )
+
+        if execution_mode == "thread":
+            # Keep the context variables, e.g. the tracing context
+            func = partial(contextvars.copy_context().run, func)
+
+        loop = asyncio.get_running_loop()
+        executor = self._executors[execution_mode]
+
+        if self.max_pending_calls is None:
+            return await loop.run_in_executor(executor, func, *args)
+
+        semaphore = self._pending_semaphores.setdefault(
+            execution_mode,
+            asyncio.Semaphore(self.max_pending_calls),
+        )
+        async with semaphore:
+            return await loop.run_in_executor(executor, func, *args)
+
+    async def _call_with_limits(  # pylint: disable=too-many-branches
+        self,
+        tool_func: RegisteredToolFunction,
+        tool_call: ToolUseBlock,
+    ) -> AsyncGenerator[ToolResponse, None]:
+        """Execute the tool function within its concurrency slot and the
+        toolkit-level concurrency slot, and cancel it when it times out."""
+        tool_semaphore = None
+        if tool_func.max_concurrency is not None:
+            tool_semaphore = self._tool_semaphores.setdefault(
+                tool_func.name,
+                asyncio.Semaphore(tool_func.max_concurrency),
+            )
+            num_queued = self._num_queued_calls.get(tool_func.name, 0)
+            if (
+                tool_func.max_queue_size is not None
+                and tool_semaphore.locked()
+                and num_queued >= tool_func.max_queue_size
+            ):
+                yield ToolResponse(
+                    content=[
+                        TextBlock(
+                            type="text",
+                            text="Error: Too many pending calls of the tool "
+                            f"function '{tool_func.name}', try again later.",
+                        ),
+                    ],
+                    metadata={"success": False},
+                )
+                return
+
+        acquired: list[asyncio.Semaphore] = []
+        res = None
+        try:
+            try:
+                if tool_semaphore is not None:
+                    self._num_queued_calls[tool_func.name] = num_queued + 1
+                    try:
+                        await tool_semaphore.acquire()
+                    finally:
+                        self._num_queued_calls[tool_func.name] -= 1
+                    acquired.append(tool_semaphore)
+
+                if self._call_semaphore is not None:
+                    await self._call_semaphore.acquire()
+                    acquired.append(self._call_semaphore)
+
+            except asyncio.CancelledError:
+                yield self._get_interrupted_tool_response()
+                return
+
+            deadline = None
+            if tool_func.timeout is not None:
+                deadline = (
+                    asyncio.get_running_loop().time() + tool_func.timeout
+                )
+            message = _CancelMessage(
+                f"The tool call has timed out after {tool_func.timeout} "
+                "seconds.",
+            )
+
+            res, timed_out = await self._run_until(
+                self._execute_tool_function(tool_func, tool_call),
+                deadline,
+                message,
+            )
+            if res is None:
+                yield self._get_interrupted_tool_response(message)
+                return
+
+            # The timed-out call has been cancelled, so the remaining
+            # chunks, i.e. the interrupted one, are drained without deadline
+            if timed_out:
+                deadline = None
+
+            last_chunk = None
+            while True:
+                chunk, timed_out = await self._run_until(
+                    anext(res, None),
+                    deadline,
+                    message,
+                )
+                if chunk is None:
+                    if timed_out:
+                        yield _get_interrupted_response(last_chunk, message)
+                    break
+
+                yield chunk
+                if not chunk.is_delta:
+                    last_chunk = chunk
+                if timed_out:
+                    deadline = None
+
+        finally:
+            if res is not None:
+                await res.aclose()
+            for semaphore in acquired:
+                semaphore.release()
+
+    async def _cache_wrapper(
+        self,
+        tool_res: AsyncGenerator[ToolResponse, None],
+        tool_func: RegisteredToolFunction,
+        kwargs: dict[str, Any],
+        cache_version: int,
+    ) -> AsyncGenerator[ToolResponse, None]:
+        """Store the final response of the cacheable tool function, or
+        invalidate the cached responses of the resources touched by the
+        write tool function after it finishes."""
+        last_chunk = None
+        async for chunk in tool_res:
+            yield chunk
+            last_chunk = chunk
+
+        resources = self._get_resources(tool_func, kwargs)
+        if not tool_func.cacheable:
+            await self.tool_cache.invalidate(resources=resources)
+
+        # Skip the interrupted responses, the ones computed before an
+        # invalidation, which may be stale, and the uncacheable arguments
+        elif (
+            last_chunk is not None
+            and not last_chunk.is_interrupted
+            and self.tool_cache.version == cache_version
+            and (cache_key := self._get_cache_key(tool_func, kwargs))
+            is not None
+        ):
+            await self.tool_cache.store(
+                cache_key,
+                tool_func.name,
+                last_chunk,
+                ttl=tool_func.cache_ttl,
+                resources=resources,
+            )
+
+    @staticmethod
+    def _get_tool_kwargs(
+        tool_func: RegisteredToolFunction,
+        tool_call: ToolUseBlock,
+    ) -> dict[str, Any]:
+        """Merge the preset keyword arguments and the input arguments."""
+        return {
+            **tool_func.preset_kwargs,
+            **(tool_call.get("input", {}) or {}),
+        }
+
+    @staticmethod
+    def _get_cache_key(
+        tool_func: RegisteredToolFunction,
+        kwargs: dict[str, Any],
+    ) -> str | None:
+        """Get the cache key with the default arguments filled in, so that
+        the equivalent calls share the same key. `None` if the arguments
+        are not JSON serializable."""
+        try:
+            bound_args = inspect.signature(tool_func.original_func).bind(
+                **kwargs,
+            )
+            bound_args.apply_defaults()
+            kwargs = dict(bound_args.arguments)
+        except (TypeError, ValueError):
+            pass
+        return ToolResultCache.get_key(tool_func.name, kwargs)
+
+    @staticmethod
+    def _get_resources(
+        tool_func: RegisteredToolFunction,
+        kwargs: dict[str, Any],
+    ) -> list[str]:
+        """Get the resources touched by the tool call."""
+        return [str(kwargs[_]) for _ in tool_func.resource_args if _ in kwargs]
+
+    @staticmethod
+    async def _run_until(
+        awaitable: Awaitable,
+        deadline: float | None,
+        message: str,
+    ) -> tuple[Any, bool]:
+        """Await the awaitable until the deadline, when the deadline is
+        reached, cancel it with the given message.
+
+        Returns:
+            `tuple[Any, bool]`:
+                The result of the awaitable (`None` if it's cancelled
+                without a result) and whether the deadline is reached.
+        """
+        task = asyncio.ensure_future(awaitable)
+        timeout = None
+        if deadline is not None:
+            timeout = max(deadline - asyncio.get_running_loop().time(), 0)
+
+        try:
+            await asyncio.wait({task}, timeout=timeout)
+        except asyncio.CancelledError:
+            # Interrupted by the user, return the interrupted result if the
+            # awaitable handles the cancellation
+            task.cancel()
+            return await task, False
+
+        timed_out = not task.done()
+        if timed_out:
+            task.cancel(message)
+            try:
+                return await task, True
+            except asyncio.CancelledError:
+                return None, True
+
+        return task.result(), False
+
+    @staticmethod
+    def _get_interrupted_tool_response(
+        message: str | None = None,
+    ) -> ToolResponse:
+        """The tool response when the tool call is interrupted before any
+        chunk is generated."""
+        res = _get_interrupted_response(None, message)
+        res.stream = True
+        return res
 
     def _validate_tool_function(self, func_name: str) -> None:
         """Check if the tool function already registered in the toolkit. If
@@ -847,6 +1788,54 @@ class Toolkit(StateModule):
                 "in the toolkit.",
             )
 
+    @classmethod
+    def _build_json_schema(
+        cls,
+        tool_func: ToolFunction,
+        json_schema: dict | None,
+        func_description: str | None,
+        preset_kwargs: dict[str, JSONSerializableObject] | None,
+        include_long_description: bool,
+        include_var_positional: bool,
+        include_var_keyword: bool,
+    ) -> dict:
+        """Build the JSON schema of the tool function from the given JSON
+        schema or its docstring, with the description overridden and the
+        preset keyword arguments removed."""
+        json_schema = json_schema or cls._parse_tool_function(
+            tool_func,
+            include_long_description=include_long_description,
+            include_var_positional=include_var_positional,
+            include_var_keyword=include_var_keyword,
+        )
+
+        # Override the description if provided
+        if func_description:
+            json_schema["function"]["description"] = func_description
+
+        # Remove the preset kwargs from the JSON schema
+        for arg_name in preset_kwargs or {}:
+            if arg_name in json_schema["function"]["parameters"]["properties"]:
+                json_schema["function"]["parameters"]["properties"].pop(
+                    arg_name,
+                )
+
+        if "required" in json_schema["function"]["parameters"]:
+            for arg_name in preset_kwargs or {}:
+                if (
+                    arg_name
+                    in json_schema["function"]["parameters"]["required"]
+                ):
+                    json_schema["function"]["parameters"]["required"].remove(
+                        arg_name,
+                    )
+
+            # Remove the required field if it is empty
+            if len(json_schema["function"]["parameters"]["required"]) == 0:
+                json_schema["function"]["parameters"].pop("required", None)
+
+        return json_schema
+
     @staticmethod
     def _parse_tool_function(
         tool_func: ToolFunction,
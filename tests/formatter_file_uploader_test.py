@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""The file uploader test module in agentscope."""
+import asyncio
+import base64
+import http.server
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.async_case import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, Mock, patch
+
+from google.genai import errors
+
+from agentscope.formatter import (
+    DashScopeChatFormatter,
+    DashScopeFileUploader,
+    FileUploaderBase,
+    GeminiChatFormatter,
+    GeminiFileUploader,
+    GeminiMultiAgentFormatter,
+    UploadedFile,
+)
+from agentscope.message import AudioBlock, ImageBlock, Msg
+from agentscope.model import DashScopeChatModel, GeminiChatModel
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """The handler mocking the resumable upload of the Gemini Files API."""
+
+    uploads: list[bytes] = []
+    ttl = timedelta(hours=48)
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Start the upload session, or receive the uploaded content."""
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        host = f"http://{self.headers['Host']}"
+
+        if self.path.startswith("/upload/"):
+            self.send_response(200)
+            self.send_header(
+                "X-Goog-Upload-URL",
+                f"{host}/session/{len(_Handler.uploads)}",
+            )
+            self._send_json({})
+            return
+
+        _Handler.uploads.append(body)
+        name = f"files/{len(_Handler.uploads)}"
+        self.send_response(200)
+        self.send_header("X-Goog-Upload-Status", "final")
+        self._send_json(
+            {
+                "file": {
+                    "name": name,
+                    "uri": f"{host}/v1beta/{name}",
+                    "mimeType": "image/png",
+                    "state": "ACTIVE",
+                    "expirationTime": (
+                        datetime.now(timezone.utc) + _Handler.ttl
+                    ).isoformat(),
+                },
+            },
+        )
+
+    def _send_json(self, data: dict) -> None:
+        """Send the JSON body."""
+        content = json.dumps(data).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args: object) -> None:
+        """Silence the logs."""
+
+
+class _SlowUploader(FileUploaderBase):
+    """The file uploader taking a while to upload."""
+
+    async def _upload(self, data: bytes, mime_type: str) -> UploadedFile:
+        """Sleep and return the uploaded file."""
+        await asyncio.sleep(0.1)
+        return UploadedFile(uri=f"files/{self.num_uploads}", mime_type="")
+
+
+def _make_msgs(data: str) -> list[Msg]:
+    """Create the messages with the base64 encoded image."""
+    return [
+        Msg(
+            "user",
+            [
+                ImageBlock(
+                    type="image",
+                    source={
+                        "type": "base64",
+                        "media_type": "image/png",
+                        "data": data,
+                    },
+                ),
+            ],
+            "user",
+        ),
+    ]
+
+
+class FileUploaderTest(IsolatedAsyncioTestCase):
+    """Test class for the file uploaders."""
+
+    async def asyncSetUp(self) -> None:
+        """Start the HTTP server."""
+        _Handler.uploads = []
+        _Handler.ttl = timedelta(hours=48)
+        self.server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            _Handler,
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.content = os.urandom(1024)
+        self.data = base64.b64encode(self.content).decode()
+
+    async def asyncTearDown(self) -> None:
+        """Stop the HTTP server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_uploader(self, **kwargs: object) -> GeminiFileUploader:
+        """Create the Gemini file uploader towards the HTTP server."""
+        return GeminiFileUploader(
+            api_key="test",
+            client_args={"http_options": {"base_url": self.base_url}},
+            **kwargs,  # type: ignore[arg-type]
+        )
+
+    async def test_gemini_upload_once(self) -> None:
+        """Test the media is uploaded once and referenced afterwards."""
+        uploader = self._make_uploader()
+        formatter = GeminiMultiAgentFormatter(file_uploader=uploader)
+
+        first = await formatter.format(_make_msgs(self.data))
+        second = await GeminiChatFormatter(file_uploader=uploader).format(
+            _make_msgs(self.data),
+        )
+
+        self.assertEqual(_Handler.uploads, [self.content])
+        self.assertDictEqual(
+            first[0]["parts"][1],
+            {
+                "file_data": {
+                    "file_uri": f"{self.base_url}/v1beta/files/1",
+                    "mime_type": "image/png",
+                },
+            },
+        )
+        self.assertDictEqual(second[0]["parts"][0], first[0]["parts"][1])
+
+    async def test_reupload(self) -> None:
+        """Test the media is uploaded again once it's about to expire or
+        invalidated."""
+        _Handler.ttl = timedelta(minutes=30)
+        uploader = self._make_uploader(expiry_margin=600)
+
+        first = await uploader.get_file(self.data, "image/png")
+        with patch("time.time", return_value=time.time() + 1500):
+            second = await uploader.get_file(self.data, "image/png")
+        self.assertEqual(uploader.num_uploads, 2)
+        self.assertNotEqual(first, second)
+
+        uploader.invalidate(second.uri)  # type: ignore[union-attr]
+        await uploader.get_file(self.data, "image/png")
+        self.assertEqual(len(_Handler.uploads), 3)
+
+    async def test_min_size(self) -> None:
+        """Test the small media is inlined."""
+        uploader = self._make_uploader(min_size=4096)
+        res = await GeminiChatFormatter(file_uploader=uploader).format(
+            _make_msgs(self.data),
+        )
+        self.assertDictEqual(
+            res[0]["parts"][0],
+            {"inline_data": {"data": self.data, "mime_type": "image/png"}},
+        )
+        self.assertListEqual(_Handler.uploads, [])
+
+    async def test_upload_failure(self) -> None:
+        """Test the media is inlined when the upload fails."""
+        uploader = GeminiFileUploader(
+            api_key="test",
+            client_args={
+                "http_options": {
+                    "base_url": "http://127.0.0.1:1",
+                    "retry_options": {"attempts": 1},
+                },
+            },
+        )
+        res = await GeminiChatFormatter(file_uploader=uploader).format(
+            _make_msgs(self.data),
+        )
+        self.assertIn("inline_data", res[0]["parts"][0])
+
+    async def test_dashscope(self) -> None:
+        """Test the base64 data and local files are uploaded to DashScope
+        once."""
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+            f.write(self.content)
+        self.addCleanup(os.remove, f.name)
+
+        msgs = _make_msgs(self.data)
+        msgs[0].content.append(  # type: ignore[union-attr]
+            AudioBlock(type="audio", source={"type": "url", "url": f.name}),
+        )
+
+        uploader = DashScopeFileUploader(api_key="test", model_name="qwen")
+        with patch(
+            "dashscope.utils.oss_utils.OssUtils.upload",
+            side_effect=lambda model, file_path, api_key: (
+                f"oss://{os.path.basename(file_path)}"
+            ),
+        ) as mock_upload:
+            formatter = DashScopeChatFormatter(file_uploader=uploader)
+            first = await formatter.format(msgs)
+            second = await formatter.format(msgs)
+
+        self.assertEqual(mock_upload.call_count, 2)
+        self.assertListEqual(first, second)
+        image, audio = first[0]["content"]
+        self.assertTrue(image["image"].endswith(".png"))
+        self.assertTrue(audio["audio"].startswith("oss://"))
+        self.assertTrue(audio["audio"].endswith(".wav"))
+
+    async def test_gemini_model_reupload(self) -> None:
+        """Test the Gemini model uploads the files again and retries once
+        when the files are not found."""
+        uploader = self._make_uploader()
+        contents = await GeminiChatFormatter(file_uploader=uploader).format(
+            _make_msgs(self.data),
+        )
+        model = GeminiChatModel(
+            model_name="gemini-2.5-flash",
+            api_key="test",
+            stream=False,
+            file_uploader=uploader,
+        )
+        not_found = errors.ClientError(
+            403,
+            {
+                "error": {
+                    "message": "You do not have permission to access the "
+                    "File files/1 or it may not exist.",
+                    "status": "PERMISSION_DENIED",
+                },
+            },
+        )
+        response = Mock(
+            candidates=[],
+            text="A red image.",
+            function_calls=[],
+            usage_metadata=None,
+        )
+        mock_generate = AsyncMock(side_effect=[not_found, response])
+        model.client.aio.models.generate_content = (  # type: ignore
+            mock_generate
+        )
+
+        res = await model(contents)
+        self.assertEqual(res.content[0]["text"], "A red image.")
+        self.assertEqual(mock_generate.call_count, 2)
+        self.assertEqual(len(_Handler.uploads), 2)
+        self.assertEqual(
+            contents[0]["parts"][0]["file_data"]["file_uri"],
+            f"{self.base_url}/v1beta/files/2",
+        )
+
+        # The other errors are raised without uploading again
+        mock_generate.side_effect = [errors.ClientError(400, {})]
+        with self.assertRaises(errors.ClientError):
+            await model(contents)
+        self.assertEqual(len(_Handler.uploads), 2)
+
+    async def test_dashscope_model_reupload(self) -> None:
+        """Test the DashScope model uploads the files again and retries once
+        when the files cannot be downloaded."""
+        uploader = DashScopeFileUploader(api_key="test", model_name="qwen")
+        model = DashScopeChatModel(
+            model_name="qwen-vl-max",
+            api_key="test",
+            stream=False,
+            file_uploader=uploader,
+        )
+        response = Mock(status_code=200)
+        response.output.choices = [Mock(message={"content": "A red image."})]
+        with patch(
+            "dashscope.utils.oss_utils.OssUtils.upload",
+            side_effect=["oss://first.png", "oss://second.png"],
+        ), patch(
+            "dashscope.MultiModalConversation.call",
+            side_effect=[
+                Mock(
+                    status_code=400,
+                    message="Download the media resource timed out.",
+                ),
+                response,
+            ],
+        ) as mock_call:
+            messages = await DashScopeChatFormatter(
+                file_uploader=uploader,
+            ).format(_make_msgs(self.data))
+            res = await model(messages)
+
+        self.assertEqual(mock_call.call_count, 2)
+        self.assertEqual(res.content[0]["text"], "A red image.")
+        self.assertEqual(
+            messages[0]["content"][0]["image"],
+            "oss://second.png",
+        )
+
+    async def test_cancellation(self) -> None:
+        """Test cancelling a caller doesn't cancel the shared upload, and
+        the media is inlined if the shared upload is cancelled."""
+        uploader = _SlowUploader()
+        task1 = asyncio.create_task(uploader.get_file(self.data, "image/png"))
+        task2 = asyncio.create_task(uploader.get_file(self.data, "image/png"))
+        await asyncio.sleep(0.01)
+        task1.cancel()
+
+        self.assertEqual((await task2).uri, "files/0")  # type: ignore
+        self.assertTrue(task1.cancelled())
+        self.assertEqual(uploader.num_uploads, 1)
+
+        uploader.invalidate()
+        task = asyncio.create_task(uploader.get_file(self.data, "image/png"))
+        await asyncio.sleep(0.01)
+        # pylint: disable=protected-access
+        next(iter(uploader._uploading.values())).cancel()
+        self.assertIsNone(await task)
+        self.assertDictEqual(uploader._uploading, {})
+
+    async def test_source_limit(self) -> None:
+        """Test the kept data is bounded, and the file whose data is dropped
+        is uploaded again from the data of the formatter."""
+        datas = [base64.b64encode(os.urandom(1024)).decode() for _ in "abc"]
+        uploader = _SlowUploader(max_source_size=2 * len(datas[0]))
+        files = [await uploader.get_file(_, "image/png") for _ in datas]
+
+        # The least recently used data is dropped
+        self.assertIsNone(
+            await uploader.reupload(files[0].uri),  # type: ignore
+        )
+        self.assertIsNotNone(
+            await uploader.reupload(files[1].uri),  # type: ignore
+        )
+        self.assertEqual(uploader.num_uploads, 4)
+
+        # The dropped file is invalidated and uploaded again in formatting
+        await uploader.get_file(datas[0], "image/png")
+        self.assertEqual(uploader.num_uploads, 5)
+        # pylint: disable=protected-access
+        self.assertLessEqual(
+            uploader._source_size,
+            uploader.max_source_size,
+        )
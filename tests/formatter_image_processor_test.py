@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""The image processor test module in agentscope."""
+import base64
+import io
+from unittest.async_case import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from PIL import Image
+
+from agentscope.formatter import (
+    AnthropicChatFormatter,
+    GeminiMultiAgentFormatter,
+    ImageProcessor,
+    OpenAIChatFormatter,
+)
+from agentscope.message import ImageBlock, Msg
+
+
+def _make_image(width: int, height: int) -> str:
+    """Create a base64 encoded PNG screenshot-like image."""
+    image = Image.new("RGB", (width, height), "white")
+    for x in range(0, width, 16):
+        image.paste((x % 256, 0, 0), (x, 0, x + 8, height))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def _get_size(data: str) -> tuple[int, int]:
+    """Get the size of the base64 encoded image."""
+    return Image.open(io.BytesIO(base64.b64decode(data))).size
+
+
+class ImageProcessorTest(IsolatedAsyncioTestCase):
+    """Test class for the image processor."""
+
+    async def test_from_model(self) -> None:
+        """Test the effective resolutions of the models."""
+        data = _make_image(3000, 2000)
+        for model_name, size in [
+            ("gpt-4o", (1152, 768)),
+            ("claude-sonnet-4", (1313, 875)),
+            ("gemini-2.5-flash", (3000, 2000)),
+            ("gpt-4.1-mini", (1536, 1024)),
+        ]:
+            processor = ImageProcessor.from_model(model_name)
+            processed, media_type = await processor.process(
+                data,
+                "image/png",
+            )
+            self.assertEqual(_get_size(processed), size, model_name)
+            if size != (3000, 2000):
+                self.assertEqual(media_type, "image/webp")
+                self.assertLess(len(processed), len(data))
+
+    async def test_cache(self) -> None:
+        """Test the processed images are cached by the content hash."""
+        processor = ImageProcessor(max_long_side=64, quality=70)
+        data = _make_image(128, 96)
+
+        with patch.object(
+            ImageProcessor,
+            "_process",
+            autospec=True,
+            # pylint: disable=protected-access
+            side_effect=ImageProcessor._process,
+        ) as mock_process:
+            first = await processor.process(data, "image/png")
+            second = await processor.process(data, "image/png")
+
+            other = ImageProcessor(max_long_side=32, quality=70)
+            third = await other.process(data, "image/png")
+
+        self.assertEqual(mock_process.call_count, 2)
+        self.assertEqual(first, second)
+        self.assertEqual(_get_size(third[0]), (32, 24))
+
+    async def test_transparent_to_jpeg(self) -> None:
+        """Test the transparent pixels turn white instead of black in
+        JPEG."""
+        image = Image.new("RGBA", (128, 128), (0, 0, 0, 0))
+        image.paste((255, 0, 0, 255), (0, 0, 64, 128))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        data = base64.b64encode(buffer.getvalue()).decode()
+
+        processor = ImageProcessor(max_long_side=64, image_format="jpeg")
+        processed, media_type = await processor.process(data, "image/png")
+        self.assertEqual(media_type, "image/jpeg")
+        result = Image.open(io.BytesIO(base64.b64decode(processed)))
+        self.assertTrue(all(_ > 240 for _ in result.getpixel((48, 32))))
+        red, green, blue = result.getpixel((16, 32))
+        self.assertGreater(red, 240)
+        self.assertLess(max(green, blue), 20)
+
+    async def test_invalid_image(self) -> None:
+        """Test the invalid images are sent as they are."""
+        data = base64.b64encode(b"not an image").decode()
+        self.assertEqual(
+            await ImageProcessor().process(data, "image/png"),
+            (data, "image/png"),
+        )
+
+    async def test_formatters(self) -> None:
+        """Test the formatters send the processed images."""
+        data = _make_image(2048, 1536)
+        msgs = [
+            Msg(
+                "user",
+                [
+                    ImageBlock(
+                        type="image",
+                        source={
+                            "type": "base64",
+                            "media_type": "image/png",
+                            "data": data,
+                        },
+                    ),
+                ],
+                "user",
+            ),
+        ]
+        processor = ImageProcessor(max_long_side=512, image_format="jpeg")
+
+        res = await OpenAIChatFormatter(image_processor=processor).format(
+            msgs,
+        )
+        url = res[0]["content"][0]["image_url"]["url"]
+        self.assertTrue(url.startswith("data:image/jpeg;base64,"))
+        self.assertEqual(_get_size(url.split(",", 1)[1]), (512, 384))
+
+        res = await AnthropicChatFormatter(image_processor=processor).format(
+            msgs,
+        )
+        source = res[0]["content"][0]["source"]
+        self.assertEqual(source["media_type"], "image/jpeg")
+        self.assertEqual(_get_size(source["data"]), (512, 384))
+
+        res = await GeminiMultiAgentFormatter(
+            image_processor=processor,
+        ).format(msgs)
+        inline_data = res[0]["parts"][1]["inline_data"]
+        self.assertEqual(inline_data["mime_type"], "image/jpeg")
+
+        # The original messages are not modified
+        self.assertEqual(msgs[0].content[0]["source"]["data"], data)
+
+        res = await OpenAIChatFormatter().format(msgs)
+        self.assertEqual(
+            res[0]["content"][0]["image_url"]["url"],
+            f"data:image/png;base64,{data}",
+        )
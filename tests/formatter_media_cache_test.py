@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""The media cache test module in agentscope."""
+import base64
+import http.server
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from agentscope._utils._media_cache import _MediaCache
+from agentscope.formatter._openai_formatter import _to_openai_image_url
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """The handler serving a file with an ETag."""
+
+    content = b"audio-v1"
+    num_downloads = 0
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve the content, or 304 if the ETag matches."""
+        etag = f'"{hash(_Handler.content)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        _Handler.num_downloads += 1
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(_Handler.content)))
+        self.end_headers()
+        self.wfile.write(_Handler.content)
+
+    def log_message(self, *args: object) -> None:
+        """Silence the logs."""
+
+
+class MediaCacheTest(TestCase):
+    """Test class for the media cache."""
+
+    def setUp(self) -> None:
+        """Create the temp directory."""
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """Remove the temp directory."""
+        self.temp_dir.cleanup()
+
+    def _write(self, name: str, content: bytes) -> str:
+        """Write a file in the temp directory."""
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_file(self) -> None:
+        """Test the local files are encoded once until modified."""
+        cache = _MediaCache()
+        path = self._write("image.png", b"v1")
+
+        self.assertEqual(
+            cache.get_file(path),
+            base64.b64encode(b"v1").decode(),
+        )
+        self.assertEqual(
+            cache.get_file(path),
+            base64.b64encode(b"v1").decode(),
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        self._write("image.png", b"v2-modified")
+        self.assertEqual(
+            cache.get_file(path),
+            base64.b64encode(b"v2-modified").decode(),
+        )
+        self.assertEqual(cache.misses, 2)
+
+    def test_lru_eviction(self) -> None:
+        """Test the least recently used entries are evicted by size."""
+        cache = _MediaCache(max_bytes=24)
+        paths = [self._write(f"{i}.png", b"x" * 9) for i in range(3)]
+
+        cache.get_file(paths[0])
+        cache.get_file(paths[1])
+        cache.get_file(paths[0])
+        cache.get_file(paths[2])
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.size, 24)
+
+        cache.get_file(paths[0])
+        self.assertEqual(cache.hits, 2)
+
+        cache.get_file(paths[1])
+        self.assertEqual(cache.misses, 4)
+
+    def test_url_revalidation(self) -> None:
+        """Test the web URLs are revalidated by their ETags."""
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/audio.wav"
+
+        try:
+            cache = _MediaCache(revalidate_after=0)
+            for _ in range(3):
+                self.assertEqual(
+                    cache.get_url(url),
+                    base64.b64encode(b"audio-v1").decode(),
+                )
+            self.assertEqual(_Handler.num_downloads, 1)
+
+            _Handler.content = b"audio-v2"
+            self.assertEqual(
+                cache.get_url(url),
+                base64.b64encode(b"audio-v2").decode(),
+            )
+            self.assertEqual(_Handler.num_downloads, 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_formatter(self) -> None:
+        """Test the formatter helper reads the image through the cache."""
+        path = self._write("screenshot.png", b"png")
+        self.assertEqual(
+            _to_openai_image_url(path),
+            f"data:image/png;base64,{base64.b64encode(b'png').decode()}",
+        )
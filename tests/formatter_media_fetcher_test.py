@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""The async media fetcher test module in agentscope."""
+import base64
+import http.server
+import io
+import threading
+import time
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from PIL import Image
+
+from agentscope._utils._media_cache import _MediaCache
+from agentscope._utils._media_fetcher import _MediaFetcher
+from agentscope.formatter import GeminiChatFormatter
+from agentscope.message import ImageBlock, Msg
+from agentscope.token._openai_token_counter import _get_sizes_of_image_urls
+
+
+def _make_png(width: int, height: int) -> bytes:
+    """Create a PNG image of the given size."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """The handler serving a PNG image slowly."""
+
+    content = _make_png(64, 32)
+    delay = 0.3
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve the image after a delay."""
+        time.sleep(_Handler.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(_Handler.content)))
+        self.end_headers()
+        self.wfile.write(_Handler.content)
+
+    def log_message(self, *args: object) -> None:
+        """Silence the logs."""
+
+
+class MediaFetcherTest(IsolatedAsyncioTestCase):
+    """Test class for the async media fetcher."""
+
+    async def asyncSetUp(self) -> None:
+        """Start the HTTP server."""
+        self.server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            _Handler,
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    async def asyncTearDown(self) -> None:
+        """Stop the HTTP server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_size_limit_and_spooling(self) -> None:
+        """Test the downloads over the size limit are refused, and the large
+        ones are spooled to disk."""
+        fetcher = _MediaFetcher(max_size=16)
+        with self.assertRaises(ValueError):
+            await fetcher.fetch_bytes(f"{self.base_url}/a.png")
+
+        fetcher = _MediaFetcher(spool_size=16)
+        media = await fetcher.fetch(f"{self.base_url}/a.png")
+        # pylint: disable=protected-access
+        self.assertTrue(media.file._rolled)  # type: ignore[union-attr]
+        self.assertEqual(media.read(), _Handler.content)
+        media.close()
+
+        await fetcher.aclose()
+
+    async def test_formatter_prefetch(self) -> None:
+        """Test the web images in the messages are downloaded concurrently
+        when formatting."""
+        urls = [f"{self.base_url}/{i}.png" for i in range(4)]
+        msgs = [
+            Msg(
+                "user",
+                [
+                    ImageBlock(type="image", source={"type": "url", "url": _})
+                    for _ in urls
+                ],
+                "user",
+            ),
+        ]
+
+        start = time.perf_counter()
+        res = await GeminiChatFormatter().format(msgs)
+        self.assertLess(time.perf_counter() - start, 4 * _Handler.delay)
+
+        self.assertEqual(
+            res[0]["parts"][0]["inline_data"]["data"],
+            base64.b64encode(_Handler.content).decode(),
+        )
+
+    async def test_url_cache(self) -> None:
+        """Test the downloaded web URL is reused within the freshness
+        window."""
+        cache = _MediaCache()
+        url = f"{self.base_url}/cached.png"
+        await cache.aprefetch([url, url])
+        await cache.aget_url(url)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    async def test_token_counter_image_sizes(self) -> None:
+        """Test the sizes of the web images are fetched concurrently for
+        counting the tokens."""
+        urls = [f"{self.base_url}/t{i}.png" for i in range(3)]
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "image_url", "image_url": {"url": url}}
+                    for url in urls
+                ],
+            },
+        ]
+
+        start = time.perf_counter()
+        sizes = await _get_sizes_of_image_urls(messages)
+        self.assertLess(time.perf_counter() - start, 3 * _Handler.delay)
+        self.assertDictEqual(sizes, {url: (64, 32) for url in urls})
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""The MCP session pool test module in agentscope."""
+import asyncio
+import time
+from multiprocessing import Process
+from typing import Any
+from unittest.async_case import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from mcp import ClientSession
+from mcp.server import FastMCP
+from mcp.server.fastmcp import Context
+
+from agentscope.mcp import HttpStatelessClient, MCPToolListCache
+
+_running = 0
+_max_running = 0
+
+
+async def whoami(ctx: Context) -> str:
+    """Return the identity of the current session."""
+    return str(id(ctx.session))
+
+
+async def count_concurrency(delay: float) -> str:
+    """Sleep for a while and return the maximum number of the concurrent
+    calls so far.
+
+    Args:
+        delay (`float`):
+            The seconds to sleep.
+    """
+    global _running, _max_running
+    _running += 1
+    _max_running = max(_max_running, _running)
+    await asyncio.sleep(delay)
+    _running -= 1
+    return str(_max_running)
+
+
+def setup_server() -> None:
+    """Set up the streamable HTTP MCP server."""
+    server = FastMCP("SessionPool", port=8004)
+    server.tool()(whoami)
+    server.tool()(count_concurrency)
+    server.run(transport="streamable-http")
+
+
+class MCPSessionPoolTest(IsolatedAsyncioTestCase):
+    """Test class for the MCP session pool."""
+
+    async def asyncSetUp(self) -> None:
+        """Set up the test environment."""
+        self.url = "http://127.0.0.1:8004/mcp"
+        self.process = Process(target=setup_server)
+        self.process.start()
+        await asyncio.sleep(5)
+
+    async def asyncTearDown(self) -> None:
+        """Tear down the test environment."""
+        while self.process.is_alive():
+            self.process.terminate()
+            await asyncio.sleep(1)
+
+    async def _call_text(self, func: object, **kwargs: object) -> str:
+        """Call the MCP function and return the text result."""
+        res = await func(**kwargs)  # type: ignore[operator]
+        return res.content[0]["text"]
+
+    async def test_no_cross_call_state(self) -> None:
+        """Test each call gets its own session by default."""
+        client = HttpStatelessClient(
+            name="pooled",
+            transport="streamable_http",
+            url=self.url,
+            pool_size=2,
+        )
+        func = await client.get_callable_function("whoami")
+        ids = [await self._call_text(func) for _ in range(4)]
+        self.assertEqual(len(set(ids)), 4)
+
+        await client.close()
+
+    async def test_session_reuse(self) -> None:
+        """Test the sessions are reused up to the max uses."""
+        client = HttpStatelessClient(
+            name="pooled",
+            transport="streamable_http",
+            url=self.url,
+            pool_size=1,
+            max_session_uses=3,
+        )
+        # List the tools through the pool instead of the shared cache
+        client.tool_cache = MCPToolListCache()
+        func = await client.get_callable_function("whoami")
+        ids = [await self._call_text(func) for _ in range(3)]
+        # The first session served list_tools and two calls
+        self.assertEqual(ids[0], ids[1])
+        self.assertNotEqual(ids[1], ids[2])
+
+        await client.close()
+
+    async def test_max_concurrency(self) -> None:
+        """Test the concurrent calls are limited."""
+        client = HttpStatelessClient(
+            name="pooled",
+            transport="streamable_http",
+            url=self.url,
+            pool_size=2,
+            max_concurrency=2,
+        )
+        func = await client.get_callable_function("count_concurrency")
+        results = await asyncio.gather(
+            *[self._call_text(func, delay=0.2) for _ in range(6)],
+        )
+        self.assertEqual(max(int(_) for _ in results), 2)
+
+        await client.close()
+
+    async def test_latency(self) -> None:
+        """Test the spare sessions initialized between the calls take the
+        handshakes off the call latency with the default settings, i.e. a
+        new session per call."""
+        initialize = ClientSession.initialize
+
+        async def slow_initialize(session: ClientSession) -> Any:
+            """Slow down the handshakes."""
+            await asyncio.sleep(0.3)
+            return await initialize(session)
+
+        latencies = {}
+        for name, pool_size in [("unpooled", 0), ("pooled", 2)]:
+            client = HttpStatelessClient(
+                name=name,
+                transport="streamable_http",
+                url=self.url,
+                pool_size=pool_size,
+            )
+            with patch.object(ClientSession, "initialize", slow_initialize):
+                func = await client.get_callable_function("whoami")
+
+                latencies[name] = []
+                for _ in range(4):
+                    # The spare sessions are ready between the calls, e.g.
+                    # while the agent is reasoning
+                    if client.session_pool is not None:
+                        await client.session_pool.warm_up()
+                    start = time.perf_counter()
+                    await self._call_text(func)
+                    latencies[name].append(time.perf_counter() - start)
+
+            await client.close()
+
+        self.assertGreaterEqual(min(latencies["unpooled"]), 0.3)
+        self.assertLess(max(latencies["pooled"]), 0.3)
+
+    async def test_handshakes(self) -> None:
+        """Test the reused pooled sessions save the handshakes entirely,
+        compared with a new session per call without the pool."""
+        initialize = ClientSession.initialize
+        num_handshakes = 0
+
+        async def count_handshakes(session: ClientSession) -> Any:
+            """Count the handshakes."""
+            nonlocal num_handshakes
+            num_handshakes += 1
+            return await initialize(session)
+
+        handshakes = {}
+        for name, pool_size in [("unpooled", 0), ("pooled", 1)]:
+            client = HttpStatelessClient(
+                name=name,
+                transport="streamable_http",
+                url=self.url,
+                pool_size=pool_size,
+                max_session_uses=100,
+            )
+            with patch.object(ClientSession, "initialize", count_handshakes):
+                func = await client.get_callable_function("whoami")
+                if client.session_pool is not None:
+                    await client.session_pool.warm_up()
+
+                num_handshakes = 0
+                for _ in range(8):
+                    await self._call_text(func)
+                handshakes[name] = num_handshakes
+
+            await client.close()
+
+        self.assertDictEqual(handshakes, {"unpooled": 8, "pooled": 0})
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""The StdIO MCP client test module in agentscope."""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from agentscope.mcp import StdIOStatefulClient
+
+_SERVER_CODE = """
+import asyncio
+import os
+
+from mcp.server import FastMCP
+
+server = FastMCP("StdIO")
+
+
+@server.tool()
+async def get_pid(delay: float = 0.0) -> str:
+    await asyncio.sleep(delay)
+    return str(os.getpid())
+
+
+@server.tool()
+async def crash() -> str:
+    os._exit(1)
+
+
+server.run(transport="stdio")
+"""
+
+
+class StdIOMCPClientTest(IsolatedAsyncioTestCase):
+    """Test class for the StdIO MCP client."""
+
+    async def asyncSetUp(self) -> None:
+        """Write the server script."""
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.server_path = os.path.join(self.temp_dir.name, "server.py")
+        with open(self.server_path, "w", encoding="utf-8") as f:
+            f.write(_SERVER_CODE)
+
+    async def asyncTearDown(self) -> None:
+        """Remove the server script."""
+        self.temp_dir.cleanup()
+
+    def _get_client(self, **kwargs: int | float) -> StdIOStatefulClient:
+        """Create the client of the test server."""
+        return StdIOStatefulClient(
+            name="stdio",
+            command=sys.executable,
+            args=[self.server_path],
+            **kwargs,  # type: ignore[arg-type]
+        )
+
+    async def test_pipelining(self) -> None:
+        """Test the concurrent calls are pipelined over one session."""
+        client = self._get_client()
+        await client.connect()
+        func = await client.get_callable_function("get_pid")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[func(delay=0.5) for _ in range(4)])
+        self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertEqual(len({_.content[0]["text"] for _ in results}), 1)
+
+        await client.close()
+
+    async def test_reconnect(self) -> None:
+        """Test the exited server is restarted, and the cached function
+        works with the new session."""
+        client = self._get_client(reconnect_backoff=0.1)
+        await client.connect()
+        get_pid = await client.get_callable_function("get_pid")
+        crash = await client.get_callable_function("crash")
+
+        pid_1 = (await get_pid()).content[0]["text"]
+        with self.assertRaises(Exception):
+            await crash()
+
+        pid_2 = (await get_pid()).content[0]["text"]
+        self.assertNotEqual(pid_1, pid_2)
+        self.assertTrue(client.is_connected)
+
+        await client.close()
+
+    async def test_no_reconnect(self) -> None:
+        """Test the lost session is not reconnected if disabled."""
+        client = self._get_client(max_reconnect_attempts=0)
+        await client.connect()
+        crash = await client.get_callable_function("crash")
+
+        with self.assertRaises(Exception):
+            await crash()
+        with self.assertRaises(RuntimeError):
+            await crash()
+
+        await client.close()
+
+    async def test_process_pool(self) -> None:
+        """Test the concurrent calls are distributed across the
+        processes."""
+        client = self._get_client(num_processes=2)
+        await client.connect()
+        func = await client.get_callable_function("get_pid")
+
+        results = await asyncio.gather(*[func(delay=0.3) for _ in range(4)])
+        self.assertEqual(len({_.content[0]["text"] for _ in results}), 2)
+
+        await client.close()
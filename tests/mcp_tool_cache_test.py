@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""The MCP tool listing cache test module in agentscope."""
+import asyncio
+import os
+import sys
+import tempfile
+from unittest.async_case import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import mcp.types
+
+from agentscope.mcp import (
+    HttpStatelessClient,
+    MCPToolListCache,
+    StdIOStatefulClient,
+)
+from agentscope.tool import Toolkit
+
+_SERVER_CODE = """
+from mcp.server import FastMCP
+from mcp.server.fastmcp import Context
+
+server = FastMCP("StdIO")
+
+
+@server.tool()
+async def {prefix}_echo(text: str) -> str:
+    return text
+
+
+@server.tool()
+async def {prefix}_add_tool(ctx: Context) -> str:
+    server.add_tool(lambda: "new", name="{prefix}_new_tool")
+    await ctx.session.send_tool_list_changed()
+    return "added"
+
+
+server.run(transport="stdio")
+"""
+
+
+def _make_tools(*names: str) -> list[mcp.types.Tool]:
+    """Create the MCP tools with the given names."""
+    return [
+        mcp.types.Tool(
+            name=name,
+            description=f"The {name} tool.",
+            inputSchema={"type": "object", "properties": {}},
+        )
+        for name in names
+    ]
+
+
+class MCPToolListCacheTest(IsolatedAsyncioTestCase):
+    """Test class for the MCP tool listing cache."""
+
+    async def asyncSetUp(self) -> None:
+        """Write the server scripts."""
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.server_paths = {}
+        for prefix in ["a", "b"]:
+            path = os.path.join(self.temp_dir.name, f"server_{prefix}.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(_SERVER_CODE.format(prefix=prefix))
+            self.server_paths[prefix] = path
+
+    async def asyncTearDown(self) -> None:
+        """Remove the server scripts."""
+        self.temp_dir.cleanup()
+
+    async def test_ttl_and_coalescing(self) -> None:
+        """Test the listings are cached within the TTL, and the concurrent
+        listings are coalesced."""
+        cache = MCPToolListCache(ttl=60)
+        num_calls = 0
+
+        async def list_func() -> list[mcp.types.Tool]:
+            nonlocal num_calls
+            num_calls += 1
+            await asyncio.sleep(0.1)
+            return _make_tools("t1")
+
+        results = await asyncio.gather(
+            *[cache.get_or_list("server", list_func) for _ in range(3)],
+        )
+        self.assertTrue(all(_ == results[0] for _ in results))
+        await cache.get_or_list("server", list_func)
+        self.assertEqual(num_calls, 1)
+
+        await cache.get_or_list("server", list_func, refresh=True)
+        self.assertEqual(num_calls, 2)
+
+        cache.invalidate("server")
+        await cache.get_or_list("server", list_func)
+        self.assertEqual(num_calls, 3)
+
+        with patch("time.time", return_value=1e12):
+            await cache.get_or_list("server", list_func)
+        self.assertEqual(num_calls, 4)
+
+        # Cancelling the first caller doesn't cancel the shared listing
+        cache.invalidate("server")
+        first = asyncio.create_task(cache.get_or_list("server", list_func))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_list("server", list_func))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, _make_tools("t1"))
+        self.assertEqual(num_calls, 5)
+        await cache.get_or_list("server", list_func)
+        self.assertEqual(num_calls, 5)
+
+    async def test_default_cache_and_keys(self) -> None:
+        """Test the default shared cache doesn't reuse the listings, and the
+        cache keys change with the headers and the environment variables."""
+        # pylint: disable=protected-access
+        client = StdIOStatefulClient(name="a", command="python")
+        num_calls = 0
+
+        async def list_func() -> list[mcp.types.Tool]:
+            nonlocal num_calls
+            num_calls += 1
+            return _make_tools("t1")
+
+        key = client._get_tool_cache_key()
+        await client.tool_cache.get_or_list(key, list_func)
+        await client.tool_cache.get_or_list(key, list_func)
+        self.assertEqual(num_calls, 2)
+
+        self.assertNotEqual(
+            key,
+            StdIOStatefulClient(
+                name="a",
+                command="python",
+                env={"API_KEY": "secret"},
+            )._get_tool_cache_key(),
+        )
+        keys = [
+            HttpStatelessClient(
+                name="b",
+                transport="streamable_http",
+                url="http://127.0.0.1:8000/mcp",
+                headers=headers,
+            )._get_tool_cache_key()
+            for headers in [None, {"Authorization": "Bearer secret"}]
+        ]
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertNotIn("secret", keys[1])
+
+    async def test_snapshot(self) -> None:
+        """Test the listings are loaded from the snapshot on restart."""
+        snapshot_path = os.path.join(self.temp_dir.name, "tools.json")
+        cache = MCPToolListCache(snapshot_path=snapshot_path)
+
+        async def list_func() -> list[mcp.types.Tool]:
+            return _make_tools("t1", "t2")
+
+        tools = await cache.get_or_list("server", list_func)
+
+        async def fail() -> list[mcp.types.Tool]:
+            raise AssertionError("Listed the tools again.")
+
+        restarted = MCPToolListCache(snapshot_path=snapshot_path)
+        self.assertListEqual(
+            await restarted.get_or_list("server", fail),
+            tools,
+        )
+
+    async def test_list_changed_notification(self) -> None:
+        """Test the cached listing is dropped once the server notifies."""
+        client = StdIOStatefulClient(
+            name="a",
+            command=sys.executable,
+            args=[self.server_paths["a"]],
+        )
+        client.tool_cache = MCPToolListCache(ttl=None)
+        await client.connect()
+
+        tools = await client.list_tools()
+        self.assertListEqual(
+            sorted(_.name for _ in tools),
+            ["a_add_tool", "a_echo"],
+        )
+
+        add_tool = await client.get_callable_function("a_add_tool")
+        await add_tool()
+        await asyncio.sleep(0.2)
+
+        tools = await client.list_tools()
+        self.assertIn("a_new_tool", [_.name for _ in tools])
+
+        await client.close()
+
+    async def test_register_mcp_clients(self) -> None:
+        """Test registering multiple MCP clients concurrently."""
+        # pylint: disable=protected-access
+        clients = [
+            StdIOStatefulClient(
+                name=prefix,
+                command=sys.executable,
+                args=[path],
+            )
+            for prefix, path in self.server_paths.items()
+        ]
+        for client in clients:
+            await client.connect()
+
+        # With the default cache of zero TTL, each server is listed once
+        with patch.object(
+            StdIOStatefulClient,
+            "_list_tools",
+            autospec=True,
+            side_effect=StdIOStatefulClient._list_tools,
+        ) as mock_list_tools:
+            toolkit = Toolkit()
+            await toolkit.register_mcp_clients(
+                clients,
+                disable_funcs=["b_echo"],
+            )
+        self.assertEqual(mock_list_tools.call_count, 2)
+        self.assertListEqual(
+            list(toolkit.tools),
+            ["a_echo", "a_add_tool", "b_add_tool"],
+        )
+
+        for client in clients:
+            await client.close()
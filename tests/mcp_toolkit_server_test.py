@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""The toolkit MCP server test module in agentscope."""
+import asyncio
+import time
+from typing import AsyncGenerator
+from unittest.async_case import IsolatedAsyncioTestCase
+
+import mcp.types
+
+from agentscope.mcp import HttpStatefulClient, ToolkitMCPServer
+from agentscope.message import TextBlock
+from agentscope.tool import Toolkit, ToolResponse
+
+
+async def sleep(seconds: float) -> ToolResponse:
+    """Sleep for the given seconds.
+
+    Args:
+        seconds (`float`):
+            The seconds to sleep.
+    """
+    await asyncio.sleep(seconds)
+    return ToolResponse(
+        content=[TextBlock(type="text", text=f"Slept {seconds}s.")],
+    )
+
+
+async def count(n: int) -> AsyncGenerator[ToolResponse, None]:
+    """Count from 1 to n.
+
+    Args:
+        n (`int`):
+            The number to count to.
+    """
+    text = ""
+    for i in range(1, n + 1):
+        text += f"{i} "
+        yield ToolResponse(content=[TextBlock(type="text", text=text)])
+        await asyncio.sleep(0.01)
+
+
+async def fail() -> ToolResponse:
+    """Raise an error."""
+    raise ValueError("Something went wrong.")
+
+
+class ToolkitMCPServerTest(IsolatedAsyncioTestCase):
+    """Test class for the toolkit MCP server."""
+
+    async def asyncSetUp(self) -> None:
+        """Start the toolkit MCP server."""
+        self.toolkit = Toolkit()
+        self.toolkit.register_tool_function(sleep)
+        self.toolkit.register_tool_function(count)
+        self.toolkit.create_tool_group("errors", "The failing tools.")
+        self.toolkit.register_tool_function(fail, group_name="errors")
+
+        self.server = ToolkitMCPServer(self.toolkit)
+        self.server_task = asyncio.create_task(
+            self.server.run("streamable_http", port=8005),
+        )
+
+        self.client = HttpStatefulClient(
+            name="toolkit",
+            transport="streamable_http",
+            url="http://127.0.0.1:8005/mcp",
+        )
+        for _ in range(50):
+            try:
+                await self.client.connect()
+                break
+            except Exception:  # pylint: disable=broad-except
+                await asyncio.sleep(0.1)
+
+    async def asyncTearDown(self) -> None:
+        """Stop the toolkit MCP server."""
+        await self.client.close()
+        self.server_task.cancel()
+        await asyncio.gather(self.server_task, return_exceptions=True)
+
+    async def test_list_and_call(self) -> None:
+        """Test listing the tools and calling them concurrently."""
+        tools = await self.client.list_tools(refresh=True)
+        self.assertListEqual([_.name for _ in tools], ["sleep", "count"])
+        self.assertListEqual(tools[0].inputSchema["required"], ["seconds"])
+
+        func = await self.client.get_callable_function("sleep")
+        start = time.perf_counter()
+        results = await asyncio.gather(*[func(seconds=0.5) for _ in range(4)])
+        self.assertLess(time.perf_counter() - start, 1.5)
+        for res in results:
+            self.assertEqual(res.content[0]["text"], "Slept 0.5s.")
+
+    async def test_streaming_progress(self) -> None:
+        """Test the chunks of the streaming tool are sent as the progress
+        notifications."""
+        messages = []
+
+        async def on_progress(
+            progress: float,
+            total: float | None,
+            message: str | None,
+        ) -> None:
+            # pylint: disable=unused-argument
+            messages.append(message)
+
+        async with self.client.acquire() as session:
+            res = await session.call_tool(
+                "count",
+                {"n": 3},
+                progress_callback=on_progress,
+            )
+
+        self.assertListEqual(messages, ["1 ", "1 2 "])
+        self.assertIsInstance(res.content[0], mcp.types.TextContent)
+        self.assertEqual(res.content[0].text, "1 2 3 ")
+
+    async def test_errors(self) -> None:
+        """Test the errors are returned as the error results."""
+        self.toolkit.tools["sleep"].timeout = 0.1
+        async with self.client.acquire() as session:
+            # The tool in the inactive group
+            res = await session.call_tool("fail", {})
+            self.assertTrue(res.isError)
+            self.assertIn("not activated", res.content[0].text)
+
+            self.toolkit.update_tool_groups(["errors"], active=True)
+            res = await session.call_tool("fail", {})
+            self.assertTrue(res.isError)
+            self.assertIn("Something went wrong.", res.content[0].text)
+
+            for name, arguments in [
+                ("unknown", {}),
+                ("sleep", {"seconds": "long"}),
+                ("sleep", {"seconds": 1}),
+            ]:
+                res = await session.call_tool(name, arguments)
+                self.assertTrue(res.isError, f"{name} {arguments}")
+
+            res = await session.call_tool("sleep", {"seconds": 0.01})
+            self.assertFalse(res.isError)
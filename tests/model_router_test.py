@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the router chat model."""
+import asyncio
+from typing import Any, AsyncGenerator
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from agentscope.agent import ReActAgent
+from agentscope.formatter import (
+    DashScopeChatFormatter,
+    OpenAIChatFormatter,
+)
+from agentscope.message import Msg, TextBlock, ToolUseBlock
+from agentscope.model import (
+    ChatModelBase,
+    ChatResponse,
+    RouterBackend,
+    RouterChatModel,
+)
+from agentscope.token import TokenCounterBase
+
+
+class FakeModel(ChatModelBase):
+    """A fake chat model with configurable delay and failures."""
+
+    def __init__(
+        self,
+        name: str,
+        delay: float = 0.0,
+        fail: bool = False,
+        stream: bool = False,
+        stall_after: int | None = None,
+    ) -> None:
+        """Initialize the fake model."""
+        super().__init__(name, stream)
+        self.delay = delay
+        self.fail = fail
+        self.stall_after = stall_after
+        self.received: list = []
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        """Return the model name as the response."""
+        self.received.append(messages)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.model_name} failed")
+        if self.stream:
+            return self._stream()
+        return ChatResponse(
+            content=[
+                ToolUseBlock(
+                    type="tool_use",
+                    id="1",
+                    name="generate_response",
+                    input={"response": self.model_name},
+                ),
+            ],
+        )
+
+    async def _stream(self) -> AsyncGenerator[ChatResponse, None]:
+        """Yield the model name character by character."""
+        text = ""
+        for i, char in enumerate(self.model_name):
+            if self.stall_after is not None and i == self.stall_after:
+                await asyncio.sleep(10)
+            text += char
+            yield ChatResponse(content=[TextBlock(type="text", text=text)])
+
+
+class MsgCounter(TokenCounterBase):
+    """A token counter counting a token per message."""
+
+    async def count(self, messages: list[dict], **kwargs: Any) -> int:
+        """Count the messages."""
+        return len(messages)
+
+
+class RouterChatModelTest(IsolatedAsyncioTestCase):
+    """Test cases for the router chat model."""
+
+    async def test_formatter_pairing(self) -> None:
+        """Test the messages are formatted by the paired formatter."""
+        openai_model = FakeModel("openai", delay=0.05)
+        dashscope_model = FakeModel("dashscope")
+        router = RouterChatModel(
+            [
+                RouterBackend(openai_model, OpenAIChatFormatter()),
+                RouterBackend(dashscope_model, DashScopeChatFormatter()),
+            ],
+        )
+        agent = ReActAgent(
+            name="Friday",
+            sys_prompt="You're a helpful assistant.",
+            model=router,
+            formatter=router.formatter,
+        )
+
+        res = await agent(Msg("user", "Hi", "user"))
+        self.assertEqual(res.get_text_content(), "openai")
+        self.assertEqual(
+            openai_model.received[0][1],
+            {
+                "role": "user",
+                "name": "user",
+                "content": [{"type": "text", "text": "Hi"}],
+            },
+        )
+
+        # Both backends have records now, the faster one is chosen
+        await agent(Msg("user", "Hi", "user"))
+        res = await agent(Msg("user", "Hi", "user"))
+        self.assertEqual(res.get_text_content(), "dashscope")
+        self.assertEqual(
+            dashscope_model.received[0][1],
+            {"role": "user", "content": "Hi"},
+        )
+        self.assertAlmostEqual(
+            router.stats["openai"].latency,
+            0.05,
+            delta=0.04,
+        )
+
+    async def test_backend_truncation(self) -> None:
+        """Test the token limit of the backend formatter is applied."""
+        limited = FakeModel("limited")
+        router = RouterChatModel(
+            [
+                RouterBackend(
+                    limited,
+                    OpenAIChatFormatter(
+                        token_counter=MsgCounter(),
+                        max_tokens=2,
+                    ),
+                ),
+            ],
+        )
+        msgs = await router.formatter.format(
+            [
+                Msg("system", "You're a helpful assistant.", "system"),
+                Msg("user", "Hi", "user"),
+                Msg("assistant", "Hello", "assistant"),
+                Msg("user", "Bye", "user"),
+            ],
+        )
+        await router(msgs)
+        self.assertListEqual(
+            [_["role"] for _ in limited.received[0]],
+            ["system", "user"],
+        )
+        self.assertEqual(
+            limited.received[0][1]["content"],
+            [{"type": "text", "text": "Bye"}],
+        )
+
+    async def test_failover_and_cooldown(self) -> None:
+        """Test failing over to the next backend and the cooldown."""
+        broken = FakeModel("broken", fail=True)
+        healthy = FakeModel("healthy", delay=0.01)
+        router = RouterChatModel(
+            [
+                RouterBackend(broken, OpenAIChatFormatter()),
+                RouterBackend(healthy, OpenAIChatFormatter(), cost=5),
+            ],
+            cost_weight=1.0,
+            max_consecutive_errors=1,
+        )
+        msgs = await router.formatter.format([Msg("user", "Hi", "user")])
+
+        res = await router(msgs)
+        self.assertEqual(res.content[0]["input"]["response"], "healthy")
+        self.assertEqual(router.stats["broken"].error_rate, 1.0)
+        self.assertEqual(len(broken.received), 1)
+
+        # The broken backend is cooling down though it's cheaper
+        await router(msgs)
+        self.assertEqual(len(broken.received), 1)
+        self.assertEqual(len(healthy.received), 2)
+
+        broken.fail = healthy.fail = True
+        router.stats["broken"].cooldown_until = 0
+        with self.assertRaises(RuntimeError):
+            await router(msgs)
+
+    async def test_stream_stall_failover(self) -> None:
+        """Test the stalled stream fails over to the next backend."""
+        stalled = FakeModel("stalled", stream=True, stall_after=2)
+        backup = FakeModel("backup", stream=True)
+        router = RouterChatModel(
+            [
+                RouterBackend(stalled, OpenAIChatFormatter()),
+                RouterBackend(backup, OpenAIChatFormatter(), cost=1),
+            ],
+            cost_weight=1.0,
+            stall_timeout=0.1,
+        )
+        self.assertTrue(router.stream)
+
+        texts = [
+            _.content[0]["text"]
+            async for _ in await router([{"role": "user", "content": "Hi"}])
+        ]
+        self.assertListEqual(
+            texts,
+            ["s", "st", "b", "ba", "bac", "back", "backu", "backup"],
+        )
+        self.assertEqual(router.stats["stalled"].error_rate, 1.0)
+        self.assertIsNotNone(router.stats["backup"].ttft)
+
+    def test_invalid_backends(self) -> None:
+        """Test the invalid backends."""
+        with self.assertRaises(ValueError):
+            RouterChatModel(
+                [
+                    RouterBackend(FakeModel("a"), OpenAIChatFormatter()),
+                    RouterBackend(
+                        FakeModel("b", stream=True),
+                        OpenAIChatFormatter(),
+                    ),
+                ],
+            )
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the semantic cache chat model."""
+import re
+from typing import Any, AsyncGenerator, List
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from agentscope.embedding import EmbeddingModelBase, EmbeddingResponse
+from agentscope.message import TextBlock
+from agentscope.model import (
+    ChatModelBase,
+    ChatResponse,
+    SemanticCache,
+    SemanticCacheChatModel,
+)
+
+VOCABULARY = [
+    "reset",
+    "password",
+    "refund",
+    "order",
+    "shipping",
+    "weather",
+]
+
+
+class BagOfWordsEmbedding(EmbeddingModelBase):
+    """A bag-of-words embedding model for testing."""
+
+    def __init__(self) -> None:
+        """Initialize the embedding model."""
+        super().__init__("bag_of_words")
+        self.cnt = 0
+
+    async def __call__(
+        self,
+        text: List[str],
+        **kwargs: Any,
+    ) -> EmbeddingResponse:
+        """Embed the texts by counting the vocabulary words."""
+        self.cnt += 1
+        embeddings = []
+        for _ in text:
+            words = re.findall(r"[a-z]+", _.lower())
+            embeddings.append(
+                [float(words.count(word)) for word in VOCABULARY],
+            )
+        return EmbeddingResponse(embeddings=embeddings)
+
+
+class CountingModel(ChatModelBase):
+    """A chat model that counts the calls."""
+
+    def __init__(self, stream: bool = False) -> None:
+        """Initialize the model."""
+        super().__init__("counting_model", stream)
+        self.cnt = 0
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        """Return the call counter as the response."""
+        self.cnt += 1
+        response = ChatResponse(
+            content=[TextBlock(type="text", text=f"answer {self.cnt}")],
+        )
+        if self.stream:
+            return self._stream(response)
+        return response
+
+    @staticmethod
+    async def _stream(
+        response: ChatResponse,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        """Yield the response in two chunks."""
+        yield ChatResponse(content=[TextBlock(type="text", text="ans")])
+        yield response
+
+
+def _messages(question: str, system: str = "You're a helper.") -> list:
+    """Construct the formatted messages."""
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": [{"type": "text", "text": question}]},
+    ]
+
+
+class SemanticCacheTest(IsolatedAsyncioTestCase):
+    """Test cases for the semantic cache."""
+
+    async def asyncSetUp(self) -> None:
+        """Set up the test case."""
+        self.embedding_model = BagOfWordsEmbedding()
+        self.cache = SemanticCache(
+            self.embedding_model,
+            similarity_threshold=0.9,
+        )
+
+    async def test_near_duplicate_hit(self) -> None:
+        """Test paraphrases are answered from the cache."""
+        model = CountingModel()
+        cached_model = SemanticCacheChatModel(model, self.cache, "agent")
+
+        res1 = await cached_model(_messages("How to reset my password?"))
+        res2 = await cached_model(_messages("Password reset, how?"))
+        res3 = await cached_model(_messages("Where is my order refund?"))
+
+        self.assertEqual(res1.content[0]["text"], "answer 1")
+        self.assertEqual(res2.content[0]["text"], "answer 1")
+        self.assertEqual(res3.content[0]["text"], "answer 2")
+        self.assertEqual(model.cnt, 2)
+        self.assertEqual(self.cache.stats["hits"], 1)
+        # The query embedding is reused when storing after a miss
+        self.assertEqual(self.embedding_model.cnt, 3)
+
+        # Different system prompt or tools won't hit
+        await cached_model(_messages("Reset password", system="Other"))
+        await cached_model(
+            _messages("Reset password"),
+            tools=[{"type": "function", "function": {"name": "f"}}],
+        )
+        self.assertEqual(model.cnt, 4)
+
+    async def test_bypass(self) -> None:
+        """Test the requests that are not ending with a user turn bypass
+        the cache."""
+        model = CountingModel()
+        cached_model = SemanticCacheChatModel(model, self.cache)
+        messages = [
+            *_messages("Reset password"),
+            {"role": "tool", "content": "done", "tool_call_id": "1"},
+        ]
+        await cached_model(messages)
+        await cached_model(messages)
+        self.assertEqual(model.cnt, 2)
+        self.assertEqual(self.cache.size(), 0)
+
+    async def test_namespace_and_history(self) -> None:
+        """Test the namespaces and the history-insensitive mode."""
+        model = CountingModel()
+        agent_a = SemanticCacheChatModel(
+            model,
+            self.cache,
+            "a",
+            include_history=False,
+        )
+        agent_b = SemanticCacheChatModel(model, self.cache, "b")
+
+        await agent_a(_messages("Reset password"))
+        await agent_b(_messages("Reset password"))
+        self.assertEqual(model.cnt, 2)
+        self.assertEqual(self.cache.size("a"), 1)
+        self.assertEqual(self.cache.size("b"), 1)
+
+        history = [
+            {"role": "user", "content": "weather"},
+            {"role": "assistant", "content": "sunny"},
+        ]
+        messages = _messages("Reset password")
+        res = await agent_a([messages[0], *history, messages[1]])
+        self.assertEqual(res.content[0]["text"], "answer 1")
+        await agent_b([messages[0], *history, messages[1]])
+        self.assertEqual(model.cnt, 3)
+
+        self.cache.clear("a")
+        self.assertEqual(self.cache.size(), 2)
+
+    async def test_eviction_and_ttl(self) -> None:
+        """Test the LRU eviction and the time-to-live."""
+        cache = SemanticCache(
+            self.embedding_model,
+            similarity_threshold=0.9,
+            max_entries=2,
+        )
+        model = CountingModel()
+        cached_model = SemanticCacheChatModel(model, cache)
+
+        await cached_model(_messages("reset"))
+        await cached_model(_messages("refund"))
+        # Touch "reset" so that "refund" is the least recently used
+        await cached_model(_messages("reset"))
+        await cached_model(_messages("shipping"))
+        self.assertEqual(cache.size(), 2)
+        self.assertEqual(cache.stats["evictions"], 1)
+
+        await cached_model(_messages("reset"))
+        await cached_model(_messages("refund"))
+        self.assertEqual(model.cnt, 4)
+
+        cache.ttl = -1
+        await cached_model(_messages("refund"))
+        self.assertEqual(model.cnt, 5)
+
+    async def test_false_hit_audit(self) -> None:
+        """Test reporting false hits."""
+        model = CountingModel()
+        cached_model = SemanticCacheChatModel(model, self.cache, "agent")
+
+        await cached_model(_messages("reset password"))
+        res = await cached_model(_messages("password reset"))
+
+        records = self.cache.get_audit_log("agent")
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].id, res.id)
+        self.assertEqual(records[0].cached_query, "reset password")
+        self.assertAlmostEqual(records[0].similarity, 1.0, places=5)
+
+        self.cache.report_false_hit(res.id)
+        self.assertTrue(records[0].false_hit)
+        self.assertEqual(self.cache.stats["false_hits"], 1)
+        self.assertEqual(self.cache.size(), 0)
+
+        await cached_model(_messages("password reset"))
+        self.assertEqual(model.cnt, 2)
+
+    async def test_streaming(self) -> None:
+        """Test the streaming model stores the last chunk."""
+        model = CountingModel(stream=True)
+        cached_model = SemanticCacheChatModel(model, self.cache)
+        self.assertTrue(cached_model.stream)
+
+        chunks = [_ async for _ in await cached_model(_messages("refund"))]
+        self.assertEqual(len(chunks), 2)
+
+        chunks = [_ async for _ in await cached_model(_messages("refund"))]
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0].content[0]["text"], "answer 1")
+        self.assertEqual(model.cnt, 1)
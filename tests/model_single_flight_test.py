@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the single-flight chat and embedding model wrappers."""
+import asyncio
+from typing import Any, AsyncGenerator, List
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from agentscope.embedding import (
+    EmbeddingModelBase,
+    EmbeddingResponse,
+    SingleFlightEmbeddingModel,
+)
+from agentscope.message import TextBlock
+from agentscope.model import (
+    ChatModelBase,
+    ChatResponse,
+    SingleFlightChatModel,
+)
+
+
+class SlowModel(ChatModelBase):
+    """A slow chat model that counts the calls."""
+
+    def __init__(self, stream: bool = False) -> None:
+        """Initialize the model."""
+        super().__init__("slow_model", stream)
+        self.cnt = 0
+        self.finished = 0
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        """Sleep and return the response."""
+        self.cnt += 1
+        if self.stream:
+            return self._stream()
+        await asyncio.sleep(0.1)
+        self.finished += 1
+        return ChatResponse(content=[TextBlock(type="text", text="hi")])
+
+    async def _stream(self) -> AsyncGenerator[ChatResponse, None]:
+        """Yield the accumulated chunks."""
+        text = ""
+        for char in "hello":
+            await asyncio.sleep(0.02)
+            text += char
+            yield ChatResponse(content=[TextBlock(type="text", text=text)])
+        self.finished += 1
+
+
+class SlowEmbedding(EmbeddingModelBase):
+    """A slow embedding model that counts the calls."""
+
+    def __init__(self) -> None:
+        """Initialize the model."""
+        super().__init__("slow_embedding")
+        self.cnt = 0
+
+    async def __call__(
+        self,
+        text: List[str],
+        **kwargs: Any,
+    ) -> EmbeddingResponse:
+        """Sleep and return the embeddings."""
+        self.cnt += 1
+        await asyncio.sleep(0.1)
+        return EmbeddingResponse(embeddings=[[float(len(_))] for _ in text])
+
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+class SingleFlightTest(IsolatedAsyncioTestCase):
+    """Test cases for the single-flight wrappers."""
+
+    async def test_deduplicate(self) -> None:
+        """Test the concurrent identical calls are deduplicated."""
+        model = SlowModel()
+        wrapper = SingleFlightChatModel(model)
+
+        responses = await asyncio.gather(
+            *[wrapper(MESSAGES) for _ in range(5)],
+            wrapper([{"role": "user", "content": "Bye"}]),
+        )
+        self.assertEqual(model.cnt, 2)
+        self.assertTrue(all(_.content[0]["text"] == "hi" for _ in responses))
+        self.assertEqual(wrapper.single_flight.num_deduplicated, 4)
+        self.assertEqual(wrapper.single_flight.num_in_flight, 0)
+
+        # The finished request is not cached
+        await wrapper(MESSAGES)
+        self.assertEqual(model.cnt, 3)
+
+    async def test_shared_scope(self) -> None:
+        """Test the wrappers within the same scope share the requests."""
+        model1, model2 = SlowModel(), SlowModel()
+        await asyncio.gather(
+            SingleFlightChatModel(model1, scope="test")(MESSAGES),
+            SingleFlightChatModel(model2, scope="test")(MESSAGES),
+        )
+        self.assertEqual(model1.cnt + model2.cnt, 1)
+
+    async def test_cancel_waiter(self) -> None:
+        """Test cancelling one waiter doesn't affect the others, and
+        cancelling all waiters cancels the request."""
+        model = SlowModel()
+        wrapper = SingleFlightChatModel(model)
+
+        task1 = asyncio.create_task(wrapper(MESSAGES))
+        task2 = asyncio.create_task(wrapper(MESSAGES))
+        await asyncio.sleep(0.01)
+        task1.cancel()
+
+        res = await task2
+        self.assertEqual(res.content[0]["text"], "hi")
+        self.assertTrue(task1.cancelled())
+        self.assertEqual(model.finished, 1)
+
+        task3 = asyncio.create_task(wrapper(MESSAGES))
+        await asyncio.sleep(0.01)
+        task3.cancel()
+        await asyncio.sleep(0.15)
+        self.assertEqual(model.cnt, 2)
+        self.assertEqual(model.finished, 1)
+        self.assertEqual(wrapper.single_flight.num_in_flight, 0)
+
+    async def test_streaming_tee(self) -> None:
+        """Test each streaming caller gets all the chunks."""
+        model = SlowModel(stream=True)
+        wrapper = SingleFlightChatModel(model)
+
+        async def consume(stop_after: int | None = None) -> list[str]:
+            texts = []
+            stream = await wrapper(MESSAGES)
+            async for chunk in stream:
+                texts.append(chunk.content[0]["text"])
+                if stop_after and len(texts) == stop_after:
+                    await stream.aclose()
+                    break
+            return texts
+
+        res = await asyncio.gather(consume(), consume(), consume(2))
+        self.assertEqual(model.cnt, 1)
+        self.assertListEqual(res[0], ["h", "he", "hel", "hell", "hello"])
+        self.assertListEqual(res[0], res[1])
+        self.assertListEqual(res[2], ["h", "he"])
+        self.assertEqual(model.finished, 1)
+
+        # Closing the only subscriber stops the stream
+        res = await consume(1)
+        await asyncio.sleep(0.1)
+        self.assertEqual(model.cnt, 2)
+        self.assertEqual(model.finished, 1)
+        self.assertEqual(wrapper.single_flight.num_in_flight, 0)
+
+    async def test_streaming_early_close(self) -> None:
+        """Test closing one stream early doesn't affect the caller that
+        holds another stream but hasn't started reading it."""
+        model = SlowModel(stream=True)
+        wrapper = SingleFlightChatModel(model)
+
+        stream1, stream2 = await asyncio.gather(
+            wrapper(MESSAGES),
+            wrapper(MESSAGES),
+        )
+        async for _ in stream1:
+            break
+        await stream1.aclose()
+        await asyncio.sleep(0.1)
+
+        texts = [chunk.content[0]["text"] async for chunk in stream2]
+        self.assertListEqual(texts, ["h", "he", "hel", "hell", "hello"])
+        self.assertEqual(model.cnt, 1)
+        self.assertEqual(model.finished, 1)
+
+    async def test_streaming_cancel_one(self) -> None:
+        """Test cancelling one of two streaming callers doesn't affect the
+        other one."""
+        model = SlowModel(stream=True)
+        wrapper = SingleFlightChatModel(model)
+
+        async def consume() -> list[str]:
+            stream = await wrapper(MESSAGES)
+            return [chunk.content[0]["text"] async for chunk in stream]
+
+        task1 = asyncio.create_task(consume())
+        task2 = asyncio.create_task(consume())
+        await asyncio.sleep(0.03)
+        task1.cancel()
+
+        self.assertListEqual(
+            await task2,
+            ["h", "he", "hel", "hell", "hello"],
+        )
+        self.assertTrue(task1.cancelled())
+        self.assertEqual(model.cnt, 1)
+        self.assertEqual(model.finished, 1)
+
+    async def test_embedding(self) -> None:
+        """Test the single-flight embedding model."""
+        model = SlowEmbedding()
+        wrapper = SingleFlightEmbeddingModel(model)
+        responses = await asyncio.gather(
+            wrapper(["abc", "de"]),
+            wrapper(["abc", "de"]),
+            wrapper(["abc"]),
+        )
+        self.assertEqual(model.cnt, 2)
+        self.assertListEqual(responses[1].embeddings, [[3.0], [2.0]])
+        self.assertListEqual(responses[2].embeddings, [[3.0]])
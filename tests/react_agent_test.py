@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 """The ReAct agent unittests."""
-from typing import Any
+from typing import Any, Generator
 from unittest import IsolatedAsyncioTestCase
 
 from agentscope.agent import ReActAgent
@@ -8,7 +8,7 @@ from agentscope.formatter import DashScopeChatFormatter
 from agentscope.memory import InMemoryMemory
 from agentscope.message import TextBlock, ToolUseBlock, Msg
 from agentscope.model import ChatModelBase, ChatResponse
-from agentscope.tool import Toolkit
+from agentscope.tool import Toolkit, ToolResponse
 
 
 class MyModel(ChatModelBase):
@@ -70,6 +70,21 @@ async def post_acting_hook(
         self.cnt_post_acting = 1
 
 
+def run_shell(num_lines: int) -> Generator[ToolResponse, None, None]:
+    """Run the shell command.
+
+    Args:
+        num_lines (`int`):
+            The number of lines.
+    """
+    for i in range(num_lines):
+        yield ToolResponse(
+            content=[TextBlock(type="text", text=f"line {i}\n")],
+            stream=True,
+            is_delta=True,
+        )
+
+
 class ReActAgentTest(IsolatedAsyncioTestCase):
     """Test class for ReActAgent."""
 
@@ -153,3 +168,48 @@ class ReActAgentTest(IsolatedAsyncioTestCase):
             getattr(agent, "cnt_post_acting"),
             2,
         )
+
+    async def test_delta_tool_response(self) -> None:
+        """Test the delta chunks of the tool response are accumulated and
+        printed incrementally."""
+        toolkit = Toolkit()
+        toolkit.register_tool_function(run_shell)
+        agent = ReActAgent(
+            name="Friday",
+            sys_prompt="You are a helpful assistant named Friday.",
+            model=MyModel(),
+            formatter=DashScopeChatFormatter(),
+            toolkit=toolkit,
+        )
+        agent.disable_console_output()
+
+        printed = []
+
+        def record_print(_self: ReActAgent, kwargs: dict) -> None:
+            """Record the printed tool outputs."""
+            output = kwargs["msg"].content[0]["output"]
+            printed.append(([_["text"] for _ in output], kwargs["last"]))
+
+        agent.register_instance_hook("pre_print", "record", record_print)
+        await agent._acting(  # pylint: disable=protected-access
+            ToolUseBlock(
+                type="tool_use",
+                id="1",
+                name="run_shell",
+                input={"num_lines": 3},
+            ),
+        )
+        self.assertListEqual(
+            printed,
+            [
+                (["line 0\n"], False),
+                (["line 0\nline 1\n"], False),
+                (["line 0\nline 1\nline 2\n"], False),
+                (["line 0\nline 1\nline 2\n"], True),
+            ],
+        )
+        memory = await agent.memory.get_memory()
+        self.assertEqual(
+            memory[-1].content[0]["output"],
+            [TextBlock(type="text", text="line 0\nline 1\nline 2\n")],
+        )
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""The unittests for the estimated token counter."""
+import asyncio
+from typing import Any
+from unittest.async_case import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock
+
+from agentscope.formatter import OpenAIChatFormatter
+from agentscope.message import Msg
+from agentscope.token import (
+    AnthropicTokenCounter,
+    EstimatedTokenCounter,
+    TokenCounterBase,
+)
+
+
+class _RemoteCounter(TokenCounterBase):
+    """The remote counter counting twice the local estimates."""
+
+    def __init__(self, fail: bool = False) -> None:
+        """Initialize the remote counter."""
+        self.fail = fail
+        self.calls = 0
+
+    async def count(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        **kwargs: Any,
+    ) -> int:
+        """Count the tokens."""
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("Network error")
+        # pylint: disable=protected-access
+        return 2 * EstimatedTokenCounter()._count_raw(messages, tools)
+
+
+def _make_messages(text: str) -> list[dict]:
+    """Create the messages with the given user text."""
+    return [
+        {"role": "system", "content": "You're a helpful assistant."},
+        {"role": "user", "content": [{"type": "text", "text": text}]},
+    ]
+
+
+class EstimatedTokenCounterTest(IsolatedAsyncioTestCase):
+    """The unittests for the estimated token counter."""
+
+    async def _wait(self, counter: EstimatedTokenCounter) -> None:
+        """Wait for the background calibrations."""
+        # pylint: disable=protected-access
+        await asyncio.gather(*counter._tasks)
+
+    async def test_estimate(self) -> None:
+        """Test the estimates of the text and multimodal data."""
+        counter = EstimatedTokenCounter(media_tokens=100)
+        text = await counter.count(_make_messages("What's the weather?"))
+        self.assertGreater(text, 10)
+
+        messages = _make_messages("What's the weather?")
+        messages[1]["content"].append(
+            {
+                "type": "image_url",
+                "image_url": {"url": "data:image/png;base64," + "A" * 10000},
+            },
+        )
+        self.assertEqual(await counter.count(messages), text + 100)
+
+        tools = [{"type": "function", "function": {"name": "get_weather"}}]
+        self.assertGreater(
+            await counter.count(_make_messages("Hi"), tools=tools),
+            await counter.count(_make_messages("Hi")),
+        )
+
+    async def test_calibration(self) -> None:
+        """Test the estimates are calibrated against the remote counts in
+        the background."""
+        remote = _RemoteCounter()
+        counter = EstimatedTokenCounter(
+            remote_counter=remote,
+            calibration_interval=3,
+        )
+        messages = _make_messages("What's the capital of France?")
+        raw, _ = await counter.estimate(messages)
+
+        self.assertEqual(await counter.count(messages), raw)
+        await self._wait(counter)
+        self.assertEqual(counter.correction_factor, 2.0)
+
+        for _ in range(5):
+            self.assertEqual(await counter.count(messages), 2 * raw)
+            await self._wait(counter)
+        self.assertEqual(remote.calls, 2)
+
+        self.assertEqual(counter.error_bound, 0.2)
+        for _ in range(3):
+            await counter.calibrate(messages)
+        self.assertEqual(counter.error_bound, 0.0)
+        self.assertEqual(await counter.estimate(messages), (2 * raw, 0))
+
+    async def test_strict(self) -> None:
+        """Test the strict mode counts with the remote counter near the
+        token budget only."""
+        messages = _make_messages("What's the capital of France?")
+        raw, margin = await EstimatedTokenCounter().estimate(messages)
+
+        remote = _RemoteCounter()
+        counter = EstimatedTokenCounter(
+            remote_counter=remote,
+            calibration_interval=100,
+            max_tokens=raw + margin,
+            strict=True,
+        )
+        # Within the error bound of the budget
+        self.assertEqual(await counter.count(messages), 2 * raw)
+        self.assertEqual(remote.calls, 1)
+
+        # Far from the budget after the calibration
+        self.assertEqual(await counter.count(messages), 2 * raw)
+        self.assertEqual(remote.calls, 1)
+
+    async def test_remote_failure(self) -> None:
+        """Test the estimates are used when the remote counter fails."""
+        messages = _make_messages("Hello")
+        counter = EstimatedTokenCounter(
+            remote_counter=_RemoteCounter(fail=True),
+            max_tokens=1,
+            strict=True,
+        )
+        raw, _ = await counter.estimate(messages)
+        self.assertEqual(await counter.count(messages), raw)
+        self.assertEqual(counter.num_calibrations, 0)
+
+    async def test_truncation(self) -> None:
+        """Test the formatter truncates the messages with the estimates."""
+        msgs = [
+            Msg("user", "Tell me a story " * 20, "user"),
+            Msg("assistant", "Once upon a time " * 20, "assistant"),
+            Msg("user", "Go on", "user"),
+        ]
+        formatter = OpenAIChatFormatter(
+            token_counter=EstimatedTokenCounter(),
+            max_tokens=40,
+        )
+        res = await formatter.format(msgs)
+        self.assertListEqual(
+            [_["content"][0]["text"] for _ in res],
+            ["Go on"],
+        )
+
+    async def test_anthropic_counter_input(self) -> None:
+        """Test the Anthropic token counter doesn't modify the input
+        messages."""
+        counter = AnthropicTokenCounter(model_name="claude", api_key="test")
+        counter.client.messages.count_tokens = AsyncMock(  # type: ignore
+            return_value=MagicMock(input_tokens=10),
+        )
+        messages = _make_messages("Hello")
+        self.assertEqual(await counter.count(messages), 10)
+        self.assertEqual(len(messages), 2)
+
+        kwargs = counter.client.messages.count_tokens.call_args.kwargs
+        self.assertEqual(kwargs["system"], "You're a helpful assistant.")
+        self.assertListEqual(kwargs["messages"], messages[1:])
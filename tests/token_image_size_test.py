@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""The image size probing test module of the OpenAI token counter."""
+import base64
+import http.server
+import io
+import threading
+from typing import Any
+from unittest import TestCase
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from PIL import Image
+
+from agentscope._utils._image_header import _get_image_size_from_header
+from agentscope.token._openai_token_counter import _get_size_of_image_url
+
+
+def _make_image(size: tuple[int, int], fmt: str, **kwargs: Any) -> bytes:
+    """Create an image of the given size and format."""
+    mode = "RGBA" if kwargs.pop("alpha", False) else "RGB"
+    buffer = io.BytesIO()
+    Image.new(mode, size, "red").save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """The handler serving the images with range requests."""
+
+    images: dict[str, bytes] = {}
+    requests: list[tuple[str, str | None]] = []
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve the requested range of the image."""
+        content = _Handler.images[self.path]
+        range_header = self.headers.get("Range")
+        _Handler.requests.append((self.path, range_header))
+
+        if range_header:
+            start, end = range_header.removeprefix("bytes=").split("-")
+            content = content[int(start) : int(end) + 1]
+            self.send_response(206)
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args: object) -> None:
+        """Silence the logs."""
+
+
+class ImageHeaderTest(TestCase):
+    """Test class for parsing the image dimensions from the headers."""
+
+    def test_formats(self) -> None:
+        """Test the dimensions of the supported formats."""
+        cases: list[tuple[str, dict[str, Any]]] = [
+            ("PNG", {}),
+            ("GIF", {}),
+            ("JPEG", {}),
+            ("JPEG", {"progressive": True}),
+            ("WEBP", {}),
+            ("WEBP", {"lossless": True}),
+            ("WEBP", {"alpha": True}),
+        ]
+        for fmt, kwargs in cases:
+            data = _make_image((321, 123), fmt, **kwargs)
+            self.assertEqual(
+                _get_image_size_from_header(data[:1024]),
+                (321, 123),
+                f"{fmt} {kwargs}",
+            )
+
+    def test_incomplete_and_unsupported(self) -> None:
+        """Test `None` is returned for the truncated headers and the
+        unsupported formats."""
+        jpeg = _make_image(
+            (64, 64),
+            "JPEG",
+            exif=b"Exif\x00\x00" + bytes(4096),
+        )
+        self.assertIsNone(_get_image_size_from_header(jpeg[:1024]))
+        self.assertEqual(_get_image_size_from_header(jpeg), (64, 64))
+
+        self.assertIsNone(
+            _get_image_size_from_header(_make_image((8, 8), "BMP")),
+        )
+        self.assertIsNone(_get_image_size_from_header(b"\x89PNG\r\n\x1a\n"))
+
+
+class ImageSizeTest(IsolatedAsyncioTestCase):
+    """Test class for probing the image sizes in the token counter."""
+
+    async def asyncSetUp(self) -> None:
+        """Start the HTTP server."""
+        _Handler.images = {
+            "/large.png": _make_image((2000, 1000), "PNG", compress_level=0),
+            "/exif.jpg": _make_image(
+                (64, 48),
+                "JPEG",
+                exif=b"Exif\x00\x00" + bytes(4096),
+            ),
+            "/image.bmp": _make_image((30, 20), "BMP"),
+        }
+        _Handler.requests = []
+        self.server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            _Handler,
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    async def asyncTearDown(self) -> None:
+        """Stop the HTTP server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_web_url(self) -> None:
+        """Test only the header of the web image is downloaded, and the size
+        is cached."""
+        url = f"{self.base_url}/large.png"
+        self.assertEqual(await _get_size_of_image_url(url), (2000, 1000))
+        self.assertEqual(await _get_size_of_image_url(url), (2000, 1000))
+        self.assertListEqual(
+            _Handler.requests,
+            [("/large.png", "bytes=0-1023")],
+        )
+
+    async def test_web_url_fallback(self) -> None:
+        """Test more bytes are probed for the JPEG with large metadata, and
+        the header of the other formats is parsed by PIL."""
+        self.assertEqual(
+            await _get_size_of_image_url(f"{self.base_url}/exif.jpg"),
+            (64, 48),
+        )
+        self.assertEqual(
+            await _get_size_of_image_url(f"{self.base_url}/image.bmp"),
+            (30, 20),
+        )
+        self.assertListEqual(
+            _Handler.requests,
+            [
+                ("/exif.jpg", "bytes=0-1023"),
+                ("/exif.jpg", "bytes=0-65535"),
+                ("/image.bmp", "bytes=0-1023"),
+            ],
+        )
+
+    async def test_data_url(self) -> None:
+        """Test the sizes of the base64 data URLs."""
+        for path, size in [
+            ("/large.png", (2000, 1000)),
+            ("/exif.jpg", (64, 48)),
+            ("/image.bmp", (30, 20)),
+        ]:
+            data = base64.b64encode(_Handler.images[path]).decode()
+            self.assertEqual(
+                await _get_size_of_image_url(f"data:image/x;base64,{data}"),
+                size,
+            )
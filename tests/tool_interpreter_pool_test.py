@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the interpreter pool of the code execution tools."""
+import os
+import platform
+from unittest import IsolatedAsyncioTestCase, skipIf
+
+from agentscope.tool import (
+    InterpreterPool,
+    execute_python_code,
+    execute_shell_command,
+)
+
+
+@skipIf(platform.system() == "Windows", "The pool requires a POSIX shell.")
+class InterpreterPoolTest(IsolatedAsyncioTestCase):
+    """Test cases for the interpreter pool."""
+
+    async def asyncSetUp(self) -> None:
+        """Set up the pool."""
+        self.pool = InterpreterPool(
+            num_python_workers=1,
+            max_runs_per_worker=3,
+            preload_modules=["json"],
+            kill_grace_period=0.5,
+        )
+
+    async def asyncTearDown(self) -> None:
+        """Close the pool."""
+        await self.pool.close()
+
+    async def _python(self, code: str, **kwargs: object) -> str:
+        """Execute the Python code within the pool."""
+        res = await execute_python_code(
+            code,
+            interpreter_pool=self.pool,
+            **kwargs,
+        )
+        return res.content[0]["text"]
+
+    async def test_python(self) -> None:
+        """Test the code is executed in warm and isolated workers."""
+        self.assertEqual(
+            await self._python("import os; print(os.getpid())"),
+            await self._python("import os; print(os.getpid())"),
+        )
+        self.assertEqual(
+            await self._python("a = 1"),
+            "<returncode>0</returncode><stdout></stdout><stderr></stderr>",
+        )
+        # The variables don't leak between calls
+        text = await self._python("print(a)")
+        self.assertTrue(text.startswith("<returncode>1</returncode>"))
+        self.assertTrue(
+            text.endswith("NameError: name 'a' is not defined\n</stderr>"),
+        )
+
+        # The output of the subprocesses is captured
+        text = await self._python(
+            "import os, sys; os.system('echo shell'); sys.exit(3)",
+        )
+        self.assertEqual(
+            text,
+            "<returncode>3</returncode><stdout>shell\n</stdout>"
+            "<stderr></stderr>",
+        )
+
+    async def test_recycle_and_timeout(self) -> None:
+        """Test the workers are recycled and the timed-out ones killed."""
+        pids = [await self._python("import os; print(os.getpid())")]
+        for _ in range(3):
+            pids.append(await self._python("import os; print(os.getpid())"))
+        # Replaced after three runs
+        self.assertEqual(len(set(pids)), 2)
+
+        text = await self._python(
+            "import time; print('123'); time.sleep(10)",
+            timeout=1,
+        )
+        self.assertEqual(
+            text,
+            "<returncode>-1</returncode><stdout>123\n</stdout>"
+            "<stderr>TimeoutError: The code execution exceeded the "
+            "timeout of 1 seconds.</stderr>",
+        )
+        self.assertNotIn(
+            await self._python("import os; print(os.getpid())"),
+            pids,
+        )
+
+    async def test_sessions(self) -> None:
+        """Test the state carries over within the session."""
+        await self._python("a = 1", session_id="alice")
+        text = await self._python("print(a + 1)", session_id="alice")
+        self.assertIn("<stdout>2\n</stdout>", text)
+        text = await self._python("print(a)", session_id="bob")
+        self.assertIn("NameError", text)
+
+        await execute_shell_command(
+            "cd / && export NAME=alice",
+            interpreter_pool=self.pool,
+            session_id="alice",
+        )
+        res = await execute_shell_command(
+            'pwd; echo "$NAME"; echo oops >&2; exit 2',
+            interpreter_pool=self.pool,
+            session_id="alice",
+        )
+        self.assertEqual(
+            res.content[0]["text"],
+            "<returncode>2</returncode><stdout>/\nalice\n</stdout>"
+            "<stderr>oops\n</stderr>",
+        )
+
+        # The state doesn't leak out of the session
+        res = await execute_shell_command(
+            'pwd; echo "$NAME"',
+            interpreter_pool=self.pool,
+        )
+        self.assertIn(
+            f"<stdout>{os.getcwd()}\n\n</stdout>",
+            res.content[0]["text"],
+        )
+
+        # The syntax errors don't break the shell
+        res = await execute_shell_command(
+            "if then",
+            interpreter_pool=self.pool,
+        )
+        text = res.content[0]["text"]
+        self.assertTrue(text.startswith("<returncode>2</returncode>"))
+        self.assertIn("syntax error", text)
+        res = await execute_shell_command("echo 1", interpreter_pool=self.pool)
+        self.assertIn("<stdout>1\n</stdout>", res.content[0]["text"])
+
+        await self.pool.close_session("alice")
+        text = await self._python("print(a)", session_id="alice")
+        self.assertIn("NameError", text)
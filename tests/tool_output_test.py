@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the output capture of the code execution tools."""
+import os
+import platform
+import tempfile
+import time
+from unittest import IsolatedAsyncioTestCase, skipIf
+
+from agentscope.message import ToolUseBlock
+from agentscope.tool import (
+    Toolkit,
+    execute_python_code,
+    execute_shell_command,
+)
+
+
+class ToolOutputTest(IsolatedAsyncioTestCase):
+    """Test cases for the output capture of the code execution tools."""
+
+    async def test_output_caps(self) -> None:
+        """Test the output is capped, and spilled to a file only if the
+        spill directory is given."""
+        code = "print('a' * 10); print('b' * 100000); print('c' * 10)"
+        with tempfile.TemporaryDirectory() as spill_dir:
+            res = await execute_python_code(
+                code,
+                max_head_bytes=12,
+                max_tail_bytes=12,
+                spill_dir=spill_dir,
+            )
+            text = res.content[0]["text"]
+            spill_path = os.path.join(spill_dir, os.listdir(spill_dir)[0])
+            self.assertEqual(
+                text,
+                "<returncode>0</returncode>"
+                "<stdout>aaaaaaaaaa\nb\n... [99999 bytes truncated, the full "
+                f"output is saved in {spill_path}] ...\n\ncccccccccc\n"
+                "</stdout><stderr></stderr>",
+            )
+            with open(spill_path, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read().count("b"), 100000)
+
+        res = await execute_shell_command(
+            "seq 1 10000",
+            max_head_bytes=4,
+            max_tail_bytes=6,
+        )
+        self.assertIn(
+            "<stdout>1\n2\n\n... [48884 bytes truncated] ...\n10000\n"
+            "</stdout>",
+            res.content[0]["text"],
+        )
+
+    async def test_streaming(self) -> None:
+        """Test the output is streamed through the toolkit."""
+        toolkit = Toolkit()
+        toolkit.register_tool_function(
+            execute_python_code,
+            preset_kwargs={"stream": True},
+        )
+        res = await toolkit.call_tool_function(
+            ToolUseBlock(
+                type="tool_use",
+                id="1",
+                name="execute_python_code",
+                input={
+                    "code": "import time\n"
+                    "print(1)\ntime.sleep(0.5)\nprint(2)\ntime.sleep(0.5)",
+                },
+            ),
+        )
+        chunks = [_ async for _ in res]
+        self.assertTrue(
+            chunks[0].content[0]["text"].startswith("<stdout>1"),
+        )
+        self.assertFalse(chunks[0].is_last)
+        self.assertEqual(
+            chunks[-1].content[0]["text"],
+            "<returncode>0</returncode><stdout>1\n2\n</stdout>"
+            "<stderr></stderr>",
+        )
+        self.assertTrue(chunks[-1].is_last)
+
+    @skipIf(platform.system() == "Windows", "Signals are not supported.")
+    async def test_terminate_then_kill(self) -> None:
+        """Test the process ignoring SIGTERM is killed after the grace
+        period, together with its subprocesses."""
+        code = (
+            "import signal, subprocess, time\n"
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+            "subprocess.Popen(['sleep', '10'])\n"
+            "print('started')\n"
+            "time.sleep(10)"
+        )
+        start = time.time()
+        res = await execute_python_code(
+            code,
+            timeout=1,
+            kill_grace_period=0.5,
+        )
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(
+            res.content[0]["text"],
+            "<returncode>-1</returncode><stdout>started\n</stdout>"
+            "<stderr>TimeoutError: The code execution exceeded the timeout "
+            "of 1 seconds.</stderr>",
+        )
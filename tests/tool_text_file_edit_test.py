@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the range editing of the text file tools."""
+import os
+import random
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from agentscope.tool import insert_text_file, write_text_file
+from agentscope.tool._text_file import _line_index, _range_edit
+
+# pylint: disable=protected-access
+
+
+class RangeEditTest(IsolatedAsyncioTestCase):
+    """Test cases for the range editing."""
+
+    def setUp(self) -> None:
+        """Create the test file."""
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "test.txt")
+        self._write("".join(f"{i}\n" for i in range(1, 21)))
+
+    def tearDown(self) -> None:
+        """Remove the test file."""
+        self.temp_dir.cleanup()
+
+    def _write(self, content: str) -> None:
+        """Write the test file without translating the newlines."""
+        with open(self.file_path, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+
+    def _read(self) -> str:
+        """Read the test file without translating the newlines."""
+        with open(self.file_path, "r", encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def _assert_index(self) -> None:
+        """Check the cached index is the same as a rescanned one."""
+        index = _line_index._get_line_index(self.file_path)
+        np.testing.assert_array_equal(
+            index.starts,
+            _line_index._scan_line_starts(self.file_path, index.size),
+        )
+
+    async def test_edits_match_readlines(self) -> None:
+        """Test the edits have the same results as rewriting the lines."""
+        rng = random.Random(0)
+        for _ in range(30):
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+            content = rng.choice(["x", "x\n", "x\ny", "\n\n", ""])
+
+            if rng.random() < 0.5:
+                line_number = rng.randint(1, len(lines) + 1)
+                await insert_text_file(self.file_path, content, line_number)
+                if line_number == len(lines) + 1:
+                    expected = lines + ["\n" + content]
+                else:
+                    expected = (
+                        lines[: line_number - 1]
+                        + [content + "\n"]
+                        + lines[line_number - 1 :]
+                    )
+            else:
+                start = rng.randint(1, len(lines))
+                end = rng.randint(start, len(lines) + 2)
+                await write_text_file(self.file_path, content, [start, end])
+                expected = lines[: start - 1] + [content] + lines[end:]
+
+            self.assertEqual(self._read(), "".join(expected))
+            self._assert_index()
+
+    async def test_index_is_updated(self) -> None:
+        """Test the edits update the index without rescanning the file."""
+        _line_index._get_line_index(self.file_path)
+        with patch.object(
+            _line_index,
+            "_scan_line_starts",
+            wraps=_line_index._scan_line_starts,
+        ) as scan_mock:
+            res = await write_text_file(self.file_path, "a\nb\n", [3, 5])
+            self.assertIn(
+                "1: 1\n2: 2\n3: a\n4: b\n5: 6\n",
+                res.content[0]["text"],
+            )
+            await insert_text_file(self.file_path, "c", 2)
+            await write_text_file(self.file_path, "d\n")
+            self.assertEqual(scan_mock.call_count, 0)
+
+        self._assert_index()
+        self.assertEqual(self._read(), "d\n")
+
+    async def test_unchanged_bytes_are_kept(self) -> None:
+        """Test the lines out of the edited range keep their line
+        endings."""
+        self._write("a\r\nb\r\nc\r\n")
+        await write_text_file(self.file_path, "B\n", [2, 2])
+        self.assertEqual(self._read(), "a\r\nB\nc\r\n")
+
+    async def test_atomicity(self) -> None:
+        """Test the file is left unchanged if the writing fails."""
+        original = self._read()
+
+        def fail(*args: object) -> None:
+            raise OSError("disk full")
+
+        with patch.object(_range_edit, "_copy_range", side_effect=fail):
+            with self.assertRaises(OSError):
+                await write_text_file(self.file_path, "x", [1, 2])
+
+        self.assertEqual(self._read(), original)
+        self.assertListEqual(os.listdir(self.temp_dir.name), ["test.txt"])
+
+    async def test_symlink(self) -> None:
+        """Test the target of the symbolic link is edited."""
+        link_path = os.path.join(self.temp_dir.name, "link.txt")
+        os.symlink(self.file_path, link_path)
+        os.chmod(self.file_path, 0o640)
+
+        await insert_text_file(link_path, "0", 1)
+        self.assertTrue(os.path.islink(link_path))
+        self.assertTrue(self._read().startswith("0\n1\n"))
+        self.assertEqual(os.stat(self.file_path).st_mode & 0o777, 0o640)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the line-offset index of the text file tools."""
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from agentscope.tool import view_text_file
+from agentscope.tool._text_file import _line_index
+
+# pylint: disable=protected-access
+
+
+class LineIndexTest(IsolatedAsyncioTestCase):
+    """Test cases for the line-offset index."""
+
+    def setUp(self) -> None:
+        """Create the test file."""
+        # pylint: disable=consider-using-with
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "test.log")
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            f.write("".join(f"{i}\n" for i in range(1, 11)))
+
+    def tearDown(self) -> None:
+        """Remove the test file."""
+        self.temp_dir.cleanup()
+
+    async def _view(self, ranges: list[int]) -> str:
+        """View the file and return the numbered lines."""
+        res = await view_text_file(self.file_path, ranges)
+        return res.content[0]["text"].split("```")[1][1:]
+
+    async def test_negative_ranges(self) -> None:
+        """Test the negative line numbers count from the end."""
+        self.assertEqual(await self._view([-3, -1]), "8: 8\n9: 9\n10: 10\n")
+        self.assertEqual(await self._view([7, -3]), "7: 7\n8: 8\n")
+        self.assertEqual(
+            await self._view([-100, -9]),
+            "1: 1\n2: 2\n",
+        )
+
+        res = await view_text_file(self.file_path, [-1, -3])
+        self.assertIn("greater than the end line", res.content[0]["text"])
+
+        # Inverted after the conversion
+        for ranges in [[-5, 3], [3, -9]]:
+            res = await view_text_file(self.file_path, ranges)
+            self.assertIn(
+                "greater than the end line",
+                res.content[0]["text"],
+            )
+
+    async def test_invalidation(self) -> None:
+        """Test the index is reused until the file changes."""
+        with patch.object(
+            _line_index,
+            "_scan_line_starts",
+            wraps=_line_index._scan_line_starts,
+        ) as scan_mock:
+            await self._view([1, 2])
+            await self._view([-2, -1])
+            self.assertEqual(scan_mock.call_count, 1)
+
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write("11\r\n12")
+            self.assertEqual(await self._view([-2, -1]), "11: 11\n12: 12")
+            self.assertEqual(scan_mock.call_count, 2)
+
+    def test_line_starts(self) -> None:
+        """Test the line starts are counted as `readlines()`."""
+        for content in ["", "\n", "a", "a\n", "a\r\nb", "\n\nc\n"]:
+            with open(self.file_path, "w", encoding="utf-8", newline="") as f:
+                f.write(content)
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                expected = f.readlines()
+
+            index = _line_index._get_line_index(self.file_path)
+            self.assertEqual(index.n_lines, len(expected), repr(content))
+            self.assertListEqual(
+                _line_index._read_lines(self.file_path, 1, index.n_lines),
+                expected,
+            )
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the batchable tool functions."""
+import asyncio
+from typing import Any
+from unittest import IsolatedAsyncioTestCase
+
+from agentscope.agent import ReActAgent
+from agentscope.formatter import DashScopeChatFormatter
+from agentscope.message import Msg, TextBlock, ToolUseBlock
+from agentscope.model import ChatModelBase, ChatResponse
+from agentscope.tool import ToolResponse, Toolkit
+
+
+class FlightDatabase:
+    """A fake flight database counting the queries."""
+
+    def __init__(self) -> None:
+        """Initialize the database."""
+        self.queries: list[list[str]] = []
+
+    def get_flight(self, flight_id: str) -> ToolResponse:
+        """Get the flight details.
+
+        Args:
+            flight_id (`str`):
+                The flight ID.
+        """
+        self.queries.append([flight_id])
+        return ToolResponse(
+            content=[TextBlock(type="text", text=f"Flight {flight_id}")],
+        )
+
+    async def get_flights(self, kwargs_list: list[dict]) -> list[ToolResponse]:
+        """Get the details of multiple flights in one query."""
+        await asyncio.sleep(0)
+        flight_ids = [_["flight_id"] for _ in kwargs_list]
+        if "XX" in flight_ids:
+            raise ValueError("Unknown flight")
+        self.queries.append(flight_ids)
+        return [
+            ToolResponse(content=[TextBlock(type="text", text=f"Flight {_}")])
+            for _ in flight_ids
+        ]
+
+
+def _tool_call(call_id: str, flight_id: str) -> ToolUseBlock:
+    """Make a tool call of the `get_flight` function."""
+    return ToolUseBlock(
+        type="tool_use",
+        id=call_id,
+        name="get_flight",
+        input={"flight_id": flight_id},
+    )
+
+
+class FlightModel(ChatModelBase):
+    """A chat model calling the `get_flight` function three times."""
+
+    def __init__(self) -> None:
+        """Initialize the model."""
+        super().__init__("flight_model", stream=False)
+        self.cnt = 0
+
+    async def __call__(
+        self,
+        _messages: list[dict],
+        **kwargs: Any,
+    ) -> ChatResponse:
+        """Call the tools in the first step."""
+        self.cnt += 1
+        if self.cnt == 1:
+            return ChatResponse(
+                content=[_tool_call(str(i), f"CA{i}") for i in range(3)],
+            )
+        return ChatResponse(content=[TextBlock(type="text", text="Done")])
+
+
+class ToolkitBatchTest(IsolatedAsyncioTestCase):
+    """Test cases for the batchable tool functions."""
+
+    async def asyncSetUp(self) -> None:
+        """Set up the toolkit."""
+        self.db = FlightDatabase()
+        self.toolkit = Toolkit()
+        self.toolkit.register_tool_function(
+            self.db.get_flight,
+            batch_func=self.db.get_flights,
+            postprocess_func=lambda tool_call, res: ToolResponse(
+                content=[
+                    TextBlock(
+                        type="text",
+                        text=f"{tool_call['id']}: {res.content[0]['text']}",
+                    ),
+                ],
+            ),
+        )
+
+    async def _call(self, tool_call: ToolUseBlock) -> str:
+        """Call the tool function and return the text of the last chunk."""
+        res = await self.toolkit.call_tool_function(tool_call)
+        return [_ async for _ in res][-1].content[0]["text"]
+
+    async def test_batch(self) -> None:
+        """Test the collected calls are executed in one batch."""
+        tool_calls = [_tool_call(str(i), f"CA{i}") for i in range(3)]
+        self.toolkit.batch_tool_calls(tool_calls)
+
+        texts = [await self._call(_) for _ in reversed(tool_calls)]
+        self.assertListEqual(
+            texts,
+            ["2: Flight CA2", "1: Flight CA1", "0: Flight CA0"],
+        )
+        self.assertListEqual(self.db.queries, [["CA0", "CA1", "CA2"]])
+
+        # The calls are not collected again
+        await self._call(tool_calls[0])
+        self.assertListEqual(self.db.queries[-1], ["CA0"])
+
+    async def test_max_batch_size_and_changed_input(self) -> None:
+        """Test the batches are split and the changed calls run alone."""
+        self.toolkit.tools["get_flight"].max_batch_size = 2
+        tool_calls = [_tool_call(str(i), f"CA{i}") for i in range(5)]
+        self.toolkit.batch_tool_calls(tool_calls)
+
+        tool_calls[0]["input"]["flight_id"] = "MU0"
+        texts = await asyncio.gather(*[self._call(_) for _ in tool_calls])
+        self.assertEqual(texts[0], "0: Flight MU0")
+        self.assertListEqual(
+            sorted(self.db.queries),
+            [["CA0", "CA1"], ["CA2", "CA3"], ["CA4"], ["MU0"]],
+        )
+
+    async def test_batch_error(self) -> None:
+        """Test the error of the batch function is fanned out."""
+        tool_calls = [_tool_call("0", "CA0"), _tool_call("1", "XX")]
+        self.toolkit.batch_tool_calls(tool_calls)
+        for tool_call in tool_calls:
+            self.assertEqual(
+                await self._call(tool_call),
+                f"{tool_call['id']}: Error: Unknown flight",
+            )
+
+    async def test_cache_hit_and_clear(self) -> None:
+        """Test the batch entries are removed on the cache hits, and the
+        collected calls that are not called can be discarded."""
+        self.toolkit.tools["get_flight"].cacheable = True
+        await self._call(_tool_call("a", "CA0"))
+
+        tool_calls = [_tool_call(str(i), f"CA{i}") for i in range(3)]
+        self.toolkit.batch_tool_calls(tool_calls)
+        self.assertEqual(await self._call(tool_calls[0]), "a: Flight CA0")
+        # pylint: disable=protected-access
+        self.assertListEqual(list(self.toolkit._tool_batches), ["1", "2"])
+
+        self.toolkit.clear_tool_batches(tool_calls[1:])
+        self.assertDictEqual(self.toolkit._tool_batches, {})
+        await self._call(tool_calls[1])
+        self.assertListEqual(self.db.queries, [["CA0"], ["CA1"]])
+
+        self.toolkit.batch_tool_calls(tool_calls)
+        self.toolkit.clear_tool_batches()
+        self.assertDictEqual(self.toolkit._tool_batches, {})
+
+    async def test_react_agent(self) -> None:
+        """Test the agent collects the tool calls in one reasoning step."""
+        agent = ReActAgent(
+            name="Friday",
+            sys_prompt="You're a helpful assistant.",
+            model=FlightModel(),
+            formatter=DashScopeChatFormatter(),
+            toolkit=self.toolkit,
+            max_iters=2,
+        )
+        await agent(Msg("user", "Check my flights.", "user"))
+        self.assertListEqual(self.db.queries, [["CA0", "CA1", "CA2"]])
+
+    async def test_react_agent_interrupted(self) -> None:
+        """Test the agent discards the collected calls when the acting is
+        interrupted."""
+        agent = ReActAgent(
+            name="Friday",
+            sys_prompt="You're a helpful assistant.",
+            model=FlightModel(),
+            formatter=DashScopeChatFormatter(),
+            toolkit=self.toolkit,
+            max_iters=2,
+        )
+
+        def interrupt(*_args: Any) -> None:
+            """Interrupt the acting."""
+            raise asyncio.CancelledError()
+
+        agent.register_instance_hook("pre_acting", "interrupt", interrupt)
+        await agent(Msg("user", "Check my flights.", "user"))
+        self.assertListEqual(self.db.queries, [])
+        # pylint: disable=protected-access
+        self.assertDictEqual(self.toolkit._tool_batches, {})
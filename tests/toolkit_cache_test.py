@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the tool result cache of the toolkit."""
+import asyncio
+import tempfile
+from typing import Any
+from unittest import IsolatedAsyncioTestCase
+
+from agentscope.message import TextBlock, ToolUseBlock
+from agentscope.tool import ToolResponse, ToolResultCache, Toolkit
+
+
+class FakeFileSystem:
+    """A fake file system that counts the reads."""
+
+    def __init__(self) -> None:
+        """Initialize the fake file system."""
+        self.files: dict[str, str] = {"a.txt": "a", "b.txt": "b"}
+        self.num_reads = 0
+
+    def read_file(
+        self,
+        file_path: str,
+        encoding: str = "utf-8",
+    ) -> ToolResponse:
+        """Read the file.
+
+        Args:
+            file_path (`str`):
+                The file path.
+            encoding (`str`, defaults to `"utf-8"`):
+                The encoding.
+        """
+        self.num_reads += 1
+        if file_path not in self.files:
+            raise FileNotFoundError(file_path)
+        return ToolResponse(
+            content=[
+                TextBlock(
+                    type="text",
+                    text=f"{self.files[file_path]} ({encoding})",
+                ),
+            ],
+        )
+
+    async def write_file(self, file_path: str, content: str) -> ToolResponse:
+        """Write the file.
+
+        Args:
+            file_path (`str`):
+                The file path.
+            content (`str`):
+                The content.
+        """
+        await asyncio.sleep(0)
+        self.files[file_path] = content
+        return ToolResponse(content=[TextBlock(type="text", text="Done")])
+
+
+class ToolkitCacheTest(IsolatedAsyncioTestCase):
+    """Test cases for the tool result cache."""
+
+    async def asyncSetUp(self) -> None:
+        """Set up the toolkit."""
+        self.fs = FakeFileSystem()
+        self.toolkit = Toolkit()
+        self.toolkit.register_tool_function(
+            self.fs.read_file,
+            cacheable=True,
+            resource_args=["file_path"],
+        )
+        self.toolkit.register_tool_function(
+            self.fs.write_file,
+            resource_args=["file_path"],
+        )
+
+    async def _call(self, name: str, **kwargs: Any) -> ToolResponse:
+        """Call the tool function and return the last chunk."""
+        res = await self.toolkit.call_tool_function(
+            ToolUseBlock(type="tool_use", id="1", name=name, input=kwargs),
+        )
+        return [_ async for _ in res][-1]
+
+    async def test_cache_hit(self) -> None:
+        """Test the equivalent calls hit the cache."""
+        res1 = await self._call("read_file", file_path="a.txt")
+        res2 = await self._call(
+            "read_file",
+            file_path="a.txt",
+            encoding="utf-8",
+        )
+        self.assertEqual(self.fs.num_reads, 1)
+        self.assertEqual(res1.content, res2.content)
+        self.assertNotEqual(res1.id, res2.id)
+        self.assertEqual(self.toolkit.tool_cache.hits, 1)
+
+        await self._call("read_file", file_path="a.txt", encoding="gbk")
+        await self._call("read_file", file_path="b.txt")
+        self.assertEqual(self.fs.num_reads, 3)
+
+        # The preset kwargs are part of the key
+        self.toolkit.tools["read_file"].preset_kwargs = {"encoding": "gbk"}
+        res = await self._call("read_file", file_path="a.txt")
+        self.assertEqual(res.content[0]["text"], "a (gbk)")
+        self.assertEqual(self.fs.num_reads, 3)
+
+    async def test_failed_calls_not_cached(self) -> None:
+        """Test the failed calls are not cached."""
+        for _ in range(2):
+            res = await self._call("read_file", file_path="c.txt")
+            self.assertEqual(res.content[0]["text"], "Error: c.txt")
+        self.assertEqual(self.fs.num_reads, 2)
+
+    async def test_ttl(self) -> None:
+        """Test the cached responses expire."""
+        self.toolkit.tools["read_file"].cache_ttl = 0.1
+        await self._call("read_file", file_path="a.txt")
+        await self._call("read_file", file_path="a.txt")
+        self.assertEqual(self.fs.num_reads, 1)
+
+        await asyncio.sleep(0.15)
+        await self._call("read_file", file_path="a.txt")
+        self.assertEqual(self.fs.num_reads, 2)
+
+    async def test_invalidate_by_write_tool(self) -> None:
+        """Test the write tool invalidates the cached responses of the same
+        resource."""
+        await self._call("read_file", file_path="a.txt")
+        await self._call("read_file", file_path="b.txt")
+
+        await self._call("write_file", file_path="a.txt", content="new")
+        res = await self._call("read_file", file_path="a.txt")
+        self.assertEqual(res.content[0]["text"], "new (utf-8)")
+        self.assertEqual(self.fs.num_reads, 3)
+
+        await self._call("read_file", file_path="b.txt")
+        self.assertEqual(self.fs.num_reads, 3)
+
+        # The different spellings of the same file path
+        await self._call("read_file", file_path="a.txt")
+        await self._call("write_file", file_path="./a.txt", content="new2")
+        await self._call("read_file", file_path="a.txt")
+        self.assertEqual(self.fs.num_reads, 4)
+
+        # Manual invalidation by the tool name
+        await self.toolkit.tool_cache.invalidate(tool_name="read_file")
+        self.assertEqual(len(self.toolkit.tool_cache), 0)
+
+    async def test_empty_user_cache(self) -> None:
+        """Test an empty cache given by the user is kept."""
+        tool_cache = ToolResultCache(max_size=2)
+        self.assertEqual(len(tool_cache), 0)
+        self.assertIs(Toolkit(tool_cache=tool_cache).tool_cache, tool_cache)
+
+    async def test_persistence_and_lru(self) -> None:
+        """Test the cached responses are persisted and bounded."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.toolkit.tool_cache = ToolResultCache(
+                max_size=2,
+                cache_dir=cache_dir,
+            )
+            for file_path in ["a.txt", "b.txt", "a.txt"]:
+                await self._call("read_file", file_path=file_path)
+            self.fs.files["c.txt"] = "c"
+            await self._call("read_file", file_path="c.txt")
+            self.assertEqual(self.fs.num_reads, 3)
+
+            # A new cache loaded from the directory, where "b.txt" is
+            # evicted as the least recently used one
+            self.toolkit.tool_cache = ToolResultCache(
+                max_size=2,
+                cache_dir=cache_dir,
+            )
+            self.assertEqual(len(self.toolkit.tool_cache), 2)
+            await self._call("read_file", file_path="a.txt")
+            await self._call("read_file", file_path="c.txt")
+            self.assertEqual(self.fs.num_reads, 3)
+            await self._call("read_file", file_path="b.txt")
+            self.assertEqual(self.fs.num_reads, 4)
+
+    async def test_unserializable(self) -> None:
+        """Test the calls with unserializable arguments aren't cached, and
+        failing to persist the response doesn't fail the call."""
+
+        def get_meta(path: str) -> ToolResponse:
+            """Get the metadata.
+
+            Args:
+                path (`str`):
+                    The path.
+            """
+            self.fs.num_reads += 1
+            return ToolResponse(
+                content=[TextBlock(type="text", text=path)],
+                metadata={"object": object()},
+            )
+
+        self.toolkit.register_tool_function(get_meta, cacheable=True)
+        for _ in range(2):
+            res = await self._call("get_meta", path="a.txt")
+            self.assertEqual(res.content[0]["text"], "a.txt")
+        self.assertEqual(self.fs.num_reads, 2)
+        self.assertEqual(len(self.toolkit.tool_cache), 0)
+
+        # The disk write fails
+        with tempfile.NamedTemporaryFile() as f:
+            self.toolkit.tool_cache = ToolResultCache(cache_dir=f.name)
+            res = await self._call("read_file", file_path="a.txt")
+            self.assertEqual(res.content[0]["text"], "a (utf-8)")
+            await self._call("read_file", file_path="a.txt")
+            self.assertEqual(self.fs.num_reads, 3)
+
+        # The unserializable arguments
+        self.toolkit.tools["read_file"].preset_kwargs = {"encoding": object()}
+        await self._call("read_file", file_path="a.txt")
+        await self._call("read_file", file_path="a.txt")
+        self.assertEqual(self.fs.num_reads, 5)
+        self.assertIsNone(
+            ToolResultCache.get_key("read_file", {"encoding": object()}),
+        )
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the compact tool schema rendering."""
+from typing import Optional
+from unittest import IsolatedAsyncioTestCase
+
+from pydantic import BaseModel
+
+from agentscope.message import TextBlock
+from agentscope.token import TokenCounterBase
+from agentscope.tool import SchemaCompactor, ToolResponse, Toolkit
+
+
+class Point(BaseModel):
+    """The point."""
+
+    x: int
+    y: int
+
+
+class Line(BaseModel):
+    """The line."""
+
+    start: Point
+    end: Point
+
+
+def draw(line: Line, color: Optional[str] = None) -> ToolResponse:
+    """Draw a line on the canvas with the given color, which is a long
+    description that exceeds the token budget of the compactor.
+
+    Args:
+        line (`Line`):
+            The line.
+        color (`Optional[str]`, optional):
+            The color.
+    """
+    return ToolResponse(
+        content=[TextBlock(type="text", text=f"{line} {color}")]
+    )
+
+
+def clear() -> ToolResponse:
+    """Clear the canvas."""
+    return ToolResponse(content=[TextBlock(type="text", text="Cleared")])
+
+
+class CharTokenCounter(TokenCounterBase):
+    """A token counter counting four characters as one token."""
+
+    async def count(self, messages: list[dict], **kwargs: dict) -> int:
+        """Count the tokens of the messages."""
+        return sum(len(_["content"]) + 12 for _ in messages) // 4
+
+
+class ToolkitCompactionTest(IsolatedAsyncioTestCase):
+    """Test cases for the compact tool schema rendering."""
+
+    async def asyncSetUp(self) -> None:
+        """Set up the toolkit."""
+        self.toolkit = Toolkit()
+        self.toolkit.create_tool_group("canvas", "Canvas tools.", active=True)
+        self.toolkit.register_tool_function(draw, group_name="canvas")
+        self.toolkit.register_tool_function(clear)
+
+    def test_compact(self) -> None:
+        """Test the redundant parts are removed."""
+        compacted = SchemaCompactor(max_description_tokens=5).compact(
+            self.toolkit.tools["draw"].extended_json_schema,
+        )
+        function = compacted["function"]
+        self.assertEqual(function["description"], "Draw a line on the...")
+
+        parameters = function["parameters"]
+        self.assertDictEqual(
+            parameters["properties"]["color"],
+            {"type": "string", "description": "The color."},
+        )
+        # The single-use "Line" is inlined while "Point" is kept
+        self.assertListEqual(list(parameters["$defs"]), ["Point"])
+        self.assertEqual(
+            parameters["properties"]["line"]["properties"]["start"],
+            {"$ref": "#/$defs/Point"},
+        )
+
+        # The original schema is untouched
+        original = self.toolkit.tools["draw"].extended_json_schema
+        self.assertIn(
+            "anyOf",
+            original["function"]["parameters"]["properties"]["color"],
+        )
+
+    def test_dedupe_defs(self) -> None:
+        """Test the identical and unused definitions are merged."""
+        point = {"type": "object", "properties": {"x": {"type": "integer"}}}
+        compacted = SchemaCompactor().compact(
+            {
+                "type": "function",
+                "function": {
+                    "name": "f",
+                    "parameters": {
+                        "$defs": {"A": point, "B": point, "C": point},
+                        "properties": {
+                            "a": {"$ref": "#/$defs/A"},
+                            "b": {"$ref": "#/$defs/B"},
+                        },
+                        "type": "object",
+                    },
+                },
+            },
+        )
+        parameters = compacted["function"]["parameters"]
+        self.assertDictEqual(parameters["$defs"], {"A": point})
+        self.assertDictEqual(
+            parameters["properties"],
+            {"a": {"$ref": "#/$defs/A"}, "b": {"$ref": "#/$defs/A"}},
+        )
+
+    async def test_toolkit_groups(self) -> None:
+        """Test the compaction is enabled per group."""
+        compactor = SchemaCompactor()
+        self.toolkit.set_schema_compactor(["canvas"], compactor)
+
+        draw_schema, clear_schema = self.toolkit.get_json_schemas()
+        self.assertNotIn(
+            "anyOf",
+            draw_schema["function"]["parameters"]["properties"]["color"],
+        )
+        self.assertIs(
+            clear_schema,
+            self.toolkit.tools["clear"].extended_json_schema,
+        )
+
+        # The compacted schema is cached
+        self.toolkit.update_tool_groups(["canvas"], active=True)
+        self.assertIs(self.toolkit.get_json_schemas()[0], draw_schema)
+
+        report = await self.toolkit.get_schema_compaction_report(
+            CharTokenCounter(),
+        )
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]["name"], "draw")
+        self.assertGreater(report[0]["saved_tokens"], 0)
+        self.assertEqual(
+            report[0]["saved_tokens"],
+            report[0]["original_tokens"] - report[0]["compacted_tokens"],
+        )
+
+        with self.assertRaises(ValueError):
+            self.toolkit.set_schema_compactor(["unknown"], compactor)
+
+        self.toolkit.set_schema_compactor(["canvas"], None)
+        self.assertIs(
+            self.toolkit.get_json_schemas()[0],
+            self.toolkit.tools["draw"].extended_json_schema,
+        )
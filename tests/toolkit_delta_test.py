@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the delta streaming of the tool responses."""
+import asyncio
+from typing import AsyncGenerator, Generator
+from unittest import IsolatedAsyncioTestCase
+
+from agentscope.message import TextBlock, ToolUseBlock
+from agentscope.tool import ToolResponse, Toolkit
+
+
+async def tail_logs(num_lines: int) -> AsyncGenerator[ToolResponse, None]:
+    """Tail the logs.
+
+    Args:
+        num_lines (`int`):
+            The number of lines.
+    """
+    for i in range(num_lines):
+        yield ToolResponse(
+            content=[TextBlock(type="text", text=f"line {i}\n")],
+            metadata={"num_lines": i + 1},
+            stream=True,
+            is_delta=True,
+        )
+    await asyncio.sleep(10)
+
+
+def run_shell(num_lines: int) -> Generator[ToolResponse, None, None]:
+    """Run the shell command.
+
+    Args:
+        num_lines (`int`):
+            The number of lines.
+    """
+    for i in range(num_lines):
+        yield ToolResponse(
+            content=[TextBlock(type="text", text=f"line {i}\n")],
+            stream=True,
+            is_delta=True,
+        )
+
+
+class ToolkitDeltaTest(IsolatedAsyncioTestCase):
+    """Test cases for the delta streaming of the tool responses."""
+
+    async def asyncSetUp(self) -> None:
+        """Set up the toolkit."""
+        self.postprocessed: list[str] = []
+        self.toolkit = Toolkit()
+        self.toolkit.register_tool_function(
+            run_shell,
+            postprocess_func=self._postprocess,
+        )
+        self.toolkit.register_tool_function(
+            tail_logs,
+            postprocess_func=self._postprocess,
+        )
+
+    def _postprocess(
+        self,
+        _tool_call: ToolUseBlock,
+        tool_response: ToolResponse,
+    ) -> ToolResponse:
+        """Record the post-processed texts."""
+        self.postprocessed.append(tool_response.content[0]["text"])
+        return tool_response
+
+    async def test_accumulation(self) -> None:
+        """Test the delta chunks are forwarded and accumulated once."""
+        res = await self.toolkit.call_tool_function(
+            ToolUseBlock(
+                type="tool_use",
+                id="1",
+                name="run_shell",
+                input={"num_lines": 3},
+            ),
+        )
+        chunks = [_ async for _ in res]
+        self.assertListEqual(
+            [(_.is_delta, _.is_last) for _ in chunks],
+            [(True, False)] * 3 + [(False, True)],
+        )
+        self.assertEqual(chunks[1].content[0]["text"], "line 1\n")
+        self.assertListEqual(
+            chunks[-1].content,
+            [TextBlock(type="text", text="line 0\nline 1\nline 2\n")],
+        )
+        # The postprocess function only runs on the accumulated response
+        self.assertListEqual(
+            self.postprocessed,
+            ["line 0\nline 1\nline 2\n"],
+        )
+
+    async def test_interruption(self) -> None:
+        """Test the interrupted response keeps the accumulated output."""
+        res = await self.toolkit.call_tool_function(
+            ToolUseBlock(
+                type="tool_use",
+                id="1",
+                name="tail_logs",
+                input={"num_lines": 2},
+            ),
+        )
+        chunks = []
+
+        async def consume() -> None:
+            async for chunk in res:
+                chunks.append(chunk)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(len(chunks), 3)
+        self.assertTrue(chunks[-1].is_interrupted)
+        self.assertEqual(chunks[-1].content[0]["text"], "line 0\nline 1\n")
+        self.assertDictEqual(chunks[-1].metadata, {"num_lines": 2})
+        self.assertListEqual(self.postprocessed, ["line 0\nline 1\n"])
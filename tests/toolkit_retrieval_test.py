@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the embedding-based tool retrieval."""
+from typing import Any, List
+from unittest import IsolatedAsyncioTestCase
+
+from agentscope.agent import ReActAgent
+from agentscope.embedding import EmbeddingModelBase, EmbeddingResponse
+from agentscope.formatter import DashScopeChatFormatter
+from agentscope.message import Msg, TextBlock
+from agentscope.model import ChatModelBase, ChatResponse
+from agentscope.tool import ToolResponse, ToolRetriever, Toolkit
+
+VOCABULARY = ["weather", "file", "search", "email", "calendar", "code"]
+
+
+class KeywordEmbedding(EmbeddingModelBase):
+    """An embedding model counting the keywords."""
+
+    def __init__(self) -> None:
+        """Initialize the embedding model."""
+        super().__init__("keyword_embedding")
+        self.embedded_texts: list[str] = []
+
+    async def __call__(
+        self,
+        text: List[str],
+        **kwargs: Any,
+    ) -> EmbeddingResponse:
+        """Embed the texts by the keyword counts."""
+        self.embedded_texts.extend(text)
+        return EmbeddingResponse(
+            embeddings=[
+                [float(_.lower().count(word)) for word in VOCABULARY]
+                for _ in text
+            ],
+        )
+
+
+def _make_tool(name: str, description: str) -> Any:
+    """Make a tool function with the given name and description."""
+
+    def tool_func() -> ToolResponse:
+        """Placeholder."""
+        return ToolResponse(content=[TextBlock(type="text", text=name)])
+
+    tool_func.__name__ = name
+    tool_func.__doc__ = description
+    return tool_func
+
+
+TOOLS = {
+    "get_weather": "Get the weather forecast of a city.",
+    "read_file": "Read a file from the disk.",
+    "web_search": "Search the web.",
+    "send_email": "Send an email.",
+    "create_event": "Create a calendar event.",
+    "run_code": "Run the python code.",
+}
+
+
+class RecordingModel(ChatModelBase):
+    """A chat model recording the tools."""
+
+    def __init__(self) -> None:
+        """Initialize the model."""
+        super().__init__("recording_model", stream=False)
+        self.tools: list = []
+
+    async def __call__(
+        self,
+        _messages: list[dict],
+        **kwargs: Any,
+    ) -> ChatResponse:
+        """Record the tools and reply."""
+        self.tools.append(kwargs.get("tools"))
+        return ChatResponse(content=[TextBlock(type="text", text="Sunny")])
+
+
+class ToolRetrievalTest(IsolatedAsyncioTestCase):
+    """Test cases for the tool retrieval."""
+
+    async def asyncSetUp(self) -> None:
+        """Set up the toolkit."""
+        self.embedding_model = KeywordEmbedding()
+        self.toolkit = Toolkit(
+            tool_retriever=ToolRetriever(
+                self.embedding_model,
+                top_k=2,
+                pinned_tools=["run_code"],
+            ),
+        )
+        for name, description in TOOLS.items():
+            self.toolkit.register_tool_function(
+                _make_tool(name, description),
+            )
+
+    async def test_retrieve(self) -> None:
+        """Test the relevant tools are selected in the original order."""
+        schemas = await self.toolkit.get_relevant_json_schemas(
+            "Email me the weather forecast",
+            pinned_tools=["read_file"],
+        )
+        self.assertListEqual(
+            [_["function"]["name"] for _ in schemas],
+            ["get_weather", "read_file", "send_email", "run_code"],
+        )
+
+        # The tools are embedded only once
+        await self.toolkit.get_relevant_json_schemas("Search the calendar")
+        self.assertEqual(len(self.embedding_model.embedded_texts), 7)
+
+        # Only the new tool is embedded
+        self.toolkit.register_tool_function(
+            _make_tool("list_files", "List the files in a directory."),
+        )
+        schemas = await self.toolkit.get_relevant_json_schemas(
+            "Which file is the largest?",
+        )
+        self.assertListEqual(
+            self.embedding_model.embedded_texts[7:],
+            [
+                "list_files: List the files in a directory.",
+                "Which file is the largest?",
+            ],
+        )
+        self.assertListEqual(
+            [_["function"]["name"] for _ in schemas],
+            ["read_file", "run_code", "list_files"],
+        )
+
+    async def test_without_retriever(self) -> None:
+        """Test all the active tools are returned without retriever."""
+        self.toolkit.tool_retriever = None
+        schemas = await self.toolkit.get_relevant_json_schemas("weather")
+        self.assertEqual(len(schemas), len(TOOLS))
+
+    async def test_react_agent(self) -> None:
+        """Test the agent only sends the relevant tools."""
+        model = RecordingModel()
+        agent = ReActAgent(
+            name="Friday",
+            sys_prompt="You're a helpful assistant.",
+            model=model,
+            formatter=DashScopeChatFormatter(),
+            toolkit=self.toolkit,
+        )
+        await agent(Msg("user", "How's the weather today?", "user"))
+
+        # The top-2 tools, the pinned tool and the finish function
+        names = [_["function"]["name"] for _ in model.tools[0]]
+        self.assertEqual(len(names), 4)
+        self.assertEqual(names[0], "get_weather")
+        self.assertListEqual(names[-2:], ["run_code", "generate_response"])
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the JSON schema caching of the toolkit."""
+from unittest import TestCase
+from unittest.mock import patch
+
+from pydantic import BaseModel, Field
+
+from agentscope.message import TextBlock
+from agentscope.tool import ToolResponse, Toolkit
+
+
+def search(query: str) -> ToolResponse:
+    """Search the web.
+
+    Args:
+        query (`str`):
+            The search query.
+    """
+    return ToolResponse(content=[TextBlock(type="text", text=query)])
+
+
+def fetch(url: str) -> ToolResponse:
+    """Fetch the web page.
+
+    Args:
+        url (`str`):
+            The URL.
+    """
+    return ToolResponse(content=[TextBlock(type="text", text=url)])
+
+
+class ExtendedModel(BaseModel):
+    """The extended model."""
+
+    reason: str = Field(description="The reason.")
+
+
+class ToolkitSchemaTest(TestCase):
+    """Test cases for the JSON schema caching of the toolkit."""
+
+    def setUp(self) -> None:
+        """Set up the toolkit."""
+        self.toolkit = Toolkit()
+
+    def test_deferred_parsing(self) -> None:
+        """Test the docstrings are parsed on the first access."""
+        # pylint: disable=protected-access
+        with patch.object(
+            Toolkit,
+            "_parse_tool_function",
+            wraps=Toolkit._parse_tool_function,
+        ) as parse_mock:
+            self.toolkit.register_tool_function(search)
+            self.toolkit.register_tool_function(
+                fetch,
+                func_description="Fetch.",
+            )
+            self.assertEqual(parse_mock.call_count, 0)
+
+            schemas = self.toolkit.get_json_schemas()
+            self.assertEqual(parse_mock.call_count, 2)
+            self.assertEqual(
+                schemas[1]["function"]["description"],
+                "Fetch.",
+            )
+
+            self.toolkit.get_json_schemas()
+            self.assertEqual(parse_mock.call_count, 2)
+
+    def test_cache_invalidation(self) -> None:
+        """Test the cached JSON schemas are invalidated by the changes."""
+        self.toolkit.create_tool_group("web", "Web tools.")
+        self.toolkit.register_tool_function(search)
+        self.toolkit.register_tool_function(fetch, group_name="web")
+
+        schemas = self.toolkit.get_json_schemas()
+        self.assertListEqual(
+            [_["function"]["name"] for _ in schemas],
+            ["search"],
+        )
+        # The returned list can be modified without affecting the cache
+        schemas.clear()
+        self.assertEqual(len(self.toolkit.get_json_schemas()), 1)
+
+        self.toolkit.update_tool_groups(["web"], active=True)
+        self.assertEqual(len(self.toolkit.get_json_schemas()), 2)
+
+        self.toolkit.set_extended_model("search", ExtendedModel)
+        schema = self.toolkit.get_json_schemas()[0]
+        self.assertIn("reason", schema["function"]["parameters"]["properties"])
+        self.assertIs(self.toolkit.get_json_schemas()[0], schema)
+
+        self.toolkit.set_extended_model("search", None)
+        schema = self.toolkit.get_json_schemas()[0]
+        self.assertNotIn(
+            "reason",
+            schema["function"]["parameters"]["properties"],
+        )
+
+        self.toolkit.remove_tool_function("search")
+        self.assertEqual(len(self.toolkit.get_json_schemas()), 1)
+
+        self.toolkit.load_state_dict({"active_groups": []})
+        self.assertEqual(len(self.toolkit.get_json_schemas()), 0)
+
+    def test_meta_tool(self) -> None:
+        """Test the meta tool schema follows the tool groups."""
+        self.toolkit.register_tool_function(
+            self.toolkit.reset_equipped_tools,
+        )
+        self.toolkit.create_tool_group("web", "Web tools.")
+        properties = self.toolkit.get_json_schemas()[0]["function"][
+            "parameters"
+        ]["properties"]
+        self.assertListEqual(list(properties), ["web"])
+
+        self.toolkit.create_tool_group("file", "File tools.")
+        properties = self.toolkit.get_json_schemas()[0]["function"][
+            "parameters"
+        ]["properties"]
+        self.assertListEqual(list(properties), ["web", "file"])
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+# pylint: disable=too-many-lines
 """Test toolkit module in agentscope."""
 import asyncio
+import os
+import threading
 import time
 from copy import deepcopy
 from functools import partial
@@ -105,6 +108,48 @@ def sync_generator_func() -> Generator[ToolResponse, None, None]:
     yield response3
 
 
+def blocking_func(seconds: float) -> ToolResponse:
+    """A blocking function that reports the executing thread and process."""
+    time.sleep(seconds)
+    return ToolResponse(
+        content=[
+            TextBlock(
+                type="text",
+                text=f"{threading.current_thread().name}|{os.getpid()}",
+            ),
+        ],
+    )
+
+
+def blocking_generator_func(n: int) -> Generator[ToolResponse, None, None]:
+    """A blocking sync generator function for testing."""
+    text = ""
+    for i in range(n):
+        time.sleep(0.1)
+        text += str(i)
+        yield ToolResponse(
+            content=[TextBlock(type="text", text=text)],
+            stream=True,
+            is_last=i == n - 1,
+        )
+
+
+async def slow_async_generator_func(
+    n: int,
+    interval: float,
+) -> AsyncGenerator[ToolResponse, None]:
+    """A slow async generator function for testing."""
+    text = ""
+    for i in range(n):
+        await asyncio.sleep(interval)
+        text += str(i)
+        yield ToolResponse(
+            content=[TextBlock(type="text", text=text)],
+            stream=True,
+            is_last=i == n - 1,
+        )
+
+
 class StructuredModel(BaseModel):
     """Test structured model"""
 
@@ -846,6 +891,220 @@ class ToolkitTest(IsolatedAsyncioTestCase):
                 "</notes>",
             )
 
+    async def _run_with_ticker(
+        self,
+        tool_call: ToolUseBlock,
+    ) -> tuple[list[ToolResponse], int]:
+        """Call the tool function while counting the ticks of the event loop
+        in the meantime."""
+        ticks = 0
+        stop = asyncio.Event()
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while not stop.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        res = await self.toolkit.call_tool_function(tool_call)
+        chunks = [_ async for _ in res]
+        stop.set()
+        await task
+        return chunks, ticks
+
+    async def test_execution_mode(self) -> None:
+        """Test executing the sync tool functions on the event loop, the
+        thread pool and the process pool."""
+        self.toolkit.register_tool_function(blocking_func)
+
+        tool_call = ToolUseBlock(
+            type="tool_use",
+            id="123",
+            name="blocking_func",
+            input={"seconds": 0.3},
+        )
+
+        # Inline by default
+        chunks, ticks = await self._run_with_ticker(tool_call)
+        self.assertEqual(
+            chunks[0].content[0]["text"],
+            f"MainThread|{os.getpid()}",
+        )
+        self.assertLessEqual(ticks, 1)
+
+        # In the thread pool, the event loop is not blocked
+        self.toolkit.tools["blocking_func"].execution_mode = "thread"
+        chunks, ticks = await self._run_with_ticker(tool_call)
+        self.assertTrue(
+            chunks[0].content[0]["text"].startswith("agentscope_tool"),
+        )
+        self.assertGreater(ticks, 5)
+
+        # In the process pool
+        self.toolkit.tools["blocking_func"].execution_mode = "process"
+        chunks, ticks = await self._run_with_ticker(tool_call)
+        self.assertNotEqual(
+            chunks[0].content[0]["text"].split("|")[1],
+            str(os.getpid()),
+        )
+
+        # The sync generator is iterated in the thread pool by the default
+        # execution mode of the toolkit
+        self.toolkit.shutdown()
+        self.toolkit = Toolkit(default_execution_mode="thread")
+        self.toolkit.register_tool_function(blocking_generator_func)
+        chunks, ticks = await self._run_with_ticker(
+            ToolUseBlock(
+                type="tool_use",
+                id="123",
+                name="blocking_generator_func",
+                input={"n": 3},
+            ),
+        )
+        self.assertListEqual(
+            [_.content[0]["text"] for _ in chunks],
+            ["0", "01", "012"],
+        )
+        self.assertGreater(ticks, 5)
+
+        self.toolkit.shutdown()
+
+    async def test_max_pending_calls(self) -> None:
+        """Test the pending calls are bounded."""
+        self.toolkit = Toolkit(
+            default_execution_mode="thread",
+            max_pending_calls=2,
+        )
+        self.toolkit.register_tool_function(blocking_func)
+
+        async def call() -> None:
+            res = await self.toolkit.call_tool_function(
+                ToolUseBlock(
+                    type="tool_use",
+                    id="123",
+                    name="blocking_func",
+                    input={"seconds": 0.2},
+                ),
+            )
+            async for _ in res:
+                pass
+
+        start = time.time()
+        await asyncio.gather(*[call() for _ in range(4)])
+        self.assertGreaterEqual(time.time() - start, 0.4)
+        self.toolkit.shutdown()
+
+    async def _call(self, name: str, **kwargs: Any) -> list[ToolResponse]:
+        """Call the tool function and collect the chunks."""
+        res = await self.toolkit.call_tool_function(
+            ToolUseBlock(type="tool_use", id="123", name=name, input=kwargs),
+        )
+        return [_ async for _ in res]
+
+    async def test_timeout(self) -> None:
+        """Test the timed-out tool calls are interrupted."""
+        self.toolkit.register_tool_function(async_func, timeout=0.1)
+        self.toolkit.register_tool_function(
+            slow_async_generator_func,
+            timeout=0.25,
+        )
+        self.toolkit.register_tool_function(
+            blocking_func,
+            execution_mode="thread",
+            timeout=0.1,
+        )
+        timeout_info = (
+            "<system-info>The tool call has timed out after {} seconds."
+            "</system-info>"
+        )
+
+        # Async function
+        chunks = await self._call("async_func", raise_cancel=True)
+        self.assertEqual(len(chunks), 1)
+        self.assertTrue(chunks[0].is_interrupted)
+        self.assertEqual(
+            chunks[0].content[0]["text"],
+            timeout_info.format(0.1),
+        )
+
+        # Async generator, the generated chunks are kept
+        chunks = await self._call(
+            "slow_async_generator_func",
+            n=5,
+            interval=0.1,
+        )
+        self.assertListEqual(
+            [_.content[0]["text"] for _ in chunks],
+            ["0", "01", "01"],
+        )
+        self.assertTrue(chunks[-1].is_interrupted)
+        self.assertTrue(chunks[-1].is_last)
+        self.assertEqual(
+            chunks[-1].content[1]["text"],
+            timeout_info.format(0.25),
+        )
+
+        # Sync function in the thread pool
+        chunks = await self._call("blocking_func", seconds=0.3)
+        self.assertTrue(chunks[0].is_interrupted)
+
+        # Finished in time
+        chunks = await self._call(
+            "slow_async_generator_func",
+            n=2,
+            interval=0.01,
+        )
+        self.assertListEqual(
+            [_.content[0]["text"] for _ in chunks],
+            ["0", "01"],
+        )
+        self.assertFalse(chunks[-1].is_interrupted)
+        self.toolkit.shutdown()
+
+    async def test_concurrency_limits(self) -> None:
+        """Test the per-tool concurrency limit and queue limit."""
+        self.toolkit.register_tool_function(
+            slow_async_generator_func,
+            max_concurrency=2,
+            max_queue_size=1,
+        )
+
+        start = time.time()
+        results = await asyncio.gather(
+            *[
+                self._call("slow_async_generator_func", n=2, interval=0.1)
+                for _ in range(4)
+            ],
+        )
+        elapsed = time.time() - start
+
+        # Two running, one queued and one rejected
+        texts = [_[-1].content[0]["text"] for _ in results]
+        self.assertEqual(texts.count("01"), 3)
+        self.assertEqual(
+            texts[3],
+            "Error: Too many pending calls of the tool function "
+            "'slow_async_generator_func', try again later.",
+        )
+        self.assertGreaterEqual(elapsed, 0.4)
+        self.assertLess(elapsed, 0.6)
+
+    async def test_max_concurrent_calls(self) -> None:
+        """Test the toolkit-level concurrency limit."""
+        self.toolkit = Toolkit(max_concurrent_calls=1)
+        self.toolkit.register_tool_function(slow_async_generator_func)
+        self.toolkit.register_tool_function(async_func)
+
+        start = time.time()
+        results = await asyncio.gather(
+            self._call("slow_async_generator_func", n=2, interval=0.1),
+            self._call("slow_async_generator_func", n=2, interval=0.1),
+            self._call("async_func", raise_cancel=False),
+        )
+        self.assertGreaterEqual(time.time() - start, 0.4)
+        self.assertEqual(results[2][0].content[0]["text"], "1")
+
     async def asyncTearDown(self) -> None:
         """Clean up after each test."""
         self.toolkit = None